@@ -265,19 +265,79 @@ int Connection::insert(const std::string& table, const std::string& data)
 {
 SQLBuffer	sql;
 Document	document;
-SQLBuffer	values;
-int		col = 0;
+bool		multiple;
+int		rows = 0;
  
 	if (document.Parse(data.c_str()).HasParseError())
 	{
 		raiseError("insert", "Failed to parse JSON payload\n");
 		return -1;
 	}
+
+	// Either a single row or { "inserts" : [ row, ... ] }, the statements
+	// sent in a single PQexec call are executed in a single transaction
+	multiple = document.HasMember("inserts");
+	if (multiple)
+	{
+		Value &inserts = document["inserts"];
+		if (!inserts.IsArray())
+		{
+			raiseError("insert", "Payload is missing the inserts array");
+			return -1;
+		}
+		if (inserts.Size() == 0)
+		{
+			// Nothing to execute
+			return 0;
+		}
+		for (Value::ConstValueIterator iter = inserts.Begin(); iter != inserts.End(); ++iter)
+		{
+			if (!iter->IsObject())
+			{
+				raiseError("insert",
+					   "Each entry in the insert array must be an object");
+				return -1;
+			}
+			appendInsert(table, *iter, sql);
+			rows++;
+		}
+	}
+	else
+	{
+		appendInsert(table, document, sql);
+	}
+
+	const char *query = sql.coalesce();
+	logSQL("CommonInsert", query);
+	PGresult *res = PQexec(dbConnection, query);
+	delete[] query;
+	if (PQresultStatus(res) == PGRES_COMMAND_OK)
+	{
+		if (!multiple)
+		{
+			rows = atoi(PQcmdTuples(res));
+		}
+		PQclear(res);
+		return rows;
+	}
+ 	raiseError("insert", PQerrorMessage(dbConnection));
+	PQclear(res);
+	return -1;
+}
+
+/**
+ * Append the INSERT statement of a single row to the SQL buffer
+ */
+void Connection::appendInsert(const std::string& table, const Value& row, SQLBuffer& sql)
+{
+SQLBuffer	values;
+int		col = 0;
+
  	sql.append("INSERT INTO foglamp.");
 	sql.append(table);
 	sql.append(" (");
-	for (Value::ConstMemberIterator itr = document.MemberBegin();
-		itr != document.MemberEnd(); ++itr)
+	for (Value::ConstMemberIterator itr = row.MemberBegin();
+		itr != row.MemberEnd(); ++itr)
 	{
 		if (col)
 			sql.append(", ");
@@ -322,19 +382,6 @@ int		col = 0;
 	sql.append(vals);
 	delete[] vals;
 	sql.append(");");
-
-	const char *query = sql.coalesce();
-	logSQL("CommonInsert", query);
-	PGresult *res = PQexec(dbConnection, query);
-	delete[] query;
-	if (PQresultStatus(res) == PGRES_COMMAND_OK)
-	{
-		PQclear(res);
-		return atoi(PQcmdTuples(res));
-	}
- 	raiseError("insert", PQerrorMessage(dbConnection));
-	PQclear(res);
-	return -1;
 }
 
 /**
@@ -1083,6 +1130,58 @@ Document doc;
 	resultSet = buffer.GetString();
 }
 
+/**
+ * Return true if the aggregates are an array of aggregates of more than one
+ * json property, each one with an alias, as requested to summarise all the
+ * properties of a column in a single query.
+ *
+ * The rows are then not restricted to those having every property: a row
+ * missing a property gives a NULL value for it, ignored by the aggregates.
+ */
+static bool multiPropertyAggregates(const Value& aggregates)
+{
+	string first;
+	bool multiple = false;
+
+	for (Value::ConstValueIterator itr = aggregates.Begin(); itr != aggregates.End(); ++itr)
+	{
+		if (!itr->IsObject() || !itr->HasMember("json"))
+		{
+			continue;
+		}
+		const Value& json = (*itr)["json"];
+		if (!itr->HasMember("alias") || !json.IsObject() ||
+		    !json.HasMember("column") || !json.HasMember("properties"))
+		{
+			return false;
+		}
+		string property = json["column"].GetString();
+		const Value& jsonFields = json["properties"];
+		if (jsonFields.IsArray())
+		{
+			for (Value::ConstValueIterator field = jsonFields.Begin(); field != jsonFields.End(); ++field)
+			{
+				property.append(".");
+				property.append(field->GetString());
+			}
+		}
+		else
+		{
+			property.append(".");
+			property.append(jsonFields.GetString());
+		}
+		if (first.empty())
+		{
+			first = property;
+		}
+		else if (property.compare(first) != 0)
+		{
+			multiple = true;
+		}
+	}
+	return multiple;
+}
+
 /**
  * Process the aggregate options and return the columns to be selected
  */
@@ -1191,6 +1290,7 @@ bool Connection::jsonAggregates(const Value& payload, const Value& aggregates, S
 	else if (aggregates.IsArray())
 	{
 		int index = 0;
+		bool allRows = multiPropertyAggregates(aggregates);
 		for (Value::ConstValueIterator itr = aggregates.Begin(); itr != aggregates.End(); ++itr)
 		{
 			if (!itr->IsObject())
@@ -1239,11 +1339,7 @@ bool Connection::jsonAggregates(const Value& payload, const Value& aggregates, S
 					return false;
 				}
 				const Value& jsonFields = json["properties"];
-				if (! jsonConstraint.isEmpty())
-				{
-					jsonConstraint.append(" AND ");
-				}
-				jsonConstraint.append(json["column"].GetString());
+				string constraint = json["column"].GetString();
 				if (jsonFields.IsArray())
 				{
 					string prev;
@@ -1251,29 +1347,40 @@ bool Connection::jsonAggregates(const Value& payload, const Value& aggregates, S
 					{
 						if (prev.length() > 0)
 						{
-							jsonConstraint.append("->>'");
-							jsonConstraint.append(prev);
-							jsonConstraint.append("'");
+							constraint.append("->>'");
+							constraint.append(prev);
+							constraint.append("'");
 						}
 						prev = itr->GetString();
 						sql.append("->>'");
 						sql.append(itr->GetString());
 						sql.append('\'');
 					}
-					jsonConstraint.append(" ? '");
-					jsonConstraint.append(prev);
-					jsonConstraint.append("'");
+					constraint.append(" ? '");
+					constraint.append(prev);
+					constraint.append("'");
 				}
 				else
 				{
 					sql.append("->>'");
 					sql.append(jsonFields.GetString());
 					sql.append('\'');
-					jsonConstraint.append(" ? '");
-					jsonConstraint.append(jsonFields.GetString());
-					jsonConstraint.append("'");
+					constraint.append(" ? '");
+					constraint.append(jsonFields.GetString());
+					constraint.append("'");
 				}
 				sql.append(")::float");
+
+				// Add condition for json key present, unless all the
+				// rows are summarised whatever properties they have
+				if (! allRows)
+				{
+					if (! jsonConstraint.isEmpty())
+					{
+						jsonConstraint.append(" AND ");
+					}
+					jsonConstraint.append(constraint);
+				}
 			}
 			sql.append(") AS \"");
 			if (itr->HasMember("alias"))
@@ -34,6 +34,8 @@ class Connection {
 		void		raiseError(const char *operation, const char *reason,...);
 		PGconn		*dbConnection;
 		void		mapResultSet(PGresult *res, std::string& resultSet);
+		void		appendInsert(const std::string& table, const rapidjson::Value& row,
+						SQLBuffer& sql);
 		bool		jsonWhereClause(const rapidjson::Value& whereClause, SQLBuffer&);
 		bool		jsonModifiers(const rapidjson::Value&, SQLBuffer&);
 		bool		jsonAggregates(const rapidjson::Value&, const rapidjson::Value&, SQLBuffer&, SQLBuffer&);
@@ -847,19 +847,107 @@ int Connection::insert(const std::string& table, const std::string& data)
 {
 SQLBuffer	sql;
 Document	document;
-SQLBuffer	values;
-int		col = 0;
+bool		multiple;
+int		rows = 0;
  
 	if (document.Parse(data.c_str()).HasParseError())
 	{
 		raiseError("insert", "Failed to parse JSON payload\n");
 		return -1;
 	}
+
+	// Either a single row or { "inserts" : [ row, ... ] }, all of them
+	// written in a single transaction
+	multiple = document.HasMember("inserts");
+	if (multiple)
+	{
+		Value &inserts = document["inserts"];
+		if (!inserts.IsArray())
+		{
+			raiseError("insert", "Payload is missing the inserts array");
+			return -1;
+		}
+		if (inserts.Size() == 0)
+		{
+			// Nothing to execute
+			return 0;
+		}
+		sql.append("BEGIN TRANSACTION;");
+		for (Value::ConstValueIterator iter = inserts.Begin(); iter != inserts.End(); ++iter)
+		{
+			if (!iter->IsObject())
+			{
+				raiseError("insert",
+					   "Each entry in the insert array must be an object");
+				return -1;
+			}
+			appendInsert(table, *iter, sql);
+			rows++;
+		}
+		sql.append("COMMIT TRANSACTION;");
+	}
+	else
+	{
+		appendInsert(table, document, sql);
+	}
+
+	const char *query = sql.coalesce();
+	logSQL("CommonInsert", query);
+	char *zErrMsg = NULL;
+	int rc;
+
+	// Exec INSERT statement: no callback, no result set
+	rc = SQLexec(dbHandle,
+		     query,
+		     NULL,
+		     NULL,
+		     &zErrMsg);
+
+	// Check exec result
+	if (rc == SQLITE_OK )
+	{
+		// Success. Release memory for 'query' var
+		delete[] query;
+		return multiple ? rows : sqlite3_changes(dbHandle);
+	}
+
+	raiseError("insert", zErrMsg);
+	sqlite3_free(zErrMsg);
+	if (sqlite3_get_autocommit(dbHandle)==0) // transaction is still open, do rollback
+	{
+		rc=SQLexec(dbHandle,
+			"ROLLBACK TRANSACTION;",
+			NULL,
+			NULL,
+			&zErrMsg);
+		if (rc != SQLITE_OK)
+		{
+			raiseError("rollback", zErrMsg);
+			sqlite3_free(zErrMsg);
+		}
+	}
+	Logger::getLogger()->error("SQL statement: %s", query);
+
+	// Release memory for 'query' var
+	delete[] query;
+
+	// Failure
+	return -1;
+}
+
+/**
+ * Append the INSERT statement of a single row to the SQL buffer
+ */
+void Connection::appendInsert(const std::string& table, const Value& row, SQLBuffer& sql)
+{
+SQLBuffer	values;
+int		col = 0;
+
  	sql.append("INSERT INTO foglamp.");
 	sql.append(table);
 	sql.append(" (");
-	for (Value::ConstMemberIterator itr = document.MemberBegin();
-		itr != document.MemberEnd(); ++itr)
+	for (Value::ConstMemberIterator itr = row.MemberBegin();
+		itr != row.MemberEnd(); ++itr)
 	{
 		if (col)
 			sql.append(", ");
@@ -901,36 +989,6 @@ int		col = 0;
 	sql.append(vals);
 	delete[] vals;
 	sql.append(");");
-
-	const char *query = sql.coalesce();
-	logSQL("CommonInsert", query);
-	char *zErrMsg = NULL;
-	int rc;
-
-	// Exec INSERT statement: no callback, no result set
-	rc = SQLexec(dbHandle,
-		     query,
-		     NULL,
-		     NULL,
-		     &zErrMsg);
-
-	// Check exec result
-	if (rc == SQLITE_OK )
-	{
-		// Success. Release memory for 'query' var
-		delete[] query;
-		return sqlite3_changes(dbHandle);
-	}
-
-	raiseError("insert", zErrMsg);
-	Logger::getLogger()->error("SQL statement: %s", query);
-	sqlite3_free(zErrMsg);
-
-	// Release memory for 'query' var
-	delete[] query;
-
-	// Failure
-	return -1;
 }
 
 /**
@@ -1982,6 +2040,58 @@ long numReadings = 0;
 	return deletedRows;
 }
 
+/**
+ * Return true if the aggregates are an array of aggregates of more than one
+ * json property, each one with an alias, as requested to summarise all the
+ * properties of a column in a single query.
+ *
+ * The rows are then not restricted to those having every property: a row
+ * missing a property gives a NULL value for it, ignored by the aggregates.
+ */
+static bool multiPropertyAggregates(const Value& aggregates)
+{
+	string first;
+	bool multiple = false;
+
+	for (Value::ConstValueIterator itr = aggregates.Begin(); itr != aggregates.End(); ++itr)
+	{
+		if (!itr->IsObject() || !itr->HasMember("json"))
+		{
+			continue;
+		}
+		const Value& json = (*itr)["json"];
+		if (!itr->HasMember("alias") || !json.IsObject() ||
+		    !json.HasMember("column") || !json.HasMember("properties"))
+		{
+			return false;
+		}
+		string property = json["column"].GetString();
+		const Value& jsonFields = json["properties"];
+		if (jsonFields.IsArray())
+		{
+			for (Value::ConstValueIterator field = jsonFields.Begin(); field != jsonFields.End(); ++field)
+			{
+				property.append(".");
+				property.append(field->GetString());
+			}
+		}
+		else
+		{
+			property.append(".");
+			property.append(jsonFields.GetString());
+		}
+		if (first.empty())
+		{
+			first = property;
+		}
+		else if (property.compare(first) != 0)
+		{
+			multiple = true;
+		}
+	}
+	return multiple;
+}
+
 /**
  * Process the aggregate options and return the columns to be selected
  */
@@ -2123,6 +2233,7 @@ bool Connection::jsonAggregates(const Value& payload,
 	else if (aggregates.IsArray())
 	{
 		int index = 0;
+		bool allRows = multiPropertyAggregates(aggregates);
 		for (Value::ConstValueIterator itr = aggregates.Begin(); itr != aggregates.End(); ++itr)
 		{
 			if (!itr->IsObject())
@@ -2169,10 +2280,6 @@ bool Connection::jsonAggregates(const Value& payload,
 					return false;
 				}
 				const Value& jsonFields = json["properties"];
-				if (! jsonConstraint.isEmpty())
-				{
-					jsonConstraint.append(" AND ");
-				}
 				// Use json_extract(field, '$.key1.key2') AS value
 				sql.append("json_extract(");
 				sql.append(json["column"].GetString());
@@ -2181,9 +2288,9 @@ bool Connection::jsonAggregates(const Value& payload,
 				// JSON1 SQLite3 extension 'json_type' object check:
 				// json_type(field, '$.key1.key2') IS NOT NULL
 				// Build the Json keys NULL check
-				jsonConstraint.append("json_type(");
-				jsonConstraint.append(json["column"].GetString());
-				jsonConstraint.append(", '$.");
+				string constraint = "json_type(";
+				constraint.append(json["column"].GetString());
+				constraint.append(", '$.");
 
 				if (jsonFields.IsArray())
 				{
@@ -2192,8 +2299,8 @@ bool Connection::jsonAggregates(const Value& payload,
 					{
 						if (prev.length() > 0)
 						{
-							jsonConstraint.append(prev);
-							jsonConstraint.append('.');
+							constraint.append(prev);
+							constraint.append(".");
 							sql.append('.');
 						}
 						// Append Json field for query
@@ -2201,25 +2308,27 @@ bool Connection::jsonAggregates(const Value& payload,
 						prev = itr->GetString();
 					}
 					// Add last Json key
-					jsonConstraint.append(prev);
-
-					// Add condition for json key not null
-					jsonConstraint.append("') IS NOT NULL");
+					constraint.append(prev);
 				}
 				else
 				{
 					// Append Json field for query
 					sql.append(jsonFields.GetString());
-
-					// JSON1 SQLite3 extension 'json_type' object check:
-					// json_type(field, '$.key1.key2') IS NOT NULL
-					// Build the Json key NULL check
-					jsonConstraint.append(jsonFields.GetString());
-
-					// Add condition for json key not null
-					jsonConstraint.append("') IS NOT NULL");
+					constraint.append(jsonFields.GetString());
 				}
 				sql.append("')");
+
+				// Add condition for json key not null, unless all the
+				// rows are summarised whatever properties they have
+				if (! allRows)
+				{
+					if (! jsonConstraint.isEmpty())
+					{
+						jsonConstraint.append(" AND ");
+					}
+					constraint.append("') IS NOT NULL");
+					jsonConstraint.append(constraint);
+				}
 			}
 			sql.append(") AS \"");
 			if (itr->HasMember("alias"))
@@ -42,6 +42,8 @@ class Connection {
 		void		raiseError(const char *operation, const char *reason,...);
 		sqlite3		*dbHandle;
 		int		mapResultSet(void *res, std::string& resultSet);
+		void		appendInsert(const std::string& table, const rapidjson::Value& row,
+						SQLBuffer& sql);
 		bool		jsonWhereClause(const rapidjson::Value& whereClause, SQLBuffer&);
 		bool		jsonModifiers(const rapidjson::Value&, SQLBuffer&);
 		bool		jsonAggregates(const rapidjson::Value&,
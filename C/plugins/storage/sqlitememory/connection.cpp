@@ -1137,6 +1137,58 @@ long numReadings = 0;
 	return deletedRows;
 }
 
+/**
+ * Return true if the aggregates are an array of aggregates of more than one
+ * json property, each one with an alias, as requested to summarise all the
+ * properties of a column in a single query.
+ *
+ * The rows are then not restricted to those having every property: a row
+ * missing a property gives a NULL value for it, ignored by the aggregates.
+ */
+static bool multiPropertyAggregates(const Value& aggregates)
+{
+	string first;
+	bool multiple = false;
+
+	for (Value::ConstValueIterator itr = aggregates.Begin(); itr != aggregates.End(); ++itr)
+	{
+		if (!itr->IsObject() || !itr->HasMember("json"))
+		{
+			continue;
+		}
+		const Value& json = (*itr)["json"];
+		if (!itr->HasMember("alias") || !json.IsObject() ||
+		    !json.HasMember("column") || !json.HasMember("properties"))
+		{
+			return false;
+		}
+		string property = json["column"].GetString();
+		const Value& jsonFields = json["properties"];
+		if (jsonFields.IsArray())
+		{
+			for (Value::ConstValueIterator field = jsonFields.Begin(); field != jsonFields.End(); ++field)
+			{
+				property.append(".");
+				property.append(field->GetString());
+			}
+		}
+		else
+		{
+			property.append(".");
+			property.append(jsonFields.GetString());
+		}
+		if (first.empty())
+		{
+			first = property;
+		}
+		else if (property.compare(first) != 0)
+		{
+			multiple = true;
+		}
+	}
+	return multiple;
+}
+
 /**
  * Process the aggregate options and return the columns to be selected
  */
@@ -1270,6 +1322,7 @@ bool Connection::jsonAggregates(const Value& payload,
 	else if (aggregates.IsArray())
 	{
 		int index = 0;
+		bool allRows = multiPropertyAggregates(aggregates);
 		for (Value::ConstValueIterator itr = aggregates.Begin(); itr != aggregates.End(); ++itr)
 		{
 			if (!itr->IsObject())
@@ -1316,10 +1369,6 @@ bool Connection::jsonAggregates(const Value& payload,
 					return false;
 				}
 				const Value& jsonFields = json["properties"];
-				if (! jsonConstraint.isEmpty())
-				{
-					jsonConstraint.append(" AND ");
-				}
 				// Use json_extract(field, '$.key1.key2') AS value
 				sql.append("json_extract(");
 				sql.append(json["column"].GetString());
@@ -1328,9 +1377,9 @@ bool Connection::jsonAggregates(const Value& payload,
 				// JSON1 SQLite3 extension 'json_type' object check:
 				// json_type(field, '$.key1.key2') IS NOT NULL
 				// Build the Json keys NULL check
-				jsonConstraint.append("json_type(");
-				jsonConstraint.append(json["column"].GetString());
-				jsonConstraint.append(", '$.");
+				string constraint = "json_type(";
+				constraint.append(json["column"].GetString());
+				constraint.append(", '$.");
 
 				if (jsonFields.IsArray())
 				{
@@ -1339,8 +1388,8 @@ bool Connection::jsonAggregates(const Value& payload,
 					{
 						if (prev.length() > 0)
 						{
-							jsonConstraint.append(prev);
-							jsonConstraint.append('.');
+							constraint.append(prev);
+							constraint.append(".");
 							sql.append('.');
 						}
 						// Append Json field for query
@@ -1348,25 +1397,27 @@ bool Connection::jsonAggregates(const Value& payload,
 						prev = itr->GetString();
 					}
 					// Add last Json key
-					jsonConstraint.append(prev);
-
-					// Add condition for json key not null
-					jsonConstraint.append("') IS NOT NULL");
+					constraint.append(prev);
 				}
 				else
 				{
 					// Append Json field for query
 					sql.append(jsonFields.GetString());
-
-					// JSON1 SQLite3 extension 'json_type' object check:
-					// json_type(field, '$.key1.key2') IS NOT NULL
-					// Build the Json key NULL check
-					jsonConstraint.append(jsonFields.GetString());
-
-					// Add condition for json key not null
-					jsonConstraint.append("') IS NOT NULL");
+					constraint.append(jsonFields.GetString());
 				}
 				sql.append("')");
+
+				// Add condition for json key not null, unless all the
+				// rows are summarised whatever properties they have
+				if (! allRows)
+				{
+					if (! jsonConstraint.isEmpty())
+					{
+						jsonConstraint.append(" AND ");
+					}
+					constraint.append("') IS NOT NULL");
+					jsonConstraint.append(constraint);
+				}
 			}
 			sql.append(") AS \"");
 			if (itr->HasMember("alias"))
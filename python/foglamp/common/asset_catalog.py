@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+"""Catalog of the assets with readings, kept in the asset_catalog table
+
+Every row holds the number of readings of an asset, the user_ts of its oldest and newest readings and the keys of
+its readings, so that the assets can be listed without scanning the readings table.
+The Python south services add the readings they insert, the purge task sets the counts to the readings left.
+The readings of the C south services are counted when the core reconciles the catalog, see :class:`Reconciler`.
+"""
+
+import asyncio
+import json
+
+from foglamp.common import logger
+from foglamp.common.storage_client.payload_builder import PayloadBuilder
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_logger = logger.setup(__name__)
+
+_TABLE = 'asset_catalog'
+
+
+def _json_type(value):
+    """ Name of the JSON type of value, as jsonb_typeof """
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, (int, float)):
+        return 'number'
+    if isinstance(value, str):
+        return 'string'
+    if isinstance(value, (list, tuple)):
+        return 'array'
+    return 'object'
+
+
+async def is_complete(storage):
+    """ Whether the catalog counts every reading added since it was last reconciled
+
+    The C south services do not add their readings to the catalog, it is incomplete once one is scheduled.
+
+    Args:
+        storage: StorageClientAsync
+    """
+    payload = PayloadBuilder().SELECT("id").WHERE(["process_name", "=", "south_c"]).LIMIT(1).payload()
+    results = await storage.query_tbl_with_payload('schedules', payload)
+    return results['count'] == 0
+
+
+class AssetCatalog(object):
+    """ Changes to the asset catalog kept in memory and written periodically
+
+    :meth:`add` only updates a dict, the readings added meanwhile are written every flush interval: a single insert
+    for the assets not in the catalog yet and a single update incrementing the count of the others.
+    When a write fails the changes are kept and written by the next flush.
+    """
+
+    def __init__(self, storage, flush_interval=5):
+        """
+        Args:
+            storage: StorageClientAsync of the asset_catalog table
+            flush_interval: seconds between two writes
+        """
+        self._storage = storage
+        self._flush_interval = flush_interval
+        self._assets = None
+        """ Rows of the catalog by asset code, with their last_ts and keys, None until loaded """
+        self._changes = {}
+        """ Changes not written yet by asset code """
+        self._flush_task = None
+        self._stop_event = None
+
+    def add(self, readings):
+        """ Adds readings inserted in the readings table
+
+        Args:
+            readings: list of readings as appended to the readings table, dicts with asset_code, reading and user_ts
+        """
+        changes = self._changes
+        for reading in readings:
+            asset_code = reading['asset_code']
+            user_ts = str(reading['user_ts'])
+            values = reading['reading']
+            change = changes.get(asset_code)
+            if change is None:
+                changes[asset_code] = {'count': 1, 'first_ts': user_ts, 'last_ts': user_ts,
+                                       'keys': {key: _json_type(value) for key, value in values.items()}}
+                continue
+            change['count'] += 1
+            if user_ts > change['last_ts']:
+                change['last_ts'] = user_ts
+            elif user_ts < change['first_ts']:
+                change['first_ts'] = user_ts
+            keys = change['keys']
+            if not keys.keys() >= values.keys():
+                for key, value in values.items():
+                    if key not in keys:
+                        keys[key] = _json_type(value)
+
+    def _restore(self, changes):
+        """ Puts back changes that could not be written """
+        for asset_code, change in changes.items():
+            newer = self._changes.get(asset_code)
+            if newer is not None:
+                change['count'] += newer['count']
+                change['first_ts'] = min(change['first_ts'], newer['first_ts'])
+                change['last_ts'] = max(change['last_ts'], newer['last_ts'])
+                change['keys'].update(newer['keys'])
+            self._changes[asset_code] = change
+
+    async def _load(self):
+        payload = PayloadBuilder().SELECT(("asset_code", "last_ts", "keys")).payload()
+        results = await self._storage.query_tbl_with_payload(_TABLE, payload)
+        self._assets = {}
+        for row in results['rows']:
+            keys = json.loads(row['keys']) if isinstance(row['keys'], str) else row['keys']
+            self._assets[row['asset_code']] = {'last_ts': str(row['last_ts']), 'keys': keys}
+
+    async def flush(self):
+        """ Writes the changes added so far
+
+        Returns:
+            False if the changes could not be written, they are kept for the next flush
+        """
+        if not self._changes:
+            return True
+        if self._assets is None:
+            try:
+                await self._load()
+            except Exception as ex:
+                _logger.warning('Unable to read the asset catalog, %s', str(ex))
+                return False
+
+        changes, self._changes = self._changes, {}
+        assets = self._assets
+        new_assets = {asset_code: change for asset_code, change in changes.items() if asset_code not in assets}
+        written = True
+
+        if new_assets:
+            payload = {"inserts": [json.loads(PayloadBuilder().INSERT(asset_code=asset_code,
+                                                                      reading_count=change['count'],
+                                                                      first_ts=change['first_ts'],
+                                                                      last_ts=change['last_ts'],
+                                                                      keys=change['keys']).payload())
+                                   for asset_code, change in new_assets.items()]}
+            try:
+                await self._storage.insert_into_tbl(_TABLE, json.dumps(payload))
+                for asset_code, change in new_assets.items():
+                    assets[asset_code] = {'last_ts': change['last_ts'], 'keys': change['keys']}
+            except Exception as ex:
+                # Some assets may have been added by another service, the catalog is read by the next flush
+                self._assets = None
+                self._restore(new_assets)
+                _logger.warning('Unable to add %s assets to the asset catalog, %s', len(new_assets), str(ex))
+                written = False
+
+        updates = []
+        updated = {}
+        for asset_code, change in changes.items():
+            if asset_code in new_assets:
+                continue
+            asset = assets[asset_code]
+            update = PayloadBuilder().WHERE(["asset_code", "=", asset_code]) \
+                .EXPR(["reading_count", "+", change['count']])
+            row = {'last_ts': asset['last_ts'], 'keys': asset['keys']}
+            if change['last_ts'] > asset['last_ts']:
+                row['last_ts'] = change['last_ts']
+                update = update.SET(last_ts=change['last_ts'])
+            if not asset['keys'].keys() >= change['keys'].keys():
+                row['keys'] = dict(change['keys'])
+                row['keys'].update(asset['keys'])
+                update = update.SET(keys=row['keys'])
+            updates.append(json.loads(update.payload()))
+            updated[asset_code] = row
+
+        if updates:
+            try:
+                await self._storage.update_tbl(_TABLE, json.dumps({"updates": updates}))
+                assets.update(updated)
+            except Exception as ex:
+                self._restore({asset_code: changes[asset_code] for asset_code in updated})
+                _logger.warning('Unable to update %s assets of the asset catalog, %s', len(updates), str(ex))
+                written = False
+
+        return written
+
+    async def reconcile(self, readings_storage):
+        """ Sets the count, first_ts and last_ts of every asset to those of the readings in the readings table
+
+        Run by the purge task once the readings are removed, an asset without readings left is kept with
+        a zero count. Assets missing from the catalog are added.
+
+        Args:
+            readings_storage: ReadingsStorageClientAsync
+        """
+        payload = PayloadBuilder().AGGREGATE(["count", "*"], ["min", "user_ts"], ["max", "user_ts"]) \
+            .ALIAS("aggregate", ("*", "count", "count"), ("user_ts", "min", "first_ts"), ("user_ts", "max", "last_ts")) \
+            .GROUP_BY("asset_code").payload()
+        results = await readings_storage.query(payload)
+        readings = {row['asset_code']: row for row in results['rows']}
+        await self._load()
+
+        updates = []
+        for asset_code in self._assets:
+            row = readings.get(asset_code)
+            update = PayloadBuilder().WHERE(["asset_code", "=", asset_code])
+            if row is None:
+                update = update.SET(reading_count=0)
+            else:
+                update = update.SET(reading_count=row['count'], first_ts=row['first_ts'], last_ts=row['last_ts'])
+            updates.append(json.loads(update.payload()))
+        if updates:
+            await self._storage.update_tbl(_TABLE, json.dumps({"updates": updates}))
+
+        inserts = [json.loads(PayloadBuilder().INSERT(asset_code=asset_code, reading_count=row['count'],
+                                                      first_ts=row['first_ts'], last_ts=row['last_ts']).payload())
+                   for asset_code, row in readings.items() if asset_code not in self._assets]
+        if inserts:
+            await self._storage.insert_into_tbl(_TABLE, json.dumps({"inserts": inserts}))
+
+    def start(self):
+        """ Starts writing the changes every flush interval """
+        if self._flush_task is None:
+            self._stop_event = asyncio.Event()
+            self._flush_task = asyncio.ensure_future(self._flush_periodically())
+
+    async def stop(self):
+        """ Stops the periodic writes and writes the changes left """
+        if self._flush_task is not None:
+            self._stop_event.set()
+            await self._flush_task
+            self._flush_task = None
+        else:
+            await self.flush()
+
+    async def _flush_periodically(self):
+        # Flushes once more when stopped, even before the first interval has elapsed
+        while True:
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+            if self._stop_event.is_set():
+                break
+
+
+class Reconciler(object):
+    """ Reconciles the catalog with the readings table periodically, while it is incomplete
+
+    Run by the core in the background, the readings of the C south services are counted every interval so that
+    the catalog is only read when the assets are listed.
+    """
+
+    def __init__(self, storage, readings_storage, interval=30):
+        """
+        Args:
+            storage: StorageClientAsync of the asset_catalog table
+            readings_storage: ReadingsStorageClientAsync
+            interval: seconds between two reconciliations
+        """
+        self._storage = storage
+        self._readings_storage = readings_storage
+        self._interval = interval
+        self._task = None
+        self._stop_event = None
+
+    def start(self):
+        """ Starts reconciling the catalog every interval """
+        if self._task is None:
+            self._stop_event = asyncio.Event()
+            self._task = asyncio.ensure_future(self._reconcile_periodically())
+
+    async def stop(self):
+        """ Stops reconciling the catalog, waiting for a reconciliation in progress """
+        if self._task is not None:
+            self._stop_event.set()
+            await self._task
+            self._task = None
+
+    async def reconcile(self):
+        """ Reconciles the catalog if it is incomplete
+
+        Returns:
+            True if the catalog was reconciled
+        """
+        if await is_complete(self._storage):
+            return False
+        await AssetCatalog(self._storage).reconcile(self._readings_storage)
+        return True
+
+    async def _reconcile_periodically(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), self._interval)
+                break
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.reconcile()
+            except Exception as ex:
+                _logger.warning('Unable to reconcile the asset catalog, %s', str(ex))
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+"""Asset tracker events known by a service, new events are sent to the core in the background"""
+
+import asyncio
+from foglamp.common import logger
+from foglamp.common.microservice_management_client.microservice_management_client import MicroserviceManagementClientAsync
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_logger = logger.setup(__name__)
+
+
+class AssetTrackerEvents(object):
+    """Set of (asset, event, service, plugin) tuples already registered with the core asset tracker
+
+    :meth:`add` is O(1) and never blocks: events not seen before are queued and sent to the core by a background
+    task, so the readings path does not wait for the round-trip to the core management API. The events queued
+    meanwhile are sent together in a single bulk request.
+
+    The events are sent by a non-blocking management client, its keep-alive connection is reused by every request
+    until :meth:`close`. The events the core fails to register are sent again after _RETRY_WAIT seconds, the wait
+    doubles after every failure up to _RETRY_MAX_WAIT.
+    """
+
+    _RETRY_WAIT = 1
+    """Seconds before the events that failed to register are sent again"""
+
+    _RETRY_MAX_WAIT = 60
+    """Maximum seconds between two attempts while the core does not register the events"""
+
+    def __init__(self, core_management_host, core_management_port, loop=None):
+        self._loop = asyncio.get_event_loop() if loop is None else loop
+        self._client = MicroserviceManagementClientAsync(core_management_host, core_management_port)
+        self._known = set()
+        self._pending = []
+        self._flush_task = None
+        self._retry_handle = None
+        self._retry_wait = self._RETRY_WAIT
+
+    def __len__(self):
+        return len(self._known)
+
+    def __contains__(self, key):
+        return key in self._known
+
+    def load(self, events):
+        """Marks as known the events already registered with the core
+
+        :param events: rows as returned by MicroserviceManagementClient.get_asset_tracker_events()['track']
+        """
+        for event in events:
+            self._known.add((event['asset'], event['event'], event['service'], event['plugin']))
+
+    async def load_from_core(self):
+        """Marks as known all the events registered with the core"""
+        self.load((await self._client.get_asset_tracker_events())['track'])
+
+    def add(self, asset, event, service, plugin):
+        """Registers an event with the core asset tracker unless it is already known
+
+        :return: True if the event was not known and has been queued for the core
+        """
+        key = (asset, event, service, plugin)
+        if key in self._known:
+            return False
+        self._known.add(key)
+        self._pending.append(key)
+        if self._flush_task is None:
+            self._flush_task = self._loop.create_task(self._send_pending())
+        return True
+
+    async def _send_pending(self):
+        try:
+            while self._pending:
+                # Events added while sending are picked up by the next iteration
+                events, self._pending = self._pending, []
+                payload = [{"asset": asset, "event": event, "service": service, "plugin": plugin}
+                           for asset, event, service, plugin in events]
+                try:
+                    # A single request whatever the number of events
+                    await self._client.create_asset_tracker_events(payload)
+                except Exception as ex:
+                    # Kept pending, they are sent again by the retry, the next add or flush
+                    self._pending = events + self._pending
+                    _logger.warning('Unable to register %s asset tracker events, %s', len(events), str(ex))
+                    self._schedule_retry()
+                    return
+            self._retry_wait = self._RETRY_WAIT
+        finally:
+            self._flush_task = None
+
+    def _schedule_retry(self):
+        if self._retry_handle is None:
+            self._retry_handle = self._loop.call_later(self._retry_wait, self._retry)
+            self._retry_wait = min(self._retry_wait * 2, self._RETRY_MAX_WAIT)
+
+    def _retry(self):
+        self._retry_handle = None
+        if self._flush_task is None and self._pending:
+            self._flush_task = self._loop.create_task(self._send_pending())
+
+    async def flush(self):
+        """Waits for the events queued so far to be sent to the core"""
+        if self._flush_task is None and self._pending:
+            self._flush_task = self._loop.create_task(self._send_pending())
+        if self._flush_task is not None:
+            await self._flush_task
+
+    async def close(self):
+        """Sends the events queued and closes the connection to the core"""
+        await self.flush()
+        if self._retry_handle is not None:
+            self._retry_handle.cancel()
+            self._retry_handle = None
+        await self._client.close()
@@ -6,11 +6,14 @@
 
 from importlib import import_module
 from urllib.parse import urlparse
+import asyncio
 import copy
 import json
 import inspect
 import ipaddress
 import datetime
+import time
+from collections import OrderedDict
 
 from foglamp.common.storage_client.payload_builder import PayloadBuilder
 from foglamp.common.storage_client.storage_client import StorageClientAsync
@@ -32,66 +35,186 @@ _valid_type_strings = sorted(['boolean', 'integer', 'float', 'string', 'IPv4', '
 
 
 class ConfigurationCache(object):
-    """Configuration Cache Manager"""
+    """Configuration Cache Manager
 
-    MAX_CACHE_SIZE = 10
+    Least recently used cache of categories: every access moves the category at the end of the ordered dict and
+    the category at the beginning is evicted when the cache is full, both in O(1).
+    """
 
-    def __init__(self):
+    MAX_CACHE_SIZE = 50
+
+    def __init__(self, max_cache_size=None, ttl=None):
         """
-        cache: value stored in dictionary as per category_name
-        max_cache_size: Hold the 10 recently requested categories in the cache
+        cache: value stored in ordered dictionary as per category_name, least recently used first
+        max_cache_size: Hold the MAX_CACHE_SIZE recently requested categories in the cache
+        ttl: seconds after which a category is read again from the storage layer, None to keep it until evicted
         hit: number of times an item is read from the cache
         miss: number of times an item was not found in the cache and a read of the storage layer was required
+        evicted: number of categories removed from the cache to make room for another one
+        expired: number of categories removed from the cache because older than ttl
         """
-        self.cache = {}
-        self.max_cache_size = self.MAX_CACHE_SIZE
+        self._cache = OrderedDict()
+        self.max_cache_size = self.MAX_CACHE_SIZE if max_cache_size is None else max_cache_size
+        self.ttl = ttl
         self.hit = 0
         self.miss = 0
+        self.evicted = 0
+        self.expired = 0
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @cache.setter
+    def cache(self, value):
+        self._cache = OrderedDict(value)
 
     def __contains__(self, category_name):
         """Returns True or False depending on whether or not the key is in the cache
-        and update the hit and data_accessed"""
-        if category_name in self.cache:
-            try:
-                current_hit = self.cache[category_name]['hit']
-            except KeyError:
-                current_hit = 0
-
+        and update the hit and the access order"""
+        entry = self._cache.get(category_name)
+        if entry is not None and self.ttl is not None and \
+                time.monotonic() - entry.get('time_loaded', 0) > self.ttl:
+            self._cache.pop(category_name)
+            self.expired += 1
+            entry = None
+        if entry is not None:
             self.hit += 1
-            self.cache[category_name].update({'date_accessed': datetime.datetime.now(), 'hit': current_hit + 1})
+            entry['hit'] = entry.get('hit', 0) + 1
+            self._cache.move_to_end(category_name)
             return True
         self.miss += 1
         return False
 
     def update(self, category_name, category_val, display_name=None):
-        """Update the cache dictionary and remove the oldest item"""
-        if category_name not in self.cache and len(self.cache) >= self.max_cache_size:
-            self.remove_oldest()
+        """Update the cache dictionary and remove the least recently used item"""
+        if category_name in self._cache:
+            self._cache.move_to_end(category_name)
+        else:
+            while len(self._cache) >= self.max_cache_size:
+                self.remove_oldest()
         display_name = category_name if display_name is None else display_name
-        self.cache[category_name] = {'date_accessed': datetime.datetime.now(), 'value': category_val, 'displayName': display_name}
-        _logger.info("Updated Configuration Cache %s", self.cache)
+        self._cache[category_name] = {'date_accessed': datetime.datetime.now(), 'time_loaded': time.monotonic(),
+                                      'value': category_val, 'displayName': display_name}
+        _logger.debug("Updated Configuration Cache %s", category_name)
 
     def remove_oldest(self):
-        """Remove the entry that has the oldest accessed date"""
-        oldest_entry = None
-        for category_name in self.cache:
-            if oldest_entry is None:
-                oldest_entry = category_name
-            elif self.cache[category_name]['date_accessed'] < self.cache[oldest_entry]['date_accessed']:
-                oldest_entry = category_name
-        self.cache.pop(oldest_entry)
+        """Remove the least recently used entry"""
+        self._cache.popitem(last=False)
+        self.evicted += 1
 
     def remove(self, key):
         """Remove the entry with given key name"""
-        for category_name in self.cache:
-            if key == category_name:
-                self.cache.pop(key)
-                break
+        self._cache.pop(key, None)
+
+    def resize(self, max_cache_size=None, ttl=None):
+        """Changes the capacity and the ttl of the cache, least recently used entries are evicted if needed
+
+        A ttl of 0 keeps the categories until evicted
+        """
+        if max_cache_size is not None:
+            if max_cache_size < 1:
+                raise ValueError('max_cache_size must be greater than 0')
+            self.max_cache_size = max_cache_size
+            while len(self._cache) > self.max_cache_size:
+                self.remove_oldest()
+        if ttl is not None:
+            if ttl < 0:
+                raise ValueError('ttl must not be negative')
+            self.ttl = ttl if ttl > 0 else None
+
+    def stats(self):
+        """Return the counters of the cache"""
+        return {'size': len(self._cache), 'maxCacheSize': self.max_cache_size, 'ttl': self.ttl, 'hit': self.hit,
+                'miss': self.miss, 'evicted': self.evicted, 'expired': self.expired}
 
     @property
     def size(self):
         """Return the size of the cache"""
-        return len(self.cache)
+        return len(self._cache)
+
+
+class ConfigurationCallbacks(object):
+    """Configuration Callbacks Registry
+
+    Callback modules are imported and validated once, when an interest is registered, and the run coroutine
+    functions are kept. The callbacks of a category run concurrently, each one within a timeout.
+    """
+
+    CALLBACK_TIMEOUT = 30
+
+    def __init__(self, timeout=None):
+        """
+        callbacks: run coroutine function by callback module name
+        timeout: seconds a callback may run before it is cancelled
+        metrics: calls, failures, timeouts, last/max/total time in seconds by callback module name
+        """
+        self._callbacks = {}
+        self.timeout = self.CALLBACK_TIMEOUT if timeout is None else timeout
+        self._metrics = {}
+
+    def __contains__(self, callback):
+        return callback in self._callbacks
+
+    def add(self, callback, category_name):
+        """Import the callback module and check its run method, an exception is raised if it cannot be called"""
+        if callback in self._callbacks:
+            return
+        try:
+            cb = import_module(callback)
+        except ImportError:
+            _logger.exception(
+                'Unable to import callback module %s for category_name %s', callback, category_name)
+            raise
+        if not hasattr(cb, 'run'):
+            _logger.exception(
+                'Callback module %s does not have method run', callback)
+            raise AttributeError('Callback module {} does not have method run'.format(callback))
+        method = cb.run
+        if not inspect.iscoroutinefunction(method):
+            _logger.exception(
+                'Callback module %s run method must be a coroutine function', callback)
+            raise AttributeError('Callback module {} run method must be a coroutine function'.format(callback))
+        self._callbacks[callback] = method
+        self._metrics[callback] = {'calls': 0, 'failures': 0, 'timeouts': 0, 'lastTime': 0, 'maxTime': 0,
+                                   'totalTime': 0}
+
+    def remove(self, callback):
+        """Forget the callback module"""
+        self._callbacks.pop(callback, None)
+        self._metrics.pop(callback, None)
+
+    async def run(self, category_name, callbacks):
+        """Run the callbacks concurrently, the first failure is raised once all of them have completed"""
+        results = await asyncio.gather(*[self._run(callback, category_name) for callback in callbacks],
+                                       return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+    async def _run(self, callback, category_name):
+        metrics = self._metrics[callback]
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(self._callbacks[callback](category_name), self.timeout)
+        except asyncio.TimeoutError:
+            metrics['timeouts'] += 1
+            _logger.error('Callback module %s for category_name %s timed out after %s seconds',
+                          callback, category_name, self.timeout)
+            raise
+        except Exception:
+            metrics['failures'] += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - start
+            metrics['calls'] += 1
+            metrics['lastTime'] = elapsed
+            metrics['maxTime'] = max(metrics['maxTime'], elapsed)
+            metrics['totalTime'] += elapsed
+
+    def stats(self):
+        """Return the metrics of the callbacks"""
+        return copy.deepcopy(self._metrics)
 
 
 class ConfigurationManagerSingleton(object):
@@ -134,6 +257,10 @@ class ConfigurationManager(ConfigurationManagerSingleton):
     _storage = None
     _registered_interests = None
     _cacheManager = None
+    _callbacks = None
+    _category_versions = None
+    """ Version of the categories, changed every time a category is changed """
+    _last_version = 0
 
     def __init__(self, storage=None):
         ConfigurationManagerSingleton.__init__(self)
@@ -145,27 +272,40 @@ class ConfigurationManager(ConfigurationManagerSingleton):
             self._registered_interests = {}
         if self._cacheManager is None:
             self._cacheManager = ConfigurationCache()
+        if self._callbacks is None:
+            self._callbacks = ConfigurationCallbacks()
+        if self._category_versions is None:
+            self._category_versions = {}
+            # Versions are not persisted, starting from the current time they are not reused after a restart
+            self._last_version = int(time.time() * 1000)
+
+    def _new_version(self, category_name):
+        self._last_version += 1
+        self._category_versions[category_name] = self._last_version
+        return self._last_version
+
+    def get_category_version(self, category_name):
+        """Get the version of a category, it changes every time the category is changed
+
+        A service holding a copy of the category needs to read it again only when the version changes.
+
+        Keyword Arguments:
+        category_name -- name of the category (required)
+
+        Return Values:
+        an integer, versions of the same category always increase
+        """
+        version = self._category_versions.get(category_name)
+        if version is None:
+            version = self._new_version(category_name)
+        return version
 
     async def _run_callbacks(self, category_name):
+        # The category has changed, callbacks see the new version
+        self._new_version(category_name)
         callbacks = self._registered_interests.get(category_name)
         if callbacks is not None:
-            for callback in callbacks:
-                try:
-                    cb = import_module(callback)
-                except ImportError:
-                    _logger.exception(
-                        'Unable to import callback module %s for category_name %s', callback, category_name)
-                    raise
-                if not hasattr(cb, 'run'):
-                    _logger.exception(
-                        'Callback module %s does not have method run', callback)
-                    raise AttributeError('Callback module {} does not have method run'.format(callback))
-                method = cb.run
-                if not inspect.iscoroutinefunction(method):
-                    _logger.exception(
-                        'Callback module %s run method must be a coroutine function', callback)
-                    raise AttributeError('Callback module {} run method must be a coroutine function'.format(callback))
-                await cb.run(category_name)
+            await self._callbacks.run(category_name, list(callbacks))
 
     async def _merge_category_vals(self, category_val_new, category_val_storage, keep_original_items, category_name=None):
         # preserve all value_vals from category_val_storage
@@ -426,6 +566,27 @@ class ConfigurationManager(ConfigurationManagerSingleton):
             err_response = ex.error
             raise ValueError(err_response)
 
+    async def _update_category_val(self, category_name, category_val):
+        """Writes the value of a category, the cached category is updated and the interested services notified"""
+        try:
+            payload = PayloadBuilder().SET(value=category_val).WHERE(["key", "=", category_name]).payload()
+            result = await self._storage.update_tbl("configuration", payload)
+            response = result['response']
+        except KeyError:
+            raise ValueError(result['message'])
+        except StorageServerError as ex:
+            err_response = ex.error
+            raise ValueError(err_response)
+        cached = self._cacheManager.cache.get(category_name)
+        if cached is not None:
+            cached['value'] = category_val
+        try:
+            await self._run_callbacks(category_name)
+        except:
+            _logger.exception(
+                'Unable to run callbacks for category_name %s', category_name)
+            raise
+
     async def update_configuration_item_bulk(self, category_name, config_item_list):
         """ Bulk update config items
 
@@ -512,11 +673,7 @@ class ConfigurationManager(ConfigurationManagerSingleton):
             response = result['response']
             # Re-read category from DB
             new_category_val_db = await self._read_category_val(category_name)
-            if category_name in self._cacheManager.cache:
-                self._cacheManager.cache[category_name]['value'] = new_category_val_db
-                self._cacheManager.cache[category_name]['displayName'] = display_name
-            else:
-                self._cacheManager.cache.update({category_name: {"value": new_category_val_db, "displayName": display_name}})
+            self._cacheManager.update(category_name, new_category_val_db, display_name)
         except KeyError:
             raise ValueError(result['message'])
         except StorageServerError as ex:
@@ -667,13 +824,10 @@ class ConfigurationManager(ConfigurationManagerSingleton):
 
             new_value_entry = self._clean(storage_value_entry['type'], new_value_entry)
             await self._update_value_val(category_name, item_name, new_value_entry)
-            # always get value from storage
-            cat_item = await self._read_item_val(category_name, item_name)
-            if category_name in self._cacheManager.cache:
-                if item_name in self._cacheManager.cache[category_name]['value']:
-                    self._cacheManager.cache[category_name]['value'][item_name]['value'] = cat_item['value']
-                else:
-                    self._cacheManager.cache[category_name]['value'].update({item_name: cat_item['value']})
+            # The value stored is the one written, the cached item is updated without reading it again
+            cached = self._cacheManager.cache.get(category_name)
+            if cached is not None and item_name in cached['value']:
+                cached['value'][item_name]['value'] = new_value_entry
         except:
             _logger.exception(
                 'Unable to set item value entry based on category_name %s and item_name %s and value_item_entry %s',
@@ -993,11 +1147,16 @@ class ConfigurationManager(ConfigurationManagerSingleton):
         A callback is only called if the corresponding category_value is created or updated.
         A callback is not called if the corresponding category_description is updated.
         A change in configuration is not rolled back if callbacks fail.
+        The callback module is imported when the interest is registered, ImportError or AttributeError is raised
+        if it does not implement the coroutine function run(category_name).
+        The callbacks of a category run concurrently, each one is cancelled if it does not complete within
+        ConfigurationCallbacks.CALLBACK_TIMEOUT seconds.
         """
         if category_name is None:
             raise ValueError('Failed to register interest. category_name cannot be None')
         if callback is None:
             raise ValueError('Failed to register interest. callback cannot be None')
+        self._callbacks.add(callback, category_name)
         if self._registered_interests.get(category_name) is None:
             self._registered_interests[category_name] = {callback}
         else:
@@ -1030,6 +1189,8 @@ class ConfigurationManager(ConfigurationManagerSingleton):
                 self._registered_interests[category_name].discard(callback)
                 if len(self._registered_interests[category_name]) == 0:
                     del self._registered_interests[category_name]
+                if not any(callback in callbacks for callbacks in self._registered_interests.values()):
+                    self._callbacks.remove(callback)
 
     def _validate_type_value(self, _type, _value):
         # TODO: Not implemented for password and X509 certificate type
@@ -7,6 +7,8 @@
 """ A simple implementation using the jq product to apply a transformation to the JSON document
 """
 
+from collections import OrderedDict
+
 import pyjq
 
 from foglamp.common import logger
@@ -23,6 +25,12 @@ class JQFilter:
     This class uses pyjq (https://pypi.python.org/pypi/jq) which contains Python bindings for jq
     """
 
+    _PROGRAMS_MAX = 16
+    """ Maximum number of compiled jq programs kept in the cache """
+
+    _programs = OrderedDict()
+    """ Compiled jq programs shared by all the instances, keyed by filter string, least recently used first """
+
     def __init__(self):
         """Initialise the JQFilter"""
         self._logger = logger.setup("JQFilter")
@@ -50,3 +58,43 @@ class JQFilter:
         except ValueError as ex:
             self._logger.error("Failed to transform, please check the transformation rule, exception %s", str(ex))
             raise
+
+    def compile(self, filter_string):
+        """Returns the jq program for filter_string, it is compiled only the first time the filter is used
+
+        Raises:
+            ValueError: If filter is not a proper JQ filter
+        """
+        try:
+            program = self._programs.pop(filter_string)
+        except KeyError:
+            try:
+                program = pyjq.compile(filter_string)
+            except ValueError as ex:
+                self._logger.error("Failed to compile, please check the transformation rule, exception %s", str(ex))
+                raise
+            if len(self._programs) >= self._PROGRAMS_MAX:
+                self._programs.popitem(last=False)
+        self._programs[filter_string] = program
+        return program
+
+    def transform_first(self, reading_block, filter_string):
+        """Applies the filter to the reading block using the cached compiled program
+
+        Args:
+            reading_block: Python objects, as decoded from JSON, on which filter needs to be applied.
+            filter_string: filter to apply. Filter should be in JQ format.
+        Returns: the first value produced by the filter, as Python objects
+        Raises:
+            TypeError: If reading_block cannot be converted to JSON
+            ValueError: If filter is not a proper JQ filter
+        """
+        program = self.compile(filter_string)
+        try:
+            return program.first(reading_block)
+        except TypeError as ex:
+            self._logger.error("Invalid JSON passed, exception %s", str(ex))
+            raise
+        except ValueError as ex:
+            self._logger.error("Failed to transform, please check the transformation rule, exception %s", str(ex))
+            raise
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+"""JSON codec for the readings hot paths
+
+The fastest encoder installed is selected at import time, in order: orjson, ujson, rapidjson and finally the
+json module of the standard library. Input the selected encoder does not support (e.g. non string dict keys
+for orjson) is encoded with the standard library instead, so the output is always valid JSON.
+
+    dumps(obj) -> str
+    dumpb(obj) -> bytes, ready to be gzip compressed or sent as an HTTP body without a further copy
+    loads(s)   -> python object, s can be str or bytes
+"""
+
+import json
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_ENCODE_ERRORS = (TypeError, ValueError, OverflowError)
+
+
+def _stdlib_codec():
+    def dumpb(obj):
+        return json.dumps(obj).encode('utf-8')
+
+    return json.dumps, dumpb, json.loads
+
+
+def _orjson_codec():
+    import orjson
+
+    def dumps(obj):
+        try:
+            return orjson.dumps(obj).decode('utf-8')
+        except _ENCODE_ERRORS:
+            return json.dumps(obj)
+
+    def dumpb(obj):
+        try:
+            return orjson.dumps(obj)
+        except _ENCODE_ERRORS:
+            return json.dumps(obj).encode('utf-8')
+
+    return dumps, dumpb, orjson.loads
+
+
+def _ujson_codec():
+    import ujson
+
+    def dumps(obj):
+        try:
+            return ujson.dumps(obj, escape_forward_slashes=False)
+        except _ENCODE_ERRORS:
+            return json.dumps(obj)
+
+    def dumpb(obj):
+        return dumps(obj).encode('utf-8')
+
+    return dumps, dumpb, ujson.loads
+
+
+def _rapidjson_codec():
+    import rapidjson
+
+    def dumps(obj):
+        try:
+            return rapidjson.dumps(obj)
+        except _ENCODE_ERRORS:
+            return json.dumps(obj)
+
+    def dumpb(obj):
+        return dumps(obj).encode('utf-8')
+
+    return dumps, dumpb, rapidjson.loads
+
+
+CODECS = {
+    'orjson': _orjson_codec,
+    'ujson': _ujson_codec,
+    'rapidjson': _rapidjson_codec,
+    'json': _stdlib_codec
+}
+"""Supported codecs, fastest first"""
+
+name = None
+"""Name of the codec in use"""
+
+dumps = None
+dumpb = None
+loads = None
+
+
+def use(codec_name):
+    """Selects the codec to use
+
+    Args:
+        codec_name: one of the CODECS keys
+    Raises:
+        ValueError: codec_name is not a supported codec
+        ImportError: the package of the codec is not installed
+    """
+    global name, dumps, dumpb, loads
+
+    if codec_name not in CODECS:
+        raise ValueError('Unsupported JSON codec {}, supported are {}'.format(codec_name, ', '.join(CODECS)))
+
+    dumps, dumpb, loads = CODECS[codec_name]()
+    name = codec_name
+
+
+def _use_fastest():
+    for codec_name in CODECS:
+        try:
+            use(codec_name)
+            return
+        except ImportError:
+            continue
+
+
+_use_fastest()
@@ -6,9 +6,12 @@
 
 """ FogLAMP Logger """
 
+import atexit
+import os
+import queue
 import sys
 import logging
-from logging.handlers import SysLogHandler
+from logging.handlers import SysLogHandler, QueueHandler, QueueListener
 
 __author__ = "Praveen Garg"
 __copyright__ = "Copyright (c) 2017 OSIsoft, LLC"
@@ -24,11 +27,90 @@ r"""Send log entries to /var/log/syslog
 CONSOLE = 1
 """Send log entries to STDOUT"""
 
+QUEUE_SIZE = 10000
+"""Maximum number of log entries waiting to be written in queued mode"""
+
+_QUEUED_ENV = 'FOGLAMP_LOG_QUEUED'
+"""Environment variable that turns the queued mode on for the loggers of all FogLAMP processes"""
+
+_queue_handlers = {}
+"""The queue handler of every destination in queued mode, shared by the loggers of the process"""
+
+
+class _QueueListener(QueueListener):
+    def enqueue_sentinel(self):
+        # Waits for room in the queue, the entries before the sentinel are written on stop
+        self.queue.put(self._sentinel)
+
+
+class _BoundedQueueHandler(QueueHandler):
+    """Puts the log entries in a bounded queue, a thread writes them to the destination handler
+
+    The log call never waits for the destination. The entries logged while the queue is full are dropped and counted,
+    a warning with the number of entries dropped is logged once there is room again.
+    """
+
+    def __init__(self, handler, queue_size=QUEUE_SIZE):
+        super().__init__(queue.Queue(queue_size))
+        self._handler = handler
+        self._queue_size = queue_size
+        self.dropped = 0
+        """Number of log entries dropped since the handler was created"""
+        self._unreported = 0
+        self._pid = None
+        self._listener = None
+        self._start()
+
+    def _start(self):
+        self._pid = os.getpid()
+        self._listener = _QueueListener(self.queue, self._handler)
+        self._listener.start()
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            # In a forked child the thread writing the entries is gone, and the locks may be held by it
+            self.queue = queue.Queue(self._queue_size)
+            self._handler.createLock()
+            self._start()
+        try:
+            if self._unreported:
+                self.queue.put_nowait(logging.makeLogRecord({
+                    'name': record.name, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                    'module': 'logger', 'process': record.process,
+                    'msg': '{} log entries dropped, the logging queue was full'.format(self._unreported)}))
+                self._unreported = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+
+    def stop(self):
+        """Writes the entries queued and stops the thread"""
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+        self._listener = None
+
+
+def dropped_entries() -> int:
+    """Returns the number of log entries dropped by the loggers of this process in queued mode"""
+    return sum(handler.dropped for handler in _queue_handlers.values())
+
+
+def flush():
+    """Writes the log entries queued by the loggers in queued mode
+
+    To call before the process exits without running the atexit handlers, as with os._exit. The entries logged
+    afterwards are queued but no longer written.
+    """
+    for handler in _queue_handlers.values():
+        handler.stop()
+
 
 def setup(logger_name: str = None,
           destination: int = SYSLOG,
           level: int = logging.WARNING,
-          propagate: bool = False) -> logging.Logger:
+          propagate: bool = False,
+          queued: bool = None) -> logging.Logger:
     """Configures a `logging.Logger`_ object
 
     Once configured, a logger can also be retrieved via
@@ -54,6 +136,12 @@ def setup(logger_name: str = None,
                 - View with: ``tail -f /var/log/syslog | sed 's/#012/\n\t/g'``
             - CONSOLE: Send message to stdout
 
+        queued:
+            Whether the log entries are written by a background thread rather than by the log call.
+            A log call then never waits for syslog or stdout, up to QUEUE_SIZE entries are queued and the
+            entries logged while the queue is full are dropped, see :func:`dropped_entries`.
+            Defaults to False, unless the environment variable FOGLAMP_LOG_QUEUED is set to 1.
+
     Returns:
         A `logging.Logger`_ object
 
@@ -66,20 +154,39 @@ def setup(logger_name: str = None,
 
     logger = logging.getLogger(logger_name)
 
+    if destination not in (SYSLOG, CONSOLE):
+        raise ValueError("Invalid destination {}".format(destination))
+
+    if queued is None:
+        queued = os.environ.get(_QUEUED_ENV) == '1'
+
+    if queued:
+        handler = _queue_handlers.get(destination)
+        if handler is None:
+            handler = _BoundedQueueHandler(_destination_handler(destination))
+            _queue_handlers[destination] = handler
+    else:
+        handler = _destination_handler(destination)
+
+    logger.setLevel(level)
+    logger.propagate = propagate
+    if handler not in logger.handlers:
+        logger.addHandler(handler)
+
+    return logger
+
+
+def _destination_handler(destination):
     if destination == SYSLOG:
         handler = SysLogHandler(address='/dev/log')
-    elif destination == CONSOLE:
-        handler = logging.StreamHandler(sys.stdout)
     else:
-        raise ValueError("Invalid destination {}".format(destination))
+        handler = logging.StreamHandler(sys.stdout)
 
     # TODO: Consider using %r with message when using syslog .. \n looks better than #
     formatter = logging.Formatter(fmt='FogLAMP[%(process)d] %(levelname)s: %(module)s: %(name)s: %(message)s')
 
     handler.setFormatter(formatter)
+    return handler
 
-    logger.setLevel(level)
-    logger.propagate = propagate
-    logger.addHandler(handler)
 
-    return logger
+atexit.register(flush)
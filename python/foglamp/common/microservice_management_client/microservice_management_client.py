@@ -4,9 +4,14 @@
 # See: http://foglamp.readthedocs.io/
 # FOGLAMP_END
 
+import asyncio
+import copy
 import http.client
 import json
 import urllib.parse
+
+import aiohttp
+
 from foglamp.common import logger
 from foglamp.common.microservice_management_client import exceptions as client_exceptions
 
@@ -17,13 +22,160 @@ __version__ = "${VERSION}"
 
 _logger = logger.setup(__name__)
 
+CATEGORY_VERSION_HEADER = 'X-FogLAMP-Category-Version'
+""" Response header with the version of the configuration category returned by the core """
+
+
+class _ManagementClientBase(object):
+    """ Requests and responses of the core management API, shared by the blocking and the non-blocking clients """
+
+    def __init__(self):
+        self._interests = {}
+        """ Category of the interests registered by this client, by registration id """
+        self._categories = {}
+        """ (version, items) of the categories with an interest registered, kept until the core notifies a change """
+
+    @staticmethod
+    def _check_status(status, reason):
+        if status in range(400, 500):
+            _logger.error("Client error code: %d, Reason: %s", status, reason)
+            raise client_exceptions.MicroserviceManagementClientError(status=status, reason=reason)
+        if status in range(500, 600):
+            _logger.error("Server error code: %d, Reason: %s", status, reason)
+            raise client_exceptions.MicroserviceManagementClientError(status=status, reason=reason)
+
+    @staticmethod
+    def _service_registered(response, service_registration_payload):
+        try:
+            response["id"]
+        except (KeyError, Exception) as ex:
+            _logger.exception("Could not register the microservice, From request %s, Reason: %s", json.dumps(service_registration_payload), str(ex))
+            raise
+        return response
+
+    @staticmethod
+    def _service_unregistered(response, microservice_id):
+        try:
+            response["id"]
+        except (KeyError, Exception) as ex:
+            _logger.exception("Could not unregister the micro-service having uuid %s, Reason: %s",
+                              microservice_id, str(ex))
+            raise
+        return response
+
+    def _interest_registered(self, response, category, payload):
+        try:
+            self._interests[response["id"]] = category
+        except (KeyError, Exception) as ex:
+            _logger.exception("Could not register interest, for request payload %s, Reason: %s",
+                              payload, str(ex))
+            raise
+        return response
+
+    def _interest_unregistered(self, response, registered_interest_id):
+        try:
+            response["id"]
+        except (KeyError, Exception) as ex:
+            _logger.exception("Could not unregister interest for %s, Reason: %s", registered_interest_id, str(ex))
+            raise
+
+        category = self._interests.pop(registered_interest_id, None)
+        if category is not None and category not in self._interests.values():
+            # No change notification will be received anymore
+            self._categories.pop(category, None)
+        return response
+
+    @staticmethod
+    def _services_url(service_name, service_type):
+        url = '/foglamp/service'
+        delimeter = '?'
+        if service_name:
+            url = '{}{}name={}'.format(url, delimeter, urllib.parse.quote(service_name))
+            delimeter = '&'
+        if service_type:
+            url = '{}{}type={}'.format(url, delimeter, service_type)
+        return url
+
+    @staticmethod
+    def _services_found(response, url):
+        try:
+            response["services"]
+        except (KeyError, Exception) as ex:
+            _logger.exception("Could not find the micro-service for requested url %s, Reason: %s", url, str(ex))
+            raise
+        return response
+
+    def _category_found(self, response, category_name, version):
+        if category_name and version is not None and category_name in self._interests.values():
+            self._cache_category(category_name, int(version), response)
+        return copy.deepcopy(response) if category_name in self._categories else response
+
+    def category_changed(self, category_name, items=None, version=None):
+        """ Updates the cached copy of a category with the content of a change notification from the core
+
+        :param category_name: name of the category changed
+        :param items: the new items of the category, the category is read again from the core if not given
+        :param version: version of the category, older notifications are ignored
+        """
+        cached = self._categories.get(category_name)
+        if cached is None:
+            return
+        if version is None or items is None:
+            self._categories.pop(category_name)
+            return
+        self._cache_category(category_name, int(version), items)
+
+    def _cache_category(self, category_name, version, items):
+        cached = self._categories.get(category_name)
+        if cached is None or cached[0] < version:
+            self._categories[category_name] = (version, items)
+
+    @staticmethod
+    def _configuration_item_url(category_name, config_item):
+        return "/foglamp/service/category/{}/{}".format(urllib.parse.quote(category_name), urllib.parse.quote(config_item))
+
+    @staticmethod
+    def _create_category_request(category_data):
+        """ URL and body of the request creating the category described by category_data """
+        data = json.loads(category_data)
+        if 'keep_original_items' in data:
+            keep_original_item = 'true' if data['keep_original_items'] is True else 'false'
+            url = '/foglamp/service/category?keep_original_items={}'.format(keep_original_item)
+            del data['keep_original_items']
+        else:
+            url = '/foglamp/service/category'
+        return url, data
+
+
+class MicroserviceManagementClient(_ManagementClientBase):
+    """ Blocking client of the core management API
+
+    For the callers that do not run in the event loop, the ones that do use :class:`MicroserviceManagementClientAsync`
+    """
 
-class MicroserviceManagementClient(object):
     _management_client_conn = None
 
     def __init__(self, microservice_management_host, microservice_management_port):
+        super().__init__()
         self._management_client_conn = http.client.HTTPConnection("{0}:{1}".format(microservice_management_host, microservice_management_port))
 
+    def _request(self, method, url, body=None, version=False):
+        """ Sends a request to the core and returns the decoded JSON response
+
+        :param version: also return the version of the category in the response headers, None if there is none
+        """
+        if body is None:
+            self._management_client_conn.request(method=method, url=url)
+        else:
+            self._management_client_conn.request(method=method, url=url, body=body)
+        r = self._management_client_conn.getresponse()
+        self._check_status(r.status, r.reason)
+        res = r.read().decode()
+        category_version = r.getheader(CATEGORY_VERSION_HEADER) if version else None
+        self._management_client_conn.close()
+        response = json.loads(res)
+        return (response, category_version) if version else response
+
     def register_service(self, service_registration_payload):
         """ Registers a newly created microservice with the core service
 
@@ -35,26 +187,8 @@ class MicroserviceManagementClient(object):
         management interface for that microservice
         :return: a JSON object containing the UUID of the newly registered service
         """
-        url = '/foglamp/service'
-
-        self._management_client_conn.request(method='POST', url=url, body=json.dumps(service_registration_payload))
-        r = self._management_client_conn.getresponse()
-        if r.status in range(400, 500):
-            _logger.error("Client error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        if r.status in range(500, 600):
-            _logger.error("Server error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        res = r.read().decode()
-        self._management_client_conn.close()
-        response = json.loads(res)
-        try:
-            response["id"]
-        except (KeyError, Exception) as ex:
-            _logger.exception("Could not register the microservice, From request %s, Reason: %s", json.dumps(service_registration_payload), str(ex))
-            raise
-
-        return response
+        response = self._request('POST', '/foglamp/service', json.dumps(service_registration_payload))
+        return self._service_registered(response, service_registration_payload)
 
     def unregister_service(self, microservice_id):
         """ Removes the registration record for a microservice
@@ -66,27 +200,8 @@ class MicroserviceManagementClient(object):
         :param microservice_id: string UUID of microservice
         :return: a JSON object containing the UUID of the unregistered service
         """
-        url = '/foglamp/service/{}'.format(microservice_id)
-
-        self._management_client_conn.request(method='DELETE', url=url)
-        r = self._management_client_conn.getresponse()
-        if r.status in range(400, 500):
-            _logger.error("Client error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        if r.status in range(500, 600):
-            _logger.error("Server error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        res = r.read().decode()
-        self._management_client_conn.close()
-        response = json.loads(res)
-        try:
-            response["id"]
-        except (KeyError, Exception) as ex:
-            _logger.exception("Could not unregister the micro-service having uuid %s, Reason: %s",
-                              microservice_id, str(ex))
-            raise
-
-        return response
+        response = self._request('DELETE', '/foglamp/service/{}'.format(microservice_id))
+        return self._service_unregistered(response, microservice_id)
 
     def register_interest(self, category, microservice_id):
         """ Register an interest of microservice in a configuration category
@@ -95,29 +210,9 @@ class MicroserviceManagementClient(object):
         :param microservice_id: microservice's UUID string
         :return: A JSON object containing a registration ID for this registration
         """
-
-        url = '/foglamp/interest'
-
         payload = json.dumps({"category": category, "service": microservice_id}, sort_keys=True)
-        self._management_client_conn.request(method='POST', url=url, body=payload)
-        r = self._management_client_conn.getresponse()
-        if r.status in range(400, 500):
-            _logger.error("Client error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        if r.status in range(500, 600):
-            _logger.error("Server error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        res = r.read().decode()
-        self._management_client_conn.close()
-        response = json.loads(res)
-        try:
-            response["id"]
-        except (KeyError, Exception) as ex:
-            _logger.exception("Could not register interest, for request payload %s, Reason: %s",
-                              payload, str(ex))
-            raise
-
-        return response
+        response = self._request('POST', '/foglamp/interest', payload)
+        return self._interest_registered(response, category, payload)
 
     def unregister_interest(self, registered_interest_id):
         """ Remove a previously registered interest in a configuration category
@@ -125,26 +220,8 @@ class MicroserviceManagementClient(object):
         :param registered_interest_id: registered interest id for a configuration category
         :return: A JSON object containing the unregistered interest id
         """
-        url = '/foglamp/interest/{}'.format(registered_interest_id)
-
-        self._management_client_conn.request(method='DELETE', url=url)
-        r = self._management_client_conn.getresponse()
-        if r.status in range(400, 500):
-            _logger.error("Client error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        if r.status in range(500, 600):
-            _logger.error("Server error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        res = r.read().decode()
-        self._management_client_conn.close()
-        response = json.loads(res)
-        try:
-            response["id"]
-        except (KeyError, Exception) as ex:
-            _logger.exception("Could not unregister interest for %s, Reason: %s", registered_interest_id, str(ex))
-            raise
-
-        return response
+        response = self._request('DELETE', '/foglamp/interest/{}'.format(registered_interest_id))
+        return self._interest_unregistered(response, registered_interest_id)
 
     def get_services(self, service_name=None, service_type=None):
         """ Retrieve the details of one or more services that are registered
@@ -153,56 +230,29 @@ class MicroserviceManagementClient(object):
         :param service_type: filter the returned services by type
         :return: list of registered microservices, all or based on filter(s) applied
         """
-        url = '/foglamp/service'
-        delimeter = '?'
-        if service_name:
-            url = '{}{}name={}'.format(url, delimeter, urllib.parse.quote(service_name))
-            delimeter = '&'
-        if service_type:
-            url = '{}{}type={}'.format(url, delimeter, service_type)
-
-        self._management_client_conn.request(method='GET', url=url)
-        r = self._management_client_conn.getresponse()
-        if r.status in range(400, 500):
-            _logger.error("Client error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        if r.status in range(500, 600):
-            _logger.error("Server error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        res = r.read().decode()
-        self._management_client_conn.close()
-        response = json.loads(res)
-        try:
-            response["services"]
-        except (KeyError, Exception) as ex:
-            _logger.exception("Could not find the micro-service for requested url %s, Reason: %s", url, str(ex))
-            raise
-
-        return response
+        url = self._services_url(service_name, service_type)
+        return self._services_found(self._request('GET', url), url)
 
     def get_configuration_category(self, category_name=None):
         """
 
+        A category with an interest registered by this client is read from the core only the first time, then
+        it is returned from the cache until :meth:`category_changed` is called for it
+
         :param category_name:
         :return:
         """
         url = '/foglamp/service/category'
 
         if category_name:
+            cached = self._categories.get(category_name)
+            if cached is not None:
+                # A copy, the caller may change the items
+                return copy.deepcopy(cached[1])
             url = "{}/{}".format(url, urllib.parse.quote(category_name))
 
-        self._management_client_conn.request(method='GET', url=url)
-        r = self._management_client_conn.getresponse()
-        if r.status in range(400, 500):
-            _logger.error("Client error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        if r.status in range(500, 600):
-            _logger.error("Server error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        res = r.read().decode()
-        self._management_client_conn.close()
-        response = json.loads(res)
-        return response
+        response, version = self._request('GET', url, version=True)
+        return self._category_found(response, category_name, version)
 
     def get_configuration_item(self, category_name, config_item):
         """
@@ -211,20 +261,7 @@ class MicroserviceManagementClient(object):
         :param config_item:
         :return:
         """
-        url = "/foglamp/service/category/{}/{}".format(urllib.parse.quote(category_name), urllib.parse.quote(config_item))
-
-        self._management_client_conn.request(method='GET', url=url)
-        r = self._management_client_conn.getresponse()
-        if r.status in range(400, 500):
-            _logger.error("Client error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        if r.status in range(500, 600):
-            _logger.error("Server error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        res = r.read().decode()
-        self._management_client_conn.close()
-        response = json.loads(res)
-        return response
+        return self._request('GET', self._configuration_item_url(category_name, config_item))
 
     def create_configuration_category(self, category_data):
         """
@@ -232,26 +269,9 @@ class MicroserviceManagementClient(object):
         :param category_data: e.g. '{"key": "TEST", "description": "description", "value": {"info": {"description": "Test", "type": "boolean", "default": "true"}}}'
         :return:
         """
-        data = json.loads(category_data)
-        if 'keep_original_items' in data:
-            keep_original_item = 'true' if data['keep_original_items'] is True else 'false'
-            url = '/foglamp/service/category?keep_original_items={}'.format(keep_original_item)
-            del data['keep_original_items']
-        else:
-            url = '/foglamp/service/category'
-
-        self._management_client_conn.request(method='POST', url=url, body=json.dumps(data))
-        r = self._management_client_conn.getresponse()
-        if r.status in range(400, 500):
-            _logger.error("Client error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        if r.status in range(500, 600):
-            _logger.error("Server error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        res = r.read().decode()
-        self._management_client_conn.close()
-        response = json.loads(res)
-        return response
+        url, data = self._create_category_request(category_data)
+        self._categories.pop(data.get('key'), None)
+        return self._request('POST', url, json.dumps(data))
 
     def create_child_category(self, parent, children):
         """
@@ -261,19 +281,7 @@ class MicroserviceManagementClient(object):
         """
         data = {"children": children}
         url = '/foglamp/service/category/{}/children'.format(urllib.parse.quote(parent))
-
-        self._management_client_conn.request(method='POST', url=url, body=json.dumps(data))
-        r = self._management_client_conn.getresponse()
-        if r.status in range(400, 500):
-            _logger.error("Client error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        if r.status in range(500, 600):
-            _logger.error("Server error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        res = r.read().decode()
-        self._management_client_conn.close()
-        response = json.loads(res)
-        return response
+        return self._request('POST', url, json.dumps(data))
 
     def update_configuration_item(self, category_name, config_item, category_data):
         """
@@ -283,20 +291,8 @@ class MicroserviceManagementClient(object):
         :param category_data: e.g. '{"value": "true"}'
         :return:
         """
-        url = "/foglamp/service/category/{}/{}".format(urllib.parse.quote(category_name), urllib.parse.quote(config_item))
-
-        self._management_client_conn.request(method='PUT', url=url, body=category_data)
-        r = self._management_client_conn.getresponse()
-        if r.status in range(400, 500):
-            _logger.error("Client error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        if r.status in range(500, 600):
-            _logger.error("Server error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        res = r.read().decode()
-        self._management_client_conn.close()
-        response = json.loads(res)
-        return response
+        self._categories.pop(category_name, None)
+        return self._request('PUT', self._configuration_item_url(category_name, config_item), category_data)
 
     def delete_configuration_item(self, category_name, config_item):
         """
@@ -305,35 +301,11 @@ class MicroserviceManagementClient(object):
         :param config_item:
         :return:
         """
-        url = "/foglamp/service/category/{}/{}/value".format(urllib.parse.quote(category_name), urllib.parse.quote(config_item))
-
-        self._management_client_conn.request(method='DELETE', url=url)
-        r = self._management_client_conn.getresponse()
-        if r.status in range(400, 500):
-            _logger.error("Client error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        if r.status in range(500, 600):
-            _logger.error("Server error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        res = r.read().decode()
-        self._management_client_conn.close()
-        response = json.loads(res)
-        return response
+        self._categories.pop(category_name, None)
+        return self._request('DELETE', self._configuration_item_url(category_name, config_item) + '/value')
 
     def get_asset_tracker_events(self):
-        url = '/foglamp/track'
-        self._management_client_conn.request(method='GET', url=url)
-        r = self._management_client_conn.getresponse()
-        if r.status in range(400, 500):
-            _logger.error("Client error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        if r.status in range(500, 600):
-            _logger.error("Server error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        res = r.read().decode()
-        self._management_client_conn.close()
-        response = json.loads(res)
-        return response
+        return self._request('GET', '/foglamp/track')
 
     def create_asset_tracker_event(self, asset_event):
         """
@@ -342,16 +314,148 @@ class MicroserviceManagementClient(object):
                e.g. {"asset": "AirIntake", "event": "Ingest", "service": "PT100_In1", "plugin": "PT100"}
         :return:
         """
-        url = '/foglamp/track'
-        self._management_client_conn.request(method='POST', url=url, body=json.dumps(asset_event))
-        r = self._management_client_conn.getresponse()
-        if r.status in range(400, 500):
-            _logger.error("Client error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        if r.status in range(500, 600):
-            _logger.error("Server error code: %d, Reason: %s", r.status, r.reason)
-            raise client_exceptions.MicroserviceManagementClientError(status=r.status, reason=r.reason)
-        res = r.read().decode()
-        self._management_client_conn.close()
+        return self._request('POST', '/foglamp/track', json.dumps(asset_event))
+
+    def create_asset_tracker_events(self, asset_events):
+        """ Registers a list of asset tracker events in a single request
+
+        :param asset_events: list of events
+               e.g. [{"asset": "AirIntake", "event": "Ingest", "service": "PT100_In1", "plugin": "PT100"}]
+        :return: the events added, the ones already tracked are not returned
+        """
+        return self._request('POST', '/foglamp/track/bulk', json.dumps({"track": asset_events}))
+
+
+class MicroserviceManagementClientAsync(_ManagementClientBase):
+    """ Non-blocking client of the core management API, for the callers running in the event loop
+
+    The requests share a long lived keep-alive session instead of opening a connection each. A request that cannot
+    connect to the core is retried; a GET is also retried when the connection is lost or times out, the other
+    methods are not as the core may have processed them.
+    """
+
+    _TIMEOUT = 30
+    """ Seconds to wait for a response """
+
+    _RETRIES = 2
+    """ Number of times a failed request is sent again """
+
+    _RETRY_WAIT = 0.5
+    """ Seconds to wait before sending a failed request again """
+
+    def __init__(self, microservice_management_host, microservice_management_port, timeout=_TIMEOUT,
+                 retries=_RETRIES, keepalive_timeout=75):
+        super().__init__()
+        self._base_url = "http://{0}:{1}".format(microservice_management_host, microservice_management_port)
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._retries = retries
+        self._keepalive_timeout = keepalive_timeout
+        self._session = None
+
+    def _get_session(self):
+        """ Return the long lived keep-alive session of this client, creating it on first use """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(keepalive_timeout=self._keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self._timeout)
+        return self._session
+
+    async def close(self):
+        """ Close the session and all of its connections """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _request(self, method, url, body=None, version=False):
+        """ Sends a request to the core and returns the decoded JSON response
+
+        :param version: also return the version of the category in the response headers, None if there is none
+        """
+        attempt = 0
+        while True:
+            try:
+                async with self._get_session().request(method, self._base_url + url, data=body) as resp:
+                    self._check_status(resp.status, resp.reason)
+                    res = await resp.text()
+                    category_version = resp.headers.get(CATEGORY_VERSION_HEADER) if version else None
+                break
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as ex:
+                # Only a GET is sent again once connected, the core may have processed the others
+                if attempt >= self._retries or (method != 'GET' and not isinstance(ex, aiohttp.ClientConnectorError)):
+                    _logger.error("%s %s failed after %d attempts, Reason: %s", method, url, attempt + 1,
+                                  str(ex) or type(ex).__name__)
+                    raise
+                attempt += 1
+                await asyncio.sleep(self._RETRY_WAIT)
         response = json.loads(res)
-        return response
+        return (response, category_version) if version else response
+
+    async def register_service(self, service_registration_payload):
+        """ Registers a newly created microservice with the core service, see
+        :meth:`MicroserviceManagementClient.register_service` """
+        response = await self._request('POST', '/foglamp/service', json.dumps(service_registration_payload))
+        return self._service_registered(response, service_registration_payload)
+
+    async def unregister_service(self, microservice_id):
+        """ Removes the registration record for a microservice """
+        response = await self._request('DELETE', '/foglamp/service/{}'.format(microservice_id))
+        return self._service_unregistered(response, microservice_id)
+
+    async def register_interest(self, category, microservice_id):
+        """ Register an interest of microservice in a configuration category """
+        payload = json.dumps({"category": category, "service": microservice_id}, sort_keys=True)
+        response = await self._request('POST', '/foglamp/interest', payload)
+        return self._interest_registered(response, category, payload)
+
+    async def unregister_interest(self, registered_interest_id):
+        """ Remove a previously registered interest in a configuration category """
+        response = await self._request('DELETE', '/foglamp/interest/{}'.format(registered_interest_id))
+        return self._interest_unregistered(response, registered_interest_id)
+
+    async def get_services(self, service_name=None, service_type=None):
+        """ Retrieve the details of one or more services that are registered """
+        url = self._services_url(service_name, service_type)
+        return self._services_found(await self._request('GET', url), url)
+
+    async def get_configuration_category(self, category_name=None):
+        """ A category with an interest registered by this client is read from the core only the first time, then
+        it is returned from the cache until :meth:`category_changed` is called for it """
+        url = '/foglamp/service/category'
+
+        if category_name:
+            cached = self._categories.get(category_name)
+            if cached is not None:
+                return copy.deepcopy(cached[1])
+            url = "{}/{}".format(url, urllib.parse.quote(category_name))
+
+        response, version = await self._request('GET', url, version=True)
+        return self._category_found(response, category_name, version)
+
+    async def get_configuration_item(self, category_name, config_item):
+        return await self._request('GET', self._configuration_item_url(category_name, config_item))
+
+    async def create_configuration_category(self, category_data):
+        url, data = self._create_category_request(category_data)
+        self._categories.pop(data.get('key'), None)
+        return await self._request('POST', url, json.dumps(data))
+
+    async def create_child_category(self, parent, children):
+        url = '/foglamp/service/category/{}/children'.format(urllib.parse.quote(parent))
+        return await self._request('POST', url, json.dumps({"children": children}))
+
+    async def update_configuration_item(self, category_name, config_item, category_data):
+        self._categories.pop(category_name, None)
+        return await self._request('PUT', self._configuration_item_url(category_name, config_item), category_data)
+
+    async def delete_configuration_item(self, category_name, config_item):
+        self._categories.pop(category_name, None)
+        return await self._request('DELETE', self._configuration_item_url(category_name, config_item) + '/value')
+
+    async def get_asset_tracker_events(self):
+        return await self._request('GET', '/foglamp/track')
+
+    async def create_asset_tracker_event(self, asset_event):
+        return await self._request('POST', '/foglamp/track', json.dumps(asset_event))
+
+    async def create_asset_tracker_events(self, asset_events):
+        """ Registers a list of asset tracker events in a single request """
+        return await self._request('POST', '/foglamp/track/bulk', json.dumps({"track": asset_events}))
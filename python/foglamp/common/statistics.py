@@ -4,6 +4,7 @@
 # See: http://foglamp.readthedocs.io/
 # FOGLAMP_END
 
+import asyncio
 import json
 from foglamp.common import logger
 from foglamp.common.storage_client.payload_builder import PayloadBuilder
@@ -131,6 +132,10 @@ class Statistics(object):
                     , key, value_increment, str(ex))
                 raise
 
+    def is_registered(self, key):
+        """ Returns True if the key is known to be in the statistics table """
+        return self._registered_keys is not None and key in self._registered_keys
+
     async def register(self, key, description):
         if key in self._registered_keys:
             return
@@ -139,7 +144,7 @@ class Statistics(object):
         try:
             payload = PayloadBuilder().INSERT(key=key, description=description, value=0, previous_value=0).payload()
             await self._storage.insert_into_tbl("statistics", payload)
-            self._registered_keys.append(key)
+            self._registered_keys.add(key)
         except Exception as ex:
             """ The error may be because the key has been created in another process, reload keys """
             await self._load_keys()
@@ -147,12 +152,134 @@ class Statistics(object):
                 _logger.exception('Unable to create new statistic %s, error %s', key, str(ex))
                 raise
 
+    async def register_bulk(self, key_descriptions):
+        """ Registers the keys not registered yet with a single insert
+
+        Args:
+            key_descriptions: dict of statistics keys and their description
+
+        Returns:
+            None
+        """
+        if len(self._registered_keys) == 0:
+            await self._load_keys()
+        new_keys = {k: d for k, d in key_descriptions.items() if k not in self._registered_keys}
+        if not new_keys:
+            return
+        try:
+            payload = {"inserts": []}
+            for k, d in new_keys.items():
+                payload_item = PayloadBuilder().INSERT(key=k, description=d, value=0, previous_value=0).payload()
+                payload['inserts'].append(json.loads(payload_item))
+            await self._storage.insert_into_tbl("statistics", json.dumps(payload, sort_keys=False))
+            self._registered_keys.update(new_keys)
+        except Exception as ex:
+            """ The error may be because some of the keys have been created in another process, reload keys """
+            await self._load_keys()
+            missing = [k for k in new_keys if k not in self._registered_keys]
+            if missing:
+                _logger.exception('Unable to create new statistics %s, error %s', missing, str(ex))
+                raise
+
     async def _load_keys(self):
-        self._registered_keys = []
+        self._registered_keys = set()
         try:
             payload = PayloadBuilder().SELECT("key").payload()
             results = await self._storage.query_tbl_with_payload('statistics', payload)
             for row in results['rows']:
-                self._registered_keys.append(row['key'])
+                self._registered_keys.add(row['key'])
         except Exception as ex:
             _logger.exception('Failed to retrieve statistics keys, %s', str(ex))
+
+
+class StatisticsAccumulator(object):
+    """ Statistics counters kept in memory and written to the statistics table periodically
+
+    :meth:`increment` only updates a dict, the counters accumulated meanwhile are written every flush interval
+    with a single :meth:`Statistics.update_bulk`, the keys seen for the first time are registered before with a
+    single :meth:`Statistics.register_bulk`. When a write fails the counters are kept and written by the next flush.
+    """
+
+    def __init__(self, stats, flush_interval=5, loop=None):
+        """
+        Args:
+            stats: Statistics instance used to write the counters
+            flush_interval: seconds between two writes
+        """
+        self._stats = stats
+        self._flush_interval = flush_interval
+        self._loop = asyncio.get_event_loop() if loop is None else loop
+        self._deltas = {}
+        """ Increments not written yet, by key """
+        self._new_keys = {}
+        """ Keys not registered yet and their description """
+        self._flush_task = None
+        self._stop_event = None
+
+    def increment(self, key, value_increment=1, description=None):
+        """ Adds value_increment to the counter of key
+
+        Args:
+            key: statistics key
+            value_increment: amount to increment the value by
+            description: description of the key, the key is registered when first seen if given
+        """
+        if not value_increment:
+            return
+        self._deltas[key] = self._deltas.get(key, 0) + value_increment
+        if description is not None and not self._stats.is_registered(key):
+            self._new_keys[key] = description
+
+    async def flush(self):
+        """ Writes the counters accumulated so far
+
+        Returns:
+            False if the counters could not be written, they are kept for the next flush
+        """
+        if self._new_keys:
+            new_keys, self._new_keys = self._new_keys, {}
+            try:
+                await self._stats.register_bulk(new_keys)
+            except Exception as ex:
+                # The counters of keys not registered would be lost by update_bulk, nothing is written
+                new_keys.update(self._new_keys)
+                self._new_keys = new_keys
+                _logger.warning('Unable to register %s statistics keys, %s', len(new_keys), str(ex))
+                return False
+        if not self._deltas:
+            return True
+        deltas, self._deltas = self._deltas, {}
+        try:
+            await self._stats.update_bulk(deltas)
+        except Exception as ex:
+            for key, value in deltas.items():
+                self._deltas[key] = self._deltas.get(key, 0) + value
+            _logger.warning('Unable to write %s statistics, %s', len(deltas), str(ex))
+            return False
+        return True
+
+    def start(self):
+        """ Starts writing the counters every flush interval """
+        if self._flush_task is None:
+            self._stop_event = asyncio.Event()
+            self._flush_task = self._loop.create_task(self._flush_periodically())
+
+    async def stop(self):
+        """ Stops the periodic writes and writes the counters left """
+        if self._flush_task is not None:
+            self._stop_event.set()
+            await self._flush_task
+            self._flush_task = None
+        else:
+            await self.flush()
+
+    async def _flush_periodically(self):
+        # Flushes once more when stopped, even before the first interval has elapsed
+        while True:
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+            if self._stop_event.is_set():
+                break
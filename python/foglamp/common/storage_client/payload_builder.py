@@ -124,22 +124,29 @@ class PayloadBuilder(object):
                 elif 'column' in qp_list[i] and qp_list[i]['column'] == col:
                     qp_list[i][clause] = clause_value
 
+    @staticmethod
+    def _is_aggregate_of(item, col, opr):
+        """ col is either a column or, for a json column, [column, properties] to tell apart the properties
+        aggregated from the same column
+        """
+        if item['operation'] != opr:
+            return False
+        if 'json' in item:
+            if isinstance(col, list):
+                return [item['json']['column'], item['json']['properties']] == col
+            return item['json']['column'] == col
+        return item['column'] == col
+
     @classmethod
     def add_clause_to_aggregate(cls, clause, qp_list, col, opr, clause_value):
         if isinstance(qp_list, dict):
-            if 'json' in qp_list:
-                if qp_list['json']['column'] == col and qp_list['operation'] == opr:
-                    qp_list[clause] = clause_value
-            elif qp_list['column'] == col and qp_list['operation'] == opr:
+            if cls._is_aggregate_of(qp_list, col, opr):
                 qp_list[clause] = clause_value
 
         if isinstance(qp_list, list):
             for i, item in enumerate(qp_list):
                 if isinstance(item, dict):
-                    if 'json' in qp_list[i]:
-                        if qp_list[i]['json']['column'] == col and qp_list[i]['operation'] == opr:
-                            qp_list[i][clause] = clause_value
-                    elif qp_list[i]['column'] == col and qp_list[i]['operation'] == opr:
+                    if cls._is_aggregate_of(item, col, opr):
                         qp_list[i][clause] = clause_value
 
     @classmethod
@@ -202,6 +209,7 @@ class PayloadBuilder(object):
         :param args: each arg is a tuple. The len of tuple depends upon main_key. If main_key is "return" i.e. SELECT,
                      then each tuple will contain (col, alias). If main_key is "aggregate", then each tuple will contain
                      (col, operation, alias) because col can be repeated in aggregate with different "operations".
+                     For a json col, col can be [col, properties] to alias each property aggregated separately.
         :return:
         :example:
         PayloadBuilder().SELECT(("name", "id")).ALIAS('return', ('name', 'my_name'), ('id', 'my_id')).payload() returns
@@ -228,6 +236,13 @@ class PayloadBuilder(object):
                            {"operation": "max", "column": "values", "alias": "max_values"},
                            {"operation": "avg", "column": "values", "alias": "avg_values"}]}
 
+        PayloadBuilder().AGGREGATE((["min", ["values", "rate"]], ["min", ["values", "volume"]])).ALIAS('aggregate',
+                                                           (['values', 'rate'], 'min', 'min_rate'),
+                                                           (['values', 'volume'], 'min', 'min_volume')).payload() returns
+            {"aggregate": [{"operation": "min", "json": {"column": "values", "properties": "rate"}, "alias": "min_rate"},
+                           {"operation": "min", "json": {"column": "values", "properties": "volume"},
+                            "alias": "min_volume"}]}
+
         PayloadBuilder().AGGREGATE((["min", ["values", "rate"]], ["max", ["values", "rate"]], ["avg", ["values", "rate"]])).\
         ALIAS('aggregate', ('values', 'min', 'Minimum'), ('values', 'max', 'Maximum'), ('values', 'avg', 'Average')).payload() returns
             {
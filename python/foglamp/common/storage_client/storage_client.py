@@ -18,12 +18,19 @@ import json
 from abc import ABC, abstractmethod
 
 from foglamp.common import logger
+from foglamp.common import json_codec
 from foglamp.common.service_record import ServiceRecord
 from foglamp.common.storage_client.exceptions import *
 from foglamp.common.storage_client.utils import Utils
 
 _LOGGER = logger.setup(__name__)
 
+_DEFAULT_CONNECTION_LIMIT = 100
+""" Maximum number of simultaneous connections a storage client keeps open to the storage service """
+
+_DEFAULT_KEEPALIVE_TIMEOUT = 60
+""" Seconds an idle keep-alive connection is held in the pool before it is closed """
+
 
 class AbstractStorage(ABC):
     """ abstract class for storage client """
@@ -39,6 +46,54 @@ class AbstractStorage(ABC):
     def disconnect(self):
         pass
 
+    @property
+    def connection_stats(self):
+        """ counters of requests sent, connections opened and pooled connections reused """
+        return dict(self._connection_stats)
+
+    def _get_session(self):
+        """ Return the long lived keep-alive session of this client, creating it on first use
+
+        Idle connections are closed by the connector after keepalive_timeout seconds
+        and a fresh one is opened on the next request.
+        """
+        if self._session is None or self._session.closed:
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_request_start.append(self._on_request_start)
+            trace_config.on_connection_create_end.append(self._on_connection_create_end)
+            trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+            connector = aiohttp.TCPConnector(limit=self._connection_limit, keepalive_timeout=self._keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+        return self._session
+
+    async def _on_request_start(self, session, trace_config_ctx, params):
+        self._connection_stats["requests"] += 1
+
+    async def _on_connection_create_end(self, session, trace_config_ctx, params):
+        self._connection_stats["created"] += 1
+
+    async def _on_connection_reuseconn(self, session, trace_config_ctx, params):
+        self._connection_stats["reused"] += 1
+
+    async def configure_pool(self, connection_limit=None, keepalive_timeout=None):
+        """ Change the connection pool limits, the open session (if any) is closed and
+        the next request opens a new one with the given settings
+
+        :param connection_limit: maximum number of simultaneous connections, 0 for no limit
+        :param keepalive_timeout: seconds an idle connection is kept open
+        """
+        if connection_limit is not None:
+            self._connection_limit = int(connection_limit)
+        if keepalive_timeout is not None:
+            self._keepalive_timeout = int(keepalive_timeout)
+        await self.close()
+
+    async def close(self):
+        """ Close the pooled session and all of its connections """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
     # Allow with context
     def __enter__(self):
         return self.connect()
@@ -48,7 +103,12 @@ class AbstractStorage(ABC):
 
 
 class StorageClientAsync(AbstractStorage):
-    def __init__(self, core_management_host, core_management_port, svc=None):
+    def __init__(self, core_management_host, core_management_port, svc=None,
+                 connection_limit=_DEFAULT_CONNECTION_LIMIT, keepalive_timeout=_DEFAULT_KEEPALIVE_TIMEOUT):
+        self._session = None
+        self._connection_limit = connection_limit
+        self._keepalive_timeout = keepalive_timeout
+        self._connection_stats = {"requests": 0, "created": 0, "reused": 0}
         try:
             if svc:
                 self.service = svc
@@ -121,11 +181,13 @@ class StorageClientAsync(AbstractStorage):
 
     # FIXME: As per JIRA-615 strict=false at python side (interim solution)
     # fix is required at storage layer (error message with escape sequence using a single quote)
-    async def insert_into_tbl(self, tbl_name, data):
+    async def insert_into_tbl(self, tbl_name, data, trusted=False):
         """ insert json payload into given table
 
         :param tbl_name:
         :param data: JSON payload
+        :param trusted: True when data was just serialized by the caller (e.g. with json.dumps),
+            the validation parse of the payload is then skipped
         :return:
 
         :Example:
@@ -144,19 +206,19 @@ class StorageClientAsync(AbstractStorage):
         if not data:
             raise ValueError("Data to insert is missing")
 
-        if not Utils.is_json(data):
+        if not trusted and not Utils.is_json(data):
             raise TypeError("Provided data to insert must be a valid JSON")
 
         post_url = '/storage/table/{tbl_name}'.format(tbl_name=tbl_name)
         url = 'http://' + self.base_url + post_url
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, data=data) as resp:
-                status_code = resp.status
-                jdoc = await resp.json()
-                if status_code not in range(200, 209):
-                    _LOGGER.info("POST %s, with payload: %s", post_url, data)
-                    _LOGGER.error("Error code: %d, reason: %s, details: %s", resp.status, resp.reason, jdoc)
-                    raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
+        session = self._get_session()
+        async with session.post(url, data=data) as resp:
+            status_code = resp.status
+            jdoc = await resp.json()
+            if status_code not in range(200, 209):
+                _LOGGER.info("POST %s, with payload: %s", post_url, data)
+                _LOGGER.error("Error code: %d, reason: %s, details: %s", resp.status, resp.reason, jdoc)
+                raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
 
         return jdoc
 
@@ -193,14 +255,14 @@ class StorageClientAsync(AbstractStorage):
         put_url = '/storage/table/{tbl_name}'.format(tbl_name=tbl_name)
 
         url = 'http://' + self.base_url + put_url
-        async with aiohttp.ClientSession() as session:
-            async with session.put(url, data=data) as resp:
-                status_code = resp.status
-                jdoc = await resp.json()
-                if status_code not in range(200, 209):
-                    _LOGGER.info("PUT %s, with payload: %s", put_url, data)
-                    _LOGGER.error("Error code: %d, reason: %s, details: %s", resp.status, resp.reason, jdoc)
-                    raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
+        session = self._get_session()
+        async with session.put(url, data=data) as resp:
+            status_code = resp.status
+            jdoc = await resp.json()
+            if status_code not in range(200, 209):
+                _LOGGER.info("PUT %s, with payload: %s", put_url, data)
+                _LOGGER.error("Error code: %d, reason: %s, details: %s", resp.status, resp.reason, jdoc)
+                raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
 
         return jdoc
 
@@ -230,14 +292,14 @@ class StorageClientAsync(AbstractStorage):
             raise TypeError("condition payload must be a valid JSON")
 
         url = 'http://' + self.base_url + del_url
-        async with aiohttp.ClientSession() as session:
-            async with session.delete(url, data=condition) as resp:
-                status_code = resp.status
-                jdoc = await resp.json()
-                if status_code not in range(200, 209):
-                    _LOGGER.info("DELETE %s, with payload: %s", del_url, condition if condition else '')
-                    _LOGGER.error("Error code: %d, reason: %s, details: %s", resp.status, resp.reason, jdoc)
-                    raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
+        session = self._get_session()
+        async with session.delete(url, data=condition) as resp:
+            status_code = resp.status
+            jdoc = await resp.json()
+            if status_code not in range(200, 209):
+                _LOGGER.info("DELETE %s, with payload: %s", del_url, condition if condition else '')
+                _LOGGER.error("Error code: %d, reason: %s, details: %s", resp.status, resp.reason, jdoc)
+                raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
 
         return jdoc
 
@@ -261,14 +323,14 @@ class StorageClientAsync(AbstractStorage):
             get_url += '?{}'.format(query)
 
         url = 'http://' + self.base_url + get_url
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                status_code = resp.status
-                jdoc = await resp.json()
-                if status_code not in range(200, 209):
-                    _LOGGER.info("GET %s", get_url)
-                    _LOGGER.error("Error code: %d, reason: %s, details: %s", resp.status, resp.reason, jdoc)
-                    raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
+        session = self._get_session()
+        async with session.get(url) as resp:
+            status_code = resp.status
+            jdoc = await resp.json()
+            if status_code not in range(200, 209):
+                _LOGGER.info("GET %s", get_url)
+                _LOGGER.error("Error code: %d, reason: %s, details: %s", resp.status, resp.reason, jdoc)
+                raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
 
         return jdoc
 
@@ -300,14 +362,14 @@ class StorageClientAsync(AbstractStorage):
         put_url = '/storage/table/{tbl_name}/query'.format(tbl_name=tbl_name)
 
         url = 'http://' + self.base_url + put_url
-        async with aiohttp.ClientSession() as session:
-            async with session.put(url, data=query_payload) as resp:
-                status_code = resp.status
-                jdoc = await resp.json()
-                if status_code not in range(200, 209):
-                    _LOGGER.info("PUT %s, with query payload: %s", put_url, query_payload)
-                    _LOGGER.error("Error code: %d, reason: %s, details: %s", resp.status, resp.reason, jdoc)
-                    raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
+        session = self._get_session()
+        async with session.put(url, data=query_payload) as resp:
+            status_code = resp.status
+            jdoc = await resp.json()
+            if status_code not in range(200, 209):
+                _LOGGER.info("PUT %s, with query payload: %s", put_url, query_payload)
+                _LOGGER.error("Error code: %d, reason: %s, details: %s", resp.status, resp.reason, jdoc)
+                raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
 
         return jdoc
 
@@ -316,13 +378,17 @@ class ReadingsStorageClientAsync(StorageClientAsync):
     """ Readings table operations """
     _base_url = ""
 
-    def __init__(self, core_mgt_host, core_mgt_port, svc=None):
-        super().__init__(core_management_host=core_mgt_host, core_management_port=core_mgt_port, svc=svc)
+    def __init__(self, core_mgt_host, core_mgt_port, svc=None,
+                 connection_limit=_DEFAULT_CONNECTION_LIMIT, keepalive_timeout=_DEFAULT_KEEPALIVE_TIMEOUT):
+        super().__init__(core_management_host=core_mgt_host, core_management_port=core_mgt_port, svc=svc,
+                         connection_limit=connection_limit, keepalive_timeout=keepalive_timeout)
         self.__class__._base_url = self.base_url
 
-    async def append(self, readings):
+    async def append(self, readings, trusted=False):
         """
-        :param readings:
+        :param readings: JSON payload (str or bytes)
+        :param trusted: True when readings was just serialized by the caller, the validation parse
+            of the payload is then skipped
         :return:
 
         :Example:
@@ -350,21 +416,37 @@ class ReadingsStorageClientAsync(StorageClientAsync):
         if not readings:
             raise ValueError("Readings payload is missing")
 
-        if not Utils.is_json(readings):
+        if not trusted and not Utils.is_json(readings):
             raise TypeError("Readings payload must be a valid JSON")
 
         url = 'http://' + self._base_url + '/storage/reading'
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, data=readings) as resp:
-                status_code = resp.status
-                jdoc = await resp.json()
-                if status_code not in range(200, 209):
-                    _LOGGER.error("POST url %s with payload: %s, Error code: %d, reason: %s, details: %s",
-                                  '/storage/reading', readings, resp.status, resp.reason, jdoc)
-                    raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
+        session = self._get_session()
+        async with session.post(url, data=readings) as resp:
+            status_code = resp.status
+            jdoc = await resp.json()
+            if status_code not in range(200, 209):
+                _LOGGER.error("POST url %s with payload: %s, Error code: %d, reason: %s, details: %s",
+                              '/storage/reading', readings, resp.status, resp.reason, jdoc)
+                raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
 
         return jdoc
 
+    async def append_readings(self, readings):
+        """ Append a list of readings given as python dicts
+
+        The payload is serialized here and is not parsed again for validation.
+
+        :param readings: list of dicts with asset_code, read_key, reading and user_ts keys
+        :return:
+        """
+        if not readings:
+            raise ValueError("Readings payload is missing")
+
+        if not isinstance(readings, list):
+            raise TypeError("Readings must be a list")
+
+        return await self.append(json_codec.dumpb({"readings": readings}), trusted=True)
+
     async def fetch(self, reading_id, count):
         """
 
@@ -389,14 +471,14 @@ class ReadingsStorageClientAsync(StorageClientAsync):
 
         get_url = '/storage/reading?id={}&count={}'.format(reading_id, count)
         url = 'http://' + self._base_url + get_url
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                status_code = resp.status
-                jdoc = await resp.json()
-                if status_code not in range(200, 209):
-                    _LOGGER.error("GET url: %s, Error code: %d, reason: %s, details: %s", url, resp.status,
-                                  resp.reason, jdoc)
-                    raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
+        session = self._get_session()
+        async with session.get(url) as resp:
+            status_code = resp.status
+            jdoc = await resp.json(loads=json_codec.loads)
+            if status_code not in range(200, 209):
+                _LOGGER.error("GET url: %s, Error code: %d, reason: %s, details: %s", url, resp.status,
+                              resp.reason, jdoc)
+                raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
 
         return jdoc
 
@@ -425,14 +507,14 @@ class ReadingsStorageClientAsync(StorageClientAsync):
             raise TypeError("Query payload must be a valid JSON")
 
         url = 'http://' + self._base_url + '/storage/reading/query'
-        async with aiohttp.ClientSession() as session:
-            async with session.put(url, data=query_payload) as resp:
-                status_code = resp.status
-                jdoc = await resp.json()
-                if status_code not in range(200, 209):
-                    _LOGGER.error("PUT url %s with query payload: %s, Error code: %d, reason: %s, details: %s",
-                                  '/storage/reading/query', query_payload, resp.status, resp.reason, jdoc)
-                    raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
+        session = self._get_session()
+        async with session.put(url, data=query_payload) as resp:
+            status_code = resp.status
+            jdoc = await resp.json(loads=json_codec.loads)
+            if status_code not in range(200, 209):
+                _LOGGER.error("PUT url %s with query payload: %s, Error code: %d, reason: %s, details: %s",
+                              '/storage/reading/query', query_payload, resp.status, resp.reason, jdoc)
+                raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
 
         return jdoc
 
@@ -484,13 +566,13 @@ class ReadingsStorageClientAsync(StorageClientAsync):
             put_url += "&flags={}".format(flag.lower())
 
         url = 'http://' + self._base_url + put_url
-        async with aiohttp.ClientSession() as session:
-            async with session.put(url, data=None) as resp:
-                status_code = resp.status
-                jdoc = await resp.json()
-                if status_code not in range(200, 209):
-                    _LOGGER.error("PUT url %s, Error code: %d, reason: %s, details: %s", put_url, resp.status,
-                                  resp.reason, jdoc)
-                    raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
+        session = self._get_session()
+        async with session.put(url, data=None) as resp:
+            status_code = resp.status
+            jdoc = await resp.json()
+            if status_code not in range(200, 209):
+                _LOGGER.error("PUT url %s, Error code: %d, reason: %s, details: %s", put_url, resp.status,
+                              resp.reason, jdoc)
+                raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
 
         return jdoc
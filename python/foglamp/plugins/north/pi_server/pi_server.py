@@ -23,6 +23,7 @@ import logging
 import foglamp.plugins.north.common.common as plugin_common
 import foglamp.plugins.north.common.exceptions as plugin_exceptions
 from foglamp.common import logger
+from foglamp.common import json_codec
 from foglamp.common.storage_client import payload_builder
 
 # Module information
@@ -823,19 +824,19 @@ class PIServerNorthPlugin(object):
                       'action': 'create',
                       'messageformat': 'JSON',
                       'omfversion': '1.0'}
-        omf_data_json = json.dumps(omf_data)
+        omf_data_json = json_codec.dumpb(omf_data)
 
         self._logger.debug("OMF message length |{0}| ".format(len(omf_data_json)))
 
         if _log_debug_level == 3:
-            self._logger.debug("OMF message : |{0}| |{1}| " .format(message_type, omf_data_json))
+            self._logger.debug("OMF message : |{0}| |{1}| " .format(message_type, omf_data_json.decode('utf-8')))
 
         while num_retry <= self._config['OMFMaxRetry']:
             _error = False
             try:
                 use_compression = True if self._config['compression'].upper() == 'TRUE' else False
                 if use_compression:
-                    msg_body = gzip.compress(bytes(omf_data_json, 'utf-8'))
+                    msg_body = gzip.compress(omf_data_json)
                     msg_header.update({'compression': 'gzip'})
                     # https://docs.aiohttp.org/en/stable/client_advanced.html#uploading-pre-compressed-data
                     msg_header.update({'Content-Encoding': 'gzip'})
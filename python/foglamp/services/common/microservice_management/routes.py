@@ -46,6 +46,7 @@ def setup(app, obj, is_core=False):
         # Asset Tracker
         app.router.add_route('GET', '/foglamp/track', obj.get_track)
         app.router.add_route('POST', '/foglamp/track', obj.add_track)
+        app.router.add_route('POST', '/foglamp/track/bulk', obj.add_track_bulk)
 
     # enable cors support
     enable_cors(app)
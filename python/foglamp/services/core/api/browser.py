@@ -24,7 +24,8 @@ Supports a number of REST API:
       sensor averages over seconds, minutes or hours. The selection of seconds, minutes
       or hours is done via the group query parameter
 
-  All but the /foglamp/asset API call take a set of optional query parameters
+  The /foglamp/asset API call takes the limit and skip query parameters only,
+  all the others take a set of optional query parameters
     limit=x     Return the first x rows only
     skip=x      skip first n entries and used with limit to implemented paged interfaces
     seconds=x   Limit the data return to be less than x seconds old
@@ -101,21 +102,34 @@ async def asset_counts(request):
     """ Browse all the assets for which we have recorded readings and
     return a readings count.
 
+    The assets come from the asset catalog, kept up to date as readings are added and purged, so that the
+    readings table is not scanned. They are ordered by asset code and can be paged through by supplying
+    the query parameters ?limit=xx&skip=xx, all the assets are returned otherwise.
+    The readings of the C south services, that do not update the catalog, are counted by the core in the
+    background and may lag behind by up to 30 seconds.
+
     Returns:
-           json result on basis of SELECT asset_code, count(*) FROM readings GROUP BY asset_code;
+           json result on basis of SELECT asset_code, reading_count, first_ts, last_ts, keys FROM asset_catalog
+           WHERE reading_count > 0 ORDER BY asset_code;
 
     :Example:
             curl -sX GET http://localhost:8081/foglamp/asset
+            curl -sX GET "http://localhost:8081/foglamp/asset?limit=10&skip=20"
     """
-    payload = PayloadBuilder().AGGREGATE(["count", "*"]).ALIAS("aggregate", ("*", "count", "count")) \
-        .GROUP_BY("asset_code").payload()
+    _select = PayloadBuilder().SELECT(("asset_code", "reading_count", "first_ts", "last_ts", "keys")) \
+        .FORMAT("return", ("first_ts", __TIMESTAMP_FMT), ("last_ts", __TIMESTAMP_FMT)) \
+        .WHERE(["reading_count", ">", 0]).ORDER_BY(["asset_code", "asc"]).chain_payload()
+    if 'limit' in request.query or 'skip' in request.query:
+        _select = prepare_limit_skip_payload(request, _select)
+    payload = PayloadBuilder(_select).payload()
 
     results = {}
     try:
-        _readings = connect.get_readings_async()
-        results = await _readings.query(payload)
+        _storage = connect.get_storage_async()
+        results = await _storage.query_tbl_with_payload('asset_catalog', payload)
         response = results['rows']
-        asset_json = [{"count": r['count'], "assetCode": r['asset_code']} for r in response]
+        asset_json = [{"count": r['reading_count'], "assetCode": r['asset_code'], "firstTimestamp": r['first_ts'],
+                       "lastTimestamp": r['last_ts'], "keys": r['keys']} for r in response]
     except KeyError:
         raise web.HTTPBadRequest(reason=results['message'])
     else:
@@ -232,18 +246,15 @@ async def asset_all_readings_summary(request):
             curl -sX GET http://localhost:8081/foglamp/asset/fogbench_humidity/summary?limit=10
     """
     try:
-        # Get readings from asset_code
+        # Find keys in readings, from one reading of the asset_code
         asset_code = request.match_info.get('asset_code', '')
-        payload = PayloadBuilder().SELECT("reading").WHERE(["asset_code", "=", asset_code]).payload()
+        payload = PayloadBuilder().SELECT("reading").WHERE(["asset_code", "=", asset_code]).LIMIT(1).payload()
         _readings = connect.get_readings_async()
         results = await _readings.query(payload)
         if not results['rows']:
             raise web.HTTPNotFound(reason="{} asset_code not found".format(asset_code))
 
-        # TODO: FOGL-1768 when support available from storage layer then avoid multiple calls
-        # Find keys in readings
         reading_keys = list(results['rows'][0]['reading'].keys())
-        response = []
         _where = PayloadBuilder().WHERE(["asset_code", "=", asset_code]).chain_payload()
         if 'seconds' in request.query or 'minutes' in request.query or 'hours' in request.query:
             _and_where = where_clause(request, _where)
@@ -251,16 +262,22 @@ async def asset_all_readings_summary(request):
             # Add limit, offset clause
             _and_where = prepare_limit_skip_payload(request, _where)
 
-        for reading in reading_keys:
-            _aggregate = PayloadBuilder(_and_where).AGGREGATE(["min", ["reading", reading]],
-                                                              ["max", ["reading", reading]],
-                                                              ["avg", ["reading", reading]]) \
-                .ALIAS('aggregate', ('reading', 'min', 'min'),
-                       ('reading', 'max', 'max'),
-                       ('reading', 'avg', 'average')).chain_payload()
-            payload = PayloadBuilder(_aggregate).payload()
+        # Summarise all the keys with a single aggregate, aliased by the position of the key
+        # as the keys are not valid aliases in general
+        operations = (('min', 'min'), ('max', 'max'), ('avg', 'average'))
+        aggregates = []
+        aliases = []
+        for index, reading in enumerate(reading_keys):
+            for operation, _ in operations:
+                aggregates.append([operation, ["reading", reading]])
+                aliases.append((["reading", reading], operation, "{}_{}".format(operation, index)))
+        response = []
+        if aggregates:
+            payload = PayloadBuilder(_and_where).AGGREGATE(tuple(aggregates)).ALIAS('aggregate', *aliases).payload()
             results = await _readings.query(payload)
-            response.append({reading: results['rows'][0]})
+            row = results['rows'][0]
+            response = [{reading: {name: row["{}_{}".format(operation, index)] for operation, name in operations}}
+                        for index, reading in enumerate(reading_keys)]
     except (KeyError, IndexError) as ex:
         raise web.HTTPNotFound(reason=ex)
     except (TypeError, ValueError) as ex:
@@ -11,7 +11,6 @@ import urllib.parse
 
 from foglamp.services.core import connect
 from foglamp.common.configuration_manager import ConfigurationManager
-from foglamp.common.storage_client.payload_builder import PayloadBuilder
 from foglamp.common.audit_logger import AuditLogger
 from foglamp.common.common import _FOGLAMP_ROOT, _FOGLAMP_DATA
 from foglamp.common import logger
@@ -31,6 +30,8 @@ _help = """
     | GET POST       | /foglamp/category/{category_name}/children                  |
     | DELETE         | /foglamp/category/{category_name}/children/{child_category} |
     | DELETE         | /foglamp/category/{category_name}/parent                    |
+    | GET PUT        | /foglamp/cache/category                                     |
+    | GET            | /foglamp/callback/category                                  |
     --------------------------------------------------------------------------------
 """
 
@@ -345,10 +346,8 @@ async def add_configuration_item(request):
         # merge category values with keep_original_items True
         merge_cat_val = await cf_mgr._merge_category_vals(config_item_dict, category, keep_original_items=True)
 
-        # update category value in storage
-        payload = PayloadBuilder().SET(value=merge_cat_val).WHERE(["key", "=", category_name]).payload()
-        result = await storage_client.update_tbl("configuration", payload)
-        response = result['response']
+        # update category value in storage, the services interested in the category are notified
+        await cf_mgr._update_category_val(category_name, merge_cat_val)
 
         # logged audit new config item for category
         audit = AuditLogger(storage_client)
@@ -584,3 +583,67 @@ async def upload_script(request):
             cf_mgr._cacheManager.cache[category_name]['value'][config_item]['value'] = result['value']
 
         return web.json_response(result)
+
+
+async def get_category_cache(request):
+    """
+    Args:
+         request:
+
+    Returns:
+            the size, capacity, ttl and hit, miss, evicted and expired counters of the categories cache
+
+    :Example:
+            curl -sX GET http://localhost:8081/foglamp/cache/category
+    """
+    cf_mgr = ConfigurationManager(connect.get_storage_async())
+    return web.json_response(cf_mgr._cacheManager.stats())
+
+
+async def update_category_cache(request):
+    """
+    Args:
+         request: {"maxCacheSize": <number of categories>, "ttl": <seconds, 0 to keep the categories until evicted>}
+                  at least one of them is required
+
+    Returns:
+            the categories cache counters after the change
+
+    :Example:
+            curl -X PUT -H "Content-Type: application/json" -d '{"maxCacheSize": 100, "ttl": 300}' http://localhost:8081/foglamp/cache/category
+    """
+    try:
+        data = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(reason='Invalid JSON payload')
+    if not isinstance(data, dict) or ('maxCacheSize' not in data and 'ttl' not in data):
+        raise web.HTTPBadRequest(reason='maxCacheSize or ttl is required')
+    max_cache_size = data.get('maxCacheSize')
+    ttl = data.get('ttl')
+    if max_cache_size is not None and (isinstance(max_cache_size, bool) or not isinstance(max_cache_size, int)):
+        raise web.HTTPBadRequest(reason='maxCacheSize must be an integer')
+    if ttl is not None and (isinstance(ttl, bool) or not isinstance(ttl, (int, float))):
+        raise web.HTTPBadRequest(reason='ttl must be a number')
+
+    cf_mgr = ConfigurationManager(connect.get_storage_async())
+    try:
+        cf_mgr._cacheManager.resize(max_cache_size, ttl)
+    except ValueError as ex:
+        raise web.HTTPBadRequest(reason=str(ex))
+    return web.json_response(cf_mgr._cacheManager.stats())
+
+
+async def get_category_callbacks(request):
+    """
+    Args:
+         request:
+
+    Returns:
+            the timeout of the configuration change callbacks and, by callback module, the number of calls,
+            failures and timeouts and the last, max and total time in seconds
+
+    :Example:
+            curl -sX GET http://localhost:8081/foglamp/callback/category
+    """
+    cf_mgr = ConfigurationManager(connect.get_storage_async())
+    return web.json_response({'timeout': cf_mgr._callbacks.timeout, 'callbacks': cf_mgr._callbacks.stats()})
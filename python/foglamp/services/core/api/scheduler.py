@@ -794,8 +794,8 @@ async def get_tasks_latest(request):
         payload.WHERE(["schedule_name", "=", name])
 
     try:
-        _storage = connect.get_storage_async()
-        results = await _storage.query_tbl_with_payload('tasks', payload.payload())
+        # Also sees the tasks started or completed since the tasks table was last written
+        results = await server.Server.scheduler.query_tasks(payload.payload())
 
         if len(results['rows']) == 0:
             raise web.HTTPNotFound(reason="No Tasks found")
@@ -31,6 +31,7 @@ __version__ = "${VERSION}"
 _help = """
     -------------------------------------------------------------------------------
     | GET POST            | /foglamp/service                                      |
+    | GET                 | /foglamp/service/monitor                              |
     -------------------------------------------------------------------------------
 """
 
@@ -73,6 +74,24 @@ async def get_health(request):
     return web.json_response(response)
 
 
+async def get_monitor(request):
+    """
+    Args:
+        request:
+
+    Returns:
+            the duration of the last round of pings of the service monitor and the duration of the last ping of
+            every service by name, in seconds, null when the ping failed
+
+    :Example:
+            curl -X GET http://localhost:8081/foglamp/service/monitor
+    """
+    monitor = server.Server.service_monitor
+    if monitor is None:
+        return web.json_response({'roundDuration': None, 'pingLatency': {}})
+    return web.json_response({'roundDuration': monitor.round_duration, 'pingLatency': monitor.ping_latency})
+
+
 async def delete_service(request):
     """ Delete an existing service
 
@@ -4,6 +4,7 @@
 # See: http://foglamp.readthedocs.io/
 # FOGLAMP_END
 
+import json
 from foglamp.common import logger
 from foglamp.common.storage_client.payload_builder import PayloadBuilder
 from foglamp.common.storage_client.storage_client import StorageClientAsync
@@ -63,13 +64,7 @@ class AssetTracker(object):
         if d in self._registered_asset_records:
             return {}
 
-        # The name of the FogLAMP this entry has come from.
-        # This is defined as the service name and configured as part of the general configuration of FogLAMP.
-        # it will only change on restart! Later we may want to fix it via callback mechanism
-        if len(self.foglamp_svc_name) == 0:
-            cfg_manager = ConfigurationManager(self._storage)
-            svc_config = await cfg_manager.get_category_item(category_name='service', item_name='name')
-            self.foglamp_svc_name = svc_config['value']
+        await self._load_foglamp_svc_name()
 
         try:
             payload = PayloadBuilder().INSERT(asset=asset, event=event, service=service, plugin=plugin, foglamp=self.foglamp_svc_name).payload()
@@ -86,3 +81,51 @@ class AssetTracker(object):
             result = copy.deepcopy(d)
             result.update({"foglamp": self.foglamp_svc_name})
             return result
+
+    async def add_asset_records(self, records):
+        """ Adds a list of asset tracker records, the new ones are written in a single storage transaction
+
+        Args:
+             records: list of dicts with the asset, event, service and plugin keys, as for add_asset_record
+        Returns:
+             list of the records added, records already tracked are skipped
+        """
+        registered = {(r['asset'], r['event'], r['service'], r['plugin']) for r in self._registered_asset_records}
+        new_records = []
+        for record in records:
+            key = (record.get('asset'), record.get('event'), record.get('service'), record.get('plugin'))
+            if None in key:
+                raise TypeError('Each record must have the asset, event, service and plugin keys')
+            if key not in registered:
+                registered.add(key)
+                new_records.append({"asset": key[0], "event": key[1], "service": key[2], "plugin": key[3]})
+        if not new_records:
+            return []
+
+        await self._load_foglamp_svc_name()
+
+        payload = {"inserts": []}
+        for d in new_records:
+            payload_item = PayloadBuilder().INSERT(asset=d['asset'], event=d['event'], service=d['service'],
+                                                   plugin=d['plugin'], foglamp=self.foglamp_svc_name).payload()
+            payload['inserts'].append(json.loads(payload_item))
+        try:
+            result = await self._storage.insert_into_tbl('asset_tracker', json.dumps(payload))
+            response = result['response']
+        except KeyError:
+            raise ValueError(result['message'])
+        except StorageServerError as ex:
+            err_response = ex.error
+            raise ValueError(err_response)
+
+        self._registered_asset_records.extend(new_records)
+        return [dict(d, foglamp=self.foglamp_svc_name) for d in new_records]
+
+    async def _load_foglamp_svc_name(self):
+        # The name of the FogLAMP this entry has come from.
+        # This is defined as the service name and configured as part of the general configuration of FogLAMP.
+        # it will only change on restart! Later we may want to fix it via callback mechanism
+        if len(self.foglamp_svc_name) == 0:
+            cfg_manager = ConfigurationManager(self._storage)
+            svc_config = await cfg_manager.get_category_item(category_name='service', item_name='name')
+            self.foglamp_svc_name = svc_config['value']
@@ -42,7 +42,9 @@ async def run(category_name):
 
     # get configuration of category_name
     category_value = await cfg_mgr.get_category_all_items(category_name)
-    payload = {"category" : category_name, "items" : category_value}
+    # the version lets the microservices keep the category cached until it changes again
+    payload = {"category": category_name, "items": category_value,
+               "version": cfg_mgr.get_category_version(category_name)}
     headers = {'content-type': 'application/json'}
 
     # for each microservice interested in category_name, notify change
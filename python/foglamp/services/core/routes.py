@@ -70,6 +70,10 @@ def setup(app):
     app.router.add_route('POST', '/foglamp/category/{category_name}/{config_item}', api_configuration.add_configuration_item)
     app.router.add_route('DELETE', '/foglamp/category/{category_name}/{config_item}/value', api_configuration.delete_configuration_item_value)
     app.router.add_route('POST', '/foglamp/category/{category_name}/{config_item}/upload', api_configuration.upload_script)
+    app.router.add_route('GET', '/foglamp/cache/category', api_configuration.get_category_cache)
+    app.router.add_route('PUT', '/foglamp/cache/category', api_configuration.update_category_cache)
+    app.router.add_route('GET', '/foglamp/callback/category', api_configuration.get_category_callbacks)
+
     # Scheduler
     # Scheduled_processes - As per doc
     app.router.add_route('GET', '/foglamp/schedule/process', api_scheduler.get_scheduled_processes)
@@ -100,6 +104,7 @@ def setup(app):
     # Service
     app.router.add_route('POST', '/foglamp/service', service.add_service)
     app.router.add_route('GET', '/foglamp/service', service.get_health)
+    app.router.add_route('GET', '/foglamp/service/monitor', service.get_monitor)
     app.router.add_route('DELETE', '/foglamp/service/{service_name}', service.delete_service)
 
     # Task
@@ -9,11 +9,13 @@
 import asyncio
 import collections
 import datetime
+import heapq
 import logging
 import math
 import time
 import uuid
 import os
+import re
 import subprocess
 import signal
 from typing import List
@@ -22,6 +24,8 @@ from foglamp.common import logger
 from foglamp.common.audit_logger import AuditLogger
 from foglamp.services.core.scheduler.entities import *
 from foglamp.services.core.scheduler.exceptions import *
+from foglamp.services.core.scheduler.task_runner import WarmTaskRunner, TaskRunnerError
+from foglamp.services.core.scheduler.task_journal import TaskJournal
 from foglamp.common.storage_client.exceptions import *
 from foglamp.common.storage_client.payload_builder import PayloadBuilder
 from foglamp.common.storage_client.storage_client import StorageClientAsync
@@ -38,6 +42,9 @@ __version__ = "${VERSION}"
 _FOGLAMP_ROOT = os.getenv("FOGLAMP_ROOT", default='/usr/local/foglamp')
 _SCRIPTS_DIR = os.path.expanduser(_FOGLAMP_ROOT + '/scripts')
 
+_PYTHON_MODULE_SCRIPT = re.compile(r'^python3 -m ([\w.]+) "\$@"$', re.MULTILINE)
+"""The line of a task script that runs a Python module with the arguments of the script"""
+
 
 class Scheduler(object):
     """FogLAMP Task Scheduler
@@ -100,6 +107,8 @@ class Scheduler(object):
     """Maximum number of running tasks allowed at any given time"""
     _DEFAULT_MAX_COMPLETED_TASK_AGE_DAYS = 30
     """Maximum age of rows in the task table that have finished, in days"""
+    _DEFAULT_WARM_TASK_RUNNER = 'false'
+    """Whether Python tasks are forked from a task runner that has already imported them"""
     _DELETE_TASKS_LIMIT = 500
     """The maximum number of rows to delete in the tasks table in a single transaction"""
 
@@ -112,6 +121,9 @@ class Scheduler(object):
     _MAX_SLEEP = 9999999
     """When there is nothing to do, sleep for this number of seconds (forever)"""
 
+    _START_NOW = 0
+    """Start time in :attr:`_schedule_queue` of the schedules queued to start via :meth:`queue_task`"""
+
     _STOP_WAIT_SECONDS = 5
     """Wait this number of seconds in :meth:`stop` for tasks to stop"""
 
@@ -158,6 +170,8 @@ class Scheduler(object):
         """Dictionary of schedules.id to _ScheduleRow"""
         self._schedule_executions = dict()
         """Dictionary of schedules.id to _ScheduleExecution"""
+        self._schedule_queue = []
+        """Heap of (start time, schedules.id), see :meth:`_queue_schedule`"""
         self._task_processes = dict()
         """Dictionary of tasks.id to _TaskProcess"""
         self._check_processes_pending = False
@@ -174,6 +188,14 @@ class Scheduler(object):
         """Delete finished task rows when they become this old"""
         self._purge_tasks_task = None  # type: asyncio.Task
         """asynico task for :meth:`purge_tasks`, if scheduled to run"""
+        self._warm_task_runner = False
+        """When True, Python tasks are forked from :attr:`_task_runner`"""
+        self._task_runner = None  # type: WarmTaskRunner
+        """Runner of the Python tasks, when :attr:`_warm_task_runner` is True"""
+        self._task_modules = dict()
+        """Dictionary of task script to the Python module it runs, None if it does not run one"""
+        self._task_journal = TaskJournal()
+        """Rows of the tasks table not written yet"""
 
     @property
     def max_completed_task_age(self) -> datetime.timedelta:
@@ -248,27 +270,25 @@ class Scheduler(object):
                 schedule_execution.next_start_time = None
                 self._logger.info(
                     "Tasks will no longer execute for schedule '%s'", schedule.name)
+            if not schedule_execution.start_now and not schedule_execution.task_processes:
+                del self._schedule_executions[schedule.id]
         elif schedule.exclusive:
             self._schedule_next_task(schedule)
 
+        if schedule_execution.start_now:
+            # A manual start skipped while the task was running
+            self._queue_schedule(schedule.id, self._START_NOW)
+
         if schedule.type != Schedule.Type.STARTUP:
             if exit_code < 0 and task_process.cancel_requested:
                 state = Task.State.CANCELED
             else:
                 state = Task.State.COMPLETE
-            # Update the task's status
-            update_payload = PayloadBuilder() \
-                .SET(exit_code=exit_code,
-                     state=int(state),
-                     end_time=str(datetime.datetime.now())) \
-                .WHERE(['id', '=', str(task_process.task_id)]) \
-                .payload()
-            try:
-                self._logger.debug('Database command: %s', update_payload)
-                res = await self._storage_async.update_tbl("tasks", update_payload)
-            except Exception:
-                self._logger.exception('Update failed: %s', update_payload)
-                # Must keep going!
+            # Update the task's status, written in bulk with the other tasks
+            self._task_journal.task_completed(task_process.task_id,
+                                              exit_code=exit_code,
+                                              state=int(state),
+                                              end_time=str(datetime.datetime.now()))
 
         # Due to maximum running tasks reached, it is necessary to
         # look for schedules that are ready to run even if there
@@ -301,13 +321,25 @@ class Scheduler(object):
         task_process = self._TaskProcess()
         task_process.start_time = time.time()
 
-        try:
-            process = await asyncio.create_subprocess_exec(*args_to_exec, cwd=_SCRIPTS_DIR)
-        except EnvironmentError:
-            self._logger.exception(
-                "Unable to start schedule '%s' process '%s'\n%s",
-                schedule.name, schedule.process_name, args_to_exec)
-            raise
+        process = None
+        if self._task_runner is not None and schedule.type != Schedule.Type.STARTUP:
+            module = self._get_task_module(args_to_exec[0])
+            if module is not None:
+                try:
+                    process = await self._task_runner.start_task(module, args_to_exec[1:])
+                except TaskRunnerError as ex:
+                    self._logger.warning(
+                        "Unable to start schedule '%s' process '%s' in the task runner, %s",
+                        schedule.name, schedule.process_name, str(ex))
+
+        if process is None:
+            try:
+                process = await asyncio.create_subprocess_exec(*args_to_exec, cwd=_SCRIPTS_DIR)
+            except EnvironmentError:
+                self._logger.exception(
+                    "Unable to start schedule '%s' process '%s'\n%s",
+                    schedule.name, schedule.process_name, args_to_exec)
+                raise
 
         task_id = uuid.uuid4()
         task_process.process = process
@@ -325,24 +357,50 @@ class Scheduler(object):
 
         # Startup tasks are not tracked in the tasks table and do not have any future associated with them.
         if schedule.type != Schedule.Type.STARTUP:
-            # The task row needs to exist before the completion handler runs
-            insert_payload = PayloadBuilder() \
-                .INSERT(id=str(task_id),
-                        pid=(self._schedule_executions[schedule.id].
-                             task_processes[task_id].process.pid),
-                        schedule_name=schedule.name,
-                        process_name=schedule.process_name,
-                        state=int(Task.State.RUNNING),
-                        start_time=str(datetime.datetime.now())) \
-                .payload()
-            try:
-                self._logger.debug('Database command: %s', insert_payload)
-                res = await self._storage_async.insert_into_tbl("tasks", insert_payload)
-            except Exception:
-                self._logger.exception('Insert failed: %s', insert_payload)
-                # The process has started. Regardless of this error it must be waited on.
+            # The task row is written in bulk with the other tasks, always before the completion
+            self._task_journal.task_started(task_id,
+                                            pid=process.pid,
+                                            schedule_name=schedule.name,
+                                            process_name=schedule.process_name,
+                                            state=int(Task.State.RUNNING),
+                                            start_time=str(datetime.datetime.now()))
             self._task_processes[task_id].future = asyncio.ensure_future(self._wait_for_task_completion(task_process))
 
+    def _get_task_module(self, script):
+        """Returns the Python module a task script runs, None if the script does something else
+
+        Only scripts ending with 'python3 -m <module> "$@"' at the start of a line are run by the task runner.
+        """
+        try:
+            return self._task_modules[script]
+        except KeyError:
+            pass
+        module = None
+        try:
+            with open(os.path.join(_SCRIPTS_DIR, script)) as script_file:
+                match = _PYTHON_MODULE_SCRIPT.search(script_file.read())
+            if match:
+                module = match.group(1)
+        except (OSError, UnicodeDecodeError):
+            pass
+        self._task_modules[script] = module
+        return module
+
+    async def _start_task_runner(self):
+        """Starts the task runner with the modules of the scheduled processes"""
+        modules = set()
+        for args in self._process_scripts.values():
+            module = self._get_task_module(args[0]) if args else None
+            if module is not None:
+                modules.add(module)
+        task_runner = WarmTaskRunner()
+        try:
+            await task_runner.start(sorted(modules))
+        except Exception:
+            self._logger.exception("Unable to start the task runner, tasks are started as new processes")
+            return
+        self._task_runner = task_runner
+
     async def purge_tasks(self):
         """Deletes rows from the tasks table"""
         if self._paused:
@@ -380,16 +438,47 @@ class Scheduler(object):
                     time.time() - self._last_task_purge_time) >= self._PURGE_TASKS_FREQUENCY_SECONDS):
             self._purge_tasks_task = asyncio.ensure_future(self.purge_tasks())
 
+    def _queue_schedule(self, schedule_id, start_time):
+        """Adds a schedule to :attr:`_schedule_queue`, to be checked by :meth:`_check_schedules` at start_time
+
+        Entries are not removed when a schedule changes: an entry no longer matching the
+        schedule's _ScheduleExecution is dropped when it reaches the top of the heap.
+        """
+        if start_time is not None:
+            heapq.heappush(self._schedule_queue, (start_time, schedule_id))
+
+    def _is_queued(self, start_time, schedule_execution) -> bool:
+        """Returns True if the :attr:`_schedule_queue` entry still matches the schedule execution"""
+        if start_time == self._START_NOW:
+            return schedule_execution.start_now
+        return start_time == schedule_execution.next_start_time
+
     async def _check_schedules(self):
-        """Starts tasks according to schedules based on the current time"""
-        earliest_start_time = None
+        """Starts tasks according to schedules based on the current time
+
+        Only the schedules due are looked at, in order of start time.
 
-        # Can not iterate over _schedule_executions - it can change mid-iteration
-        for schedule_id in list(self._schedule_executions.keys()):
+        Returns:
+            The start time of the next schedule, None if there is none
+            or if no more tasks can be started
+        """
+        while self._schedule_queue:
             if self._paused or len(self._task_processes) >= self._max_running_tasks:
                 return None
 
-            schedule_execution = self._schedule_executions[schedule_id]
+            start_time, schedule_id = self._schedule_queue[0]
+            schedule_execution = self._schedule_executions.get(schedule_id)
+
+            if schedule_execution is None or not self._is_queued(start_time, schedule_execution):
+                # The schedule changed after it was queued
+                heapq.heappop(self._schedule_queue)
+                continue
+
+            now = self.current_time if self.current_time else time.time()
+            if start_time > now:
+                return start_time
+
+            heapq.heappop(self._schedule_queue)
 
             try:
                 schedule = self._schedules[schedule_id]
@@ -399,58 +488,40 @@ class Scheduler(object):
                     del self._schedule_executions[schedule_id]
                 continue
 
+            # Queued again when enabled
             if schedule.enabled is False:
                 continue
 
+            # Queued again when the task completes
             if schedule.exclusive and schedule_execution.task_processes:
                 continue
 
-            # next_start_time is None when repeat is None until the
-            # task completes, at which time schedule_execution is removed
-            next_start_time = schedule_execution.next_start_time
-            if not next_start_time and not schedule_execution.start_now:
-                if not schedule_execution.task_processes:
-                    del self._schedule_executions[schedule_id]
-                continue
-
-            if next_start_time and not schedule_execution.start_now:
-                now = self.current_time if self.current_time else time.time()
-                right_time = now >= next_start_time
+            # Start a task
+            if schedule_execution.start_now and not (
+                    schedule_execution.next_start_time and schedule_execution.next_start_time <= now):
+                # Manual start - don't change next_start_time
+                # When the schedule is also due, the manual start is its timed start
+                pass
+            elif schedule.exclusive:
+                # Exclusive tasks won't start again until they terminate
+                # Or the schedule doesn't repeat
+                pass
             else:
-                right_time = False
-
-            if right_time or schedule_execution.start_now:
-                # Start a task
-
-                if not right_time:
-                    # Manual start - don't change next_start_time
-                    pass
-                elif schedule.exclusive:
-                    # Exclusive tasks won't start again until they terminate
-                    # Or the schedule doesn't repeat
-                    next_start_time = None
-                else:
-                    # _schedule_next_task alters next_start_time
-                    self._schedule_next_task(schedule)
-                    next_start_time = schedule_execution.next_start_time
-
-                await self._start_task(schedule)
+                # _schedule_next_task alters next_start_time and queues the schedule
+                self._schedule_next_task(schedule)
 
-                # Queued manual execution is ignored when it was
-                # already time to run the task. The task doesn't
-                # start twice even when nonexclusive.
-                # The choice to put this after "await" above was
-                # deliberate. The above "await" could have allowed
-                # queue_task() to run. The following line
-                # will undo that because, after all, the task started.
-                schedule_execution.start_now = False
+            await self._start_task(schedule)
 
-            # Keep track of the earliest next_start_time
-            if next_start_time and (earliest_start_time is None or
-                                            earliest_start_time > next_start_time):
-                earliest_start_time = next_start_time
+            # Queued manual execution is ignored when it was
+            # already time to run the task. The task doesn't
+            # start twice even when nonexclusive.
+            # The choice to put this after "await" above was
+            # deliberate. The above "await" could have allowed
+            # queue_task() to run. The following line
+            # will undo that because, after all, the task started.
+            schedule_execution.start_now = False
 
-        return earliest_start_time
+        return None
 
     async def _scheduler_loop(self):
         """Main loop for the scheduler"""
@@ -579,6 +650,8 @@ class Scheduler(object):
                     schedule_execution.next_start_time = time.time()
                 schedule_execution.next_start_time += advance_seconds
 
+            self._queue_schedule(schedule.id, schedule_execution.next_start_time)
+
             self._logger.info(
                 "Scheduled task for schedule '%s' to start at %s", schedule.name,
                 datetime.datetime.fromtimestamp(schedule_execution.next_start_time))
@@ -631,6 +704,8 @@ class Scheduler(object):
         elif schedule.type == Schedule.Type.STARTUP:
             schedule_execution.next_start_time = current_time
 
+        self._queue_schedule(schedule.id, schedule_execution.next_start_time)
+
         if self._logger.isEnabledFor(logging.INFO):
             self._logger.info(
                 "Scheduled task for schedule '%s' to start at %s", schedule.name,
@@ -724,6 +799,13 @@ class Scheduler(object):
                 "default": str(self._DEFAULT_MAX_COMPLETED_TASK_AGE_DAYS),
                 "displayName": "Max Age Of Task (In days)"
             },
+            "warm_task_runner": {
+                "description": "Start the Python tasks by forking a process that has already imported them, "
+                               "instead of starting a new interpreter every time. Takes effect at restart",
+                "type": "boolean",
+                "default": self._DEFAULT_WARM_TASK_RUNNER,
+                "displayName": "Warm Task Runner"
+            },
         }
 
         cfg_manager = ConfigurationManager(self._storage_async)
@@ -733,6 +815,7 @@ class Scheduler(object):
         self._max_running_tasks = int(config['max_running_tasks']['value'])
         self._max_completed_task_age = datetime.timedelta(
             seconds=int(config['max_completed_task_age_days']['value']) * self._DAY_SECONDS)
+        self._warm_task_runner = config['warm_task_runner']['value'] == 'true'
 
     async def start(self):
         """Starts the scheduler
@@ -783,6 +866,12 @@ class Scheduler(object):
         await self._mark_tasks_interrupted()
         await self._read_storage()
 
+        if self._warm_task_runner:
+            await self._start_task_runner()
+
+        self._task_journal.storage = self._storage_async
+        self._task_journal.start()
+
         self._ready = True
 
         self._scheduler_loop_task = asyncio.ensure_future(self._scheduler_loop())
@@ -860,6 +949,9 @@ class Scheduler(object):
                 break
             await asyncio.sleep(1)
 
+        # Write the tasks completed, even when some are still running
+        await self._task_journal.flush()
+
         if self._task_processes:
             # Before throwing timeout error, just check if there are still any tasks pending for cancellation
             task_count = 0
@@ -875,6 +967,12 @@ class Scheduler(object):
             if task_count != 0:
                 raise TimeoutError("Timeout Error: Could not stop scheduler as {} tasks are pending".format(task_count))
 
+        if self._task_runner is not None:
+            await self._task_runner.stop()
+            self._task_runner = None
+
+        await self._task_journal.stop()
+
         self._schedule_executions = None
         self._task_processes = None
         self._schedules = None
@@ -1364,6 +1462,7 @@ class Scheduler(object):
             self._schedule_executions[schedule_row.id] = schedule_execution
 
         schedule_execution.start_now = True
+        self._queue_schedule(schedule_id, self._START_NOW)
 
         self._logger.debug("Queued schedule '%s' for execution", schedule_row.name)
         self._resume_check_schedules()
@@ -1393,6 +1492,10 @@ class Scheduler(object):
 
         del self._schedules[schedule_id]
 
+        schedule_execution = self._schedule_executions.get(schedule_id)
+        if schedule_execution is not None and not schedule_execution.task_processes:
+            del self._schedule_executions[schedule_id]
+
         # TODO: Inspect race conditions with _set_first
         delete_payload = PayloadBuilder() \
             .WHERE(['id', '=', str(schedule_id)]) \
@@ -1433,6 +1536,18 @@ class Scheduler(object):
 
         return tasks
 
+    async def query_tasks(self, query_payload):
+        """Queries the tasks table once the task journal is written, so that the tasks started or completed
+        since the rows were last written are seen
+
+        Args:
+            query_payload: The query, as built by PayloadBuilder
+        Returns:
+            The result of the query
+        """
+        await self._task_journal.flush()
+        return await self._storage_async.query_tbl_with_payload("tasks", query_payload)
+
     async def get_task(self, task_id: uuid.UUID) -> Task:
         """Retrieves a task given its id"""
         query_payload = PayloadBuilder().SELECT("id", "process_name", "schedule_name", "state", "start_time", "end_time", "reason", "exit_code")\
@@ -1442,7 +1557,7 @@ class Scheduler(object):
 
         try:
             self._logger.debug('Database command: %s', query_payload)
-            res = await self._storage_async.query_tbl_with_payload("tasks", query_payload)
+            res = await self.query_tasks(query_payload)
             for row in res['rows']:
                 task = Task()
                 task.task_id = row.get('id')
@@ -1493,7 +1608,7 @@ class Scheduler(object):
 
         try:
             self._logger.debug('Database command: %s', query_payload)
-            res = await self._storage_async.query_tbl_with_payload("tasks", query_payload)
+            res = await self.query_tasks(query_payload)
             for row in res['rows']:
                 task = Task()
                 task.task_id = row.get('id')
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+"""Write-behind journal of the tasks table"""
+
+import asyncio
+import collections
+import json
+
+from foglamp.common import logger
+from foglamp.common.storage_client.payload_builder import PayloadBuilder
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_logger = logger.setup(__name__)
+
+
+class TaskJournal(object):
+    """Rows of the tasks table kept in memory and written periodically in bulk
+
+    The start and the completion of a task are recorded by :meth:`task_started` and :meth:`task_completed`.
+    Every flush interval, the tasks started since the previous flush are written with a single insert and the
+    tasks completed with a single update. A task that starts and completes between two flushes is written with
+    one insert only. The insert of a task is always written before its update.
+
+    When a write fails the rows are kept and written by the next flush, they are dropped after
+    MAX_ATTEMPTS failed flushes. Flushes do not overlap, a flush waits for the one in progress.
+    """
+
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, storage=None, flush_interval=1):
+        """
+        Args:
+            storage: StorageClientAsync used to write the rows, can be set later
+            flush_interval: seconds between two writes
+        """
+        self.storage = storage
+        self._flush_interval = flush_interval
+        self._records = collections.OrderedDict()
+        """Rows not written yet by task id, {'insert': values} or {'update': values}"""
+        self._flush_task = None
+        self._stop_event = None
+        self._flush_lock = None
+
+    def __len__(self):
+        return len(self._records)
+
+    def task_started(self, task_id, **values):
+        """Records the insert of the row of a task
+
+        Args:
+            task_id: id of the task
+            values: values of the columns other than id
+        """
+        values['id'] = str(task_id)
+        self._records[str(task_id)] = {'insert': values, 'attempts': 0}
+
+    def task_completed(self, task_id, **values):
+        """Records the update of the row of a task
+
+        Args:
+            task_id: id of the task
+            values: values of the columns to change
+        """
+        record = self._records.get(str(task_id))
+        if record is None:
+            self._records[str(task_id)] = {'update': values, 'attempts': 0}
+        else:
+            # Not written yet, the row is written once with the new values
+            record.get('insert', record.get('update')).update(values)
+
+    async def flush(self):
+        """Writes the rows recorded so far
+
+        Returns:
+            False if some rows could not be written, they are kept for the next flush
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        # The update of a task is not written before its insert, still being written by another flush
+        async with self._flush_lock:
+            return await self._flush()
+
+    async def _flush(self):
+        if not self._records:
+            return True
+        records, self._records = self._records, collections.OrderedDict()
+        inserts = [(task_id, record) for task_id, record in records.items() if 'insert' in record]
+        updates = [(task_id, record) for task_id, record in records.items() if 'update' in record]
+        written = True
+
+        if inserts:
+            payload = {"inserts": [json.loads(PayloadBuilder().INSERT(**record['insert']).payload())
+                                   for task_id, record in inserts]}
+            try:
+                _logger.debug('Database command: %s', payload)
+                await self.storage.insert_into_tbl("tasks", json.dumps(payload))
+            except Exception as ex:
+                self._restore(inserts, ex)
+                written = False
+
+        if updates:
+            payload = {"updates": [json.loads(PayloadBuilder().SET(**record['update'])
+                                              .WHERE(['id', '=', task_id]).payload())
+                                   for task_id, record in updates]}
+            try:
+                _logger.debug('Database command: %s', payload)
+                await self.storage.update_tbl("tasks", json.dumps(payload))
+            except Exception as ex:
+                self._restore(updates, ex)
+                written = False
+
+        return written
+
+    def _restore(self, failed, ex):
+        """Puts back rows that could not be written, before the rows recorded since"""
+        records = collections.OrderedDict()
+        for task_id, record in failed:
+            record['attempts'] += 1
+            if record['attempts'] >= self.MAX_ATTEMPTS:
+                _logger.error('Unable to write the row of task %s, dropped: %s', task_id, record)
+                continue
+            newer = self._records.pop(task_id, None)
+            if newer is not None:
+                # The task completed during the flush
+                record.get('insert', record.get('update')).update(newer['update'])
+            records[task_id] = record
+        records.update(self._records)
+        self._records = records
+        _logger.warning('Unable to write %s rows of the tasks table, %s', len(failed), str(ex))
+
+    def start(self):
+        """Starts writing the rows every flush interval"""
+        if self._flush_task is None:
+            self._stop_event = asyncio.Event()
+            self._flush_task = asyncio.ensure_future(self._flush_periodically())
+
+    async def stop(self):
+        """Stops the periodic writes and writes the rows left"""
+        if self._flush_task is not None:
+            self._stop_event.set()
+            await self._flush_task
+            self._flush_task = None
+        else:
+            await self.flush()
+
+    async def _flush_periodically(self):
+        # Flushes once more when stopped, even before the first interval has elapsed
+        while True:
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+            if self._stop_event.is_set():
+                break
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+"""Client of the warm task runner, see foglamp.tasks.common.runner"""
+
+import asyncio
+import itertools
+import json
+import os
+import signal
+import socket
+import sys
+
+import foglamp
+from foglamp.common import logger
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_logger = logger.setup(__name__)
+
+_PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(foglamp.__file__)))
+
+
+class TaskRunnerError(RuntimeError):
+    """The task runner is not running"""
+    pass
+
+
+class WarmProcess(object):
+    """A task forked by the task runner, with the attributes and methods of asyncio.subprocess.Process
+    the scheduler uses"""
+
+    _POLL_SECONDS = 1
+    """How often to check a task is still running once the task runner has stopped"""
+
+    def __init__(self, pid, exit_future):
+        self.pid = pid
+        self.returncode = None
+        self._exit_future = exit_future
+
+    async def wait(self):
+        """Waits for the task to terminate and returns its exit code"""
+        self.returncode = await asyncio.shield(self._exit_future)
+        if self.returncode is None:
+            # The task runner stopped first, the exit code is lost
+            while self._is_running():
+                await asyncio.sleep(self._POLL_SECONDS)
+            self.returncode = 1
+        return self.returncode
+
+    def _is_running(self):
+        try:
+            os.kill(self.pid, 0)
+        except ProcessLookupError:
+            return False
+        return True
+
+    def send_signal(self, sig):
+        os.kill(self.pid, sig)
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+
+class WarmTaskRunner(object):
+    """Starts the task runner and assigns tasks to it
+
+    The runner is a process that has already imported the Python tasks, every task is started by forking it
+    instead of starting a new interpreter.
+    """
+
+    _START_TASK_TIMEOUT = 5
+    """Seconds to wait for the pid of a task from the runner"""
+
+    def __init__(self):
+        self._process = None  # type: asyncio.subprocess.Process
+        self._reader = None  # type: asyncio.StreamReader
+        self._writer = None  # type: asyncio.StreamWriter
+        self._read_task = None  # type: asyncio.Task
+        self._ids = itertools.count(1)
+        self._pids = {}
+        """Future of the pid by task id, until the runner has forked the task"""
+        self._exit_codes = {}
+        """Future of the exit code by task id, until the task terminates"""
+
+    @property
+    def is_running(self):
+        return self._read_task is not None and not self._read_task.done()
+
+    async def start(self, modules):
+        """Starts the runner, importing the modules in it
+
+        Args:
+            modules: names of the modules the tasks are run with, as in python3 -m <module>
+        """
+        runner_socket, scheduler_socket = socket.socketpair()
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                sys.executable, '-m', 'foglamp.tasks.common.runner', '--fd', str(runner_socket.fileno()), *modules,
+                cwd=_PYTHON_DIR, pass_fds=(runner_socket.fileno(),))
+        except Exception:
+            scheduler_socket.close()
+            raise
+        finally:
+            runner_socket.close()
+        self._reader, self._writer = await asyncio.open_unix_connection(sock=scheduler_socket)
+        self._read_task = asyncio.ensure_future(self._read_messages())
+        _logger.info("Started task runner pid %s with modules %s", self._process.pid, modules)
+
+    async def stop(self):
+        """Stops the runner, tasks that are running are not stopped"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._read_task is not None:
+            await self._read_task
+            self._read_task = None
+        if self._process is not None:
+            await self._process.wait()
+            self._process = None
+
+    async def start_task(self, module, args):
+        """Forks a task in the runner
+
+        Args:
+            module: module to run, as in python3 -m <module>
+            args: command line arguments of the task
+
+        Returns:
+            A :class:`WarmProcess`
+
+        Raises:
+            TaskRunnerError: the runner is not running
+        """
+        if not self.is_running:
+            raise TaskRunnerError("The task runner is not running")
+        task_id = next(self._ids)
+        pid_future = asyncio.Future()
+        self._pids[task_id] = pid_future
+        self._exit_codes[task_id] = asyncio.Future()
+        try:
+            self._writer.write((json.dumps({'id': task_id, 'module': module, 'args': args}) + '\n').encode())
+            pid = await asyncio.wait_for(asyncio.shield(pid_future), self._START_TASK_TIMEOUT)
+        except Exception as ex:
+            self._pids.pop(task_id, None)
+            self._exit_codes.pop(task_id, None)
+            raise TaskRunnerError("Unable to start task {}: {}".format(module, str(ex)))
+        return WarmProcess(pid, self._exit_codes[task_id])
+
+    async def _read_messages(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                message = json.loads(line.decode())
+                task_id = message['id']
+                if 'pid' in message:
+                    pid_future = self._pids.pop(task_id, None)
+                    if pid_future is not None and not pid_future.done():
+                        pid_future.set_result(message['pid'])
+                else:
+                    exit_future = self._exit_codes.pop(task_id, None)
+                    if exit_future is not None:
+                        exit_future.set_result(message['exit_code'])
+        except Exception:
+            _logger.exception("Unable to read from the task runner")
+        finally:
+            if self._writer is not None:
+                _logger.error("The task runner has stopped, tasks are started as new processes")
+            for pid_future in self._pids.values():
+                if not pid_future.done():
+                    pid_future.set_exception(TaskRunnerError("The task runner has stopped"))
+            for exit_future in self._exit_codes.values():
+                if not exit_future.done():
+                    exit_future.set_result(None)
+            self._pids.clear()
+            self._exit_codes.clear()
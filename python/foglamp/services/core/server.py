@@ -18,8 +18,10 @@ from aiohttp import web
 import aiohttp
 import json
 import signal
+import urllib.parse
 
 from foglamp.common import logger
+from foglamp.common import asset_catalog
 from foglamp.common.audit_logger import AuditLogger
 from foglamp.common.configuration_manager import ConfigurationManager
 
@@ -31,6 +33,7 @@ from foglamp.common.storage_client.storage_client import ReadingsStorageClientAs
 from foglamp.services.core import routes as admin_routes
 from foglamp.services.core.api import configuration as conf_api
 from foglamp.services.common.microservice_management import routes as management_routes
+from foglamp.common.microservice_management_client.microservice_management_client import CATEGORY_VERSION_HEADER
 
 from foglamp.common.service_record import ServiceRecord
 from foglamp.services.core.service_registry.service_registry import ServiceRegistry
@@ -221,6 +224,9 @@ class Server:
     _asset_tracker = None
     """ Asset tracker """
 
+    _asset_catalog_reconciler = None
+    """ Reconciles the asset catalog with the readings of the C south services """
+
     service_app, service_server, service_server_handler = None, None, None
     core_app, core_server, core_server_handler = None, None, None
 
@@ -580,6 +586,20 @@ class Server:
         cls._asset_tracker = AssetTracker(cls._storage_client_async)
         await cls._asset_tracker.load_asset_records()
 
+    @classmethod
+    def _start_asset_catalog_reconciler(cls):
+        """Starts counting the readings of the C south services in the asset catalog"""
+        cls._asset_catalog_reconciler = asset_catalog.Reconciler(cls._storage_client_async,
+                                                                 cls._readings_client_async)
+        cls._asset_catalog_reconciler.start()
+
+    @classmethod
+    async def _stop_asset_catalog_reconciler(cls):
+        """Stops the reconciliation of the asset catalog"""
+        if cls._asset_catalog_reconciler is not None:
+            await cls._asset_catalog_reconciler.stop()
+            cls._asset_catalog_reconciler = None
+
     @classmethod
     def _start_core(cls, loop=None):
         _logger.info("start core")
@@ -658,6 +678,9 @@ class Server:
             # Start asset tracker
             loop.run_until_complete(cls._start_asset_tracker())
 
+            # Start reconciling the asset catalog
+            cls._start_asset_catalog_reconciler()
+
             # Everything is complete in the startup sequence, write the audit log entry
             cls._audit = AuditLogger(cls._storage_client_async)
             loop.run_until_complete(cls._audit.information('START', None))
@@ -702,6 +725,8 @@ class Server:
             # stop the REST api (exposed on service port)
             await cls.stop_rest_server()
 
+            await cls._stop_asset_catalog_reconciler()
+
             # Must write the audit log entry before we stop the storage service
             cls._audit = AuditLogger(cls._storage_client_async)
             await cls._audit.information('FSTOP', None)
@@ -1184,6 +1209,23 @@ class Server:
 
         return web.json_response(result)
 
+    @classmethod
+    async def add_track_bulk(cls, request):
+        data = await request.json()
+        if not isinstance(data, dict) or not isinstance(data.get('track'), list):
+            raise web.HTTPBadRequest(reason='Data payload must be a dictionary with a track list')
+
+        try:
+            result = await cls._asset_tracker.add_asset_records(data['track'])
+        except (TypeError, StorageServerError) as ex:
+            raise web.HTTPBadRequest(reason=str(ex))
+        except ValueError as ex:
+            raise web.HTTPNotFound(reason=str(ex))
+        except Exception as ex:
+            raise web.HTTPException(reason=ex)
+
+        return web.json_response({'track': result})
+
     @classmethod
     async def get_configuration_categories(cls, request):
         res = await conf_api.get_categories(request)
@@ -1206,7 +1248,12 @@ class Server:
 
     @classmethod
     async def get_configuration_category(cls, request):
+        # Microservices cache the category until a change notification with a newer version is received.
+        # The version is read first, a change made meanwhile has a newer version.
+        category_name = urllib.parse.unquote(request.match_info.get('category_name'))
+        version = cls._configuration_manager.get_category_version(category_name)
         res = await conf_api.get_category(request)
+        res.headers[CATEGORY_VERSION_HEADER] = str(version)
         return res
 
     @classmethod
@@ -9,6 +9,7 @@
 import asyncio
 import aiohttp
 import json
+import random
 from foglamp.common import logger
 from foglamp.common.audit_logger import AuditLogger
 from foglamp.common.configuration_manager import ConfigurationManager
@@ -35,6 +36,12 @@ class Monitor(object):
     _DEFAULT_RESTART_FAILED = "auto"
     """Restart failed microservice - manual/auto"""
 
+    _MAX_CONCURRENT_PINGS = 20
+    """Maximum number of services pinged at the same time"""
+
+    _PING_JITTER = 0.1
+    """The pings of a round start at random times over this fraction of the sleep interval"""
+
     _logger = None
 
     def __init__(self):
@@ -50,80 +57,120 @@ class Monitor(object):
         """Number of max attempts for finding a heartbeat of service"""
         self._restart_failed = None  # type: str
         """Restart failed microservice - manual/auto"""
+        self._ping_jitter = 0  # type: float
+        """Maximum delay (in seconds) before pinging a service in a round"""
+        self._session = None  # type: aiohttp.ClientSession
+        """Keep-alive session shared by the pings"""
+        self._ping_semaphore = None  # type: asyncio.Semaphore
 
         self.restarted_services = []
 
+        self.ping_latency = {}
+        """Duration (in seconds) of the last ping of every service by name, None when it failed"""
+        self.round_duration = None  # type: float
+        """Duration (in seconds) of the last round of pings"""
+
     async def _sleep(self, sleep_time):
         await asyncio.sleep(sleep_time)
 
     async def _monitor_loop(self):
-        """async Monitor loop to monitor registered services"""
+        """async Monitor loop to monitor registered services
+
+        The services of a round are pinged concurrently, a service that does not respond delays the round
+        by ping_timeout whatever the number of services.
+        """
         # check health of all micro-services every N seconds
         round_cnt = 0
         check_count = {}  # dict to hold current count of current status.
                           # In case of ok and running status, count will always be 1.
                           # In case of of non running statuses, count shows since when this status is set.
-        while True:
-            round_cnt += 1
-            self._logger.debug("Starting next round#{} of service monitoring, sleep/i:{} ping/t:{} max/a:{}".format(
-                round_cnt, self._sleep_interval, self._ping_timeout, self._max_attempts))
-            for service_record in ServiceRegistry.all():
-                if service_record._id not in check_count:
-                    check_count.update({service_record._id: 1})
-
-                # Try ping if service status is either running or doubtful (i.e. give service a chance to recover)
-                if service_record._status not in [ServiceRecord.Status.Running,
-                                                  ServiceRecord.Status.Unresponsive,
-                                                  ServiceRecord.Status.Failed]:
-                    continue
-
-                self._logger.debug("Service: {} Status: {}".format(service_record._name, service_record._status))
-
-                if service_record._status == ServiceRecord.Status.Failed:
-                    if self._restart_failed == "auto":
-                        if service_record._id not in self.restarted_services:
-                            self.restarted_services.append(service_record._id)
-                            asyncio.ensure_future(self.restart_service(service_record))
-                    continue
-
-                try:
-                    url = "{}://{}:{}/foglamp/service/ping".format(
-                        service_record._protocol, service_record._address, service_record._management_port)
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(url, timeout=self._ping_timeout) as resp:
-                            text = await resp.text()
-                            res = json.loads(text)
-                            if res["uptime"] is None:
-                                raise ValueError('res.uptime is None')
-                except (asyncio.TimeoutError, aiohttp.client_exceptions.ServerTimeoutError) as ex:
-                    service_record._status = ServiceRecord.Status.Unresponsive
-                    check_count[service_record._id] += 1
-                    self._logger.info("ServerTimeoutError: %s, %s", str(ex), service_record.__repr__())
-                except aiohttp.client_exceptions.ClientConnectorError as ex:
-                    service_record._status = ServiceRecord.Status.Unresponsive
-                    check_count[service_record._id] += 1
-                    self._logger.info("ClientConnectorError: %s, %s", str(ex), service_record.__repr__())
-                except ValueError as ex:
-                    service_record._status = ServiceRecord.Status.Unresponsive
-                    check_count[service_record._id] += 1
-                    self._logger.info("Invalid response: %s, %s", str(ex), service_record.__repr__())
-                except Exception as ex:
-                    service_record._status = ServiceRecord.Status.Unresponsive
-                    check_count[service_record._id] += 1
-                    self._logger.info("Exception occurred: %s, %s", str(ex), service_record.__repr__())
-                else:
-                    service_record._status = ServiceRecord.Status.Running
-                    check_count[service_record._id] = 1
-
-                if check_count[service_record._id] > self._max_attempts:
-                    ServiceRegistry.mark_as_failed(service_record._id)
-                    check_count[service_record._id] = 0
-                    try:
-                        audit = AuditLogger(connect.get_storage_async())
-                        await audit.failure('SRVFL', {'name':service_record._name})
-                    except Exception as ex:
-                        self._logger.info("Failed to audit service failure %s", str(ex))
-            await self._sleep(self._sleep_interval)
+        loop = asyncio.get_event_loop()
+        self._session = aiohttp.ClientSession()
+        self._ping_semaphore = asyncio.Semaphore(self._MAX_CONCURRENT_PINGS)
+        try:
+            while True:
+                round_cnt += 1
+                self._logger.debug("Starting next round#{} of service monitoring, sleep/i:{} ping/t:{} max/a:{}".format(
+                    round_cnt, self._sleep_interval, self._ping_timeout, self._max_attempts))
+                round_start = loop.time()
+                ping_latency = {}
+                checks = []
+                for service_record in ServiceRegistry.all():
+                    if service_record._id not in check_count:
+                        check_count.update({service_record._id: 1})
+
+                    # Try ping if service status is either running or doubtful (i.e. give service a chance to recover)
+                    if service_record._status not in [ServiceRecord.Status.Running,
+                                                      ServiceRecord.Status.Unresponsive,
+                                                      ServiceRecord.Status.Failed]:
+                        continue
+
+                    self._logger.debug("Service: {} Status: {}".format(service_record._name, service_record._status))
+
+                    if service_record._status == ServiceRecord.Status.Failed:
+                        if self._restart_failed == "auto":
+                            if service_record._id not in self.restarted_services:
+                                self.restarted_services.append(service_record._id)
+                                asyncio.ensure_future(self.restart_service(service_record))
+                        continue
+
+                    checks.append(self._check_service(service_record, check_count, ping_latency))
+                if checks:
+                    await asyncio.gather(*checks)
+                self.ping_latency = ping_latency
+                self.round_duration = loop.time() - round_start
+                self._logger.debug("Round#{} of service monitoring done in {:.3f}s, ping latency: {}".format(
+                    round_cnt, self.round_duration, ping_latency))
+                await self._sleep(self._sleep_interval)
+        finally:
+            await self._session.close()
+
+    async def _check_service(self, service_record, check_count, ping_latency):
+        """Pings a service and updates its status"""
+        if self._ping_jitter:
+            # Services registered together are not pinged all at once
+            await asyncio.sleep(random.uniform(0, self._ping_jitter))
+        loop = asyncio.get_event_loop()
+        async with self._ping_semaphore:
+            ping_start = loop.time()
+            ping_latency[service_record._name] = None
+            try:
+                url = "{}://{}:{}/foglamp/service/ping".format(
+                    service_record._protocol, service_record._address, service_record._management_port)
+                async with self._session.get(url, timeout=aiohttp.ClientTimeout(total=self._ping_timeout)) as resp:
+                    text = await resp.text()
+                    res = json.loads(text)
+                    if res["uptime"] is None:
+                        raise ValueError('res.uptime is None')
+            except (asyncio.TimeoutError, aiohttp.client_exceptions.ServerTimeoutError) as ex:
+                service_record._status = ServiceRecord.Status.Unresponsive
+                check_count[service_record._id] += 1
+                self._logger.info("ServerTimeoutError: %s, %s", str(ex), service_record.__repr__())
+            except aiohttp.client_exceptions.ClientConnectorError as ex:
+                service_record._status = ServiceRecord.Status.Unresponsive
+                check_count[service_record._id] += 1
+                self._logger.info("ClientConnectorError: %s, %s", str(ex), service_record.__repr__())
+            except ValueError as ex:
+                service_record._status = ServiceRecord.Status.Unresponsive
+                check_count[service_record._id] += 1
+                self._logger.info("Invalid response: %s, %s", str(ex), service_record.__repr__())
+            except Exception as ex:
+                service_record._status = ServiceRecord.Status.Unresponsive
+                check_count[service_record._id] += 1
+                self._logger.info("Exception occurred: %s, %s", str(ex), service_record.__repr__())
+            else:
+                service_record._status = ServiceRecord.Status.Running
+                check_count[service_record._id] = 1
+                ping_latency[service_record._name] = loop.time() - ping_start
+
+        if check_count[service_record._id] > self._max_attempts:
+            ServiceRegistry.mark_as_failed(service_record._id)
+            check_count[service_record._id] = 0
+            try:
+                audit = AuditLogger(connect.get_storage_async())
+                await audit.failure('SRVFL', {'name':service_record._name})
+            except Exception as ex:
+                self._logger.info("Failed to audit service failure %s", str(ex))
 
     async def _read_config(self):
         """Reads configuration"""
@@ -169,6 +216,7 @@ class Monitor(object):
         self._ping_timeout = int(config['ping_timeout']['value'])
         self._max_attempts = int(config['max_attempts']['value'])
         self._restart_failed = config['restart_failed']['value']
+        self._ping_jitter = self._sleep_interval * self._PING_JITTER
 
     async def restart_service(self, service_record):
         from foglamp.services.core import server  # To avoid cyclic import as server also imports monitor
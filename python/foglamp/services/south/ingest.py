@@ -15,7 +15,10 @@ import json
 
 from foglamp.common import logger
 from foglamp.common import statistics
+from foglamp.common.asset_catalog import AssetCatalog
+from foglamp.common.asset_tracker_events import AssetTrackerEvents
 from foglamp.common.storage_client.exceptions import StorageServerError
+from foglamp.services.south.readings_buffer import Reading, ReadingsRingBuffer
 
 __author__ = "Terris Linenbach, Amarendra K Sinha"
 __copyright__ = "Copyright (c) 2017 OSIsoft, LLC"
@@ -58,11 +61,20 @@ class Ingest(object):
     _started = False
     """True when the server has been started"""
 
-    _readings_lists = None  # type: List
-    """A list of readings lists. Each list contains the inputs to :meth:`add_readings`."""
+    _readings_buffers = None  # type: List[ReadingsRingBuffer]
+    """A list of readings ring buffers. Each buffer contains the :class:`Reading` records of :meth:`add_readings`."""
+
+    _readings_count = 0  # type: int
+    """Number of readings held by all of the readings buffers"""
+
+    _readings_high_water = 0  # type: int
+    """Highest number of readings held by the readings buffers since the occupancy was last reset"""
+
+    _readings_low_water = 0  # type: int
+    """Lowest number of readings held by the readings buffers since the occupancy was last reset"""
 
     _current_readings_list_index = 0
-    """Which readings list to insert into next"""
+    """Which readings buffer to insert into next"""
 
     _insert_readings_tasks = None  # type: List[asyncio.Task]
     """asyncio tasks for :meth:`_insert_readings`"""
@@ -103,14 +115,29 @@ class Ingest(object):
     _max_readings_insert_batch_reconnect_wait_seconds = 10
     """The maximum number of seconds to wait before reconnecting to storage when inserting readings"""
 
+    _readings_buffer_full_policy = 'discard'
+    """What to do with a reading when all the readings buffers are full: 'discard' or 'wait'"""
+
+    _readings_buffer_full_wait_seconds = 1.0
+    """With the 'wait' policy, maximum number of seconds to wait for room in the readings buffers"""
+
     # Configuration (end)
 
-    _payload_events = []
-    """The list of unique reading payload for asset tracker"""
+    _asset_tracker_events = None  # type: AssetTrackerEvents
+    """Ingest events of the assets already registered with the core asset tracker"""
 
     stats = None
     """Statistics class instance"""
 
+    _statistics_accumulator = None  # type: statistics.StatisticsAccumulator
+    """Statistics written to storage every _write_statistics_frequency_seconds"""
+
+    _write_statistics_frequency_seconds = 5
+    """Number of seconds between two writes of the statistics to storage"""
+
+    _asset_catalog = None  # type: AssetCatalog
+    """Assets of the readings inserted, written to storage every _write_statistics_frequency_seconds"""
+
     @classmethod
     async def _read_config(cls):
         """Creates default values for the South configuration category and then reads all
@@ -159,6 +186,21 @@ class Ingest(object):
                 "type": "integer",
                 "default": str(cls._max_readings_insert_batch_reconnect_wait_seconds)
             },
+            "readings_buffer_full_policy": {
+                "description": "What to do with a reading when all the readings buffers are full, "
+                               "discard it or wait for room up to the buffer full wait time",
+                "displayName": "Buffer Full Policy",
+                "type": "enumeration",
+                "options": ["discard", "wait"],
+                "default": cls._readings_buffer_full_policy
+            },
+            "readings_buffer_full_wait_seconds": {
+                "description": "Maximum number of seconds to wait for room in the readings buffers "
+                               "when the buffer full policy is wait",
+                "displayName": "Buffer Full Wait Time",
+                "type": "float",
+                "default": str(cls._readings_buffer_full_wait_seconds)
+            },
         }
 
         # Create configuration category and any new keys within it
@@ -188,8 +230,8 @@ class Ingest(object):
             ['value'])
         cls._max_readings_insert_batch_reconnect_wait_seconds = int(
             config['max_readings_insert_batch_reconnect_wait_seconds']['value'])
-
-        cls._payload_events = []
+        cls._readings_buffer_full_policy = config['readings_buffer_full_policy']['value']
+        cls._readings_buffer_full_wait_seconds = float(config['readings_buffer_full_wait_seconds']['value'])
 
     @classmethod
     async def start(cls, parent):
@@ -222,14 +264,22 @@ class Ingest(object):
                             'to %s', cls._readings_buffer_size,
                             cls._readings_list_size * cls._max_concurrent_readings_inserts)
 
+        # Keep-alive connections to storage are shared by all the readings lists and evicted when idle
+        await cls.readings_storage_async.configure_pool(
+            connection_limit=cls._max_concurrent_readings_inserts,
+            keepalive_timeout=cls._max_readings_insert_batch_connection_idle_seconds)
+
         cls._last_insert_time = 0
         cls._insert_readings_wait_tasks = []
         cls._readings_list_batch_size_reached = []
         cls._readings_list_not_empty = []
-        cls._readings_lists = []
+        cls._readings_buffers = []
+        cls._readings_count = 0
+        cls._readings_high_water = 0
+        cls._readings_low_water = 0
 
         for _ in range(cls._max_concurrent_readings_inserts):
-            cls._readings_lists.append([])
+            cls._readings_buffers.append(ReadingsRingBuffer(cls._readings_list_size))
             cls._insert_readings_wait_tasks.append(None)
             cls._readings_list_batch_size_reached.append(asyncio.Event())
             cls._readings_list_not_empty.append(asyncio.Event())
@@ -237,7 +287,9 @@ class Ingest(object):
         cls._insert_readings_task = asyncio.ensure_future(cls._insert_readings())
         cls._readings_lists_not_full = asyncio.Event()
 
-        cls._payload_events = cls._parent_service._core_microservice_management_client.get_asset_tracker_events()['track']
+        cls._asset_tracker_events = AssetTrackerEvents(cls._parent_service._core_management_host,
+                                                       cls._parent_service._core_management_port)
+        await cls._asset_tracker_events.load_from_core()
 
         cls.stats = await statistics.create_statistics(cls.storage_async)
 
@@ -246,6 +298,12 @@ class Ingest(object):
         await cls.stats.register('DISCARDED', 'Readings discarded at the input side by FogLAMP, i.e. '
                                               'discarded before being placed in the buffer. This may be due to some '
                                               'error in the readings themselves.')
+        cls._statistics_accumulator = statistics.StatisticsAccumulator(cls.stats,
+                                                                       cls._write_statistics_frequency_seconds)
+        cls._statistics_accumulator.start()
+
+        cls._asset_catalog = AssetCatalog(cls.storage_async, cls._write_statistics_frequency_seconds)
+        cls._asset_catalog.start()
 
         cls._stop = False
         cls._started = True
@@ -260,6 +318,9 @@ class Ingest(object):
 
         cls._stop = True
 
+        # Readings waiting for room in the buffers are discarded
+        cls._readings_lists_not_full.set()
+
         for task in cls._insert_readings_wait_tasks:
             if task is not None:
                 try:
@@ -272,9 +333,31 @@ class Ingest(object):
         except Exception:
             _LOGGER.exception('An exception was raised by Ingest._insert_readings')
 
+        try:
+            await cls._statistics_accumulator.stop()
+        except Exception:
+            _LOGGER.exception('An exception was raised while writing statistics')
+
+        try:
+            await cls._asset_catalog.stop()
+        except Exception:
+            _LOGGER.exception('An exception was raised while writing the asset catalog')
+
+        try:
+            await cls._asset_tracker_events.close()
+        except Exception:
+            _LOGGER.exception('An exception was raised while sending asset tracker events')
+
+        try:
+            await cls.readings_storage_async.close()
+            await cls.storage_async.close()
+        except Exception:
+            _LOGGER.exception('An exception was raised while closing storage connections')
+
         cls._insert_readings_wait_tasks = None
         cls._insert_readings_tasks = None
-        cls._readings_lists = None
+        cls._readings_buffers = None
+        cls._readings_count = 0
         cls._readings_list_batch_size_reached = None
         cls._readings_list_not_empty = None
         cls._readings_lists_not_full = None
@@ -298,10 +381,7 @@ class Ingest(object):
 
         while list_index <= cls._max_concurrent_readings_inserts-1:
             if cls._stop:
-                readings = 0
-                for i in range(cls._max_concurrent_readings_inserts):
-                    readings += len(cls._readings_lists[i])
-                if cls._discarded_readings_stats + readings == 0:
+                if cls._discarded_readings_stats + cls._readings_count == 0:
                     break  # Terminate this method as there are no pending readings available
 
             list_index += 1
@@ -310,40 +390,40 @@ class Ingest(object):
 
             # _LOGGER.debug('Insert readings for list_index: %s', list_index)
 
-            readings_list = cls._readings_lists[list_index]
+            readings_buffer = cls._readings_buffers[list_index]
             min_readings_reached = cls._readings_list_batch_size_reached[list_index]
             lists_not_full = cls._readings_lists_not_full
 
             # Wait for enough items in the list to fill a batch
             # for some minimum amount of time
             while not cls._stop:
-                if len(readings_list) >= cls._readings_insert_batch_size:
+                if len(readings_buffer) >= cls._readings_insert_batch_size:
                     break
 
                 min_readings_reached.clear()
                 waiter = asyncio.ensure_future(min_readings_reached.wait())
                 cls._insert_readings_wait_tasks[list_index] = waiter
 
-                # _LOGGER.debug('Waiting for entire batch: Queue index: %s Size: %s', list_index, len(readings_list))
+                # _LOGGER.debug('Waiting for entire batch: Queue index: %s Size: %s', list_index, len(readings_buffer))
 
                 try:
                     await asyncio.wait_for(waiter, cls._readings_insert_batch_timeout_seconds)
-                    # _LOGGER.debug('Released: Queue index: %s Size: %s', list_index, len(readings_list))
+                    # _LOGGER.debug('Released: Queue index: %s Size: %s', list_index, len(readings_buffer))
                 except asyncio.CancelledError:
-                    # _LOGGER.debug('Cancelled: Queue index: %s Size: %s', list_index, len(readings_list))
+                    # _LOGGER.debug('Cancelled: Queue index: %s Size: %s', list_index, len(readings_buffer))
                     break
                 except asyncio.TimeoutError:
-                    # _LOGGER.debug('Timed out: Queue index: %s Size: %s', list_index, len(readings_list))
+                    # _LOGGER.debug('Timed out: Queue index: %s Size: %s', list_index, len(readings_buffer))
                     break
                 finally:
                     cls._insert_readings_wait_tasks[list_index] = None
 
             # If list is still empty, then proceed to next list
-            if not len(readings_list):
+            if not len(readings_buffer):
                 continue
 
             # If batch size still not reached and if there is time then let this list wait and move to next list
-            if (not cls._stop) and (len(readings_list) < cls._readings_insert_batch_size) and ((
+            if (not cls._stop) and (len(readings_buffer) < cls._readings_insert_batch_size) and ((
                     time.time() - cls._last_insert_time) < cls._readings_insert_batch_timeout_seconds):
                 continue
 
@@ -353,15 +433,16 @@ class Ingest(object):
             # Perform insert. Retry when fails.
             while True:
                 try:
-                    batch_size = len(readings_list)
-                    payload = json.dumps({"readings": readings_list[:batch_size]})
+                    batch_size = len(readings_buffer)
                     # insert_start_time = time.time()
                     # _LOGGER.debug('Begin insert: Queue index: %s Batch size: %s', list_index, batch_size)
                     try:
-                        await cls.readings_storage_async.append(payload)
+                        rows = [reading.to_dict() for reading in readings_buffer.peek(batch_size)]
+                        await cls.readings_storage_async.append_readings(rows)
                         # insert_end_time = time.time()
                         # _LOGGER.debug('Inserted %s records in time %s', batch_size, insert_end_time - insert_start_time)
                         cls._readings_stats += batch_size
+                        cls._asset_catalog.add(rows)
                     except StorageServerError as ex:
                         err_response = ex.error
                         # if key error in next, it will be automatically in parent except block
@@ -372,7 +453,7 @@ class Ingest(object):
                         else:
                             # not retryable
                             _LOGGER.error("%s, %s", err_response["source"], err_response["message"])
-                            batch_size = len(readings_list)
+                            batch_size = len(readings_buffer)
                             cls._discarded_readings_stats += batch_size
                     # _LOGGER.debug('End insert: Queue index: %s Batch size: %s', list_index, batch_size)
                     break
@@ -383,14 +464,16 @@ class Ingest(object):
 
                     if cls._stop or attempt >= _MAX_ATTEMPTS:
                         # Stopping. Discard the entire list upon failure.
-                        batch_size = len(readings_list)
+                        batch_size = len(readings_buffer)
                         cls._discarded_readings_stats += batch_size
                         _LOGGER.warning('Insert failed: Queue index: %s Batch size: %s', list_index, batch_size)
                         break
 
             await cls._write_statistics()
 
-            del readings_list[:batch_size]
+            cls._readings_count -= readings_buffer.discard(batch_size)
+            if cls._readings_count < cls._readings_low_water:
+                cls._readings_low_water = cls._readings_count
 
             if not lists_not_full.is_set():
                 lists_not_full.set()
@@ -402,59 +485,99 @@ class Ingest(object):
 
     @classmethod
     async def _write_statistics(cls):
-        """Periodically commits collected readings statistics"""
-
-        updates = {}
-
-        readings = cls._readings_stats
-        cls._readings_stats -= readings
-        updates.update({'READINGS': readings})
+        """Hands the collected readings statistics to the accumulator that periodically commits them"""
+        accumulator = cls._statistics_accumulator
 
-        discarded_readings = cls._discarded_readings_stats
-        cls._discarded_readings_stats -= discarded_readings
-        updates.update({'DISCARDED': discarded_readings})
+        accumulator.increment('READINGS', cls._readings_stats)
+        cls._readings_stats = 0
 
-        """ Register the statistics keys as this may be the first time the key has come into existence """
-        sensor_readings = cls._sensor_stats.copy()
-        for key in sensor_readings:
-            description = 'Readings received by FogLAMP since startup for sensor {}'.format(key)
-            await cls.stats.register(key, description)
-            cls._sensor_stats[key] -= sensor_readings[key]
-            updates.update({key: sensor_readings[key]})
+        accumulator.increment('DISCARDED', cls._discarded_readings_stats)
+        cls._discarded_readings_stats = 0
 
-        try:
-            await cls.stats.update_bulk(updates)
-        except Exception as ex:
-            cls._readings_stats += readings
-            cls._discarded_readings_stats += discarded_readings
-            for key in sensor_readings:
-                cls._sensor_stats[key] += sensor_readings[key]
-            _LOGGER.exception('An error occurred while writing sensor statistics, Error: %s', str(ex))
+        # The sensor keys are registered by the accumulator the first time they come into existence
+        sensor_readings, cls._sensor_stats = cls._sensor_stats, {}
+        for key, count in sensor_readings.items():
+            accumulator.increment(key, count, 'Readings received by FogLAMP since startup for sensor {}'.format(key))
 
     @classmethod
     def is_available(cls) -> bool:
-        """Indicates whether all lists are currently full
+        """Indicates whether all readings buffers are currently full
 
         Returns:
-            False - All of the lists are full
+            False - All of the buffers are full
             True - Otherwise
         """
         if cls._stop:
             return False
 
         list_index = cls._current_readings_list_index
-        if len(cls._readings_lists[list_index]) < cls._readings_list_size:
+        if not cls._readings_buffers[list_index].is_full():
             return True
 
-        if cls._max_concurrent_readings_inserts > 1:
+        # Only look for another buffer when the total occupancy shows that one has room
+        if cls._max_concurrent_readings_inserts > 1 and \
+                cls._readings_count < cls._readings_list_size * cls._max_concurrent_readings_inserts:
             for list_index in range(cls._max_concurrent_readings_inserts):
-                if len(cls._readings_lists[list_index]) < cls._readings_list_size:
+                if not cls._readings_buffers[list_index].is_full():
                     cls._current_readings_list_index = list_index
                     return True
 
         _LOGGER.warning('The ingest service is unavailable %s', list_index)
         return False
 
+    @classmethod
+    async def _wait_until_available(cls) -> bool:
+        """Waits for room in the readings buffers for up to _readings_buffer_full_wait_seconds
+
+        Returns:
+            True - A readings buffer has room
+            False - The wait timed out or the server is stopping
+        """
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + cls._readings_buffer_full_wait_seconds
+        lists_not_full = cls._readings_lists_not_full
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            # Set by _insert_readings every time a batch is removed from a buffer
+            lists_not_full.clear()
+            try:
+                await asyncio.wait_for(lists_not_full.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+            if cls.is_available():
+                return True
+            if cls._stop:
+                return False
+
+    @classmethod
+    def buffer_occupancy(cls, reset: bool = False) -> dict:
+        """Returns the occupancy of the readings buffers
+
+        Plugins can use it to throttle their polling, for instance slowing down while the high water
+        mark is close to the capacity.
+
+        Args:
+            reset: Restart the high water and low water marks from the current number of readings
+
+        Returns:
+            readings - Number of readings in the buffers
+            capacity - Maximum number of readings the buffers can hold
+            high_water - Highest number of readings held since the last reset
+            low_water - Lowest number of readings held since the last reset
+        """
+        occupancy = {
+            'readings': cls._readings_count,
+            'capacity': cls._readings_list_size * cls._max_concurrent_readings_inserts,
+            'high_water': cls._readings_high_water,
+            'low_water': cls._readings_low_water
+        }
+        if reset:
+            cls._readings_high_water = cls._readings_count
+            cls._readings_low_water = cls._readings_count
+        return occupancy
+
     @classmethod
     async def add_readings(cls, asset: str, timestamp: Union[str, datetime.datetime],
                            key: Union[str, uuid.UUID] = None, readings: dict = None) -> None:
@@ -468,6 +591,10 @@ class Ingest(object):
                 key, the readings are only written to storage once
             readings: A dictionary of sensor readings
 
+        When all the readings buffers are full the reading is discarded, unless the buffer full policy
+        of the service is 'wait': the reading is then added as soon as there is room, or discarded
+        after the buffer full wait time.
+
         Raises:
             If this method raises an Exception, the discarded readings counter is
             also incremented.
@@ -487,33 +614,7 @@ class Ingest(object):
             # cls._logger = logger.setup(__name__, destination=logger.CONSOLE, level=logging.DEBUG)
 
         try:
-            if asset is None:
-                raise ValueError('asset can not be None')
-
-            if not isinstance(asset, str):
-                raise TypeError('asset must be a string')
-
-            if timestamp is None:
-                raise ValueError('timestamp can not be None')
-
-            # if not isinstance(timestamp, datetime.datetime):
-            #     # validate
-            #     timestamp = dateutil.parser.parse(timestamp)
-
-            if key is not None and not isinstance(key, uuid.UUID):
-                # Validate
-                if not isinstance(key, str):
-                    raise TypeError('key must be a uuid.UUID or a string')
-                # If key is not a string, uuid.UUID throws an Exception that appears to
-                # be a TypeError but can not be caught as a TypeError
-                key = uuid.UUID(key)
-
-            if readings is None:
-                readings = dict()
-            elif not isinstance(readings, dict):
-                # Postgres allows values like 5 be converted to JSON
-                # Downstream processors can not handle this
-                raise TypeError('readings must be a dictionary')
+            key, readings = cls._validate_reading(asset, timestamp, key, readings)
         except Exception:
             cls.increment_discarded_readings()
             raise
@@ -521,22 +622,13 @@ class Ingest(object):
         # Comment out to test IntegrityError
         # key = '123e4567-e89b-12d3-a456-426655440000'
 
-        # If an empty slot is not available, discard the reading
+        # If an empty slot is not available, discard the reading unless the policy is to wait for one
         if not cls.is_available():
-            cls.increment_discarded_readings()
-            return
-
-        list_index = cls._current_readings_list_index
-        readings_list = cls._readings_lists[list_index]
+            if cls._readings_buffer_full_policy != 'wait' or not await cls._wait_until_available():
+                cls.increment_discarded_readings()
+                return
 
-        read = dict()
-        read['asset_code'] = asset
-        read['read_key'] = str(key)
-        read['reading'] = readings
-        read['user_ts'] = timestamp
-        readings_list.append(read)
-
-        list_size = len(readings_list)
+        cls._append_reading(Reading(asset, str(key), readings, timestamp))
 
         # Increment the count of received readings to be used for statistics update
         if asset.upper() in cls._sensor_stats:
@@ -545,11 +637,143 @@ class Ingest(object):
             cls._sensor_stats[asset.upper()] = 1
 
         # asset tracker checking
-        payload = {"asset": asset, "event": "Ingest", "service": cls._parent_service._name,
-                   "plugin": cls._parent_service._plugin_info['config']['plugin']['default']}
-        if payload not in cls._payload_events:
-            cls._parent_service._core_microservice_management_client.create_asset_tracker_event(payload)
-            cls._payload_events.append(payload)
+        cls._asset_tracker_events.add(asset, "Ingest", cls._parent_service._name,
+                                      cls._parent_service._plugin_info['config']['plugin']['default'])
+
+    @classmethod
+    async def add_readings_batch(cls, readings: List[dict]) -> int:
+        """Adds a batch of asset readings records to FogLAMP in one pass
+
+        The statistics and the asset tracker are updated once per asset of the batch rather than
+        once per reading.
+
+        Args:
+            readings:
+                A list of readings records as returned by plugin_poll, each one a dictionary with the
+                asset, timestamp, key and readings of :meth:`add_readings`, key and readings being
+                optional. Readings of one or more assets can be mixed.
+
+        Invalid readings records are counted as discarded and skipped, the others are still added.
+        As for :meth:`add_readings` the buffer full policy of the service applies when all the
+        readings buffers are full; once a reading is discarded the rest of the batch is discarded too.
+
+        Returns:
+            The number of readings added
+
+        Raises:
+            RuntimeError:
+                The server has not been started
+
+            TypeError:
+                readings is not a list
+        """
+        if cls._stop:
+            _LOGGER.warning('The South Service is stopping')
+            return 0
+
+        if not cls._started:
+            raise RuntimeError('The South Service was not started')
+
+        if not isinstance(readings, list):
+            raise TypeError('readings must be a list')
+
+        asset_counts = {}
+        invalid = 0
+        for index, record in enumerate(readings):
+            try:
+                asset = record['asset']
+                key, values = cls._validate_reading(asset, record['timestamp'], record.get('key'),
+                                                    record.get('readings'))
+            except Exception as ex:
+                invalid += 1
+                cls.increment_discarded_readings()
+                if invalid == 1:
+                    _LOGGER.warning('Invalid readings record discarded: %s', str(ex))
+                continue
+
+            if not cls.is_available():
+                if cls._readings_buffer_full_policy != 'wait' or not await cls._wait_until_available():
+                    # The buffers are not going to have room for the rest of the batch either
+                    cls._discarded_readings_stats += len(readings) - index
+                    break
+
+            cls._append_reading(Reading(asset, str(key), values, record['timestamp']))
+
+            if asset in asset_counts:
+                asset_counts[asset] += 1
+            else:
+                asset_counts[asset] = 1
+
+        if invalid > 1:
+            _LOGGER.warning('%s invalid readings records discarded from a batch of %s', invalid, len(readings))
+
+        service_name = cls._parent_service._name
+        plugin_name = cls._parent_service._plugin_info['config']['plugin']['default']
+        for asset, count in asset_counts.items():
+            # Increment the count of received readings to be used for statistics update
+            sensor = asset.upper()
+            if sensor in cls._sensor_stats:
+                cls._sensor_stats[sensor] += count
+            else:
+                cls._sensor_stats[sensor] = count
+
+            cls._asset_tracker_events.add(asset, "Ingest", service_name, plugin_name)
+
+        return sum(asset_counts.values())
+
+    @staticmethod
+    def _validate_reading(asset, timestamp, key, readings):
+        """Validates the fields of a readings record
+
+        Returns:
+            The key as a uuid.UUID, or None, and the readings dictionary
+
+        Raises:
+            ValueError, TypeError:
+                An invalid value was provided
+        """
+        if asset is None:
+            raise ValueError('asset can not be None')
+
+        if not isinstance(asset, str):
+            raise TypeError('asset must be a string')
+
+        if timestamp is None:
+            raise ValueError('timestamp can not be None')
+
+        # if not isinstance(timestamp, datetime.datetime):
+        #     # validate
+        #     timestamp = dateutil.parser.parse(timestamp)
+
+        if key is not None and not isinstance(key, uuid.UUID):
+            # Validate
+            if not isinstance(key, str):
+                raise TypeError('key must be a uuid.UUID or a string')
+            # If key is not a string, uuid.UUID throws an Exception that appears to
+            # be a TypeError but can not be caught as a TypeError
+            key = uuid.UUID(key)
+
+        if readings is None:
+            readings = dict()
+        elif not isinstance(readings, dict):
+            # Postgres allows values like 5 be converted to JSON
+            # Downstream processors can not handle this
+            raise TypeError('readings must be a dictionary')
+
+        return key, readings
+
+    @classmethod
+    def _append_reading(cls, reading):
+        """Appends a reading to the current readings buffer, :meth:`is_available` must have returned True"""
+        list_index = cls._current_readings_list_index
+        readings_buffer = cls._readings_buffers[list_index]
+
+        readings_buffer.append(reading)
+        cls._readings_count += 1
+        if cls._readings_count > cls._readings_high_water:
+            cls._readings_high_water = cls._readings_count
+
+        list_size = len(readings_buffer)
 
         # _LOGGER.debug('Add readings list index: %s size: %s', cls._current_readings_list_index, list_size)
 
@@ -558,15 +782,15 @@ class Ingest(object):
 
         if list_size == cls._readings_insert_batch_size:
             cls._readings_list_batch_size_reached[list_index].set()
-            # _LOGGER.debug('Set event list index: %s size: %s', cls._current_readings_list_index, len(readings_list))
+            # _LOGGER.debug('Set event list index: %s size: %s', cls._current_readings_list_index, len(readings_buffer))
 
         # When the current list is full, move on to the next list
         if cls._max_concurrent_readings_inserts > 1 and (
                     list_size >= cls._readings_insert_batch_size):
             # Start at the beginning to reduce the number of connections
             for list_index in range(cls._max_concurrent_readings_inserts):
-                if len(cls._readings_lists[list_index]) < cls._readings_insert_batch_size:
+                if len(cls._readings_buffers[list_index]) < cls._readings_insert_batch_size:
                     cls._current_readings_list_index = list_index
                     # _LOGGER.debug('Change Ingest Queue: from #%s (len %s) to #%s', cls._current_readings_list_index,
-                    #               len(cls._readings_lists[list_index]), list_index)
+                    #               len(cls._readings_buffers[list_index]), list_index)
                     break
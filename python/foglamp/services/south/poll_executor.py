@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+"""Runs the plugin_poll calls of a south plugin, on the event loop or in threads, and measures their latency"""
+
+import asyncio
+import bisect
+import concurrent.futures
+
+from foglamp.common import logger
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_LOGGER = logger.setup(__name__)
+
+
+class PollLatencyHistogram(object):
+    """Number of polls by duration, in buckets of milliseconds"""
+
+    BUCKETS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+    """Upper bounds of the buckets in milliseconds, the last bucket has no upper bound"""
+
+    def __init__(self):
+        self._counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, milliseconds):
+        self._counts[bisect.bisect_left(self.BUCKETS, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+        if milliseconds > self.max:
+            self.max = milliseconds
+
+    def to_dict(self):
+        buckets = {'<={}'.format(bound): count for bound, count in zip(self.BUCKETS, self._counts)}
+        buckets['>{}'.format(self.BUCKETS[-1])] = self._counts[-1]
+        return {'count': self.count,
+                'mean': round(self.total / self.count, 3) if self.count else 0,
+                'max': round(self.max, 3),
+                'buckets': buckets}
+
+
+class PollExecutor(object):
+    """Runs the plugin_poll calls of a south plugin
+
+    In 'inline' mode plugin_poll is called on the event loop, as plugins have always been polled. In 'thread' mode
+    it is called in a pool of max_concurrent_polls threads, a slow device does not hold up the event loop that
+    inserts the readings and answers the core. With a single thread all the polls are made from the same thread.
+    """
+
+    MODES = ('inline', 'thread')
+
+    _STOP_TIMEOUT = 5
+    """Seconds to wait for the polls running when stopped"""
+
+    def __init__(self, mode='inline', max_concurrent_polls=1, loop=None):
+        """
+        Args:
+            mode: 'inline' or 'thread'
+            max_concurrent_polls: maximum number of plugin_poll calls running at the same time, always 1 inline
+        """
+        if mode not in self.MODES:
+            raise ValueError('Poll mode must be one of {}, not {}'.format(', '.join(self.MODES), mode))
+        self._loop = asyncio.get_event_loop() if loop is None else loop
+        self.mode = mode
+        self.max_concurrent_polls = max(1, int(max_concurrent_polls)) if mode == 'thread' else 1
+        self._executor = concurrent.futures.ThreadPoolExecutor(self.max_concurrent_polls) \
+            if mode == 'thread' else None
+        self._running = set()
+        self._stopping = False
+        self.latency = PollLatencyHistogram()
+
+    @property
+    def running(self):
+        """Number of plugin_poll calls not returned yet, including those waiting for a thread"""
+        return len(self._running)
+
+    async def poll(self, plugin, handle):
+        """Calls plugin.plugin_poll(handle) and returns its readings, None without polling once stopped"""
+        if self._stopping:
+            return None
+        start = self._loop.time()
+        try:
+            if self._executor is None:
+                return plugin.plugin_poll(handle)
+            future = self._loop.run_in_executor(self._executor, plugin.plugin_poll, handle)
+            self._running.add(future)
+            future.add_done_callback(self._running.discard)
+            # A thread cannot be interrupted, when the poll is cancelled stop still waits for plugin_poll to return
+            return await asyncio.shield(future)
+        finally:
+            self.latency.record((self._loop.time() - start) * 1000)
+
+    async def stop(self):
+        """Refuses new polls and waits for the polls running to return, so that the plugin can be shut down"""
+        self._stopping = True
+        if self._running:
+            done, pending = await asyncio.wait(self._running, timeout=self._STOP_TIMEOUT)
+            if pending:
+                _LOGGER.warning('%s plugin_poll calls still running after %s seconds', len(pending),
+                                self._STOP_TIMEOUT)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
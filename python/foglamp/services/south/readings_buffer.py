@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+"""Fixed size in memory buffer of readings used by the South Service Ingest"""
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+class Reading(object):
+    """A single asset reading as accepted by :meth:`Ingest.add_readings`"""
+
+    __slots__ = ('asset_code', 'read_key', 'reading', 'user_ts')
+
+    def __init__(self, asset_code, read_key, reading, user_ts):
+        self.asset_code = asset_code
+        self.read_key = read_key
+        self.reading = reading
+        self.user_ts = user_ts
+
+    def to_dict(self):
+        """Returns the reading in the format expected by the storage readings append"""
+        return {'asset_code': self.asset_code, 'read_key': self.read_key, 'reading': self.reading,
+                'user_ts': self.user_ts}
+
+    def __repr__(self):
+        return 'Reading({!r}, {!r}, {!r}, {!r})'.format(self.asset_code, self.read_key, self.reading, self.user_ts)
+
+
+class ReadingsRingBuffer(object):
+    """Preallocated FIFO ring of readings
+
+    Readings are appended at the tail and removed in batches from the head, both without shifting the
+    other items, so the cost does not depend on the number of buffered readings.
+    """
+
+    __slots__ = ('_items', '_capacity', '_head', '_count')
+
+    def __init__(self, capacity):
+        if capacity <= 0:
+            raise ValueError('capacity must be greater than 0')
+        self._items = [None] * capacity
+        self._capacity = capacity
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    def is_full(self):
+        return self._count >= self._capacity
+
+    def free(self):
+        """Number of readings that can be appended before the buffer is full"""
+        return self._capacity - self._count
+
+    def append(self, reading):
+        """Adds a reading at the tail
+
+        Raises:
+            OverflowError: the buffer is full
+        """
+        if self._count >= self._capacity:
+            raise OverflowError('readings buffer is full')
+        tail = self._head + self._count
+        if tail >= self._capacity:
+            tail -= self._capacity
+        self._items[tail] = reading
+        self._count += 1
+
+    def peek(self, count):
+        """Returns up to count readings from the head, oldest first, without removing them"""
+        count = min(count, self._count)
+        end = self._head + count
+        if end <= self._capacity:
+            return self._items[self._head:end]
+        return self._items[self._head:] + self._items[:end - self._capacity]
+
+    def discard(self, count):
+        """Removes up to count readings from the head
+
+        Returns:
+            The number of readings removed
+        """
+        count = min(count, self._count)
+        end = self._head + count
+        # Release the references so that the readings can be garbage collected
+        if end <= self._capacity:
+            self._items[self._head:end] = [None] * count
+        else:
+            self._items[self._head:] = [None] * (self._capacity - self._head)
+            self._items[:end - self._capacity] = [None] * (end - self._capacity)
+        self._head = end if end < self._capacity else end - self._capacity
+        self._count -= count
+        if self._count == 0:
+            self._head = 0
+        return count
+
+    def clear(self):
+        self.discard(self._count)
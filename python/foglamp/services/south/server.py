@@ -8,9 +8,11 @@
 
 import json
 import asyncio
+import time
 from foglamp.services.south import exceptions
 from foglamp.common import logger
 from foglamp.services.south.ingest import Ingest
+from foglamp.services.south.poll_executor import PollExecutor
 from foglamp.services.common.microservice import FoglampMicroservice
 from aiohttp import web
 
@@ -58,6 +60,9 @@ class Server(FoglampMicroservice):
 
     _task_main = None
 
+    _poll_executor = None  # type: PollExecutor
+    """Runs the plugin_poll calls of a poll plugin"""
+
     config = None
 
     _event_loop = None
@@ -144,6 +149,7 @@ class Server(FoglampMicroservice):
             if self._plugin_info['mode'] == 'async':
                 self._task_main = asyncio.ensure_future(self._exec_plugin_async())
             elif self._plugin_info['mode'] == 'poll':
+                self._poll_executor = self._create_poll_executor()
                 self._task_main = asyncio.ensure_future(self._exec_plugin_poll())
         except asyncio.CancelledError:
             pass
@@ -155,6 +161,38 @@ class Server(FoglampMicroservice):
             _LOGGER.exception(error)
             asyncio.ensure_future(self._stop(loop))
 
+    def _create_poll_executor(self):
+        """Creates the poll executor as configured in the advanced configuration category of the service"""
+        category = "{}Advanced".format(self._name)
+        default_config = {
+            "poll_mode": {
+                "description": "Call the plugin poll on the event loop of the service (inline) or in a thread, "
+                               "so that a slow device does not hold up the readings and the service",
+                "displayName": "Poll Mode",
+                "type": "enumeration",
+                "options": list(PollExecutor.MODES),
+                "default": "inline"
+            },
+            "max_concurrent_polls": {
+                "description": "Maximum number of polls running at the same time in thread mode, with more than "
+                               "one a poll starts every poll interval even if the previous one has not returned",
+                "displayName": "Max Concurrent Polls",
+                "type": "integer",
+                "default": "1"
+            },
+        }
+        config_payload = json.dumps({
+            "key": category,
+            "description": '{} South Service Ingest configuration'.format(self._name),
+            "value": default_config,
+            "keep_original_items": True
+        })
+        self._core_microservice_management_client.create_configuration_category(config_payload)
+        config = self._core_microservice_management_client.get_configuration_category(category_name=category)
+
+        return PollExecutor(config['poll_mode']['value'], int(config['max_concurrent_polls']['value']),
+                            loop=self._event_loop)
+
     async def _exec_plugin_async(self) -> None:
         """Executes async type plugin
         """
@@ -163,6 +201,10 @@ class Server(FoglampMicroservice):
 
     async def _exec_plugin_poll(self) -> None:
         """Executes poll type plugin
+
+        A poll is started every pollInterval. When the poll executor runs concurrent polls a slow poll does not delay
+        the next ones until max_concurrent_polls are running, then the next poll starts as soon as one returns.
+        The polls that could not start on time are skipped rather than run in a burst.
         """
         _LOGGER.info('Started South Plugin: {}'.format(self._name))
         try_count = 1
@@ -173,44 +215,54 @@ class Server(FoglampMicroservice):
             _LOGGER.warning('Plugin {} pollInterval must be greater than 0, defaulting to {} ms'.format(
                 self._name, self._plugin_handle['pollInterval']['value']))
         sleep_seconds = int(self._plugin_handle['pollInterval']['value']) / 1000.0
-        _TIME_TO_WAIT_BEFORE_RETRY = sleep_seconds
 
-        while self._plugin and try_count <= _MAX_RETRY_POLL:
-            try:
-                t1 = self._event_loop.time()
-                data = self._plugin.plugin_poll(self._plugin_handle)
-                if len(data) > 0:
-                    if isinstance(data, list):
-                        for reading in data:
-                            asyncio.ensure_future(Ingest.add_readings(asset=reading['asset'],
-                                                                        timestamp=reading['timestamp'],
-                                                                        key=reading['key'],
-                                                                        readings=reading['readings']))
-                    elif isinstance(data, dict):
-                        asyncio.ensure_future(Ingest.add_readings(asset=data['asset'],
-                                                                  timestamp=data['timestamp'],
-                                                                  key=data['key'],
-                                                                  readings=data['readings']))
-                delta = self._event_loop.time() - t1
-                # If delta somehow becomes > sleep_seconds, then ignore delta
-                sleep_for = sleep_seconds - delta if delta < sleep_seconds else sleep_seconds
-                await asyncio.sleep(sleep_for)
-            except asyncio.CancelledError:
-                pass
-            except KeyError as ex:
-                try_count = 2
-                _LOGGER.exception('Key error plugin {} : {}'.format(self._name, str(ex)))
-            except exceptions.QuietError:
-                try_count = 2
-                await asyncio.sleep(_TIME_TO_WAIT_BEFORE_RETRY)
-            except (Exception, RuntimeError, exceptions.DataRetrievalError) as ex:
-                try_count = 2
-                _LOGGER.error('Failed to poll for plugin {}'.format(self._name))
-                _LOGGER.debug('Exception poll plugin {}'.format(str(ex)))
-                await asyncio.sleep(_TIME_TO_WAIT_BEFORE_RETRY)
+        polls = set()
+        next_poll = self._event_loop.time()
+        try:
+            while self._plugin and try_count <= _MAX_RETRY_POLL:
+                try:
+                    # The errors of the polls that have returned are raised here
+                    for poll in [poll for poll in polls if poll.done()]:
+                        polls.discard(poll)
+                        poll.result()
+                    if len(polls) >= self._poll_executor.max_concurrent_polls:
+                        await asyncio.wait(polls, return_when=asyncio.FIRST_COMPLETED)
+                        continue
+                    polls.add(asyncio.ensure_future(self._poll()))
+                    now = self._event_loop.time()
+                    next_poll = max(next_poll + sleep_seconds, now)
+                    # Also the wait before polling again after an error
+                    await asyncio.sleep(next_poll - now)
+                except asyncio.CancelledError:
+                    break
+                except KeyError as ex:
+                    try_count = 2
+                    _LOGGER.exception('Key error plugin {} : {}'.format(self._name, str(ex)))
+                except exceptions.QuietError:
+                    try_count = 2
+                except (Exception, RuntimeError, exceptions.DataRetrievalError) as ex:
+                    try_count = 2
+                    _LOGGER.error('Failed to poll for plugin {}'.format(self._name))
+                    _LOGGER.debug('Exception poll plugin {}'.format(str(ex)))
+        finally:
+            for poll in polls:
+                poll.cancel()
 
         _LOGGER.warning('Stopped all polling tasks for plugin: {}'.format(self._name))
 
+    async def _poll(self):
+        """Polls the plugin once and adds its readings
+
+        The readings are added to the ingest buffers in one pass, in the order of the poll. The pass does not yield to
+        the event loop unless the buffers are full and the service waits for room. Invalid readings are discarded and
+        reported once for the whole poll.
+        """
+        data = await self._poll_executor.poll(self._plugin, self._plugin_handle)
+        if isinstance(data, dict):
+            data = [data]
+        if data:
+            await Ingest.add_readings_batch(data)
+
     def run(self):
         """Starts the South Microservice
         """
@@ -220,6 +272,16 @@ class Server(FoglampMicroservice):
         loop.run_forever()
 
     async def _stop(self, loop):
+        # The plugin is not shut down in the middle of a poll: no poll starts once the main task has stopped
+        # and the executor refuses the polls not started yet, then the polls running return
+        if self._task_main is not None:
+            self._task_main.cancel()
+            await asyncio.wait([self._task_main])
+        if self._poll_executor is not None:
+            await self._poll_executor.stop()
+            _LOGGER.info('Poll latency of plugin {} in milliseconds: {}'.format(
+                self._name, json.dumps(self._poll_executor.latency.to_dict())))
+
         if self._plugin is not None:
             try:
                 self._plugin.plugin_shutdown(self._plugin_handle)
@@ -241,7 +303,6 @@ class Server(FoglampMicroservice):
             raise ex
 
         try:
-            self._task_main.cancel()
             # Cancel all pending asyncio tasks after a timeout occurs
             done, pending = await asyncio.wait(asyncio.Task.all_tasks(), timeout=_CLEAR_PENDING_TASKS_TIMEOUT)
             for task_pending in pending:
@@ -258,6 +319,14 @@ class Server(FoglampMicroservice):
         _LOGGER.info('Stopping South service event loop, for plugin {}.'.format(self._name))
         loop.stop()
 
+    async def ping(self, request):
+        """Health check, with the latency of the polls of a poll plugin in milliseconds
+        """
+        response = {'uptime': time.time() - self._start_time}
+        if self._poll_executor is not None:
+            response['pollLatency'] = self._poll_executor.latency.to_dict()
+        return web.json_response(response)
+
     async def shutdown(self, request):
         """implementation of abstract method form foglamp.common.microservice.
         """
@@ -289,6 +358,16 @@ class Server(FoglampMicroservice):
         """
         _LOGGER.info('Configuration has changed for South plugin {}'.format(self._name))
 
+        try:
+            notification = await request.json()
+        except ValueError:
+            notification = {}
+        if not isinstance(notification, dict):
+            notification = {}
+        # The notification carries the new items, the cached category is updated without reading it again
+        self._core_microservice_management_client.category_changed(self._name, notification.get('items'),
+                                                                   notification.get('version'))
+
         try:
             # retrieve new configuration
             new_config = self._core_microservice_management_client.get_configuration_category(category_name=self._name)
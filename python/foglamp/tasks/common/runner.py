@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+"""Warm task runner
+
+A process started by the scheduler that imports the Python tasks once and then forks a child to run each task
+assigned to it, so that a task does not pay for the interpreter startup and the imports every time it runs.
+
+Usage:
+    python3 -m foglamp.tasks.common.runner --fd <socket file descriptor> [module ...]
+
+The modules are the ones a task is started with, as in ``python3 -m <module>``, they are imported before the
+first fork. The scheduler and the runner exchange one JSON object per line over the socket:
+
+    scheduler -> runner     {"id": 1, "module": "foglamp.tasks.purge", "args": ["--port=...", ...]}
+    runner -> scheduler     {"id": 1, "pid": 1234}
+    runner -> scheduler     {"id": 1, "exit_code": 0}
+
+The exit code is negative when the task is terminated by a signal, as for asyncio subprocesses.
+The runner exits when the socket is closed, tasks that are running are not stopped.
+"""
+
+import argparse
+import asyncio
+import gc
+import importlib
+import json
+import os
+import pkgutil
+import runpy
+import selectors
+import signal
+import socket
+import sys
+import traceback
+
+from foglamp.common import logger
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_logger = logger.setup(__name__)
+
+_REAP_INTERVAL = 1
+"""Seconds between checks for terminated tasks when no SIGCHLD is received"""
+
+
+def preload(modules):
+    """Imports the modules and, for a package, the modules in it other than __main__"""
+    for module_name in modules:
+        try:
+            module = importlib.import_module(module_name)
+            if hasattr(module, '__path__'):
+                for _, name, _ in pkgutil.iter_modules(module.__path__):
+                    if name != '__main__':
+                        importlib.import_module('{}.{}'.format(module_name, name))
+        except Exception:
+            # The task imports the module again when it runs and reports the error
+            _logger.exception('Unable to import task module %s', module_name)
+
+
+def run_task(module, args):
+    """Runs the module as ``python3 -m module args``, in the forked child, it never returns"""
+    exit_code = 0
+    try:
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.set_wakeup_fd(-1)
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        sys.argv = [module] + args
+        imported = sys.modules.get(module)
+        if imported is not None and not hasattr(imported, '__path__'):
+            # Run as __main__ like python3 -m does, its imports stay loaded
+            del sys.modules[module]
+        runpy.run_module(module, run_name='__main__', alter_sys=True)
+    except SystemExit as ex:
+        if ex.code is None:
+            exit_code = 0
+        elif isinstance(ex.code, int):
+            exit_code = ex.code
+        else:
+            print(ex.code, file=sys.stderr)
+            exit_code = 1
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        # os._exit skips the atexit handlers
+        logger.flush()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(exit_code)
+
+
+class TaskRunner(object):
+    """Forks a child for every task received on the socket and reports its pid and exit code"""
+
+    def __init__(self, sock):
+        self._sock = sock
+        self._children = {}
+        """Task id by pid of the running children"""
+        self._selector = None
+        self._wakeup_r = None
+        self._wakeup_w = None
+
+    def _send(self, message):
+        self._sock.sendall((json.dumps(message) + '\n').encode())
+
+    def _start(self, message):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                self._selector.close()
+                self._sock.close()
+                os.close(self._wakeup_r)
+                os.close(self._wakeup_w)
+            finally:
+                run_task(message['module'], message['args'])
+        self._children[pid] = message['id']
+        self._send({'id': message['id'], 'pid': pid})
+
+    def _reap(self):
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            task_id = self._children.pop(pid, None)
+            if task_id is None:
+                continue
+            exit_code = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+            self._send({'id': task_id, 'exit_code': exit_code})
+
+    def run(self):
+        """Serves the scheduler until it closes the socket"""
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_r, False)
+        os.set_blocking(self._wakeup_w, False)
+        signal.set_wakeup_fd(self._wakeup_w)
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._sock, selectors.EVENT_READ)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ)
+        if hasattr(gc, 'freeze'):
+            # The objects imported stay shared with the children
+            gc.freeze()
+
+        buffer = b''
+        while True:
+            for key, _ in self._selector.select(_REAP_INTERVAL):
+                if key.fileobj == self._wakeup_r:
+                    try:
+                        os.read(self._wakeup_r, 512)
+                    except BlockingIOError:
+                        pass
+                    continue
+                data = self._sock.recv(65536)
+                if not data:
+                    return
+                buffer += data
+                while b'\n' in buffer:
+                    line, buffer = buffer.split(b'\n', 1)
+                    self._start(json.loads(line.decode()))
+            self._reap()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FogLAMP warm task runner')
+    parser.add_argument('--fd', type=int, required=True, help='file descriptor of the socket to the scheduler')
+    parser.add_argument('modules', nargs='*', help='modules of the tasks to import')
+    arguments = parser.parse_args()
+
+    preload(arguments.modules)
+    sock = socket.fromfd(arguments.fd, socket.AF_UNIX, socket.SOCK_STREAM)
+    os.close(arguments.fd)
+    try:
+        TaskRunner(sock).run()
+    finally:
+        sock.close()
+
+
+if __name__ == '__main__':
+    main()
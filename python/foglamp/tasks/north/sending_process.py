@@ -17,6 +17,7 @@
 
 import importlib
 import aiohttp
+import collections
 import resource
 import asyncio
 import sys
@@ -34,6 +35,7 @@ from foglamp.common.storage_client import payload_builder
 from foglamp.common import statistics
 from foglamp.common.jqfilter import JQFilter
 from foglamp.common.audit_logger import AuditLogger
+from foglamp.common.asset_tracker_events import AssetTrackerEvents
 from foglamp.common.process import FoglampProcess
 from foglamp.common import logger
 
@@ -242,6 +244,13 @@ class SendingProcess(FoglampProcess):
             "type": "integer",
             "default": "10",
             "order": "12"
+        },
+        "max_concurrent_sends": {
+            "description": "Maximum number of blocks of the in memory buffer sent concurrently, "
+                           "the plugin must support concurrent sends when greater than 1",
+            "type": "integer",
+            "default": "1",
+            "order": "13"
         }
     }
 
@@ -256,6 +265,7 @@ class SendingProcess(FoglampProcess):
             'blockSize': int(self._CONFIG_DEFAULT['blockSize']['default']),
             'sleepInterval': float(self._CONFIG_DEFAULT['sleepInterval']['default']),
             'memory_buffer_size': int(self._CONFIG_DEFAULT['memory_buffer_size']['default']),
+            'max_concurrent_sends': int(self._CONFIG_DEFAULT['max_concurrent_sends']['default']),
         }
         self._config_from_manager = ""
         self._module_template = self._NORTH_PATH + "empty." + "empty"
@@ -288,6 +298,8 @@ class SendingProcess(FoglampProcess):
         """" Semaphores used for the synchronization of the fetch/send operations """
         self._memory_buffer = [None]
         """" In memory buffer where the data is loaded from the storage layer before to send it to the plugin """
+        self._jqfilter = JQFilter()
+        """" Applies the filterRule to the blocks loaded, the compiled rule is cached """
         self._memory_buffer_fetch_idx = 0
         self._memory_buffer_send_idx = 0
         """" Used to to managed the in memory buffer for the fetch/send operations """
@@ -337,74 +349,112 @@ class SendingProcess(FoglampProcess):
         await self._update_statistics(tot_num_sent)
         await self._audit.information(self._AUDIT_CODE, {"sentRows": tot_num_sent})
 
+    async def _send_block(self, idx):
+        """ Sends a block of the in memory buffer to the destination using the loaded plugin"""
+        return await self._plugin.plugin_send(self._plugin_handle, self._memory_buffer[idx], self._stream_id)
+
     async def _task_send_data(self):
-        """ Sends the data from the in memory structure to the destination using the loaded plugin"""
-        data_sent = False
+        """ Sends the data from the in memory structure to the destination using the loaded plugin
+
+        Up to 'max_concurrent_sends' blocks are sent at the same time. The position reached is advanced only over
+        the contiguous blocks already acknowledged, a block sent before a previous one that has failed is not
+        considered sent until the previous one is, so that no data is skipped.
+        """
         db_update = False
         update_last_object_id = 0
         tot_num_sent = 0
         update_position_idx = 0
+        # Blocks being sent, oldest first, as [index in the memory buffer, task]
+        in_flight = collections.deque()
 
         try:
             self._memory_buffer_send_idx = 0
             sleep_time = self.TASK_SEND_SLEEP
             sleep_num_increments = 1
+            buffer_size = self._config['memory_buffer_size']
+            window = max(1, min(self._config['max_concurrent_sends'], buffer_size))
 
-            while self._task_send_data_run:
+            while True:
+                running = self._task_send_data_run
                 slept = False
-                if self._memory_buffer_send_idx < self._config['memory_buffer_size']:
-                    new_last_object_id = None
-                    num_sent = 0
-                    if self._memory_buffer[self._memory_buffer_send_idx] is not None:  # if there are data to send
-                        try:
-                            data_sent, new_last_object_id, num_sent = \
-                                await self._plugin.plugin_send(self._plugin_handle,
-                                                               self._memory_buffer[self._memory_buffer_send_idx], self._stream_id)
-                        except Exception as ex:
-                            _message = _MESSAGES_LIST["e000021"].format(ex)
-                            SendingProcess._logger.error(_message)
-                            await self._audit.failure(self._AUDIT_CODE, {"error - on _task_send_data": _message})
-                            data_sent = False
+
+                # Starts sending the blocks already loaded, as long as there is room in the window
+                while running and len(in_flight) < window and \
+                        self._memory_buffer[self._memory_buffer_send_idx] is not None:
+                    idx = self._memory_buffer_send_idx
+                    in_flight.append([idx, asyncio.ensure_future(self._send_block(idx))])
+                    self._memory_buffer_send_idx = (idx + 1) % buffer_size
+
+                if not in_flight:
+                    if not running:
+                        break
+                    # Updates the position before going to wait for the semaphore
+                    if db_update:
+                        await self._update_position_reached(update_last_object_id, tot_num_sent)
+                        update_position_idx = 0
+                        tot_num_sent = 0
+                        db_update = False
+                    await self._task_fetch_data_sem.acquire()
+                    continue
+
+                # Waits for a block to be sent or, if there is room in the window, for a new block to be loaded
+                waiters = [task for _, task in in_flight if not task.done()]
+                fetch_waiter = None
+                if running and len(in_flight) < window:
+                    fetch_waiter = asyncio.ensure_future(self._task_fetch_data_sem.acquire())
+                    waiters.append(fetch_waiter)
+                if waiters:
+                    await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                if fetch_waiter is not None and not fetch_waiter.done():
+                    fetch_waiter.cancel()
+
+                # Acknowledges the blocks sent, oldest first
+                while in_flight and in_flight[0][1].done():
+                    idx, task = in_flight[0]
+                    try:
+                        data_sent, new_last_object_id, num_sent = task.result()
+                    except Exception as ex:
+                        _message = _MESSAGES_LIST["e000021"].format(ex)
+                        SendingProcess._logger.error(_message)
+                        await self._audit.failure(self._AUDIT_CODE, {"error - on _task_send_data": _message})
+                        data_sent = False
+                        if running:
                             slept = True
                             await asyncio.sleep(sleep_time)
 
-                        if data_sent:
-                            # asset tracker checking
-                            for _reads in self._memory_buffer[self._memory_buffer_send_idx]:
-                                payload = {"asset": _reads['asset_code'], "event": "Egress", "service": self._name,
-                                           "plugin": self._config['plugin']}
-                                if payload not in self._tracked_assets:
-                                    self._core_microservice_management_client.create_asset_tracker_event(
-                                        payload)
-                                    self._tracked_assets.append(payload)
-
-                            db_update = True
-                            update_last_object_id = new_last_object_id
-                            tot_num_sent = tot_num_sent + num_sent
-                            self._memory_buffer[self._memory_buffer_send_idx] = None
-                            self._memory_buffer_send_idx += 1
-                            self._task_send_data_sem.release()
-                            self.performance_track("task _task_send_data")
-                    else:
-                        # Updates the position before going to wait for the semaphore
-                        if db_update:
-                            await self._update_position_reached(update_last_object_id, tot_num_sent)
-                            update_position_idx = 0
-                            tot_num_sent = 0
-                            db_update = False
-                        await self._task_fetch_data_sem.acquire()
-
-                    # Updates the Storage layer every 'self.UPDATE_POSITION_MAX' interactions
-                    if db_update:
-                        if update_position_idx >= self.TASK_SEND_UPDATE_POSITION_MAX:
-                            await self._update_position_reached(update_last_object_id, tot_num_sent)
-                            update_position_idx = 0
-                            tot_num_sent = 0
-                            db_update = False
+                    if not data_sent:
+                        if running and self._task_send_data_run:
+                            # Sends the block again, the following ones wait for it to be acknowledged
+                            in_flight[0][1] = asyncio.ensure_future(self._send_block(idx))
                         else:
-                            update_position_idx += 1
-                else:
-                    self._memory_buffer_send_idx = 0
+                            # Stopping, the blocks not acknowledged are sent again by the next execution
+                            for _, pending_task in in_flight:
+                                pending_task.cancel()
+                            in_flight.clear()
+                        break
+
+                    in_flight.popleft()
+
+                    # asset tracker checking
+                    for _reads in self._memory_buffer[idx]:
+                        self._tracked_assets.add(_reads['asset_code'], "Egress", self._name,
+                                                 self._config['plugin'])
+
+                    db_update = True
+                    update_last_object_id = new_last_object_id
+                    tot_num_sent = tot_num_sent + num_sent
+                    self._memory_buffer[idx] = None
+                    self._task_send_data_sem.release()
+                    self.performance_track("task _task_send_data")
+
+                    # Updates the Storage layer every 'self.UPDATE_POSITION_MAX' blocks
+                    if update_position_idx >= self.TASK_SEND_UPDATE_POSITION_MAX:
+                        await self._update_position_reached(update_last_object_id, tot_num_sent)
+                        update_position_idx = 0
+                        tot_num_sent = 0
+                        db_update = False
+                    else:
+                        update_position_idx += 1
 
                 # Handles the sleep time, it is doubled every time up to a limit
                 if slept:
@@ -418,7 +468,10 @@ class SendingProcess(FoglampProcess):
             if db_update:
                 await self._update_position_reached(update_last_object_id, tot_num_sent)
         except Exception as ex:
-            SendingProcess._logger.error(_MESSAGES_LIST["e000021"].format(ex))
+            _message = _MESSAGES_LIST["e000021"].format(ex)
+            SendingProcess._logger.error(_message)
+            for _, pending_task in in_flight:
+                pending_task.cancel()
             if db_update:
                 await self._update_position_reached(update_last_object_id, tot_num_sent)
             await self._audit.failure(self._AUDIT_CODE, {"error - on _task_send_data": _message})
@@ -582,17 +635,8 @@ class SendingProcess(FoglampProcess):
                         if data_to_send:
                             # Handles the JQFilter functionality
                             if self._config_from_manager['applyFilter']["value"].upper() == "TRUE":
-                                jqfilter = JQFilter()
-                                # Steps needed to proper format the data generated by the JQFilter
-                                # to the one expected by the SP
-                                data_to_send_2 = jqfilter.transform(data_to_send,
-                                                                    self._config_from_manager['filterRule']["value"])
-                                data_to_send_3 = json.dumps(data_to_send_2)
-                                del data_to_send_2
-                                data_to_send_4 = eval(data_to_send_3)
-                                del data_to_send_3
-                                data_to_send = data_to_send_4[0]
-                                del data_to_send_4
+                                data_to_send = self._jqfilter.transform_first(
+                                    data_to_send, self._config_from_manager['filterRule']["value"])
                             # Loads the block of data into the in memory buffer
                             self._memory_buffer[self._memory_buffer_fetch_idx] = data_to_send
                             last_position = len(data_to_send) - 1
@@ -664,6 +708,11 @@ class SendingProcess(FoglampProcess):
         except Exception as ex:
             SendingProcess._logger.error(_MESSAGES_LIST["e000029"].format(ex))
 
+        try:
+            await self._tracked_assets.close()
+        except Exception as ex:
+            SendingProcess._logger.warning("Unable to send the asset tracker events, {}".format(str(ex)))
+
     async def _get_stream_id(self, config_stream_id):
         async def get_rows_from_stream_id(stream_id):
             payload = payload_builder.PayloadBuilder() \
@@ -848,6 +897,7 @@ class SendingProcess(FoglampProcess):
                 self._config['plugin'] = _config_from_manager['plugin']['value']
 
             self._config['memory_buffer_size'] = int(_config_from_manager['memory_buffer_size']['value'])
+            self._config['max_concurrent_sends'] = int(_config_from_manager['max_concurrent_sends']['value'])
             _config_from_manager['_CONFIG_CATEGORY_NAME'] = cat_name
 
             if 'stream_id' in _config_from_manager:
@@ -940,8 +990,12 @@ class SendingProcess(FoglampProcess):
             await self._audit.failure(self._AUDIT_CODE, {"error - on start": _message})
             raise
 
-        # The list of unique reading payload for asset tracker
-        self._tracked_assets = []
+        # Egress events already registered with the core asset tracker
+        self._tracked_assets = AssetTrackerEvents(self._core_management_host, self._core_management_port)
+        try:
+            await self._tracked_assets.load_from_core()
+        except Exception as ex:
+            SendingProcess._logger.warning("Unable to load the asset tracker events, {}".format(str(ex)))
 
         return exec_sending_process
 
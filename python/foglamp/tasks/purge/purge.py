@@ -24,6 +24,7 @@ Statistics reported by Purge process are:
 """
 import time
 
+from foglamp.common.asset_catalog import AssetCatalog
 from foglamp.common.audit_logger import AuditLogger
 from foglamp.common.configuration_manager import ConfigurationManager
 from foglamp.common import statistics
@@ -172,17 +173,26 @@ class Purge(FoglampProcess):
 
         return total_rows_removed, unsent_rows_removed
 
+    async def update_asset_catalog(self):
+        """" Sets the readings count of every asset in the asset catalog to the readings left """
+        try:
+            await AssetCatalog(self._storage_async).reconcile(self._readings_storage_async)
+        except Exception as ex:
+            self._logger.error("Unable to update the asset catalog, %s", str(ex))
+
     async def run(self):
         """" Starts the purge task
 
             1. Write and read Purge task configuration
             2. Purge as per the configuration
-            3. Collect statistics
-            4. Write statistics to statistics table
+            3. Update the readings counts of the asset catalog
+            4. Collect statistics
+            5. Write statistics to statistics table
         """
         try:
             config = await self.set_configuration()
             total_purged, unsent_purged = await self.purge_data(config)
+            await self.update_asset_catalog()
             await self.write_statistics(total_purged, unsent_purged)
         except Exception as ex:
             self._logger.exception(str(ex))
@@ -11,6 +11,8 @@ Fetch information from the statistics table, compute delta and
 stores the delta value (statistics.value - statistics.previous_value) in the statistics_history table
 """
 
+import json
+
 from foglamp.common.storage_client.payload_builder import PayloadBuilder
 from foglamp.common import logger
 from foglamp.common.process import FoglampProcess
@@ -31,31 +33,30 @@ class StatisticsHistory(FoglampProcess):
         super().__init__()
         self._logger = logger.setup("StatisticsHistory")
 
-    async def _insert_into_stats_history(self, key='', value=0, history_ts=None):
-        """ INSERT values in statistics_history
-    
+    async def _bulk_insert_into_stats_history(self, deltas, history_ts=None):
+        """ INSERT the values of all the keys in statistics_history with a single request
+
         Args:
-            key: corresponding stats_key_value 
-            value: delta between `value` and `prev_val`
+            deltas: list of (key, delta between `value` and `prev_val`) tuples
             history_ts: timestamp with timezone
-        Returns:
-            Return the number of rows inserted. Since each process inserts only 1 row,
-            the expected count should always be 1.
         """
-        payload = PayloadBuilder().INSERT(key=key, value=value, history_ts=history_ts).payload()
-        await self._storage_async.insert_into_tbl("statistics_history", payload)
+        payload = {"inserts": []}
+        for key, value in deltas:
+            payload_item = PayloadBuilder().INSERT(key=key, value=value, history_ts=history_ts).payload()
+            payload['inserts'].append(json.loads(payload_item))
+        await self._storage_async.insert_into_tbl("statistics_history", json.dumps(payload, sort_keys=False))
+
+    async def _bulk_update_previous_value(self, values):
+        """ UPDATE previous_value of all the keys with a single request
 
-    async def _update_previous_value(self, key='', value=0):
-        """ UPDATE previous_value of column to have the same value as snapshot
-    
-        Query: 
-            UPDATE statistics_history SET previous_value = value WHERE key = key
         Args:
-            key: Key which previous_value gets update 
-            value: value at snapshot
+            values: list of (key, value at snapshot) tuples
         """
-        payload = PayloadBuilder().SET(previous_value=value).WHERE(["key", "=", key]).payload()
-        await self._storage_async.update_tbl("statistics", payload)
+        payload = {"updates": []}
+        for key, value in values:
+            payload_item = PayloadBuilder().SET(previous_value=value).WHERE(["key", "=", key]).payload()
+            payload['updates'].append(json.loads(payload_item))
+        await self._storage_async.update_tbl("statistics", json.dumps(payload, sort_keys=False))
 
     async def run(self):
         """ SELECT against the statistics table, to get a snapshot of the data at that moment.
@@ -63,13 +64,23 @@ class StatisticsHistory(FoglampProcess):
         Based on the snapshot:
             1. INSERT the delta between `value` and `previous_value` into  statistics_history
             2. UPDATE the previous_value in statistics table to be equal to statistics.value at snapshot 
+
+        Each step is a single request to the storage layer whatever the number of keys, the storage plugin
+        executes the rows of a request in one transaction.
         """
         current_time = utils.local_timestamp()
         results = await self._storage_async.query_tbl("statistics")
+        deltas = []
+        changed = []
         for r in results['rows']:
             key = r['key']
             value = int(r["value"])
             previous_value = int(r["previous_value"])
-            delta = value - previous_value
-            await self._insert_into_stats_history(key=key, value=delta, history_ts=current_time)
-            await self._update_previous_value(key=key, value=value)
+            deltas.append((key, value - previous_value))
+            if value != previous_value:
+                changed.append((key, value))
+        if deltas:
+            await self._bulk_insert_into_stats_history(deltas, history_ts=current_time)
+        # Keys not changed since the previous snapshot already have previous_value = value
+        if changed:
+            await self._bulk_update_previous_value(changed)
@@ -0,0 +1 @@
+DROP TABLE IF EXISTS foglamp.asset_catalog;
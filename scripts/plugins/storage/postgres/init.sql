@@ -760,6 +760,16 @@ CREATE TABLE foglamp.plugin_data (
 	data    jsonb                     NOT NULL DEFAULT '{}'::jsonb,
 	CONSTRAINT plugin_data_pkey PRIMARY KEY (key) );
 
+-- Create asset_catalog table
+-- One row per asset with readings, kept up to date by the south services and the purge task
+CREATE TABLE foglamp.asset_catalog (
+       asset_code    character varying(50)       NOT NULL,                      -- The asset code of the readings
+       reading_count bigint                      NOT NULL DEFAULT 0,            -- Number of readings of the asset
+       first_ts      timestamp(6) with time zone NOT NULL DEFAULT now(),        -- user_ts of the oldest reading
+       last_ts       timestamp(6) with time zone NOT NULL DEFAULT now(),        -- user_ts of the newest reading
+       keys          jsonb                       NOT NULL DEFAULT '{}'::jsonb,  -- The keys of the readings and their JSON type
+       CONSTRAINT asset_catalog_pkey PRIMARY KEY (asset_code) );
+
 -- Grants to foglamp schema
 GRANT SELECT, INSERT, UPDATE, DELETE ON ALL TABLES IN SCHEMA foglamp TO PUBLIC;
 
@@ -0,0 +1,18 @@
+-- Create asset_catalog table
+-- One row per asset with readings, kept up to date by the south services and the purge task
+CREATE TABLE IF NOT EXISTS foglamp.asset_catalog (
+       asset_code    character varying(50)       NOT NULL,                      -- The asset code of the readings
+       reading_count bigint                      NOT NULL DEFAULT 0,            -- Number of readings of the asset
+       first_ts      timestamp(6) with time zone NOT NULL DEFAULT now(),        -- user_ts of the oldest reading
+       last_ts       timestamp(6) with time zone NOT NULL DEFAULT now(),        -- user_ts of the newest reading
+       keys          jsonb                       NOT NULL DEFAULT '{}'::jsonb,  -- The keys of the readings and their JSON type
+       CONSTRAINT asset_catalog_pkey PRIMARY KEY (asset_code) );
+
+-- Catalog the readings already stored, the keys are those of one reading of the asset
+INSERT INTO foglamp.asset_catalog ( asset_code, reading_count, first_ts, last_ts, keys )
+     SELECT r.asset_code, count(*), min(r.user_ts), max(r.user_ts),
+            COALESCE(( SELECT jsonb_object_agg(k.key, jsonb_typeof(k.value))
+                         FROM jsonb_each(( SELECT reading FROM foglamp.readings
+                                            WHERE asset_code = r.asset_code LIMIT 1 )) k ), '{}'::jsonb)
+       FROM foglamp.readings r
+   GROUP BY r.asset_code;
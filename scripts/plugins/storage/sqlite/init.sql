@@ -582,6 +582,16 @@ CREATE TABLE foglamp.plugin_data (
 	data    JSON                      NOT NULL DEFAULT '{}',
 	CONSTRAINT plugin_data_pkey PRIMARY KEY (key) );
 
+-- Create asset_catalog table
+-- One row per asset with readings, kept up to date by the south services and the purge task
+CREATE TABLE foglamp.asset_catalog (
+       asset_code    character varying(50)   NOT NULL,                                       -- The asset code of the readings
+       reading_count bigint                  NOT NULL DEFAULT 0,                             -- Number of readings of the asset
+       first_ts      DATETIME DEFAULT (STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')),                -- user_ts of the oldest reading
+       last_ts       DATETIME DEFAULT (STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')),                -- user_ts of the newest reading
+       keys          JSON                    NOT NULL DEFAULT '{}',                          -- The keys of the readings and their JSON type
+       CONSTRAINT asset_catalog_pkey PRIMARY KEY (asset_code) );
+
 ----------------------------------------------------------------------
 -- Initialization phase - DML
 ----------------------------------------------------------------------
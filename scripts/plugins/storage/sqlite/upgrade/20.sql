@@ -0,0 +1,23 @@
+-- Create asset_catalog table
+-- One row per asset with readings, kept up to date by the south services and the purge task
+CREATE TABLE IF NOT EXISTS foglamp.asset_catalog (
+       asset_code    character varying(50)   NOT NULL,                                       -- The asset code of the readings
+       reading_count bigint                  NOT NULL DEFAULT 0,                             -- Number of readings of the asset
+       first_ts      DATETIME DEFAULT (STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')),                -- user_ts of the oldest reading
+       last_ts       DATETIME DEFAULT (STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')),                -- user_ts of the newest reading
+       keys          JSON                    NOT NULL DEFAULT '{}',                          -- The keys of the readings and their JSON type
+       CONSTRAINT asset_catalog_pkey PRIMARY KEY (asset_code) );
+
+-- Catalog the readings already stored, the keys are those of one reading of the asset
+INSERT INTO foglamp.asset_catalog ( asset_code, reading_count, first_ts, last_ts, keys )
+     SELECT r.asset_code, count(*), min(r.user_ts), max(r.user_ts),
+            COALESCE(( SELECT json_group_object(k.key, CASE k.type WHEN 'integer' THEN 'number'
+                                                                 WHEN 'real' THEN 'number'
+                                                                 WHEN 'text' THEN 'string'
+                                                                 WHEN 'true' THEN 'boolean'
+                                                                 WHEN 'false' THEN 'boolean'
+                                                                 ELSE k.type END)
+                         FROM json_each(( SELECT reading FROM foglamp.readings
+                                           WHERE asset_code = r.asset_code LIMIT 1 )) k ), '{}')
+       FROM foglamp.readings r
+   GROUP BY r.asset_code;
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+""" Benchmark the readings per second of a log-heavy ingest with the log entries written by the log call or queued
+
+An INFO entry is logged for every batch of readings added, as a south plugin logging at INFO level does. The
+destination is a handler that takes SYSLOG_DELAY seconds for an entry, as syslog does when the daemon is busy or
+the disk is slow. With logger.setup(queued=True) the delay is taken by the thread writing the entries, the entries
+that do not fit in the queue are dropped and counted.
+"""
+
+import logging
+import time
+
+from foglamp.common import logger
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+BATCH_SIZE = 100
+BATCHES = 2000
+SYSLOG_DELAY = 0.0005
+
+
+class SlowSyslogHandler(logging.Handler):
+    def emit(self, record):
+        self.format(record)
+        time.sleep(SYSLOG_DELAY)
+
+
+def ingest(log, batches=BATCHES):
+    """Adds the readings of the batches and returns the readings per second"""
+    readings = []
+    start = time.perf_counter()
+    for batch in range(batches):
+        for i in range(BATCH_SIZE):
+            readings.append({'asset': 'sinusoid', 'readings': {'sinusoid': i}})
+        log.info('Batch %s of %s readings added', batch, BATCH_SIZE)
+        del readings[:]
+    return batches * BATCH_SIZE / (time.perf_counter() - start)
+
+
+def main():
+    logger._destination_handler = lambda destination: SlowSyslogHandler()
+    for name, queued in (("direct", False), ("queued", True)):
+        log = logger.setup('bench_{}'.format(name), destination=logger.CONSOLE, level=logging.INFO, queued=queued)
+        rate = ingest(log)
+        print("{:<8} {:>12.0f} readings/s, {} log entries dropped".format(name, rate, logger.dropped_entries()))
+    logger.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+""" Benchmark the per batch cost of building a readings append payload
+
+Compares the validating path of ReadingsStorageClientAsync.append, that serializes the batch and parses it back
+with Utils.is_json, with the path used by append_readings, that only serializes the batch to bytes with json_codec.
+"""
+
+import json
+import timeit
+import uuid
+from datetime import datetime
+
+from foglamp.common import json_codec
+from foglamp.common.storage_client.utils import Utils
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+BATCH_SIZE = 1024
+ITERATIONS = 200
+
+
+def make_batch(size=BATCH_SIZE):
+    ts = str(datetime.now())
+    return [{"asset_code": "sinusoid", "read_key": str(uuid.uuid4()),
+             "reading": {"sinusoid": 0.5, "temperature": {"value": 32, "unit": "kelvin"}},
+             "user_ts": ts} for _ in range(size)]
+
+
+def validating_append(readings):
+    payload = json.dumps({"readings": readings})
+    assert Utils.is_json(payload)
+    return payload
+
+
+def trusted_append(readings):
+    return json_codec.dumpb({"readings": readings})
+
+
+def main():
+    readings = make_batch()
+    results = {}
+    print("json codec: {}".format(json_codec.name))
+    for name, fn in (("append (dumps + is_json)", validating_append), ("append_readings (dumpb)", trusted_append)):
+        seconds = min(timeit.repeat(lambda: fn(readings), number=ITERATIONS, repeat=3)) / ITERATIONS
+        results[name] = seconds
+        print("{:<28} {:>8.3f} ms/batch of {}".format(name, seconds * 1000, BATCH_SIZE))
+    old, new = results.values()
+    print("{:<28} {:>8.3f} ms/batch ({:.0%})".format("saved", (old - new) * 1000, (old - new) / old))
+
+
+if __name__ == '__main__':
+    main()
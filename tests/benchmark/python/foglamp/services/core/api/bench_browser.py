@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+""" Benchmark the queries of /foglamp/asset/{asset_code}/summary on a large synthetic readings table
+
+Compares fetching every reading of the asset to find its keys and then running one aggregate query per key,
+with fetching one reading and running a single aggregate of all the keys. The readings table is held by
+SQLite in memory, the JSON rows returned are parsed as the storage client does with the response.
+"""
+
+import json
+import random
+import sqlite3
+import time
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+READINGS = 200000
+KEYS = 20
+ASSET_CODE = "bench"
+
+
+def make_table(readings=READINGS, keys=KEYS):
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE readings (id INTEGER PRIMARY KEY, asset_code TEXT, reading TEXT)")
+    connection.execute("CREATE INDEX readings_ix1 ON readings (asset_code)")
+    names = ["sensor{}".format(k) for k in range(keys)]
+    connection.executemany("INSERT INTO readings (asset_code, reading) VALUES (?, ?)",
+                           ((ASSET_CODE, json.dumps({name: random.random() * 100 for name in names}))
+                            for _ in range(readings)))
+    connection.commit()
+    return connection
+
+
+def _query(connection, sql, *args):
+    """ Runs the query and returns the rows as the storage client gets them, through JSON """
+    cursor = connection.execute(sql, args)
+    columns = [c[0] for c in cursor.description]
+    return json.loads(json.dumps({"rows": [dict(zip(columns, row)) for row in cursor]}))["rows"]
+
+
+def _aggregates(keys):
+    return ", ".join("min(json_extract(reading, '$.{0}')) AS min_{1}, max(json_extract(reading, '$.{0}')) AS max_{1}, "
+                     "avg(json_extract(reading, '$.{0}')) AS avg_{1}".format(key, index)
+                     for index, key in enumerate(keys))
+
+
+def summary_per_key(connection):
+    rows = _query(connection, "SELECT reading FROM readings WHERE asset_code = ?", ASSET_CODE)
+    keys = list(json.loads(rows[0]["reading"]).keys())
+    response = []
+    for key in keys:
+        row = _query(connection, "SELECT {} FROM readings WHERE asset_code = ?".format(_aggregates([key])),
+                     ASSET_CODE)[0]
+        response.append({key: {"min": row["min_0"], "max": row["max_0"], "average": row["avg_0"]}})
+    return response
+
+
+def summary_single_query(connection):
+    rows = _query(connection, "SELECT reading FROM readings WHERE asset_code = ? LIMIT 1", ASSET_CODE)
+    keys = list(json.loads(rows[0]["reading"]).keys())
+    row = _query(connection, "SELECT {} FROM readings WHERE asset_code = ?".format(_aggregates(keys)), ASSET_CODE)[0]
+    return [{key: {"min": row["min_{}".format(index)], "max": row["max_{}".format(index)],
+                   "average": row["avg_{}".format(index)]}} for index, key in enumerate(keys)]
+
+
+def main():
+    connection = make_table()
+    results = []
+    for name, fn in (("keys from all rows + 1 aggregate per key", summary_per_key),
+                     ("keys from 1 row + 1 aggregate", summary_single_query)):
+        start = time.perf_counter()
+        response = fn(connection)
+        seconds = time.perf_counter() - start
+        results.append((seconds, response))
+        print("{:<42} {:>8.2f} s for {} readings of {} keys".format(name, seconds, READINGS, KEYS))
+    assert results[0][1] == results[1][1]
+    old, new = results[0][0], results[1][0]
+    print("{:<42} {:>8.1f}x".format("speedup", old / new))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+""" Benchmark the cost of a scheduler wake-up with 10, 1,000 and 10,000 schedules
+
+A wake-up is a call of Scheduler._check_schedules when no schedule is due, as it happens every time a task
+completes. Compares the former scan of every schedule execution with the queue ordered by start time.
+"""
+
+import asyncio
+import datetime
+import time
+import timeit
+import uuid
+
+from foglamp.services.core.scheduler.entities import Schedule
+from foglamp.services.core.scheduler.scheduler import Scheduler
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+SCHEDULES = (10, 1000, 10000)
+ITERATIONS = 200
+
+
+def make_scheduler(count):
+    scheduler = Scheduler()
+    scheduler._max_running_tasks = count + 1
+    now = time.time()
+    for i in range(count):
+        schedule = scheduler._ScheduleRow(id=uuid.uuid4(), name="schedule {}".format(i), type=Schedule.Type.INTERVAL,
+                                          time=None, day=None, repeat=datetime.timedelta(seconds=30),
+                                          repeat_seconds=30, exclusive=True, enabled=True, process_name="purge")
+        scheduler._schedules[schedule.id] = schedule
+        schedule_execution = scheduler._ScheduleExecution()
+        # Spread over the next hour, none is due
+        schedule_execution.next_start_time = now + 60 + i % 3600
+        scheduler._schedule_executions[schedule.id] = schedule_execution
+        scheduler._queue_schedule(schedule.id, schedule_execution.next_start_time)
+    return scheduler
+
+
+async def check_schedules_scan(scheduler):
+    """ The former Scheduler._check_schedules, less the start of the tasks that never happens here """
+    earliest_start_time = None
+    for schedule_id in list(scheduler._schedule_executions.keys()):
+        if scheduler._paused or len(scheduler._task_processes) >= scheduler._max_running_tasks:
+            return None
+        schedule_execution = scheduler._schedule_executions[schedule_id]
+        try:
+            schedule = scheduler._schedules[schedule_id]
+        except KeyError:
+            continue
+        if schedule.enabled is False:
+            continue
+        if schedule.exclusive and schedule_execution.task_processes:
+            continue
+        next_start_time = schedule_execution.next_start_time
+        if not next_start_time and not schedule_execution.start_now:
+            continue
+        if next_start_time and not schedule_execution.start_now:
+            now = scheduler.current_time if scheduler.current_time else time.time()
+            right_time = now >= next_start_time
+        else:
+            right_time = False
+        assert not right_time
+        if next_start_time and (earliest_start_time is None or earliest_start_time > next_start_time):
+            earliest_start_time = next_start_time
+    return earliest_start_time
+
+
+def main():
+    loop = asyncio.get_event_loop()
+    for count in SCHEDULES:
+        scheduler = make_scheduler(count)
+        assert loop.run_until_complete(check_schedules_scan(scheduler)) == \
+            loop.run_until_complete(scheduler._check_schedules())
+        for name, check in (("scan", check_schedules_scan), ("queue", Scheduler._check_schedules)):
+            seconds = min(timeit.repeat(lambda: loop.run_until_complete(check(scheduler)),
+                                        number=ITERATIONS, repeat=3)) / ITERATIONS
+            print("{:>6} schedules {:<6} {:>12.1f} us/wake-up".format(count, name, seconds * 1000000))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,4 +3,6 @@ delete from foglamp.test;
 drop table foglamp.test;
 delete from foglamp.test2;
 drop table foglamp.test2;
+delete from foglamp.test3;
+drop table foglamp.test3;
 EOF
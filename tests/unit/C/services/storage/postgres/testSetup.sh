@@ -10,6 +10,13 @@ create table foglamp.test (
 
 insert into foglamp.test values (1, 'TEST1',  'A test row', '{ "json" : "test1" }');
 
+drop table if exists foglamp.test3;
+
+create table foglamp.test3 (
+	id	bigint PRIMARY KEY,
+	description	character varying(255)
+);
+
 delete from foglamp.readings;
 
 create table foglamp.test2 (
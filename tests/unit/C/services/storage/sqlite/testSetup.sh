@@ -15,6 +15,13 @@ drop table if exists foglamp.test2;
 
 insert into foglamp.test values (1, 'TEST1',  'A test row', '{ "json" : "test1" }');
 
+drop table if exists foglamp.test3;
+
+create table foglamp.test3 (
+	id	bigint PRIMARY KEY,
+	description	character varying(255)
+);
+
 -- Readings table
 -- This tables contains the readings for assets.
 -- An asset can be a south with multiple sensor, a single sensor,
@@ -373,6 +373,70 @@ class TestMicroserviceManagementClient:
         request_patch.assert_called_once_with(method='GET', url='/foglamp/service/category/SMNTR')
         assert test_dict == ret_value
 
+    def test_get_configuration_category_cached(self):
+        ms_mgt_client = MicroserviceManagementClient('host1', 1)
+        ms_mgt_client._interests['interest-id'] = 'SMNTR'
+        test_dict = {'sleep_interval': {'type': 'integer', 'description': 'sleep', 'value': '5', 'default': '5'}}
+        response_mock = MagicMock(type=HTTPResponse)
+        response_mock.read.return_value.decode.return_value = json.dumps(test_dict)
+        response_mock.getheader.return_value = '10'
+        response_mock.status = 200
+        with patch.object(HTTPConnection, 'request') as request_patch:
+            with patch.object(HTTPConnection, 'getresponse', return_value=response_mock) as response_patch:
+                assert test_dict == ms_mgt_client.get_configuration_category("SMNTR")
+                ret_value = ms_mgt_client.get_configuration_category("SMNTR")
+                assert test_dict == ret_value
+                # The caller gets a copy, the cached category is unchanged
+                ret_value['sleep_interval']['value'] = '7'
+                assert test_dict == ms_mgt_client.get_configuration_category("SMNTR")
+            response_patch.assert_called_once_with()
+        request_patch.assert_called_once_with(method='GET', url='/foglamp/service/category/SMNTR')
+        response_mock.getheader.assert_called_once_with('X-FogLAMP-Category-Version')
+
+    def test_get_configuration_category_not_cached_without_interest(self):
+        ms_mgt_client = MicroserviceManagementClient('host1', 1)
+        response_mock = MagicMock(type=HTTPResponse)
+        response_mock.read.return_value.decode.return_value = json.dumps({})
+        response_mock.getheader.return_value = '10'
+        response_mock.status = 200
+        with patch.object(HTTPConnection, 'request') as request_patch:
+            with patch.object(HTTPConnection, 'getresponse', return_value=response_mock):
+                ms_mgt_client.get_configuration_category("SMNTR")
+                ms_mgt_client.get_configuration_category("SMNTR")
+        assert 2 == request_patch.call_count
+        assert {} == ms_mgt_client._categories
+
+    def test_category_changed(self):
+        ms_mgt_client = MicroserviceManagementClient('host1', 1)
+        ms_mgt_client._categories['SMNTR'] = (10, {'value': 'a'})
+        ms_mgt_client.category_changed('SMNTR', {'value': 'b'}, 11)
+        assert (11, {'value': 'b'}) == ms_mgt_client._categories['SMNTR']
+        # An older notification received late is ignored
+        ms_mgt_client.category_changed('SMNTR', {'value': 'c'}, 9)
+        assert (11, {'value': 'b'}) == ms_mgt_client._categories['SMNTR']
+        # Not cached
+        ms_mgt_client.category_changed('other', {'value': 'c'}, 12)
+        assert 'other' not in ms_mgt_client._categories
+        # Without the items the category is read again from the core
+        ms_mgt_client.category_changed('SMNTR')
+        assert 'SMNTR' not in ms_mgt_client._categories
+
+    def test_unregister_interest_drops_cached_category(self):
+        ms_mgt_client = MicroserviceManagementClient('host1', 1)
+        ms_mgt_client._interests = {'id1': 'SMNTR', 'id2': 'SMNTR'}
+        ms_mgt_client._categories['SMNTR'] = (10, {})
+        response_mock = MagicMock(type=HTTPResponse)
+        response_mock.status = 200
+        with patch.object(HTTPConnection, 'request'):
+            with patch.object(HTTPConnection, 'getresponse', return_value=response_mock):
+                response_mock.read.return_value.decode.return_value = json.dumps({'id': 'id1'})
+                ms_mgt_client.unregister_interest('id1')
+                assert 'SMNTR' in ms_mgt_client._categories
+                response_mock.read.return_value.decode.return_value = json.dumps({'id': 'id2'})
+                ms_mgt_client.unregister_interest('id2')
+        assert {} == ms_mgt_client._interests
+        assert 'SMNTR' not in ms_mgt_client._categories
+
     @pytest.mark.parametrize("status_code, host", [(450, 'Client'), (550, 'Server')])
     def test_get_configuration_category_exception(self, status_code, host):
         microservice_management_host = 'host1'
@@ -783,3 +847,47 @@ class TestMicroserviceManagementClient:
         assert 'POST' == kwargs['method']
         assert '/foglamp/track' == kwargs['url']
         assert test_dict == json.loads(kwargs['body'])
+
+    def test_create_asset_tracker_events(self):
+        microservice_management_host = 'host1'
+        microservice_management_port = 1
+        ms_mgt_client = MicroserviceManagementClient(
+            microservice_management_host, microservice_management_port)
+        response_mock = MagicMock(type=HTTPResponse)
+        undecoded_data_mock = MagicMock()
+        response_mock.read.return_value = undecoded_data_mock
+        test_list = [{'asset': 'AirIntake', 'event': 'Ingest', 'service': 'PT100_In1', 'plugin': 'PT100'},
+                     {'asset': 'AirOutlet', 'event': 'Ingest', 'service': 'PT100_In1', 'plugin': 'PT100'}]
+        undecoded_data_mock.decode.return_value = json.dumps({'track': test_list})
+        response_mock.status = 200
+        with patch.object(HTTPConnection, 'request') as request_patch:
+            with patch.object(HTTPConnection, 'getresponse', return_value=response_mock) as response_patch:
+                ret_value = ms_mgt_client.create_asset_tracker_events(test_list)
+                assert {'track': test_list} == ret_value
+            response_patch.assert_called_once_with()
+        args, kwargs = request_patch.call_args_list[0]
+        assert 'POST' == kwargs['method']
+        assert '/foglamp/track/bulk' == kwargs['url']
+        assert {'track': test_list} == json.loads(kwargs['body'])
+
+    @pytest.mark.parametrize("status_code, host", [(450, 'Client'), (550, 'Server')])
+    def test_create_asset_tracker_events_exception(self, status_code, host):
+        microservice_management_host = 'host1'
+        microservice_management_port = 1
+        ms_mgt_client = MicroserviceManagementClient(
+            microservice_management_host, microservice_management_port)
+        response_mock = MagicMock(type=HTTPResponse)
+        response_mock.status = status_code
+        response_mock.reason = 'this is the reason'
+        test_list = [{'asset': 'AirIntake', 'event': 'Ingest', 'service': 'PT100_In1', 'plugin': 'PT100'}]
+        with patch.object(HTTPConnection, 'request') as request_patch:
+            with patch.object(HTTPConnection, 'getresponse', return_value=response_mock) as response_patch:
+                with patch.object(_logger, "error") as log_error:
+                    with pytest.raises(Exception) as excinfo:
+                        ms_mgt_client.create_asset_tracker_events(test_list)
+                    assert excinfo.type is client_exceptions.MicroserviceManagementClientError
+                log_error.assert_called_once_with('{} error code: %d, Reason: %s'.format(host), status_code,
+                                                  'this is the reason')
+            response_patch.assert_called_once_with()
+        args, kwargs = request_patch.call_args_list[0]
+        assert '/foglamp/track/bulk' == kwargs['url']
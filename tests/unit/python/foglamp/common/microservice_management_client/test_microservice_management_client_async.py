@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+import asyncio
+import json
+import socket
+
+import aiohttp
+import pytest
+from aiohttp import web
+from unittest.mock import patch
+
+from foglamp.common.microservice_management_client.microservice_management_client import \
+    MicroserviceManagementClientAsync, _logger
+from foglamp.common.microservice_management_client import exceptions
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+
+
+class CoreStub(object):
+    """ Core management API answering the requests of the client, on a real socket """
+
+    def __init__(self):
+        self.port = _free_port()
+        self.requests = []
+        self.connections = set()
+        self.delay = 0
+        self.disconnect = False
+        self._runner = None
+
+    async def _handle(self, request):
+        self.requests.append((request.method, request.path_qs, await request.text()))
+        self.connections.add(request.transport.get_extra_info('peername'))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.disconnect:
+            # Lost before the response is sent
+            request.transport.close()
+            await asyncio.sleep(0.1)
+        if request.path == '/foglamp/service/category/missing':
+            raise web.HTTPNotFound(reason='not found')
+        if request.path.startswith('/foglamp/service/category/'):
+            return web.json_response({'value': '1'}, headers={'X-FogLAMP-Category-Version': '3'})
+        if request.path == '/foglamp/track/bulk':
+            return web.json_response({'track': json.loads(await request.text())['track']})
+        return web.json_response({'id': 'some-id', 'services': []})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_route('*', '/{tail:.*}', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, 'localhost', self.port).start()
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("common", "microservice-management-client")
+class TestMicroserviceManagementClientAsync:
+
+    @pytest.mark.asyncio
+    async def test_requests_share_a_connection(self):
+        core = CoreStub()
+        await core.start()
+        client = MicroserviceManagementClientAsync('localhost', core.port)
+        try:
+            events = [{"asset": "pump1", "event": "Ingest", "service": "south", "plugin": "http_south"}]
+            assert {'track': events} == await client.create_asset_tracker_events(events)
+            assert {'id': 'some-id', 'services': []} == await client.get_services('foo', 'Southbound')
+            assert {'id': 'some-id', 'services': []} == await client.register_service({'name': 'foo'})
+        finally:
+            await client.close()
+            await core.stop()
+        assert [('POST', '/foglamp/track/bulk', json.dumps({"track": events})),
+                ('GET', '/foglamp/service?name=foo&type=Southbound', ''),
+                ('POST', '/foglamp/service', json.dumps({'name': 'foo'}))] == core.requests
+        # Kept alive between the requests
+        assert 1 == len(core.connections)
+
+    @pytest.mark.asyncio
+    async def test_get_configuration_category_cached(self):
+        core = CoreStub()
+        await core.start()
+        client = MicroserviceManagementClientAsync('localhost', core.port)
+        try:
+            await client.register_interest('SMNTR', 'some-service')
+            assert {'value': '1'} == await client.get_configuration_category('SMNTR')
+            assert {'value': '1'} == await client.get_configuration_category('SMNTR')
+        finally:
+            await client.close()
+            await core.stop()
+        assert 2 == len(core.requests)
+        assert (3, {'value': '1'}) == client._categories['SMNTR']
+
+    @pytest.mark.asyncio
+    async def test_client_error(self):
+        core = CoreStub()
+        await core.start()
+        client = MicroserviceManagementClientAsync('localhost', core.port)
+        try:
+            with patch.object(_logger, "error") as log_error:
+                with pytest.raises(exceptions.MicroserviceManagementClientError) as excinfo:
+                    await client.get_configuration_category('missing')
+        finally:
+            await client.close()
+            await core.stop()
+        assert 404 == excinfo.value.status
+        # Not retried
+        assert 1 == len(core.requests)
+        log_error.assert_called_once_with("Client error code: %d, Reason: %s", 404, 'not found')
+
+    @pytest.mark.asyncio
+    async def test_connection_error_retried(self):
+        client = MicroserviceManagementClientAsync('localhost', _free_port(), retries=2)
+        client._RETRY_WAIT = 0
+        try:
+            with patch.object(_logger, "error") as log_error:
+                with pytest.raises(aiohttp.ClientConnectionError):
+                    await client.create_asset_tracker_event({"asset": "pump1"})
+        finally:
+            await client.close()
+        assert 1 == log_error.call_count
+        args = log_error.call_args[0]
+        assert ('POST', '/foglamp/track', 3) == args[1:4]
+
+    @pytest.mark.asyncio
+    async def test_timeout_retried_for_get_only(self):
+        core = CoreStub()
+        core.delay = 0.5
+        await core.start()
+        client = MicroserviceManagementClientAsync('localhost', core.port, timeout=0.1, retries=1)
+        client._RETRY_WAIT = 0
+        try:
+            with patch.object(_logger, "error"):
+                with pytest.raises(asyncio.TimeoutError):
+                    await client.get_asset_tracker_events()
+                assert 2 == len(core.requests)
+                with pytest.raises(asyncio.TimeoutError):
+                    await client.create_asset_tracker_event({"asset": "pump1"})
+                # The core may have added the event, it is not sent again
+                assert 3 == len(core.requests)
+        finally:
+            await client.close()
+            await core.stop()
+
+    @pytest.mark.asyncio
+    async def test_disconnect_retried_for_get_only(self):
+        core = CoreStub()
+        core.disconnect = True
+        await core.start()
+        client = MicroserviceManagementClientAsync('localhost', core.port, retries=1)
+        client._RETRY_WAIT = 0
+        try:
+            with patch.object(_logger, "error"):
+                with pytest.raises(aiohttp.ClientConnectionError):
+                    await client.get_asset_tracker_events()
+                # Some aiohttp versions also resend an idempotent request themselves
+                sent = len(core.requests)
+                assert sent in (2, 4)
+                with pytest.raises(aiohttp.ClientConnectionError):
+                    await client.create_asset_tracker_event({"asset": "pump1"})
+                # The core received the event, it is not sent again
+                assert sent + 1 == len(core.requests)
+        finally:
+            await client.close()
+            await core.stop()
@@ -225,6 +225,17 @@ class TestPayloadBuilderRead:
                                                            ('values', 'avg', 'Average')).payload()
         assert expected == json.loads(res)
 
+    @pytest.mark.parametrize("test_input, expected", [
+        ((["min", ["values", "rate"]], ["min", ["values", "volume"]], ["max", ["values", "volume"]]),
+         _payload("data/payload_aggregate8_alias.json"))
+    ])
+    def test_aggregate_payload_with_alias5(self, test_input, expected):
+        res = PayloadBuilder().AGGREGATE(test_input).ALIAS('aggregate',
+                                                           (['values', 'rate'], 'min', 'min_rate'),
+                                                           (['values', 'volume'], 'min', 'min_volume'),
+                                                           (['values', 'volume'], 'max', 'max_volume')).payload()
+        assert expected == json.loads(res)
+
     @pytest.mark.parametrize("test_input, expected", [
         (("user_ts",), _payload("data/payload_timebucket4.json")),
         (("user_ts", "5"), _payload("data/payload_timebucket1.json")),
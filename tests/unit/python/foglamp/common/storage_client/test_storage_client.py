@@ -16,6 +16,7 @@ from functools import partial
 
 from foglamp.common.service_record import ServiceRecord
 from foglamp.common.storage_client.storage_client import _LOGGER, StorageClientAsync, ReadingsStorageClientAsync
+from foglamp.common.storage_client.utils import Utils
 
 from foglamp.common.storage_client.exceptions import *
 
@@ -268,6 +269,25 @@ class TestStorageClientAsync:
 
         await fake_storage_srvr.stop()
 
+    @pytest.mark.asyncio
+    async def test_insert_into_tbl_trusted(self, event_loop):
+        fake_storage_srvr = FakeFoglampStorageSrvr(loop=event_loop)
+        await fake_storage_srvr.start()
+
+        mockServiceRecord = MagicMock(ServiceRecord)
+        mockServiceRecord._address = HOST
+        mockServiceRecord._type = "Storage"
+        mockServiceRecord._port = PORT
+        mockServiceRecord._management_port = 2000
+
+        sc = StorageClientAsync(1, 2, mockServiceRecord)
+        with patch.object(Utils, "is_json") as is_json:
+            response = await sc.insert_into_tbl("aTable", json.dumps({"k": "v"}), trusted=True)
+        assert 0 == is_json.call_count
+        assert {"k": "v"} == response["called"]
+
+        await fake_storage_srvr.stop()
+
     @pytest.mark.asyncio
     async def test_update_tbl(self, event_loop):
         # PUT, '/storage/table/{tbl_name}', data
@@ -556,6 +576,97 @@ class TestReadingsStorageAsyncClient:
 
         await fake_storage_srvr.stop()
 
+    @pytest.mark.asyncio
+    async def test_append_trusted(self, event_loop):
+        fake_storage_srvr = FakeFoglampStorageSrvr(loop=event_loop)
+        await fake_storage_srvr.start()
+
+        mockServiceRecord = MagicMock(ServiceRecord)
+        mockServiceRecord._address = HOST
+        mockServiceRecord._type = "Storage"
+        mockServiceRecord._port = PORT
+        mockServiceRecord._management_port = 2000
+
+        rsc = ReadingsStorageClientAsync(1, 2, mockServiceRecord)
+        readings = json.dumps({"readings": []})
+        with patch.object(Utils, "is_json") as is_json:
+            response = await rsc.append(readings, trusted=True)
+            assert {'readings': []} == response['appended']
+            response = await rsc.append(readings.encode(), trusted=True)
+            assert {'readings': []} == response['appended']
+        assert 0 == is_json.call_count
+
+        await fake_storage_srvr.stop()
+
+    @pytest.mark.asyncio
+    async def test_append_readings(self, event_loop):
+        fake_storage_srvr = FakeFoglampStorageSrvr(loop=event_loop)
+        await fake_storage_srvr.start()
+
+        mockServiceRecord = MagicMock(ServiceRecord)
+        mockServiceRecord._address = HOST
+        mockServiceRecord._type = "Storage"
+        mockServiceRecord._port = PORT
+        mockServiceRecord._management_port = 2000
+
+        rsc = ReadingsStorageClientAsync(1, 2, mockServiceRecord)
+
+        with pytest.raises(Exception) as excinfo:
+            await rsc.append_readings([])
+        assert excinfo.type is ValueError
+        assert "Readings payload is missing" in str(excinfo.value)
+
+        with pytest.raises(Exception) as excinfo:
+            await rsc.append_readings({"asset_code": "a"})
+        assert excinfo.type is TypeError
+        assert "Readings must be a list" in str(excinfo.value)
+
+        readings = [{"asset_code": "a", "read_key": "5b3be500-ff95-41ae-b5a4-cc99d08bef40",
+                     "reading": {"rate": 18.4}, "user_ts": "2017-09-21 15:00:09.025655"}]
+        with patch.object(Utils, "is_json") as is_json:
+            response = await rsc.append_readings(readings)
+        assert 0 == is_json.call_count
+        assert {"readings": readings} == response['appended']
+
+        await fake_storage_srvr.stop()
+
+    @pytest.mark.asyncio
+    async def test_append_reuses_pooled_connection(self, event_loop):
+        fake_storage_srvr = FakeFoglampStorageSrvr(loop=event_loop)
+        await fake_storage_srvr.start()
+
+        mockServiceRecord = MagicMock(ServiceRecord)
+        mockServiceRecord._address = HOST
+        mockServiceRecord._type = "Storage"
+        mockServiceRecord._port = PORT
+        mockServiceRecord._management_port = 2000
+
+        rsc = ReadingsStorageClientAsync(1, 2, mockServiceRecord, connection_limit=2, keepalive_timeout=30)
+        readings = json.dumps({"readings": []})
+        await rsc.append(readings)
+        session = rsc._session
+        await rsc.append(readings)
+        await rsc.fetch(1, 3)
+
+        assert session is rsc._session
+        assert {"requests": 3, "created": 1, "reused": 2} == rsc.connection_stats
+
+        await rsc.close()
+        assert session.closed is True
+        assert rsc._session is None
+
+        # a new session is opened on next use after close
+        await rsc.append(readings)
+        assert rsc._session is not session
+        assert 2 == rsc.connection_stats["created"]
+
+        await rsc.configure_pool(connection_limit=4, keepalive_timeout=5)
+        assert rsc._session is None
+        assert 4 == rsc._connection_limit
+        assert 5 == rsc._keepalive_timeout
+
+        await fake_storage_srvr.stop()
+
     @pytest.mark.asyncio
     async def test_fetch(self, event_loop):
         # GET, '/storage/reading?id={}&count={}'
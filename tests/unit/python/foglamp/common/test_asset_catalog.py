@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from foglamp.common import asset_catalog
+from foglamp.common.asset_catalog import AssetCatalog, Reconciler, is_complete
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+class FakeStorage(object):
+    def __init__(self, rows=None, fail=0):
+        self.rows = rows or []
+        self.fail = fail
+        self.calls = []
+
+    async def query_tbl_with_payload(self, table, payload):
+        return {'rows': self.rows, 'count': len(self.rows)}
+
+    async def insert_into_tbl(self, table, payload):
+        return self._write('insert', table, payload)
+
+    async def update_tbl(self, table, payload):
+        return self._write('update', table, payload)
+
+    def _write(self, operation, table, payload):
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError("storage unavailable")
+        self.calls.append((operation, table, json.loads(payload)))
+        return {"response": "inserted" if operation == 'insert' else "updated"}
+
+
+class FakeReadingsStorage(object):
+    def __init__(self, rows):
+        self.rows = rows
+        self.payload = None
+
+    async def query(self, payload):
+        self.payload = json.loads(payload)
+        return {'rows': self.rows, 'count': len(self.rows)}
+
+
+def _reading(asset_code, user_ts, **reading):
+    return {'asset_code': asset_code, 'read_key': None, 'reading': reading, 'user_ts': user_ts}
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("common", "asset-catalog")
+class TestAssetCatalog:
+
+    @pytest.mark.asyncio
+    async def test_flush_new_assets(self):
+        storage = FakeStorage()
+        catalog = AssetCatalog(storage)
+        catalog.add([_reading('a', '2018-01-01 00:00:02', x=1),
+                     _reading('a', '2018-01-01 00:00:01', y='on'),
+                     _reading('b', '2018-01-01 00:00:03', z={'v': 1})])
+        assert await catalog.flush() is True
+        assert 1 == len(storage.calls)
+        operation, table, payload = storage.calls[0]
+        assert ('insert', 'asset_catalog') == (operation, table)
+        assert [{'asset_code': 'a', 'reading_count': 2, 'first_ts': '2018-01-01 00:00:01',
+                 'last_ts': '2018-01-01 00:00:02', 'keys': {'x': 'number', 'y': 'string'}},
+                {'asset_code': 'b', 'reading_count': 1, 'first_ts': '2018-01-01 00:00:03',
+                 'last_ts': '2018-01-01 00:00:03', 'keys': {'z': 'object'}}] == payload['inserts']
+        assert await catalog.flush() is True
+        assert 1 == len(storage.calls)
+
+    @pytest.mark.asyncio
+    async def test_flush_known_assets(self):
+        storage = FakeStorage([{'asset_code': 'a', 'last_ts': '2018-01-01 00:00:05', 'keys': {'x': 'number'}},
+                               {'asset_code': 'b', 'last_ts': '2018-01-01 00:00:05', 'keys': {'y': 'number'}}])
+        catalog = AssetCatalog(storage)
+        catalog.add([_reading('a', '2018-01-01 00:00:04', x=1),
+                     _reading('b', '2018-01-01 00:00:06', y=1, z=True)])
+        assert await catalog.flush() is True
+        assert 1 == len(storage.calls)
+        operation, table, payload = storage.calls[0]
+        assert ('update', 'asset_catalog') == (operation, table)
+        # Only the count of a changes, last_ts and the keys of b change too
+        assert [{'where': {'column': 'asset_code', 'condition': '=', 'value': 'a'},
+                 'expressions': [{'column': 'reading_count', 'operator': '+', 'value': 1}]},
+                {'where': {'column': 'asset_code', 'condition': '=', 'value': 'b'},
+                 'expressions': [{'column': 'reading_count', 'operator': '+', 'value': 1}],
+                 'values': {'last_ts': '2018-01-01 00:00:06', 'keys': {'y': 'number', 'z': 'boolean'}}}] \
+            == payload['updates']
+
+    @pytest.mark.asyncio
+    async def test_flush_failed(self):
+        storage = FakeStorage(fail=1)
+        catalog = AssetCatalog(storage)
+        catalog.add([_reading('a', '2018-01-01 00:00:01', x=1)])
+        assert await catalog.flush() is False
+        assert [] == storage.calls
+
+        # The readings added meanwhile are written with the ones not written
+        catalog.add([_reading('a', '2018-01-01 00:00:02', x=1)])
+        assert await catalog.flush() is True
+        assert 1 == len(storage.calls)
+        assert 2 == storage.calls[0][2]['inserts'][0]['reading_count']
+        assert '2018-01-01 00:00:02' == storage.calls[0][2]['inserts'][0]['last_ts']
+
+    @pytest.mark.asyncio
+    async def test_reconcile(self):
+        storage = FakeStorage([{'asset_code': 'a', 'last_ts': '2018-01-01 00:00:05', 'keys': {}},
+                               {'asset_code': 'b', 'last_ts': '2018-01-01 00:00:05', 'keys': {}}])
+        readings_storage = FakeReadingsStorage([
+            {'asset_code': 'a', 'count': 3, 'first_ts': '2018-01-01 00:00:01', 'last_ts': '2018-01-01 00:00:05'},
+            {'asset_code': 'c', 'count': 1, 'first_ts': '2018-01-01 00:00:02', 'last_ts': '2018-01-01 00:00:02'}])
+        await AssetCatalog(storage).reconcile(readings_storage)
+
+        assert "asset_code" == readings_storage.payload['group']
+        assert [('update', 'asset_catalog'), ('insert', 'asset_catalog')] == [call[:2] for call in storage.calls]
+        # The readings of b have all been purged
+        assert [{'where': {'column': 'asset_code', 'condition': '=', 'value': 'a'},
+                 'values': {'reading_count': 3, 'first_ts': '2018-01-01 00:00:01', 'last_ts': '2018-01-01 00:00:05'}},
+                {'where': {'column': 'asset_code', 'condition': '=', 'value': 'b'},
+                 'values': {'reading_count': 0}}] == storage.calls[0][2]['updates']
+        assert [{'asset_code': 'c', 'reading_count': 1, 'first_ts': '2018-01-01 00:00:02',
+                 'last_ts': '2018-01-01 00:00:02'}] == storage.calls[1][2]['inserts']
+
+    @pytest.mark.asyncio
+    async def test_is_complete(self):
+        assert await is_complete(FakeStorage()) is True
+        # A C south service is scheduled
+        assert await is_complete(FakeStorage([{'id': '6c2c6d1c-2c0c-4b4e-9d4f-2b4c4d8b8d1c'}])) is False
+
+    @pytest.mark.asyncio
+    async def test_stop(self):
+        storage = FakeStorage()
+        catalog = AssetCatalog(storage, flush_interval=60)
+        catalog.start()
+        catalog.add([_reading('a', '2018-01-01 00:00:01', x=1)])
+        # Stopping writes the readings left
+        await catalog.stop()
+        assert 1 == len(storage.calls)
+
+
+class FailingReadingsStorage(object):
+    def __init__(self):
+        self.calls = 0
+
+    async def query(self, payload):
+        self.calls += 1
+        raise RuntimeError("storage unavailable")
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("common", "asset-catalog")
+class TestReconciler:
+
+    @pytest.mark.asyncio
+    async def test_reconcile_complete(self):
+        storage = FakeStorage()
+        readings_storage = FakeReadingsStorage([])
+        assert await Reconciler(storage, readings_storage).reconcile() is False
+        # The readings are not scanned
+        assert readings_storage.payload is None
+        assert [] == storage.calls
+
+    @pytest.mark.asyncio
+    async def test_reconcile_incomplete(self):
+        # A C south service is scheduled, asset a is in the catalog
+        storage = FakeStorage([{'id': '6c2c6d1c-2c0c-4b4e-9d4f-2b4c4d8b8d1c', 'asset_code': 'a',
+                                'last_ts': '2018-01-01 00:00:01', 'keys': {}}])
+        readings_storage = FakeReadingsStorage([
+            {'asset_code': 'a', 'count': 7, 'first_ts': '2018-01-01 00:00:01', 'last_ts': '2018-01-01 00:00:09'}])
+        assert await Reconciler(storage, readings_storage).reconcile() is True
+        assert [{'where': {'column': 'asset_code', 'condition': '=', 'value': 'a'},
+                 'values': {'reading_count': 7, 'first_ts': '2018-01-01 00:00:01',
+                            'last_ts': '2018-01-01 00:00:09'}}] == storage.calls[0][2]['updates']
+
+    @pytest.mark.asyncio
+    async def test_periodically(self):
+        storage = FakeStorage([{'id': '6c2c6d1c-2c0c-4b4e-9d4f-2b4c4d8b8d1c'}])
+        readings_storage = FailingReadingsStorage()
+        reconciler = Reconciler(storage, readings_storage, interval=0.05)
+        with patch.object(asset_catalog._logger, 'warning') as log_warning:
+            reconciler.start()
+            await asyncio.sleep(0.18)
+            await reconciler.stop()
+        # Kept reconciling after a failure, stopped without waiting for the interval
+        assert readings_storage.calls >= 2
+        assert readings_storage.calls == log_warning.call_count
+        calls = readings_storage.calls
+        await asyncio.sleep(0.1)
+        assert calls == readings_storage.calls
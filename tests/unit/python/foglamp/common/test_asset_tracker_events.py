@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+""" Test common/asset_tracker_events.py
+
+"""
+import asyncio
+import pytest
+from unittest.mock import patch
+from foglamp.common.asset_tracker_events import AssetTrackerEvents
+from foglamp.common.microservice_management_client.microservice_management_client import MicroserviceManagementClientAsync
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_TRACK = [{"asset": "sinusoid", "event": "Ingest", "service": "sine", "plugin": "sinusoid",
+           "foglamp": "FogLAMP", "timestamp": "2018-08-21 16:58:00.000"}]
+
+
+async def mock_create(asset_events):
+    return {"track": asset_events}
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("common", "asset_tracker_events")
+class TestAssetTrackerEvents:
+
+    @pytest.mark.asyncio
+    async def test_load(self, event_loop):
+        events = AssetTrackerEvents("localhost", 0, loop=event_loop)
+        events.load(_TRACK)
+        assert 1 == len(events)
+        assert ("sinusoid", "Ingest", "sine", "sinusoid") in events
+        with patch.object(MicroserviceManagementClientAsync, "create_asset_tracker_events",
+                          side_effect=mock_create) as patch_create:
+            assert events.add("sinusoid", "Ingest", "sine", "sinusoid") is False
+            await events.flush()
+        assert 0 == patch_create.call_count
+
+    @pytest.mark.asyncio
+    async def test_add_sends_new_events_once(self, event_loop):
+        events = AssetTrackerEvents("localhost", 0, loop=event_loop)
+        with patch.object(MicroserviceManagementClientAsync, "create_asset_tracker_events",
+                          side_effect=mock_create) as patch_create:
+            for _ in range(3):
+                events.add("pump1", "Ingest", "south", "http_south")
+                events.add("pump2", "Ingest", "south", "http_south")
+            # Not sent inline by add
+            assert 0 == patch_create.call_count
+            await events.flush()
+        assert 2 == len(events)
+        patch_create.assert_called_once_with([
+            {"asset": "pump1", "event": "Ingest", "service": "south", "plugin": "http_south"},
+            {"asset": "pump2", "event": "Ingest", "service": "south", "plugin": "http_south"}])
+
+    @pytest.mark.asyncio
+    async def test_failed_events_are_retried(self, event_loop):
+        events = AssetTrackerEvents("localhost", 0, loop=event_loop)
+        with patch.object(MicroserviceManagementClientAsync, "create_asset_tracker_events",
+                          side_effect=Exception("core not reachable")) as patch_create:
+            events.add("pump1", "Egress", "north", "pi_server")
+            await events.flush()
+        assert 1 == patch_create.call_count
+        with patch.object(MicroserviceManagementClientAsync, "create_asset_tracker_events",
+                          side_effect=mock_create) as patch_create:
+            await events.flush()
+        patch_create.assert_called_once_with([{"asset": "pump1", "event": "Egress", "service": "north",
+                                               "plugin": "pi_server"}])
+
+    @pytest.mark.asyncio
+    async def test_failed_events_are_retried_with_backoff(self, event_loop):
+        events = AssetTrackerEvents("localhost", 0, loop=event_loop)
+        events._RETRY_WAIT = 0.05
+        events._retry_wait = 0.05
+        with patch.object(MicroserviceManagementClientAsync, "create_asset_tracker_events",
+                          side_effect=[Exception("core not reachable"), Exception("core not reachable"),
+                                       {"track": []}]) as patch_create:
+            # Neither added again nor flushed, as for a service whose assets are all known at start
+            events.add("pump1", "Ingest", "south", "http_south")
+            await asyncio.sleep(0.01)
+            assert 1 == patch_create.call_count
+            # Retried after 0.05 seconds, then after 0.1 seconds
+            await asyncio.sleep(0.07)
+            assert 2 == patch_create.call_count
+            assert 0.2 == events._retry_wait
+            await asyncio.sleep(0.07)
+            assert 2 == patch_create.call_count
+            await asyncio.sleep(0.06)
+            assert 3 == patch_create.call_count
+        assert [] == events._pending
+        assert events._retry_handle is None
+        # The wait starts over once registered
+        assert 0.05 == events._retry_wait
+
+    @pytest.mark.asyncio
+    async def test_close_cancels_retry(self, event_loop):
+        async def mock_close():
+            pass
+        events = AssetTrackerEvents("localhost", 0, loop=event_loop)
+        with patch.object(MicroserviceManagementClientAsync, "create_asset_tracker_events",
+                          side_effect=Exception("core not reachable")):
+            with patch.object(MicroserviceManagementClientAsync, "close", side_effect=mock_close):
+                events.add("pump1", "Ingest", "south", "http_south")
+                await events.close()
+        assert events._retry_handle is None
+
+    @pytest.mark.asyncio
+    async def test_load_from_core(self, event_loop):
+        async def mock_get():
+            return {"track": _TRACK}
+        events = AssetTrackerEvents("localhost", 0, loop=event_loop)
+        with patch.object(MicroserviceManagementClientAsync, "get_asset_tracker_events",
+                          side_effect=mock_get) as patch_get:
+            await events.load_from_core()
+        patch_get.assert_called_once_with()
+        assert ("sinusoid", "Ingest", "sine", "sinusoid") in events
+
+    @pytest.mark.asyncio
+    async def test_close(self, event_loop):
+        async def mock_close():
+            pass
+        events = AssetTrackerEvents("localhost", 0, loop=event_loop)
+        with patch.object(MicroserviceManagementClientAsync, "create_asset_tracker_events",
+                          side_effect=mock_create) as patch_create:
+            with patch.object(MicroserviceManagementClientAsync, "close", side_effect=mock_close) as patch_close:
+                events.add("pump1", "Ingest", "south", "http_south")
+                await events.close()
+        # The events queued are sent before the connection is closed
+        assert 1 == patch_create.call_count
+        patch_close.assert_called_once_with()
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
 import pytest
+from unittest.mock import patch
+from foglamp.common import configuration_manager
 from foglamp.common.configuration_manager import ConfigurationCache
 
 __author__ = "Ashish Jabble"
@@ -16,9 +18,12 @@ class TestConfigurationCache:
     def test_init(self):
         cached_manager = ConfigurationCache()
         assert {} == cached_manager.cache
-        assert 10 == cached_manager.max_cache_size
+        assert 50 == cached_manager.max_cache_size
+        assert cached_manager.ttl is None
         assert 0 == cached_manager.hit
         assert 0 == cached_manager.miss
+        assert 0 == cached_manager.evicted
+        assert 0 == cached_manager.expired
 
     def test_size(self):
         cached_manager = ConfigurationCache()
@@ -43,7 +48,7 @@ class TestConfigurationCache:
         assert cat_val == cached_manager.cache[cat_name]['value']
 
     def test_remove_oldest(self):
-        cached_manager = ConfigurationCache()
+        cached_manager = ConfigurationCache(max_cache_size=10)
         cached_manager.update("cat1", {'value': {}})
         cached_manager.update("cat2", {'value': {}})
         cached_manager.update("cat3", {'value': {}})
@@ -68,6 +73,7 @@ class TestConfigurationCache:
         assert 'cat10' in cached_manager.cache
         assert 'cat11' in cached_manager.cache
         assert 10 == cached_manager.size
+        assert 1 == cached_manager.evicted
 
     def test_remove(self):
         cached_manager = ConfigurationCache()
@@ -82,3 +88,69 @@ class TestConfigurationCache:
         assert 'cat1' in cached_manager.cache
         assert 'cat3' in cached_manager.cache
         assert 'cat4' in cached_manager.cache
+
+    def test_remove_not_cached(self):
+        cached_manager = ConfigurationCache()
+        cached_manager.update("cat1", {'value': {}})
+        cached_manager.remove("cat2")
+        assert 1 == cached_manager.size
+
+    def test_least_recently_used_evicted(self):
+        cached_manager = ConfigurationCache(max_cache_size=3)
+        cached_manager.update("cat1", {'value': {}})
+        cached_manager.update("cat2", {'value': {}})
+        cached_manager.update("cat3", {'value': {}})
+        # cat1 is used again, cat2 becomes the least recently used
+        assert "cat1" in cached_manager
+        cached_manager.update("cat4", {'value': {}})
+        assert ['cat3', 'cat1', 'cat4'] == list(cached_manager.cache)
+        # Updating a cached category does not evict
+        cached_manager.update("cat3", {'value': {}})
+        assert ['cat1', 'cat4', 'cat3'] == list(cached_manager.cache)
+        assert 1 == cached_manager.evicted
+        assert 1 == cached_manager.hit
+
+    def test_ttl(self):
+        cached_manager = ConfigurationCache(ttl=60)
+        with patch.object(configuration_manager.time, 'monotonic', return_value=1000):
+            cached_manager.update("cat1", {'value': {}})
+        with patch.object(configuration_manager.time, 'monotonic', return_value=1060):
+            assert "cat1" in cached_manager
+        with patch.object(configuration_manager.time, 'monotonic', return_value=1061):
+            assert "cat1" not in cached_manager
+        assert 0 == cached_manager.size
+        assert 1 == cached_manager.hit
+        assert 1 == cached_manager.miss
+        assert 1 == cached_manager.expired
+
+    def test_resize(self):
+        cached_manager = ConfigurationCache(max_cache_size=3)
+        cached_manager.update("cat1", {'value': {}})
+        cached_manager.update("cat2", {'value': {}})
+        cached_manager.update("cat3", {'value': {}})
+        cached_manager.resize(max_cache_size=1, ttl=30)
+        assert ['cat3'] == list(cached_manager.cache)
+        assert 2 == cached_manager.evicted
+        assert 30 == cached_manager.ttl
+        cached_manager.resize(ttl=0)
+        assert cached_manager.ttl is None
+        assert 1 == cached_manager.max_cache_size
+
+    @pytest.mark.parametrize("max_cache_size, ttl, message", [
+        (0, None, 'max_cache_size must be greater than 0'),
+        (None, -1, 'ttl must not be negative')
+    ])
+    def test_resize_bad_values(self, max_cache_size, ttl, message):
+        cached_manager = ConfigurationCache()
+        with pytest.raises(ValueError) as excinfo:
+            cached_manager.resize(max_cache_size, ttl)
+        assert message == str(excinfo.value)
+
+    def test_stats(self):
+        cached_manager = ConfigurationCache(max_cache_size=1)
+        cached_manager.update("cat1", {'value': {}})
+        assert "cat1" in cached_manager
+        assert "cat2" not in cached_manager
+        cached_manager.update("cat2", {'value': {}})
+        assert {'size': 1, 'maxCacheSize': 1, 'ttl': None, 'hit': 1, 'miss': 1, 'evicted': 1,
+                'expired': 0} == cached_manager.stats()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import sys
+import types
+import pytest
+from unittest.mock import patch
+from foglamp.common import configuration_manager
+from foglamp.common.configuration_manager import ConfigurationCallbacks
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+def callback_module(name, run):
+    module = types.ModuleType(name)
+    module.run = run
+    sys.modules[name] = module
+    return name
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("common", "configuration_manager", "configuration_callbacks")
+class TestConfigurationCallbacks:
+
+    def teardown_method(self):
+        for name in [n for n in sys.modules if n.startswith('test_cfg_callback')]:
+            del sys.modules[name]
+
+    def test_init(self):
+        callbacks = ConfigurationCallbacks()
+        assert 30 == callbacks.timeout
+        assert {} == callbacks.stats()
+
+    def test_add_imports_once(self):
+        async def run(category_name):
+            pass
+
+        callbacks = ConfigurationCallbacks()
+        name = callback_module('test_cfg_callback', run)
+        with patch.object(configuration_manager, 'import_module', return_value=sys.modules[name]) as import_patch:
+            callbacks.add(name, 'cat')
+            callbacks.add(name, 'other')
+        import_patch.assert_called_once_with(name)
+        assert name in callbacks
+        callbacks.remove(name)
+        assert name not in callbacks
+        assert {} == callbacks.stats()
+
+    @pytest.mark.asyncio
+    async def test_run_concurrently(self):
+        running = []
+
+        async def run(category_name):
+            running.append(category_name)
+            await asyncio.sleep(.2)
+
+        callbacks = ConfigurationCallbacks()
+        names = [callback_module('test_cfg_callback{}'.format(i), run) for i in range(3)]
+        for name in names:
+            callbacks.add(name, 'cat')
+        start = asyncio.get_event_loop().time()
+        await callbacks.run('cat', names)
+        assert asyncio.get_event_loop().time() - start < .5
+        assert ['cat', 'cat', 'cat'] == running
+        stats = callbacks.stats()
+        for name in names:
+            assert 1 == stats[name]['calls']
+            assert 0 == stats[name]['failures']
+            assert stats[name]['lastTime'] >= .2
+            assert stats[name]['maxTime'] == stats[name]['totalTime'] == stats[name]['lastTime']
+
+    @pytest.mark.asyncio
+    async def test_run_failure_raised_after_all_callbacks(self):
+        done = []
+
+        async def fail(category_name):
+            raise ValueError('bad')
+
+        async def run(category_name):
+            await asyncio.sleep(.1)
+            done.append(category_name)
+
+        callbacks = ConfigurationCallbacks()
+        failing = callback_module('test_cfg_callback_fail', fail)
+        good = callback_module('test_cfg_callback_good', run)
+        callbacks.add(failing, 'cat')
+        callbacks.add(good, 'cat')
+        with pytest.raises(ValueError):
+            await callbacks.run('cat', [failing, good])
+        assert ['cat'] == done
+        assert 1 == callbacks.stats()[failing]['failures']
+        assert 0 == callbacks.stats()[good]['failures']
+
+    @pytest.mark.asyncio
+    async def test_run_timeout(self):
+        async def run(category_name):
+            await asyncio.sleep(5)
+
+        callbacks = ConfigurationCallbacks(timeout=.1)
+        name = callback_module('test_cfg_callback_slow', run)
+        callbacks.add(name, 'cat')
+        with patch.object(configuration_manager._logger, 'error') as log_error:
+            with pytest.raises(asyncio.TimeoutError):
+                await callbacks.run('cat', [name])
+        log_error.assert_called_once_with('Callback module %s for category_name %s timed out after %s seconds',
+                                          name, 'cat', .1)
+        assert 1 == callbacks.stats()[name]['timeouts']
+        assert 1 == callbacks.stats()[name]['calls']
@@ -94,9 +94,10 @@ class TestConfigurationManager:
     def test_register_interest(self, reset_singleton):
         storage_client_mock = MagicMock(spec=StorageClientAsync)
         c_mgr = ConfigurationManager(storage_client_mock)
-        c_mgr.register_interest('name', 'callback')
-        assert 'callback' in c_mgr._registered_interests['name']
+        c_mgr.register_interest('name', 'configuration_manager_callback')
+        assert 'configuration_manager_callback' in c_mgr._registered_interests['name']
         assert 1 == len(c_mgr._registered_interests)
+        assert 'configuration_manager_callback' in c_mgr._callbacks
 
     def test_unregister_interest_no_category_name(self, reset_singleton):
         storage_client_mock = MagicMock(spec=StorageClientAsync)
@@ -117,10 +118,15 @@ class TestConfigurationManager:
     def test_unregister_interest(self, reset_singleton):
         storage_client_mock = MagicMock(spec=StorageClientAsync)
         c_mgr = ConfigurationManager(storage_client_mock)
-        c_mgr.register_interest('name', 'callback')
+        c_mgr.register_interest('name', 'configuration_manager_callback')
+        c_mgr.register_interest('other', 'configuration_manager_callback')
+        assert 2 == len(c_mgr._registered_interests)
+        c_mgr.unregister_interest('name', 'configuration_manager_callback')
         assert 1 == len(c_mgr._registered_interests)
-        c_mgr.unregister_interest('name', 'callback')
+        assert 'configuration_manager_callback' in c_mgr._callbacks
+        c_mgr.unregister_interest('other', 'configuration_manager_callback')
         assert len(c_mgr._registered_interests) is 0
+        assert 'configuration_manager_callback' not in c_mgr._callbacks
 
     @pytest.mark.asyncio
     async def test__run_callbacks(self, reset_singleton):
@@ -129,14 +135,29 @@ class TestConfigurationManager:
         c_mgr.register_interest('name', 'configuration_manager_callback')
         await c_mgr._run_callbacks('name')
 
+    def test_get_category_version(self, reset_singleton):
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        c_mgr = ConfigurationManager(storage_client_mock)
+        version = c_mgr.get_category_version('name')
+        assert version == c_mgr.get_category_version('name')
+        assert version < c_mgr.get_category_version('other')
+
     @pytest.mark.asyncio
-    async def test__run_callbacks_invalid_module(self, reset_singleton):
+    async def test__run_callbacks_new_version(self, reset_singleton):
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        c_mgr = ConfigurationManager(storage_client_mock)
+        version = c_mgr.get_category_version('name')
+        other_version = c_mgr.get_category_version('other')
+        await c_mgr._run_callbacks('name')
+        assert version < c_mgr.get_category_version('name')
+        assert other_version == c_mgr.get_category_version('other')
+
+    def test_register_interest_invalid_module(self, reset_singleton):
         storage_client_mock = MagicMock(spec=StorageClientAsync)
         c_mgr = ConfigurationManager(storage_client_mock)
-        c_mgr.register_interest('name', 'invalid')
         with patch.object(_logger, "error") as log_error:
             with pytest.raises(Exception) as excinfo:
-                await c_mgr._run_callbacks('name')
+                c_mgr.register_interest('name', 'invalid')
             import sys
             if sys.version_info[1] >= 6:
                 assert excinfo.type is ModuleNotFoundError
@@ -146,34 +167,30 @@ class TestConfigurationManager:
         assert 1 == log_error.call_count
         log_error.assert_called_once_with('Unable to import callback module %s for category_name %s', 'invalid', 'name', exc_info=True)
 
-    @pytest.mark.asyncio
-    async def test__run_callbacks_norun(self, reset_singleton):
+    def test_register_interest_norun(self, reset_singleton):
         storage_client_mock = MagicMock(spec=StorageClientAsync)
         c_mgr = ConfigurationManager(storage_client_mock)
-        c_mgr.register_interest('name', 'configuration_manager_callback_norun')
         with patch.object(_logger, "error") as log_error:
             with pytest.raises(Exception) as excinfo:
-                await c_mgr._run_callbacks('name')
+                c_mgr.register_interest('name', 'configuration_manager_callback_norun')
             assert excinfo.type is AttributeError
             assert 'Callback module configuration_manager_callback_norun does not have method run' in str(
                 excinfo.value)
         assert 1 == log_error.call_count
         log_error.assert_called_once_with('Callback module %s does not have method run', 'configuration_manager_callback_norun', exc_info=True)
 
-    @pytest.mark.asyncio
-    async def test__run_callbacks_nonasync(self, reset_singleton):
+    def test_register_interest_nonasync(self, reset_singleton):
         storage_client_mock = MagicMock(spec=StorageClientAsync)
         c_mgr = ConfigurationManager(storage_client_mock)
-        c_mgr.register_interest(
-            'name', 'configuration_manager_callback_nonasync')
         with patch.object(_logger, "error") as log_error:
             with pytest.raises(Exception) as excinfo:
-                await c_mgr._run_callbacks('name')
+                c_mgr.register_interest('name', 'configuration_manager_callback_nonasync')
             assert excinfo.type is AttributeError
             assert 'Callback module configuration_manager_callback_nonasync run method must be a coroutine function' in str(
                 excinfo.value)
         assert 1 == log_error.call_count
         log_error.assert_called_once_with('Callback module %s run method must be a coroutine function', 'configuration_manager_callback_nonasync', exc_info=True)
+        assert 'name' not in c_mgr._registered_interests
 
     @pytest.mark.asyncio
     async def test__validate_category_val_valid_config_use_default_val(self, reset_singleton):
@@ -1041,7 +1058,8 @@ class TestConfigurationManager:
                     await c_mgr.set_category_item_value_entry(category_name, item_name, new_value_entry)
                 callbackpatch.assert_called_once_with(category_name)
             updatepatch.assert_called_once_with(category_name, item_name, new_value_entry)
-        readpatch.assert_called_once_with(category_name, item_name)
+        readpatch.assert_not_called()
+        assert new_value_entry == c_mgr._cacheManager.cache[category_name]['value'][item_name]['value']
 
     @pytest.mark.asyncio
     async def test_set_category_item_value_entry_bad_update(self, reset_singleton):
@@ -1149,7 +1167,8 @@ class TestConfigurationManager:
                     await c_mgr.set_category_item_value_entry(category_name, item_name, new_value_entry)
                 callbackpatch.assert_called_once_with(category_name)
             updatepatch.assert_called_once_with(category_name, item_name, new_value_entry)
-        readpatch.assert_called_once_with(category_name, item_name)
+        readpatch.assert_not_called()
+        assert new_value_entry == c_mgr._cacheManager.cache[category_name]['value'][item_name]['value']
 
     @pytest.mark.asyncio
     @pytest.mark.parametrize("new_value_entry, message", [
@@ -1668,6 +1687,47 @@ class TestConfigurationManager:
             pbsetpatch.assert_called_once_with(description=category_description, value=category_val, display_name=category_name)
         storage_client_mock.update_tbl.assert_called_once_with('configuration', None)
 
+    @pytest.mark.asyncio
+    async def test__update_category_val(self, reset_singleton):
+        async def mock_coro(*args):
+            return {"response": "updated", "rows_affected": 1}
+
+        async def mock_callbacks(category_name, callbacks):
+            pass
+
+        category_val = {"info": {"default": "1", "description": "Test description", "type": "integer", "value": "1"}}
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        c_mgr = ConfigurationManager(storage_client_mock)
+        c_mgr._cacheManager.update('catname', {})
+        c_mgr._registered_interests['catname'] = {'configuration_manager_callback'}
+        version = c_mgr.get_category_version('catname')
+        with patch.object(storage_client_mock, 'update_tbl', side_effect=mock_coro) as patch_update:
+            with patch.object(c_mgr._callbacks, 'run', side_effect=mock_callbacks) as patch_run:
+                await c_mgr._update_category_val('catname', category_val)
+        patch_run.assert_called_once_with('catname', ['configuration_manager_callback'])
+        args, kwargs = patch_update.call_args
+        assert 'configuration' == args[0]
+        assert {"values": {"value": category_val}, "where": {"column": "key", "condition": "=", "value": "catname"}} \
+            == json.loads(args[1])
+        assert category_val == c_mgr._cacheManager.cache['catname']['value']
+        assert version < c_mgr.get_category_version('catname')
+
+    @pytest.mark.asyncio
+    async def test__update_category_val_keyerror(self, reset_singleton):
+        async def mock_coro(*args):
+            return {"message": "update failed"}
+
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        c_mgr = ConfigurationManager(storage_client_mock)
+        version = c_mgr.get_category_version('catname')
+        with patch.object(storage_client_mock, 'update_tbl', side_effect=mock_coro):
+            with patch.object(c_mgr, '_run_callbacks') as patch_callbacks:
+                with pytest.raises(ValueError) as excinfo:
+                    await c_mgr._update_category_val('catname', {})
+        assert 'update failed' == str(excinfo.value)
+        assert 0 == patch_callbacks.call_count
+        assert version == c_mgr.get_category_version('catname')
+
     @pytest.mark.asyncio
     async def test__update_category_storageservererror(self, reset_singleton):
         @asyncio.coroutine
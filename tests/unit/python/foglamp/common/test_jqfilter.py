@@ -7,7 +7,7 @@
 """ Test common/jqfilter.py
 
 """
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 import pytest
 import pyjq
 from foglamp.common import logger
@@ -50,3 +50,64 @@ class TestJQFilter:
                     jqfilter_instance.transform(input_filter_string, input_reading_block)
         mock_pyjq.assert_called_once_with(input_reading_block, input_filter_string)
         log.assert_called_once_with(expected_log, '')
+
+    def test_compile_cached(self):
+        JQFilter._programs.clear()
+        jqfilter_instance = JQFilter()
+        with patch.object(pyjq, "compile", side_effect=lambda f: MagicMock(name=f)) as mock_compile:
+            program = jqfilter_instance.compile(".")
+            assert program is jqfilter_instance.compile(".")
+            assert program is JQFilter().compile(".")
+            assert program is not jqfilter_instance.compile(".[]")
+        assert 2 == mock_compile.call_count
+        JQFilter._programs.clear()
+
+    def test_compile_evicts_least_recently_used(self):
+        JQFilter._programs.clear()
+        jqfilter_instance = JQFilter()
+        with patch.object(JQFilter, "_PROGRAMS_MAX", 2):
+            with patch.object(pyjq, "compile", side_effect=lambda f: MagicMock(name=f)) as mock_compile:
+                jqfilter_instance.compile(".a")
+                jqfilter_instance.compile(".b")
+                jqfilter_instance.compile(".a")
+                jqfilter_instance.compile(".c")
+        assert [".a", ".c"] == list(JQFilter._programs)
+        assert 3 == mock_compile.call_count
+        JQFilter._programs.clear()
+
+    def test_compile_exception(self):
+        JQFilter._programs.clear()
+        jqfilter_instance = JQFilter()
+        with patch.object(pyjq, "compile", side_effect=ValueError) as mock_compile:
+            with patch.object(jqfilter_instance._logger, "error") as log:
+                with pytest.raises(ValueError):
+                    jqfilter_instance.compile("..")
+        mock_compile.assert_called_once_with("..")
+        log.assert_called_once_with('Failed to compile, please check the transformation rule, exception %s', '')
+        assert 0 == len(JQFilter._programs)
+
+    def test_transform_first(self):
+        JQFilter._programs.clear()
+        jqfilter_instance = JQFilter()
+        reading_block = [{"id": 1, "reading": {"a": 1}}]
+        program = MagicMock()
+        program.first.return_value = [{"id": 1, "reading": {"a": 1, "b": True}}]
+        with patch.object(pyjq, "compile", return_value=program) as mock_compile:
+            ret = jqfilter_instance.transform_first(reading_block, "(.[]|.reading|.b)=true")
+            ret = jqfilter_instance.transform_first(reading_block, "(.[]|.reading|.b)=true")
+        assert [{"id": 1, "reading": {"a": 1, "b": True}}] == ret
+        mock_compile.assert_called_once_with("(.[]|.reading|.b)=true")
+        program.first.assert_called_with(reading_block)
+        JQFilter._programs.clear()
+
+    def test_transform_first_exception(self):
+        JQFilter._programs.clear()
+        jqfilter_instance = JQFilter()
+        program = MagicMock()
+        program.first.side_effect = TypeError
+        with patch.object(pyjq, "compile", return_value=program):
+            with patch.object(jqfilter_instance._logger, "error") as log:
+                with pytest.raises(TypeError):
+                    jqfilter_instance.transform_first({"a": object()}, ".")
+        log.assert_called_once_with('Invalid JSON passed, exception %s', '')
+        JQFilter._programs.clear()
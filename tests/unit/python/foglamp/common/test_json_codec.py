@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+""" Test common/json_codec.py
+
+"""
+import json
+import pytest
+from foglamp.common import json_codec
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_READINGS = {"readings": [{"asset_code": "pump1", "read_key": "5b3be500-ff95-41ae-b5a4-cc99d08bef40",
+                           "reading": {"velocity": 500, "temperature": {"value": 32.5, "unit": "kelvin"}},
+                           "user_ts": "2017-09-21 15:00:09.025655"}]}
+
+
+def _installed_codecs():
+    installed = []
+    for codec_name in json_codec.CODECS:
+        try:
+            json_codec.CODECS[codec_name]()
+            installed.append(codec_name)
+        except ImportError:
+            pass
+    return installed
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("common", "json_codec")
+class TestJsonCodec:
+
+    @pytest.fixture(autouse=True)
+    def restore_codec(self):
+        codec_name = json_codec.name
+        yield
+        json_codec.use(codec_name)
+
+    def test_fastest_codec_selected(self):
+        assert _installed_codecs()[0] == json_codec.name
+
+    def test_use_unsupported_codec(self):
+        with pytest.raises(ValueError) as excinfo:
+            json_codec.use("simplejson")
+        assert "Unsupported JSON codec simplejson" in str(excinfo.value)
+
+    @pytest.mark.parametrize("codec_name", _installed_codecs())
+    def test_round_trip(self, codec_name):
+        json_codec.use(codec_name)
+        assert codec_name == json_codec.name
+
+        as_str = json_codec.dumps(_READINGS)
+        as_bytes = json_codec.dumpb(_READINGS)
+        assert isinstance(as_str, str)
+        assert isinstance(as_bytes, bytes)
+        assert _READINGS == json.loads(as_str)
+        assert _READINGS == json.loads(as_bytes.decode('utf-8'))
+        assert _READINGS == json_codec.loads(as_str)
+        assert _READINGS == json_codec.loads(as_bytes)
+
+    @pytest.mark.parametrize("codec_name", _installed_codecs())
+    def test_fallback_to_stdlib(self, codec_name):
+        json_codec.use(codec_name)
+        obj = {1: "non string key", "big": 2 ** 70}
+        assert json.loads(json.dumps(obj)) == json.loads(json_codec.dumps(obj))
+        assert json.loads(json.dumps(obj)) == json.loads(json_codec.dumpb(obj).decode('utf-8'))
+
+    @pytest.mark.parametrize("codec_name", _installed_codecs())
+    def test_not_serializable(self, codec_name):
+        json_codec.use(codec_name)
+        with pytest.raises(TypeError):
+            json_codec.dumps({"a": object()})
@@ -6,6 +6,10 @@
 
 import pytest
 import logging
+import threading
+import time
+from logging.handlers import QueueHandler
+from unittest.mock import patch
 
 from foglamp.common import logger
 
@@ -95,3 +99,110 @@ class TestLogger:
                     log.setLevel(level) 
                     log.propagate = propagate
                     assert log is logger.setup(name, propagate=propagate, level=level)
+
+
+class SlowHandler(logging.Handler):
+    """ A destination that takes its time, as syslog when the daemon is busy """
+
+    def __init__(self):
+        super().__init__()
+        self.released = threading.Event()
+        self.messages = []
+
+    def emit(self, record):
+        self.released.wait()
+        self.messages.append(self.format(record))
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("common", "logger")
+class TestQueuedLogger:
+    """ Logger tests in queued mode """
+
+    @pytest.fixture
+    def queue_handlers(self):
+        with patch.dict(logger._queue_handlers, clear=True):
+            yield logger._queue_handlers
+            logger.flush()
+
+    def test_queued_instance(self, queue_handlers):
+        """ Test the loggers of a destination share a queue handler
+
+        :assert:
+            Assert the handler of the logger is a QueueHandler, added once
+        """
+        instance = logger.setup('test_queued_instance', destination=logger.CONSOLE, queued=True)
+        logger.setup('test_queued_instance', destination=logger.CONSOLE, queued=True)
+        other = logger.setup('test_queued_other', destination=logger.CONSOLE, queued=True)
+        assert 1 == len(instance.handlers)
+        assert isinstance(instance.handlers[0], QueueHandler)
+        assert instance.handlers == other.handlers
+        assert [logger.CONSOLE] == list(queue_handlers)
+
+    def test_queued_from_environment(self, queue_handlers):
+        """ Test the queued mode is selected by FOGLAMP_LOG_QUEUED
+
+        :assert:
+            Assert the logger has a QueueHandler when FOGLAMP_LOG_QUEUED=1
+        """
+        with patch.dict('os.environ', {'FOGLAMP_LOG_QUEUED': '1'}):
+            instance = logger.setup('test_queued_from_environment', destination=logger.CONSOLE)
+        assert isinstance(instance.handlers[0], QueueHandler)
+
+    def test_queued_destination_error(self, queue_handlers):
+        """ Test Error gets returned when destination isn't 0 or 1 in queued mode
+
+        :assert:
+            Assert ValueError is returned when destination=2
+        """
+        with pytest.raises(ValueError) as error_exec:
+            logger.setup(__name__, destination=2, queued=True)
+        assert "Invalid destination 2" == str(error_exec.value)
+        assert {} == queue_handlers
+
+    def test_queued_written(self, queue_handlers):
+        """ Test the entries are written by the listener, in order and formatted
+
+        :assert:
+            Assert the log calls do not wait for the destination
+            Assert the entries are written on flush
+        """
+        destination = SlowHandler()
+        destination.setFormatter(logging.Formatter(fmt='%(levelname)s: %(name)s: %(message)s'))
+        with patch.object(logger, '_destination_handler', return_value=destination):
+            instance = logger.setup('test_queued_written', destination=logger.CONSOLE, queued=True)
+        for i in range(3):
+            instance.warning('reading %s', i)
+        assert [] == destination.messages
+        destination.released.set()
+        logger.flush()
+        assert ['WARNING: test_queued_written: reading {}'.format(i) for i in range(3)] == destination.messages
+        assert 0 == logger.dropped_entries()
+
+    def test_queued_dropped(self, queue_handlers):
+        """ Test the entries are dropped and counted when the queue is full
+
+        :assert:
+            Assert the number of entries dropped
+            Assert a warning reports the entries dropped once there is room in the queue
+        """
+        destination = SlowHandler()
+        handler = logger._BoundedQueueHandler(destination, queue_size=5)
+        queue_handlers[logger.CONSOLE] = handler
+        instance = logger.setup('test_queued_dropped', destination=logger.CONSOLE, queued=True)
+        # The listener holds the first entry, 5 more fill the queue
+        instance.warning('first')
+        while not handler.queue.empty():
+            time.sleep(0.01)
+        for i in range(10):
+            instance.warning('reading %s', i)
+        assert 5 == handler.dropped
+        assert 5 == logger.dropped_entries()
+        destination.released.set()
+        while not handler.queue.empty():
+            time.sleep(0.01)
+        instance.warning('last')
+        logger.flush()
+        assert ['first'] + ['reading {}'.format(i) for i in range(5)] + \
+               ['5 log entries dropped, the logging queue was full', 'last'] == destination.messages
+
@@ -4,9 +4,10 @@
 # See: http://foglamp.readthedocs.io/
 # FOGLAMP_END
 
+import asyncio
 import json
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, patch, ANY
 import pytest
 
 from foglamp.common import statistics
@@ -58,7 +59,7 @@ class TestStatistics:
         """ Test that register results in a database insert """
         storageMock = MagicMock(spec=StorageClientAsync)
         stats = statistics.Statistics(storageMock)
-        stats._registered_keys = []
+        stats._registered_keys = set()
 
         async def mock_coro():
             return {"response": "updated", "rows_affected": 1}
@@ -79,7 +80,7 @@ class TestStatistics:
         """ Test that register results in a database insert only once for same key"""
         storageMock = MagicMock(spec=StorageClientAsync)
         stats = statistics.Statistics(storageMock)
-        stats._registered_keys = []
+        stats._registered_keys = set()
 
         async def mock_coro():
             return {"response": "updated", "rows_affected": 1}
@@ -103,11 +104,21 @@ class TestStatistics:
                     assert args[0] == 'Unable to create new statistic %s, error %s'
                     assert args[1] == 'T3Stat'
 
+    async def test_is_registered(self):
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        s = statistics.Statistics(storage_client_mock)
+        s._registered_keys = None
+        # Keys not loaded yet
+        assert s.is_registered('READINGS') is False
+        s._registered_keys = {'READINGS'}
+        assert s.is_registered('READINGS') is True
+        assert s.is_registered('PUMP1') is False
+
     async def test_load_keys(self):
         """Test the load key"""
         storage_client_mock = MagicMock(spec=StorageClientAsync)
         s = statistics.Statistics(storage_client_mock)
-        s._registered_keys = []
+        s._registered_keys = set()
 
         async def mock_coro():
             return {'rows': [{"previous_value": 0, "value": 1,
@@ -121,7 +132,7 @@ class TestStatistics:
         """Test the load key exception"""
         storage_client_mock = MagicMock(spec=StorageClientAsync)
         s = statistics.Statistics(storage_client_mock)
-        s._registered_keys = []
+        s._registered_keys = set()
 
         async def mock_coro():
             return Exception
@@ -215,3 +226,137 @@ class TestStatistics:
                 with patch.object(statistics._logger, 'exception') as logger_exception:
                     await s.add_update(stat_dict)
                 logger_exception.assert_called_once_with(*msg)
+
+    async def test_register_bulk(self):
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        s = statistics.Statistics(storage_client_mock)
+        s._registered_keys = {'READINGS'}
+
+        async def mock_coro():
+            return {"response": "inserted", "rows_affected": 2}
+
+        with patch.object(s._storage, 'insert_into_tbl', return_value=mock_coro()) as stat_insert:
+            await s.register_bulk({'READINGS': 'Readings', 'PUMP1': 'Pump 1', 'PUMP2': 'Pump 2'})
+        stat_insert.assert_called_once_with('statistics', ANY)
+        args, kwargs = stat_insert.call_args
+        inserts = json.loads(args[1])['inserts']
+        assert [{'key': 'PUMP1', 'description': 'Pump 1', 'value': 0, 'previous_value': 0},
+                {'key': 'PUMP2', 'description': 'Pump 2', 'value': 0, 'previous_value': 0}] == \
+            sorted(inserts, key=lambda i: i['key'])
+        assert {'READINGS', 'PUMP1', 'PUMP2'} == s._registered_keys
+
+    async def test_register_bulk_registered(self):
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        s = statistics.Statistics(storage_client_mock)
+        s._registered_keys = {'READINGS'}
+        with patch.object(s._storage, 'insert_into_tbl') as stat_insert:
+            await s.register_bulk({'READINGS': 'Readings'})
+        assert 0 == stat_insert.call_count
+
+    async def test_register_bulk_exception(self):
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        s = statistics.Statistics(storage_client_mock)
+        s._registered_keys = {'READINGS'}
+
+        async def mock_load_keys():
+            # PUMP1 has been created by another process
+            s._registered_keys = {'READINGS', 'PUMP1'}
+
+        with patch.object(s._storage, 'insert_into_tbl', side_effect=Exception):
+            with patch.object(s, '_load_keys', side_effect=mock_load_keys):
+                await s.register_bulk({'PUMP1': 'Pump 1'})
+                with patch.object(statistics._logger, 'exception') as logger_exception:
+                    with pytest.raises(Exception):
+                        await s.register_bulk({'PUMP1': 'Pump 1', 'PUMP2': 'Pump 2'})
+        args, kwargs = logger_exception.call_args
+        assert args[0] == 'Unable to create new statistics %s, error %s'
+        assert args[1] == ['PUMP2']
+
+
+class FakeStatistics(object):
+    """ Records the calls StatisticsAccumulator makes to Statistics """
+
+    def __init__(self, fail=False):
+        self._registered_keys = {'READINGS'}
+        self.fail = fail
+        self.registered = []
+        self.updates = []
+
+    def is_registered(self, key):
+        return key in self._registered_keys
+
+    async def register_bulk(self, key_descriptions):
+        if self.fail:
+            raise Exception('storage not reachable')
+        self.registered.append(dict(key_descriptions))
+        self._registered_keys.update(key_descriptions)
+
+    async def update_bulk(self, stat_list):
+        if self.fail:
+            raise Exception('storage not reachable')
+        self.updates.append(dict(stat_list))
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("common", "statistics")
+class TestStatisticsAccumulator:
+
+    async def test_flush(self):
+        stats = FakeStatistics()
+        accumulator = statistics.StatisticsAccumulator(stats)
+        accumulator.increment('READINGS', 2, 'Readings')
+        accumulator.increment('PUMP1', 1, 'Pump 1')
+        accumulator.increment('PUMP1', 3, 'Pump 1')
+        accumulator.increment('DISCARDED', 0)
+        assert await accumulator.flush() is True
+        assert [{'PUMP1': 'Pump 1'}] == stats.registered
+        assert [{'READINGS': 2, 'PUMP1': 4}] == stats.updates
+        # Nothing left to write
+        assert await accumulator.flush() is True
+        assert 1 == len(stats.updates)
+
+    async def test_flush_failure_keeps_counters(self):
+        stats = FakeStatistics(fail=True)
+        accumulator = statistics.StatisticsAccumulator(stats)
+        accumulator.increment('PUMP1', 1, 'Pump 1')
+        with patch.object(statistics._logger, 'warning') as logger_warning:
+            assert await accumulator.flush() is False
+        args, kwargs = logger_warning.call_args
+        assert args[0] == 'Unable to register %s statistics keys, %s'
+        accumulator.increment('PUMP1', 2, 'Pump 1')
+        stats.fail = False
+        assert await accumulator.flush() is True
+        assert [{'PUMP1': 'Pump 1'}] == stats.registered
+        assert [{'PUMP1': 3}] == stats.updates
+
+    async def test_update_failure_keeps_counters(self):
+        stats = FakeStatistics()
+        accumulator = statistics.StatisticsAccumulator(stats)
+        accumulator.increment('READINGS', 5)
+        stats.fail = True
+        with patch.object(statistics._logger, 'warning'):
+            assert await accumulator.flush() is False
+        accumulator.increment('READINGS', 1)
+        stats.fail = False
+        assert await accumulator.flush() is True
+        assert [{'READINGS': 6}] == stats.updates
+
+    async def test_start_stop(self):
+        stats = FakeStatistics()
+        accumulator = statistics.StatisticsAccumulator(stats, flush_interval=0.1)
+        accumulator.start()
+        accumulator.increment('READINGS', 1)
+        await asyncio.sleep(0.3)
+        assert [{'READINGS': 1}] == stats.updates
+        accumulator.increment('READINGS', 2)
+        await accumulator.stop()
+        assert [{'READINGS': 1}, {'READINGS': 2}] == stats.updates
+        assert accumulator._flush_task is None
+
+    async def test_stop_before_first_flush(self):
+        stats = FakeStatistics()
+        accumulator = statistics.StatisticsAccumulator(stats, flush_interval=60)
+        accumulator.start()
+        accumulator.increment('READINGS', 1)
+        await accumulator.stop()
+        assert [{'READINGS': 1}] == stats.updates
@@ -7,6 +7,7 @@
 
 import asyncio
 import json
+from collections import OrderedDict
 from unittest.mock import MagicMock, patch
 
 from aiohttp import web
@@ -15,7 +16,7 @@ import pytest
 
 from foglamp.services.core.api import browser
 from foglamp.services.core import connect
-from foglamp.common.storage_client.storage_client import ReadingsStorageClientAsync
+from foglamp.common.storage_client.storage_client import ReadingsStorageClientAsync, StorageClientAsync
 
 __author__ = "Ashish Jabble"
 __copyright__ = "Copyright (c) 2017 OSIsoft, LLC"
@@ -23,20 +24,17 @@ __license__ = "Apache 2.0"
 __version__ = "${VERSION}"
 
 
-URLS = ['foglamp/asset',
-        '/foglamp/asset/fogbench%2fhumidity',
+URLS = ['/foglamp/asset/fogbench%2fhumidity',
         '/foglamp/asset/fogbench%2fhumidity/temperature',
         '/foglamp/asset/fogbench%2fhumidity/temperature/summary',
         '/foglamp/asset/fogbench%2fhumidity/temperature/series']
 
-PAYLOADS = ['{"aggregate": {"column": "*", "alias": "count", "operation": "count"}, "group": "asset_code"}',
-            '{"return": ["reading", {"format": "YYYY-MM-DD HH24:MI:SS.MS", "column": "user_ts", "alias": "timestamp"}], "where": {"column": "asset_code", "condition": "=", "value": "fogbench/humidity"}, "limit": 20, "sort": {"column": "user_ts", "direction": "desc"}}',
+PAYLOADS = ['{"return": ["reading", {"format": "YYYY-MM-DD HH24:MI:SS.MS", "column": "user_ts", "alias": "timestamp"}], "where": {"column": "asset_code", "condition": "=", "value": "fogbench/humidity"}, "limit": 20, "sort": {"column": "user_ts", "direction": "desc"}}',
             '{"return": [{"format": "YYYY-MM-DD HH24:MI:SS.MS", "column": "user_ts", "alias": "timestamp"}, {"json": {"properties": "temperature", "column": "reading"}, "alias": "temperature"}], "where": {"column": "asset_code", "condition": "=", "value": "fogbench/humidity"}, "limit": 20, "sort": {"column": "user_ts", "direction": "desc"}}',
             '{"aggregate": [{"operation": "min", "alias": "min", "json": {"properties": "temperature", "column": "reading"}}, {"operation": "max", "alias": "max", "json": {"properties": "temperature", "column": "reading"}}, {"operation": "avg", "alias": "average", "json": {"properties": "temperature", "column": "reading"}}], "where": {"column": "asset_code", "condition": "=", "value": "fogbench/humidity"}}',
             '{"aggregate": [{"operation": "min", "alias": "min", "json": {"properties": "temperature", "column": "reading"}}, {"operation": "max", "alias": "max", "json": {"properties": "temperature", "column": "reading"}}, {"operation": "avg", "alias": "average", "json": {"properties": "temperature", "column": "reading"}}], "where": {"column": "asset_code", "condition": "=", "value": "fogbench/humidity"}, "group": {"format": "YYYY-MM-DD HH24:MI:SS", "column": "user_ts", "alias": "timestamp"}, "limit": 20, "sort": {"column": "user_ts", "direction": "desc"}}'
             ]
-RESULTS = [{'rows': [{'count': 10, 'asset_code': 'TI sensorTag/luxometer'}], 'count': 1},
-           {'rows': [{'reading': {'temperature': 26, 'humidity': 93}, 'timestamp': '2018-02-16 15:08:51.026'}], 'count': 1},
+RESULTS = [{'rows': [{'reading': {'temperature': 26, 'humidity': 93}, 'timestamp': '2018-02-16 15:08:51.026'}], 'count': 1},
            {'rows': [{'temperature': 26, 'timestamp': '2018-02-16 15:08:51.026'}], 'count': 1},
            {'rows': [{'max': '9', 'min': '9', 'average': '9'}], 'count': 1},
            {'rows': [{'average': '26', 'timestamp': '2018-02-16 15:08:51', 'max': '26', 'min': '26'}], 'count': 1}
@@ -117,9 +115,6 @@ class TestBrowserAssets:
                 json_response = json.loads(r)
                 if str(request_url).endswith("summary"):
                     assert {'temperature': result['rows'][0]} == json_response
-                elif str(request_url) == 'foglamp/asset':
-                    result['rows'][0]['assetCode'] = result['rows'][0].pop('asset_code')
-                    assert result['rows'] == json_response
                 else:
                     assert result['rows'] == json_response
             args, kwargs = query_patch.call_args
@@ -146,6 +141,52 @@ class TestBrowserAssets:
             assert 500 == resp.status
             assert 'Internal Server Error' == resp.reason
 
+    @pytest.mark.parametrize("request_params, payload", [
+        ('', {"return": ["asset_code", "reading_count",
+                         {"column": "first_ts", "format": "YYYY-MM-DD HH24:MI:SS.MS"},
+                         {"column": "last_ts", "format": "YYYY-MM-DD HH24:MI:SS.MS"}, "keys"],
+              "where": {"column": "reading_count", "condition": ">", "value": 0},
+              "sort": {"column": "asset_code", "direction": "asc"}}),
+        ('?limit=5&skip=10', {"return": ["asset_code", "reading_count",
+                                         {"column": "first_ts", "format": "YYYY-MM-DD HH24:MI:SS.MS"},
+                                         {"column": "last_ts", "format": "YYYY-MM-DD HH24:MI:SS.MS"}, "keys"],
+                              "where": {"column": "reading_count", "condition": ">", "value": 0},
+                              "sort": {"column": "asset_code", "direction": "asc"}, "limit": 5, "skip": 10})
+    ])
+    async def test_asset_counts(self, client, request_params, payload):
+        result = {'rows': [{'asset_code': 'TI sensorTag/luxometer', 'reading_count': 10,
+                            'first_ts': '2018-02-16 15:08:51.026', 'last_ts': '2018-02-16 15:18:51.026',
+                            'keys': {'lux': 'number'}}], 'count': 1}
+        storage_client_mock = MagicMock(StorageClientAsync)
+        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+            with patch.object(storage_client_mock, 'query_tbl_with_payload',
+                              return_value=mock_coro(result)) as query_patch:
+                resp = await client.get('foglamp/asset{}'.format(request_params))
+                assert 200 == resp.status
+                r = await resp.text()
+                json_response = json.loads(r)
+                assert [{'assetCode': 'TI sensorTag/luxometer', 'count': 10,
+                         'firstTimestamp': '2018-02-16 15:08:51.026', 'lastTimestamp': '2018-02-16 15:18:51.026',
+                         'keys': {'lux': 'number'}}] == json_response
+            args, kwargs = query_patch.call_args
+            assert 'asset_catalog' == args[0]
+            assert payload == json.loads(args[1])
+            query_patch.assert_called_once_with(args[0], args[1])
+
+    async def test_asset_counts_bad_request(self, client):
+        result = {'message': 'ERROR: something went wrong', 'retryable': False, 'entryPoint': 'retrieve'}
+        storage_client_mock = MagicMock(StorageClientAsync)
+        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+            with patch.object(storage_client_mock, 'query_tbl_with_payload', return_value=mock_coro(result)):
+                resp = await client.get('foglamp/asset')
+                assert 400 == resp.status
+                assert result['message'] == resp.reason
+
+    async def test_asset_counts_bad_limit(self, client):
+        resp = await client.get('foglamp/asset?limit=-1')
+        assert 400 == resp.status
+        assert "Limit must be a positive integer" == resp.reason
+
     @pytest.mark.parametrize("group_name, payload, result", [
         ('seconds', '{"aggregate": [{"alias": "min", "operation": "min", "json": {"properties": "temperature", "column": "reading"}}, {"alias": "max", "operation": "max", "json": {"properties": "temperature", "column": "reading"}}, {"alias": "average", "operation": "avg", "json": {"properties": "temperature", "column": "reading"}}], "where": {"column": "asset_code", "condition": "=", "value": "fogbench/humidity"}, "group": {"alias": "timestamp", "format": "YYYY-MM-DD HH24:MI:SS", "column": "user_ts"}, "limit": 20, "sort": {"column": "user_ts", "direction": "desc"}}',
          {'count': 1, 'rows': [{'min': '9', 'average': '9', 'max': '9', 'timestamp': '2018-02-19 17:35:25'}]}),
@@ -220,36 +261,38 @@ class TestBrowserAssets:
                 resp = await client.get('foglamp/asset/fogbench_humidity/summary')
                 assert 404 == resp.status
                 assert 'fogbench_humidity asset_code not found' == resp.reason
-            query_patch.assert_called_once_with('{"return": ["reading"], "where": {"column": "asset_code", "condition": "=", "value": "fogbench_humidity"}}')
+            query_patch.assert_called_once_with('{"return": ["reading"], "where": {"column": "asset_code", "condition": "=", "value": "fogbench_humidity"}, "limit": 1}')
 
     async def test_asset_all_readings_summary(self, client):
-        @asyncio.coroutine
-        def q_result(*args):
-            if payload1 == args[0]:
-                return {'rows': [{'reading': {'humidity': 20}}], 'count': 1}
-            if payload2 == args[0]:
-                return {'count': 1, 'rows': [{'min': 13.0, 'max': 83.0, 'average': 33.5}]}
-
         payload1 = {"return": ["reading"],
-                    "where": {"column": "asset_code", "condition": "=", "value": "fogbench_humidity"}}
+                    "where": {"column": "asset_code", "condition": "=", "value": "fogbench_humidity"}, "limit": 1}
         payload2 = {
-            "aggregate": [{"operation": "min", "json": {"properties": "humidity", "column": "reading"}, "alias": "min"},
-                          {"operation": "max", "json": {"properties": "humidity", "column": "reading"}, "alias": "max"},
-                          {"operation": "avg", "json": {"properties": "humidity", "column": "reading"},
-                           "alias": "average"}],
+            "aggregate": [{"operation": "min", "json": {"properties": "humidity", "column": "reading"}, "alias": "min_0"},
+                          {"operation": "max", "json": {"properties": "humidity", "column": "reading"}, "alias": "max_0"},
+                          {"operation": "avg", "json": {"properties": "humidity", "column": "reading"}, "alias": "avg_0"},
+                          {"operation": "min", "json": {"properties": "temperature", "column": "reading"},
+                           "alias": "min_1"},
+                          {"operation": "max", "json": {"properties": "temperature", "column": "reading"},
+                           "alias": "max_1"},
+                          {"operation": "avg", "json": {"properties": "temperature", "column": "reading"},
+                           "alias": "avg_1"}],
             "where": {"column": "asset_code", "condition": "=", "value": "fogbench_humidity"}, "limit": 20}
+        result1 = {'rows': [{'reading': OrderedDict([('humidity', 20), ('temperature', 25)])}], 'count': 1}
+        result2 = {'count': 1, 'rows': [{'min_0': 13.0, 'max_0': 83.0, 'avg_0': 33.5,
+                                         'min_1': 1.0, 'max_1': 30.0, 'avg_1': 22.5}]}
 
         readings_storage_client_mock = MagicMock(ReadingsStorageClientAsync)
         with patch.object(connect, 'get_readings_async', return_value=readings_storage_client_mock):
-            with patch.object(readings_storage_client_mock, 'query', side_effect=[q_result(payload1), q_result(payload2)]) as patch_query:
+            with patch.object(readings_storage_client_mock, 'query', side_effect=[mock_coro(result1), mock_coro(result2)]) as patch_query:
                 resp = await client.get('foglamp/asset/fogbench_humidity/summary')
                 assert 200 == resp.status
                 r = await resp.text()
                 json_response = json.loads(r)
-                assert [{'humidity': {'average': 33.5, 'max': 83.0, 'min': 13.0}}] == json_response
+                assert [{'humidity': {'average': 33.5, 'max': 83.0, 'min': 13.0}},
+                        {'temperature': {'average': 22.5, 'max': 30.0, 'min': 1.0}}] == json_response
+            # One query for the keys and one for all the aggregates
             assert 2 == patch_query.call_count
             args0, kwargs0 = patch_query.call_args_list[0]
             args1, kwargs1 = patch_query.call_args_list[1]
-            assert '{"return": ["reading"], "where": {"column": "asset_code", "condition": "=", "value": "fogbench_humidity"}}' in args0
-            # FIXME: ordering issue and add tests for datetimeunits request param
-            # assert '{"aggregate": [{"operation": "min", "json": {"column": "reading", "properties": "humidity"}, "alias": "min"}, {"operation": "max", "json": {"column": "reading", "properties": "humidity"}, "alias": "max"}, {"operation": "avg", "json": {"column": "reading", "properties": "humidity"}, "alias": "average"}], "where": {"column": "asset_code", "condition": "=", "value": "fogbench_humidity"}, "limit": 20}' in args1
+            assert payload1 == json.loads(args0[0])
+            assert payload2 == json.loads(args1[0])
@@ -16,6 +16,7 @@ from foglamp.services.core import connect
 from foglamp.common.storage_client.storage_client import StorageClientAsync
 from foglamp.common.configuration_manager import ConfigurationManager, ConfigurationManagerSingleton, _logger
 from foglamp.common.audit_logger import AuditLogger
+from foglamp.common.microservice_management_client.microservice_management_client import MicroserviceManagementClient
 
 __author__ = "Ashish Jabble"
 __copyright__ = "Copyright (c) 2017 OSIsoft, LLC"
@@ -536,6 +537,46 @@ class TestConfiguration:
                 assert json.loads(payload) == json.loads(args1[1])
             patch_get_all_items.assert_called_once_with(category_name)
 
+    async def test_add_config_item_refreshes_service_cache(self, client, reset_singleton):
+        async def async_mock_expected(*args):
+            return {'rows_affected': 1, "response": "updated"}
+
+        async def async_audit_mock(*args):
+            return None
+
+        category_name = 'cat'
+        items = {"info": {"default": "1", "description": "Test description", "type": "integer", "value": "1"}}
+        data = {"default": "true", "description": "Test description", "type": "boolean"}
+        storage_client_mock = MagicMock(StorageClientAsync)
+        c_mgr = ConfigurationManager(storage_client_mock)
+        c_mgr._cacheManager.update(category_name, items)
+        c_mgr._registered_interests[category_name] = {'foglamp.services.core.interest_registry.change_callback'}
+
+        # A service with an interest in the category holds a cached copy of it
+        service_client = MicroserviceManagementClient('localhost', 0)
+        service_client._interests['interest-id'] = category_name
+        service_client._cache_category(category_name, c_mgr.get_category_version(category_name), items)
+
+        async def notify_service(category_name, callbacks):
+            # As the change callback does, the service gets the items and the version of the category
+            service_client.category_changed(category_name, await c_mgr.get_category_all_items(category_name),
+                                            c_mgr.get_category_version(category_name))
+
+        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+            with patch.object(storage_client_mock, 'update_tbl', side_effect=async_mock_expected):
+                with patch.object(AuditLogger, '__init__', return_value=None):
+                    with patch.object(AuditLogger, 'information', side_effect=async_audit_mock):
+                        with patch.object(c_mgr._callbacks, 'run', side_effect=notify_service) as patch_run:
+                            resp = await client.post('/foglamp/category/{}/{}'.format(category_name, 'info1'),
+                                                     data=json.dumps(data))
+                            assert 200 == resp.status
+        patch_run.assert_called_once_with(category_name,
+                                          ['foglamp.services.core.interest_registry.change_callback'])
+        version, cached = service_client._categories[category_name]
+        assert c_mgr.get_category_version(category_name) == version
+        assert {'info', 'info1'} == set(cached)
+        assert 'true' == cached['info1']['value']
+
     async def test_unknown_exception_for_add_config_item(self, client):
         data = {"default": "d", "description": "Test description", "type": "boolean"}
         with patch.object(connect, 'get_storage_async', side_effect=Exception):
@@ -688,3 +729,60 @@ class TestConfiguration:
                     assert result == json_response
                 patch_get_all_items.assert_called_once_with(category_name)
             patch_update_bulk.assert_called_once_with(category_name, payload)
+
+    async def test_get_category_cache(self, client, reset_singleton):
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        c_mgr = ConfigurationManager(storage_client_mock)
+        c_mgr._cacheManager.update("rest_api", {})
+        assert "rest_api" in c_mgr._cacheManager
+        assert "service" not in c_mgr._cacheManager
+        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+            resp = await client.get('/foglamp/cache/category')
+            assert 200 == resp.status
+            r = await resp.text()
+            json_response = json.loads(r)
+        assert {'size': 1, 'maxCacheSize': 50, 'ttl': None, 'hit': 1, 'miss': 1, 'evicted': 0,
+                'expired': 0} == json_response
+
+    async def test_update_category_cache(self, client, reset_singleton):
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        c_mgr = ConfigurationManager(storage_client_mock)
+        c_mgr._cacheManager.update("rest_api", {})
+        c_mgr._cacheManager.update("service", {})
+        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+            resp = await client.put('/foglamp/cache/category', data=json.dumps({"maxCacheSize": 1, "ttl": 300}))
+            assert 200 == resp.status
+            r = await resp.text()
+            json_response = json.loads(r)
+        assert {'size': 1, 'maxCacheSize': 1, 'ttl': 300, 'hit': 0, 'miss': 0, 'evicted': 1,
+                'expired': 0} == json_response
+        assert ['service'] == list(c_mgr._cacheManager.cache)
+
+    async def test_get_category_callbacks(self, client, reset_singleton):
+        stats = {'foglamp.services.core.interest_registry.change_callback': {
+            'calls': 3, 'failures': 1, 'timeouts': 0, 'lastTime': 0.002, 'maxTime': 0.01, 'totalTime': 0.015}}
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        c_mgr = ConfigurationManager(storage_client_mock)
+        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+            with patch.object(c_mgr._callbacks, 'stats', return_value=stats) as patch_stats:
+                resp = await client.get('/foglamp/callback/category')
+                assert 200 == resp.status
+                r = await resp.text()
+                json_response = json.loads(r)
+            patch_stats.assert_called_once_with()
+        assert {'timeout': 30, 'callbacks': stats} == json_response
+
+    @pytest.mark.parametrize("payload, message", [
+        ({}, 'maxCacheSize or ttl is required'),
+        ({"maxCacheSize": "100"}, 'maxCacheSize must be an integer'),
+        ({"maxCacheSize": True}, 'maxCacheSize must be an integer'),
+        ({"ttl": "60"}, 'ttl must be a number'),
+        ({"maxCacheSize": 0}, 'max_cache_size must be greater than 0'),
+        ({"ttl": -1}, 'ttl must not be negative')
+    ])
+    async def test_update_category_cache_bad_request(self, client, reset_singleton, payload, message):
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+            resp = await client.put('/foglamp/cache/category', data=json.dumps(payload))
+            assert 400 == resp.status
+            assert message == resp.reason
@@ -7,7 +7,7 @@
 
 import asyncio
 import json
-from unittest.mock import MagicMock, patch, call
+from unittest.mock import MagicMock, patch, call, ANY
 from datetime import timedelta, datetime
 import uuid
 import pytest
@@ -625,29 +625,27 @@ class TestTasks:
 
     @pytest.mark.parametrize("request_params", ['', '?name=bla'])
     async def test_get_tasks_latest(self, client, request_params):
-        storage_client_mock = MagicMock(StorageClientAsync)
         response = {'count': 2, 'rows': [
             {'pid': '1', 'reason': '', 'exit_code': '0', 'id': '1',
              'process_name': 'bla', 'schedule_name': 'bla', 'end_time': '2018', 'start_time': '2018', 'state': '2'}]}
-        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
-            with patch.object(storage_client_mock, 'query_tbl_with_payload', return_value=mock_coro_response(response)):
-                resp = await client.get('/foglamp/task/latest{}'.format(request_params))
-                assert 200 == resp.status
-                result = await resp.text()
-                json_response = json.loads(result)
-                assert {'tasks': [{'reason': '', 'name': 'bla', 'processName': 'bla',
-                                   'state': 'Complete', 'exitCode': '0', 'endTime': '2018',
-                                   'pid': '1', 'startTime': '2018', 'id': '1'}]} == json_response
+        with patch.object(server.Server.scheduler, 'query_tasks', return_value=mock_coro_response(response)) as patch_query:
+            resp = await client.get('/foglamp/task/latest{}'.format(request_params))
+            assert 200 == resp.status
+            result = await resp.text()
+            json_response = json.loads(result)
+            assert {'tasks': [{'reason': '', 'name': 'bla', 'processName': 'bla',
+                               'state': 'Complete', 'exitCode': '0', 'endTime': '2018',
+                               'pid': '1', 'startTime': '2018', 'id': '1'}]} == json_response
+        patch_query.assert_called_once_with(ANY)
 
     @pytest.mark.parametrize("request_params", ['', '?name=not_exist'])
     async def test_get_tasks_latest_no_task_exception(self, client, request_params):
-        storage_client_mock = MagicMock(StorageClientAsync)
         response = {'count': 0, 'rows': []}
-        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
-            with patch.object(storage_client_mock, 'query_tbl_with_payload', return_value=mock_coro_response(response)):
-                resp = await client.get('/foglamp/task/latest{}'.format(request_params))
-                assert 404 == resp.status
-                assert "No Tasks found" == resp.reason
+        with patch.object(server.Server.scheduler, 'query_tasks', return_value=mock_coro_response(response)) as patch_query:
+            resp = await client.get('/foglamp/task/latest{}'.format(request_params))
+            assert 404 == resp.status
+            assert "No Tasks found" == resp.reason
+        patch_query.assert_called_once_with(ANY)
 
     async def test_cancel_task(self, client):
         async def mock_coro():
@@ -118,6 +118,22 @@ class TestService:
             }
         assert 6 == log_patch_info.call_count
 
+    async def test_get_monitor(self, client):
+        monitor = MagicMock()
+        monitor.round_duration = 0.25
+        monitor.ping_latency = {'name1': 0.012, 'name2': None}
+        with patch.object(server.Server, 'service_monitor', monitor):
+            resp = await client.get('/foglamp/service/monitor')
+        assert 200 == resp.status
+        json_response = json.loads(await resp.text())
+        assert {'roundDuration': 0.25, 'pingLatency': {'name1': 0.012, 'name2': None}} == json_response
+
+    async def test_get_monitor_not_started(self, client):
+        with patch.object(server.Server, 'service_monitor', None):
+            resp = await client.get('/foglamp/service/monitor')
+        assert 200 == resp.status
+        assert {'roundDuration': None, 'pingLatency': {}} == json.loads(await resp.text())
+
     @pytest.mark.parametrize("payload, code, message", [
         ('"blah"', 400, "Data payload must be a valid JSON"''),
         ('{}', 400, "Missing name property in payload."),
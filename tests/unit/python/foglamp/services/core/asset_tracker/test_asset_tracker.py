@@ -67,4 +67,49 @@ class TestAssetTracker:
             assert payload == json.loads(args[1])
         patch_get_cat_item.assert_called_once_with(category_name='service', item_name='name')
 
+    async def test_add_asset_records(self):
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        asset_tracker = AssetTracker(storage_client_mock)
+        asset_tracker.foglamp_svc_name = 'FogLAMP'
+        asset_tracker._registered_asset_records = [{"plugin": "sinusoid", "asset": "sinusoid", "event": "Ingest",
+                                                    "service": "sine"}]
+        records = [{"plugin": "sinusoid", "asset": "sinusoid", "event": "Ingest", "service": "sine"},
+                   {"plugin": "sinusoid", "asset": "sinusoid2", "event": "Ingest", "service": "sine"},
+                   {"plugin": "sinusoid", "asset": "sinusoid2", "event": "Ingest", "service": "sine"},
+                   {"plugin": "sinusoid", "asset": "sinusoid3", "event": "Ingest", "service": "sine"}]
+        expected = [{"plugin": "sinusoid", "asset": "sinusoid2", "event": "Ingest", "service": "sine",
+                     "foglamp": "FogLAMP"},
+                    {"plugin": "sinusoid", "asset": "sinusoid3", "event": "Ingest", "service": "sine",
+                     "foglamp": "FogLAMP"}]
+
+        async def mock_coro():
+            return {"response": "inserted", "rows_affected": 2}
+
+        with patch.object(asset_tracker._storage, 'insert_into_tbl', return_value=mock_coro()) as patch_insert_tbl:
+            result = await asset_tracker.add_asset_records(records)
+            assert expected == result
+        # A single storage request for all the new records
+        args, kwargs = patch_insert_tbl.call_args
+        assert 'asset_tracker' == args[0]
+        assert {"inserts": expected} == json.loads(args[1])
+        assert 3 == len(asset_tracker._registered_asset_records)
+
+    async def test_add_asset_records_all_tracked(self):
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        asset_tracker = AssetTracker(storage_client_mock)
+        asset_tracker._registered_asset_records = [{"plugin": "sinusoid", "asset": "sinusoid", "event": "Ingest",
+                                                    "service": "sine"}]
+        with patch.object(asset_tracker._storage, 'insert_into_tbl') as patch_insert_tbl:
+            result = await asset_tracker.add_asset_records(asset_tracker._registered_asset_records[:])
+            assert [] == result
+        assert 0 == patch_insert_tbl.call_count
+
+    async def test_add_asset_records_bad_record(self):
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        asset_tracker = AssetTracker(storage_client_mock)
+        asset_tracker._registered_asset_records = []
+        with pytest.raises(TypeError) as excinfo:
+            await asset_tracker.add_asset_records([{"asset": "sinusoid", "event": "Ingest"}])
+        assert 'Each record must have the asset, event, service and plugin keys' == str(excinfo.value)
+
     # TODO: will add -ve tests later
@@ -66,24 +66,27 @@ class TestChangeCallback:
             async def __aexit__(self, *args):
                 return None
 
-        with patch.object(ConfigurationManager, 'get_category_all_items', return_value=async_mock(None)) as cm_get_patch:
+        with patch.object(ConfigurationManager, 'get_category_version', return_value=1), \
+                patch.object(ConfigurationManager, 'get_category_all_items', return_value=async_mock(None)) as cm_get_patch:
             with patch.object(aiohttp.ClientSession, 'post', return_value=AsyncSessionContextManagerMock()) as post_patch:
                 await cb.run('catname1')
-            post_patch.assert_has_calls([call('http://saddress1:1/foglamp/change', data='{"category": "catname1", "items": null}', headers={'content-type': 'application/json'}),
-                                         call('http://saddress2:2/foglamp/change', data='{"category": "catname1", "items": null}', headers={'content-type': 'application/json'})])
+            post_patch.assert_has_calls([call('http://saddress1:1/foglamp/change', data='{"category": "catname1", "items": null, "version": 1}', headers={'content-type': 'application/json'}),
+                                         call('http://saddress2:2/foglamp/change', data='{"category": "catname1", "items": null, "version": 1}', headers={'content-type': 'application/json'})])
         cm_get_patch.assert_called_once_with('catname1')
 
-        with patch.object(ConfigurationManager, 'get_category_all_items', return_value=async_mock(None)) as cm_get_patch:
+        with patch.object(ConfigurationManager, 'get_category_version', return_value=1), \
+                patch.object(ConfigurationManager, 'get_category_all_items', return_value=async_mock(None)) as cm_get_patch:
             with patch.object(aiohttp.ClientSession, 'post', return_value=AsyncSessionContextManagerMock()) as post_patch:
                 await cb.run('catname2')
-            post_patch.assert_has_calls([call('http://saddress1:1/foglamp/change', data='{"category": "catname2", "items": null}', headers={'content-type': 'application/json'}),
-                                         call('http://saddress2:2/foglamp/change', data='{"category": "catname2", "items": null}', headers={'content-type': 'application/json'})])
+            post_patch.assert_has_calls([call('http://saddress1:1/foglamp/change', data='{"category": "catname2", "items": null, "version": 1}', headers={'content-type': 'application/json'}),
+                                         call('http://saddress2:2/foglamp/change', data='{"category": "catname2", "items": null, "version": 1}', headers={'content-type': 'application/json'})])
         cm_get_patch.assert_called_once_with('catname2')
 
-        with patch.object(ConfigurationManager, 'get_category_all_items', return_value=async_mock(None)) as cm_get_patch:
+        with patch.object(ConfigurationManager, 'get_category_version', return_value=1), \
+                patch.object(ConfigurationManager, 'get_category_all_items', return_value=async_mock(None)) as cm_get_patch:
             with patch.object(aiohttp.ClientSession, 'post', return_value=AsyncSessionContextManagerMock()) as post_patch:
                 await cb.run('catname3')
-            post_patch.assert_called_once_with('http://saddress3:3/foglamp/change', data='{"category": "catname3", "items": null}', headers={'content-type': 'application/json'})
+            post_patch.assert_called_once_with('http://saddress3:3/foglamp/change', data='{"category": "catname3", "items": null, "version": 1}', headers={'content-type': 'application/json'})
         cm_get_patch.assert_called_once_with('catname3')
 
     @pytest.mark.asyncio
@@ -117,7 +120,8 @@ class TestChangeCallback:
             async def __aexit__(self, *args):
                 return None
 
-        with patch.object(ConfigurationManager, 'get_category_all_items') as cm_get_patch:
+        with patch.object(ConfigurationManager, 'get_category_version', return_value=1), \
+                patch.object(ConfigurationManager, 'get_category_all_items') as cm_get_patch:
             with patch.object(aiohttp.ClientSession, 'post') as post_patch:
                 await cb.run('catname1')
             post_patch.assert_not_called()
@@ -159,7 +163,8 @@ class TestChangeCallback:
 
             async def __aexit__(self, *args):
                 return None
-        with patch.object(ConfigurationManager, 'get_category_all_items') as cm_get_patch:
+        with patch.object(ConfigurationManager, 'get_category_version', return_value=1), \
+                patch.object(ConfigurationManager, 'get_category_all_items') as cm_get_patch:
             with patch.object(aiohttp.ClientSession, 'post') as post_patch:
                 await cb.run('catname1')
             post_patch.assert_not_called()
@@ -206,14 +211,15 @@ class TestChangeCallback:
             async def __aexit__(self, *args):
                 return None
 
-        with patch.object(ConfigurationManager, 'get_category_all_items', return_value=async_mock(None)) as cm_get_patch:
+        with patch.object(ConfigurationManager, 'get_category_version', return_value=1), \
+                patch.object(ConfigurationManager, 'get_category_all_items', return_value=async_mock(None)) as cm_get_patch:
             with patch.object(aiohttp.ClientSession, 'post', return_value=AsyncSessionContextManagerMock()) as post_patch:
                 with patch.object(cb._LOGGER, 'exception') as exception_patch:
                     await cb.run('catname1')
                 exception_patch.assert_called_once_with(
                     'Unable to notify microservice with uuid %s as it is not found in the service registry', 'fakeid')
-            post_patch.assert_has_calls([call('http://saddress1:1/foglamp/change', data='{"category": "catname1", "items": null}', headers={'content-type': 'application/json'}),
-                                         call('http://saddress2:2/foglamp/change', data='{"category": "catname1", "items": null}', headers={'content-type': 'application/json'})])
+            post_patch.assert_has_calls([call('http://saddress1:1/foglamp/change', data='{"category": "catname1", "items": null, "version": 1}', headers={'content-type': 'application/json'}),
+                                         call('http://saddress2:2/foglamp/change', data='{"category": "catname1", "items": null, "version": 1}', headers={'content-type': 'application/json'})])
         cm_get_patch.assert_called_once_with('catname1')
 
     @pytest.mark.asyncio
@@ -245,11 +251,12 @@ class TestChangeCallback:
             async def __aexit__(self, *args):
                 return None
 
-        with patch.object(ConfigurationManager, 'get_category_all_items', return_value=async_mock(None)) as cm_get_patch:
+        with patch.object(ConfigurationManager, 'get_category_version', return_value=1), \
+                patch.object(ConfigurationManager, 'get_category_all_items', return_value=async_mock(None)) as cm_get_patch:
             with patch.object(aiohttp.ClientSession, 'post', return_value=AsyncSessionContextManagerMock()) as post_patch:
                 with patch.object(cb._LOGGER, 'exception') as exception_patch:
                     await cb.run('catname1')
                 exception_patch.assert_called_once_with(
                     'Unable to notify microservice with uuid %s due to exception: %s', s_id_1, '')
-            post_patch.assert_has_calls([call('http://saddress1:1/foglamp/change', data='{"category": "catname1", "items": null}', headers={'content-type': 'application/json'})])
+            post_patch.assert_has_calls([call('http://saddress1:1/foglamp/change', data='{"category": "catname1", "items": null, "version": 1}', headers={'content-type': 'application/json'})])
         cm_get_patch.assert_called_once_with('catname1')
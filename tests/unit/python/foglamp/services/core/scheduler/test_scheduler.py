@@ -201,6 +201,58 @@ class TestScheduler:
         assert 'OMF to PI north' in args
         assert 'North Readings to PI' in args
 
+    def test__get_task_module(self, mocker, tmpdir):
+        scripts_dir = tmpdir.mkdir("tasks")
+        scripts_dir.join("purge").write('#!/bin/sh\ncd "${FOGLAMP_ROOT}/python"\n\npython3 -m foglamp.tasks.purge "$@"\n')
+        scripts_dir.join("backup").write('#!/bin/sh\nif [ "$1" ]; then\n'
+                                         '    python3 -m foglamp.plugins.storage.sqlite.backup "$@"\nfi\n')
+        mocker.patch('foglamp.services.core.scheduler.scheduler._SCRIPTS_DIR', str(tmpdir))
+        scheduler = Scheduler()
+
+        assert 'foglamp.tasks.purge' == scheduler._get_task_module('tasks/purge')
+        # Shell logic around the module, the script itself is run
+        assert scheduler._get_task_module('tasks/backup') is None
+        assert scheduler._get_task_module('tasks/missing') is None
+
+        # Read once
+        scripts_dir.join("purge").remove()
+        assert 'foglamp.tasks.purge' == scheduler._get_task_module('tasks/purge')
+
+    @pytest.mark.asyncio
+    async def test__start_task_warm(self, mocker):
+        # GIVEN
+        scheduler = Scheduler()
+        scheduler._storage_async = MockStorageAsync(core_management_host=None, core_management_port=None)
+        mocker.patch.object(scheduler._logger, "info")
+        mocker.patch.multiple(scheduler, _core_management_port=9999)
+        schedule = scheduler._ScheduleRow(id=uuid.uuid4(), name="purge", type=Schedule.Type.INTERVAL, time=None,
+                                          day=None, repeat=datetime.timedelta(seconds=30), repeat_seconds=30,
+                                          exclusive=True, enabled=True, process_name="purge")
+        scheduler._process_scripts = {"purge": ["tasks/purge"]}
+        scheduler._schedule_executions[schedule.id] = scheduler._ScheduleExecution()
+        mocker.patch.object(scheduler, '_get_task_module', return_value='foglamp.tasks.purge')
+
+        async def start_task(module, args):
+            return MagicMock(pid=1234)
+
+        async def wait_for_task_completion(task_process):
+            pass
+
+        scheduler._task_runner = MagicMock()
+        scheduler._task_runner.start_task.side_effect = start_task
+        mocker.patch.object(scheduler, '_wait_for_task_completion', side_effect=wait_for_task_completion)
+        create_subprocess = mocker.patch.object(asyncio, 'create_subprocess_exec')
+
+        # WHEN
+        await scheduler._start_task(schedule)
+
+        # THEN
+        scheduler._task_runner.start_task.assert_called_once_with(
+            'foglamp.tasks.purge', ['--port=9999', '--address=127.0.0.1', '--name=purge'])
+        assert 0 == create_subprocess.call_count
+        task_process = list(scheduler._task_processes.values())[0]
+        assert 1234 == task_process.process.pid
+
     @pytest.mark.asyncio
     async def test_purge_tasks(self, mocker):
         # TODO: Mandatory - Add negative tests for full code coverage
@@ -263,6 +315,90 @@ class TestScheduler:
         assert 'COAP listener south' in args1
         assert 'OMF to PI north' in args2
 
+    @pytest.mark.asyncio
+    async def test__check_schedules_queue(self, mocker):
+        # GIVEN
+        scheduler = Scheduler()
+        mocker.patch.object(scheduler._logger, "info")
+        now = time.time()
+        mocker.patch.multiple(scheduler, _max_running_tasks=10, _start_time=now)
+        started = []
+
+        async def start_task(schedule):
+            started.append(schedule.name)
+
+        mocker.patch.object(scheduler, '_start_task', side_effect=start_task)
+
+        def add_schedule(name, exclusive, next_start_time):
+            schedule = scheduler._ScheduleRow(id=uuid.uuid4(), name=name, type=Schedule.Type.INTERVAL, time=None,
+                                              day=None, repeat=datetime.timedelta(seconds=30), repeat_seconds=30,
+                                              exclusive=exclusive, enabled=True, process_name="purge")
+            scheduler._schedules[schedule.id] = schedule
+            schedule_execution = scheduler._ScheduleExecution()
+            schedule_execution.next_start_time = next_start_time
+            scheduler._schedule_executions[schedule.id] = schedule_execution
+            scheduler._queue_schedule(schedule.id, next_start_time)
+            return schedule.id
+
+        due_id = add_schedule("due", False, now - 1)
+        add_schedule("later", True, now + 100)
+        edited_id = add_schedule("edited", False, now - 5)
+        # The schedule is edited after it was queued, the first entry is dropped
+        scheduler._schedule_executions[edited_id].next_start_time = now + 50
+        scheduler._queue_schedule(edited_id, now + 50)
+
+        # WHEN
+        earliest_start_time = await scheduler._check_schedules()
+
+        # THEN
+        assert ["due"] == started
+        # _schedule_next_task queued the next start of the nonexclusive schedule
+        assert scheduler._schedule_executions[due_id].next_start_time == earliest_start_time
+        assert now + 29 <= earliest_start_time
+        assert 3 == len(scheduler._schedule_queue)
+
+        # WHEN a manual start is queued
+        scheduler._schedule_executions[edited_id].start_now = True
+        scheduler._queue_schedule(edited_id, scheduler._START_NOW)
+        await scheduler._check_schedules()
+
+        # THEN
+        assert ["due", "edited"] == started
+        assert scheduler._schedule_executions[edited_id].start_now is False
+        assert now + 50 == scheduler._schedule_executions[edited_id].next_start_time
+
+    @pytest.mark.asyncio
+    async def test__check_schedules_due_and_queued(self, mocker):
+        # GIVEN a nonexclusive schedule due and queued with queue_task
+        scheduler = Scheduler()
+        mocker.patch.object(scheduler._logger, "info")
+        now = time.time()
+        mocker.patch.multiple(scheduler, _max_running_tasks=10, _start_time=now)
+        started = []
+
+        async def start_task(schedule):
+            started.append(schedule.name)
+
+        mocker.patch.object(scheduler, '_start_task', side_effect=start_task)
+        schedule = scheduler._ScheduleRow(id=uuid.uuid4(), name="due", type=Schedule.Type.INTERVAL, time=None,
+                                          day=None, repeat=datetime.timedelta(seconds=30), repeat_seconds=30,
+                                          exclusive=False, enabled=True, process_name="purge")
+        scheduler._schedules[schedule.id] = schedule
+        schedule_execution = scheduler._ScheduleExecution()
+        schedule_execution.next_start_time = now - 1
+        scheduler._schedule_executions[schedule.id] = schedule_execution
+        scheduler._queue_schedule(schedule.id, now - 1)
+        schedule_execution.start_now = True
+        scheduler._queue_schedule(schedule.id, scheduler._START_NOW)
+
+        # WHEN
+        earliest_start_time = await scheduler._check_schedules()
+
+        # THEN the task starts once and the schedule moves on to its next start
+        assert ["due"] == started
+        assert schedule_execution.start_now is False
+        assert now + 29 <= schedule_execution.next_start_time == earliest_start_time
+
     @pytest.mark.asyncio
     @pytest.mark.skip("_scheduler_loop() not suitable for unit testing. Will be tested during System tests.")
     async def test__scheduler_loop(self, mocker):
@@ -494,6 +630,13 @@ class TestScheduler:
                         "default": str(Scheduler._DEFAULT_MAX_COMPLETED_TASK_AGE_DAYS),
                         "value": str(Scheduler._DEFAULT_MAX_COMPLETED_TASK_AGE_DAYS)
                     },
+                    "warm_task_runner": {
+                        "description": "Start the Python tasks by forking a process that has already imported "
+                                       "them, instead of starting a new interpreter every time",
+                        "type": "boolean",
+                        "default": Scheduler._DEFAULT_WARM_TASK_RUNNER,
+                        "value": "true"
+                    },
             }
         # GIVEN
         scheduler = Scheduler()
@@ -512,6 +655,7 @@ class TestScheduler:
         assert 1 == get_cat.call_count
         assert scheduler._max_running_tasks is not None
         assert scheduler._max_completed_task_age is not None
+        assert scheduler._warm_task_runner is True
 
     @pytest.mark.asyncio
     async def test_start(self, mocker):
@@ -1238,6 +1382,38 @@ class TestScheduler:
         assert task.end_time is not None
         assert task.exit_code is '0'
 
+
+    @pytest.mark.asyncio
+    async def test_task_queries_flush_journal(self, mocker):
+        # GIVEN a task started since the task rows were last written
+        scheduler = Scheduler()
+        scheduler._storage_async = MagicMock()
+        calls = []
+
+        async def flush():
+            calls.append('flush')
+            return True
+
+        async def query(table, payload):
+            calls.append('query')
+            return {'count': 1, 'rows': [{'id': 't1', 'process_name': 'purge', 'schedule_name': 'purge',
+                                          'state': 1, 'start_time': '2018-09-14 15:30:00.000', 'end_time': None,
+                                          'reason': None, 'exit_code': None}]}
+
+        mocker.patch.object(scheduler._task_journal, 'flush', side_effect=flush)
+        mocker.patch.object(scheduler._storage_async, 'query_tbl_with_payload', side_effect=query)
+
+        # WHEN
+        task = await scheduler.get_task('t1')
+        tasks = await scheduler.get_tasks()
+        res = await scheduler.query_tasks({"where": {"column": "id", "condition": "=", "value": "t1"}})
+
+        # THEN the rows are written before they are read
+        assert ['flush', 'query', 'flush', 'query', 'flush', 'query'] == calls
+        assert 't1' == task.task_id
+        assert ['t1'] == [t.task_id for t in tasks]
+        assert 1 == res['count']
+
     @pytest.mark.skip("Need a suitable fixture")
     @pytest.mark.asyncio
     async def test_get_task_not_found(self, mocker):
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+import asyncio
+import json
+from unittest.mock import MagicMock
+import pytest
+
+from foglamp.services.core.scheduler.task_journal import TaskJournal
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+class FakeStorage(object):
+    def __init__(self, fail=0):
+        self.fail = fail
+        self.calls = []
+
+    async def insert_into_tbl(self, table, payload):
+        return self._write('insert', table, payload)
+
+    async def update_tbl(self, table, payload):
+        return self._write('update', table, payload)
+
+    def _write(self, operation, table, payload):
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError("storage unavailable")
+        self.calls.append((operation, table, json.loads(payload)))
+        return {"response": "inserted" if operation == 'insert' else "updated"}
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("scheduler", "task_journal")
+class TestTaskJournal:
+
+    @pytest.mark.asyncio
+    async def test_flush_started_and_completed(self):
+        storage = FakeStorage()
+        journal = TaskJournal(storage)
+        journal.task_started('t1', pid=1, state=1)
+        journal.task_started('t2', pid=2, state=1)
+        journal.task_completed('t1', exit_code=0, state=2)
+        assert 2 == len(journal)
+
+        assert await journal.flush() is True
+        assert 0 == len(journal)
+        # One insert with the completed values, no update
+        assert 1 == len(storage.calls)
+        operation, table, payload = storage.calls[0]
+        assert ('insert', 'tasks') == (operation, table)
+        assert [{'id': 't1', 'pid': 1, 'state': 2, 'exit_code': 0},
+                {'id': 't2', 'pid': 2, 'state': 1}] == payload['inserts']
+
+    @pytest.mark.asyncio
+    async def test_flush_update_after_insert(self):
+        storage = FakeStorage()
+        journal = TaskJournal(storage)
+        journal.task_started('t1', pid=1, state=1)
+        assert await journal.flush() is True
+        journal.task_completed('t1', exit_code=0, state=2)
+        journal.task_started('t2', pid=2, state=1)
+        assert await journal.flush() is True
+
+        assert ['insert', 'insert', 'update'] == [call[0] for call in storage.calls]
+        payload = storage.calls[2][2]
+        assert 1 == len(payload['updates'])
+        assert {'exit_code': 0, 'state': 2} == payload['updates'][0]['values']
+        assert {'column': 'id', 'condition': '=', 'value': 't1'} == payload['updates'][0]['where']
+
+    @pytest.mark.asyncio
+    async def test_flush_failed_insert_kept(self):
+        storage = FakeStorage(fail=1)
+        journal = TaskJournal(storage)
+        journal.task_started('t1', pid=1, state=1)
+        assert await journal.flush() is False
+        assert 1 == len(journal)
+
+        # The task completes before the insert is written
+        journal.task_completed('t1', exit_code=0, state=2)
+        assert await journal.flush() is True
+        assert 1 == len(storage.calls)
+        assert [{'id': 't1', 'pid': 1, 'state': 2, 'exit_code': 0}] == storage.calls[0][2]['inserts']
+
+    @pytest.mark.asyncio
+    async def test_flush_completed_during_failed_insert(self):
+        storage = FakeStorage(fail=1)
+        journal = TaskJournal(storage)
+        journal.task_started('t1', pid=1, state=1)
+
+        async def insert_into_tbl(table, payload):
+            journal.task_completed('t1', exit_code=0, state=2)
+            raise RuntimeError("storage unavailable")
+        storage.insert_into_tbl = insert_into_tbl
+        assert await journal.flush() is False
+        # The update is merged into the insert not written
+        assert 1 == len(journal)
+        assert 'update' not in journal._records['t1']
+        assert 2 == journal._records['t1']['insert']['state']
+
+    @pytest.mark.asyncio
+    async def test_flush_dropped(self):
+        storage = FakeStorage(fail=TaskJournal.MAX_ATTEMPTS)
+        journal = TaskJournal(storage)
+        journal.task_started('t1', pid=1, state=1)
+        for _ in range(TaskJournal.MAX_ATTEMPTS):
+            assert await journal.flush() is False
+        assert 0 == len(journal)
+        assert await journal.flush() is True
+        assert [] == storage.calls
+
+    @pytest.mark.asyncio
+    async def test_flushes_do_not_overlap(self):
+        storage = FakeStorage()
+        insert_written = asyncio.Event()
+
+        async def slow_insert(table, payload):
+            await insert_written.wait()
+            return storage._write('insert', table, payload)
+
+        storage.insert_into_tbl = slow_insert
+        journal = TaskJournal(storage)
+        journal.task_started('t1', pid=1, state=1)
+        periodic = asyncio.ensure_future(journal.flush())
+        await asyncio.sleep(0)
+        # The task completes while its insert is being written, a reader flushes
+        journal.task_completed('t1', exit_code=0, state=2)
+        reader = asyncio.ensure_future(journal.flush())
+        await asyncio.sleep(0.01)
+        assert [] == storage.calls
+        insert_written.set()
+        assert [True, True] == await asyncio.gather(periodic, reader)
+        assert ['insert', 'update'] == [operation for operation, table, payload in storage.calls]
+
+    @pytest.mark.asyncio
+    async def test_start_stop(self):
+        storage = FakeStorage()
+        journal = TaskJournal(storage, flush_interval=60)
+        journal.start()
+        journal.task_started('t1', pid=1, state=1)
+        await asyncio.sleep(0)
+        assert [] == storage.calls
+        # Stopping writes the rows left
+        await journal.stop()
+        assert 1 == len(storage.calls)
+        assert 0 == len(journal)
+
+    @pytest.mark.asyncio
+    async def test_stop_before_first_flush(self):
+        storage = FakeStorage()
+        journal = TaskJournal(storage, flush_interval=60)
+        journal.start()
+        journal.task_started('t1', pid=1, state=1)
+        await journal.stop()
+        assert 1 == len(storage.calls)
+
+    @pytest.mark.asyncio
+    async def test_stop_not_started(self):
+        storage = MagicMock()
+        journal = TaskJournal(storage)
+        await journal.stop()
+        storage.insert_into_tbl.assert_not_called()
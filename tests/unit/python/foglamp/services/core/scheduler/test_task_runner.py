@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+import asyncio
+import pytest
+
+from foglamp.services.core.scheduler.task_runner import WarmTaskRunner, WarmProcess, TaskRunnerError
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("scheduler", "task_runner")
+class TestWarmTaskRunner:
+
+    @pytest.mark.asyncio
+    async def test_start_task(self, event_loop):
+        task_runner = WarmTaskRunner()
+        await task_runner.start(['json.tool'])
+        try:
+            assert task_runner.is_running is True
+            process = await task_runner.start_task('json.tool', ['/nonexistent/file.json'])
+            assert process.pid > 0
+            # argparse error
+            assert 2 == await process.wait()
+            assert 2 == process.returncode
+        finally:
+            await task_runner.stop()
+        assert task_runner.is_running is False
+
+    @pytest.mark.asyncio
+    async def test_start_task_not_running(self, event_loop):
+        task_runner = WarmTaskRunner()
+        with pytest.raises(TaskRunnerError):
+            await task_runner.start_task('json.tool', [])
+
+    @pytest.mark.asyncio
+    async def test_wait_exit_code_lost(self, event_loop):
+        process = await asyncio.create_subprocess_exec("true")
+        await process.wait()
+        exit_future = asyncio.Future()
+        # The task runner stopped before the task
+        exit_future.set_result(None)
+        warm_process = WarmProcess(process.pid, exit_future)
+        assert 1 == await warm_process.wait()
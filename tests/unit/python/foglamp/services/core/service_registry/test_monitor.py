@@ -108,3 +108,40 @@ class TestMonitor:
                 assert excinfo.type in [TestMonitorException, TypeError]
 
         assert ServiceRegistry.get(idx=s_id_1)[0]._status is ServiceRecord.Status.Failed
+
+    @pytest.mark.asyncio
+    async def test__monitor_pings_concurrently(self):
+        class ResponseMock:
+            async def text(self):
+                return '{"uptime": 1}'
+
+        class SlowSessionContextManagerMock:
+            async def __aenter__(self):
+                await asyncio.sleep(.2)
+                return ResponseMock()
+
+            async def __aexit__(self, *args):
+                return None
+
+        class TestMonitorException(Exception):
+            pass
+
+        for i in range(5):
+            ServiceRegistry.register('sname{}'.format(i), 'Southbound', 'saddress{}'.format(i), i + 1, i + 1,
+                                     'protocol1')
+        monitor = Monitor()
+        monitor._sleep_interval = Monitor._DEFAULT_SLEEP_INTERVAL
+        monitor._ping_timeout = Monitor._DEFAULT_PING_TIMEOUT
+        monitor._max_attempts = Monitor._DEFAULT_MAX_ATTEMPTS
+
+        with patch.object(Monitor, '_sleep', side_effect=TestMonitorException()):
+            with patch.object(aiohttp.ClientSession, 'get', return_value=SlowSessionContextManagerMock()) as get_patch:
+                with pytest.raises(TestMonitorException):
+                    await monitor._monitor_loop()
+
+        assert 5 == get_patch.call_count
+        # One round takes the time of the slowest ping, not the sum of the pings
+        assert monitor.round_duration < .5
+        assert ['sname0', 'sname1', 'sname2', 'sname3', 'sname4'] == sorted(monitor.ping_latency)
+        assert all(latency >= .2 for latency in monitor.ping_latency.values())
+        assert all(s._status is ServiceRecord.Status.Running for s in ServiceRegistry.all())
@@ -9,9 +9,12 @@
 """
 import copy
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, call
 from foglamp.services.south.ingest import *
 from foglamp.services.south import ingest
+from foglamp.services.south.readings_buffer import ReadingsRingBuffer
+from foglamp.common.asset_catalog import AssetCatalog
+from foglamp.common.asset_tracker_events import AssetTrackerEvents
 from foglamp.common.storage_client.storage_client import StorageClientAsync, ReadingsStorageClientAsync
 from foglamp.common.microservice_management_client.microservice_management_client import MicroserviceManagementClient
 
@@ -54,7 +57,8 @@ class TestIngest:
         Ingest._write_statistics_sleep_task = None  # type: asyncio.Task
         Ingest._stop = False
         Ingest._started = False
-        Ingest._readings_lists = None  # type: List
+        Ingest._readings_buffers = None  # type: List
+        Ingest._readings_count = 0
         Ingest._current_readings_list_index = 0
         Ingest._insert_readings_tasks = None  # type: List[asyncio.Task]
         Ingest._readings_list_batch_size_reached = None  # type: List[asyncio.Event]
@@ -64,12 +68,18 @@ class TestIngest:
         Ingest._last_insert_time = 0  # type: int
         Ingest._readings_list_size = 0  # type: int
         Ingest._write_statistics_frequency_seconds = 5
+        Ingest._statistics_accumulator = None  # type: statistics.StatisticsAccumulator
+        Ingest._asset_catalog = None  # type: AssetCatalog
         Ingest._readings_buffer_size = 500
         Ingest._max_concurrent_readings_inserts = 5
         Ingest._readings_insert_batch_size = 100
         Ingest._readings_insert_batch_timeout_seconds = 1
         Ingest._max_readings_insert_batch_connection_idle_seconds = 60
         Ingest._max_readings_insert_batch_reconnect_wait_seconds = 10
+        Ingest._readings_buffer_full_policy = 'discard'
+        Ingest._readings_buffer_full_wait_seconds = 1.0
+        Ingest._readings_high_water = 0
+        Ingest._readings_low_water = 0
         Ingest.category = 'South'
         Ingest.default_config = {
             "readings_buffer_size": {
@@ -106,6 +116,19 @@ class TestIngest:
                 "type": "integer",
                 "default": str(Ingest._max_readings_insert_batch_reconnect_wait_seconds)
             },
+            "readings_buffer_full_policy": {
+                "description": "What to do with a reading when all the readings buffers are full, "
+                               "discard it or wait for room up to the buffer full wait time",
+                "type": "enumeration",
+                "options": ["discard", "wait"],
+                "default": Ingest._readings_buffer_full_policy
+            },
+            "readings_buffer_full_wait_seconds": {
+                "description": "Maximum number of seconds to wait for room in the readings buffers "
+                               "when the buffer full policy is wait",
+                "type": "float",
+                "default": str(Ingest._readings_buffer_full_wait_seconds)
+            },
         }
 
     @pytest.mark.asyncio
@@ -136,7 +159,10 @@ class TestIngest:
                int(new_config['max_readings_insert_batch_connection_idle_seconds']['value'])
         assert Ingest._max_readings_insert_batch_reconnect_wait_seconds == \
                int(new_config['max_readings_insert_batch_reconnect_wait_seconds']['value'])
-        
+        assert Ingest._readings_buffer_full_policy == new_config['readings_buffer_full_policy']['value']
+        assert Ingest._readings_buffer_full_wait_seconds == \
+               float(new_config['readings_buffer_full_wait_seconds']['value'])
+
     @pytest.mark.asyncio
     async def test_start(self, mocker):
 
@@ -157,10 +183,13 @@ class TestIngest:
         mocker.patch.object(MicroserviceManagementClient, "__init__", return_value=None)
         create_cfg = mocker.patch.object(MicroserviceManagementClient, "create_configuration_category", return_value=None)
         get_cfg = mocker.patch.object(MicroserviceManagementClient, "get_configuration_category", return_value=get_cat(Ingest.default_config))
-        mocker.patch.object(MicroserviceManagementClient, "get_asset_tracker_events", return_value={'track':[]})
+        mocker.patch.object(AssetTrackerEvents, "load_from_core", return_value=mock_coro())
         mocker.patch.object(MicroserviceManagementClient, "create_child_category", return_value=None)
         mocker.patch.object(statistics, "create_statistics", return_value=mock_create(None))
-        parent_service = MagicMock(_core_microservice_management_client=MicroserviceManagementClient())
+        configure_pool = mocker.patch.object(ReadingsStorageClientAsync, "configure_pool", return_value=mock_coro())
+        parent_service = MagicMock(_core_microservice_management_client=MicroserviceManagementClient(),
+                                   _readings_storage_async=ReadingsStorageClientAsync(),
+                                   _storage_async=StorageClientAsync())
         mocker.patch.object(Ingest, "_write_statistics", return_value=mock_coro())
         mocker.patch.object(Ingest, "_insert_readings", return_value=mock_coro())
 
@@ -178,8 +207,13 @@ class TestIngest:
         assert Ingest._max_concurrent_readings_inserts == len(Ingest._insert_readings_wait_tasks)
         assert Ingest._max_concurrent_readings_inserts == len(Ingest._readings_list_batch_size_reached)
         assert Ingest._max_concurrent_readings_inserts == len(Ingest._readings_list_not_empty)
-        assert Ingest._max_concurrent_readings_inserts == len(Ingest._readings_lists)
+        assert Ingest._max_concurrent_readings_inserts == len(Ingest._readings_buffers)
+        assert isinstance(Ingest._statistics_accumulator, statistics.StatisticsAccumulator)
+        assert isinstance(Ingest._asset_catalog, AssetCatalog)
         assert 0 == log_warning.call_count
+        configure_pool.assert_called_once_with(
+            connection_limit=Ingest._max_concurrent_readings_inserts,
+            keepalive_timeout=Ingest._max_readings_insert_batch_connection_idle_seconds)
 
     @pytest.mark.asyncio
     async def test_stop(self, mocker):
@@ -201,10 +235,14 @@ class TestIngest:
         mocker.patch.object(MicroserviceManagementClient, "__init__", return_value=None)
         create_cfg = mocker.patch.object(MicroserviceManagementClient, "create_configuration_category", return_value=None)
         get_cfg = mocker.patch.object(MicroserviceManagementClient, "get_configuration_category", return_value=get_cat(Ingest.default_config))
-        mocker.patch.object(MicroserviceManagementClient, "get_asset_tracker_events", return_value={'track':[]})
+        mocker.patch.object(AssetTrackerEvents, "load_from_core", return_value=mock_coro())
         mocker.patch.object(MicroserviceManagementClient, "create_child_category", return_value=None)
         mocker.patch.object(statistics, "create_statistics", return_value=mock_create(None))
-        parent_service = MagicMock(_core_microservice_management_client=MicroserviceManagementClient())
+        configure_pool = mocker.patch.object(ReadingsStorageClientAsync, "configure_pool", return_value=mock_coro())
+        parent_service = MagicMock(_core_microservice_management_client=MicroserviceManagementClient(),
+                                   _readings_storage_async=ReadingsStorageClientAsync(),
+                                   _storage_async=StorageClientAsync())
+        close = mocker.patch.object(StorageClientAsync, "close", side_effect=false_coro)
         mocker.patch.object(Ingest, "_write_statistics", return_value=mock_coro())
         mocker.patch.object(Ingest, "_insert_readings", return_value=mock_coro())
 
@@ -220,11 +258,13 @@ class TestIngest:
         assert Ingest._started is False
         assert Ingest._insert_readings_wait_tasks is None
         assert Ingest._insert_readings_tasks is None
-        assert Ingest._readings_lists is None
+        assert Ingest._readings_buffers is None
         assert Ingest._readings_list_batch_size_reached is None
         assert Ingest._readings_list_not_empty is None
         assert Ingest._readings_lists_not_full is None
         assert 0 == log_exception.call_count
+        # Pooled sessions of both the readings and the storage client are closed
+        assert 2 == close.call_count
 
     @pytest.mark.asyncio
     async def test_increment_discarded_readings(self, mocker):
@@ -240,10 +280,27 @@ class TestIngest:
     async def test__insert_readings(self, mocker):
         pass
 
-    @pytest.mark.skip(reason="This method uses a while True loop. Investigate as to how to write unit test for an infinite loop.")
     @pytest.mark.asyncio
     async def test_write_statistics(self, mocker):
-        pass
+        # GIVEN
+        accumulator = MagicMock(spec=statistics.StatisticsAccumulator)
+        Ingest._statistics_accumulator = accumulator
+        Ingest._readings_stats = 5
+        Ingest._discarded_readings_stats = 1
+        Ingest._sensor_stats = {'PUMP1': 3, 'PUMP2': 2}
+
+        # WHEN
+        await Ingest._write_statistics()
+
+        # THEN
+        assert 0 == Ingest._readings_stats
+        assert 0 == Ingest._discarded_readings_stats
+        assert {} == Ingest._sensor_stats
+        accumulator.increment.assert_has_calls([
+            call('READINGS', 5),
+            call('DISCARDED', 1),
+            call('PUMP1', 3, 'Readings received by FogLAMP since startup for sensor PUMP1'),
+            call('PUMP2', 2, 'Readings received by FogLAMP since startup for sensor PUMP2')])
 
     @pytest.mark.asyncio
     async def test_is_available_at_start(self, mocker):
@@ -251,10 +308,10 @@ class TestIngest:
         Ingest._max_concurrent_readings_inserts = 1
         Ingest._readings_list_size = 2
         Ingest._current_readings_list_index = 0
-        Ingest._readings_lists = []
-        Ingest._readings_lists.append([])
+        Ingest._readings_buffers = []
+        Ingest._readings_buffers.append(ReadingsRingBuffer(Ingest._readings_list_size))
         # Insert one task and leave room for more
-        Ingest._readings_lists[0].append(mock_coro())
+        Ingest._readings_buffers[0].append(mock_coro())
         log_warning = mocker.patch.object(ingest._LOGGER, "warning")
         mocker.patch.object(Ingest, "_write_statistics", return_value=mock_coro())
         mocker.patch.object(Ingest, "_insert_readings", return_value=mock_coro())
@@ -272,9 +329,9 @@ class TestIngest:
         Ingest._max_concurrent_readings_inserts = 1
         Ingest._readings_list_size = 2
         Ingest._current_readings_list_index = 0
-        Ingest._readings_lists = []
-        Ingest._readings_lists.append([])
-        Ingest._readings_lists[0].append(mock_coro())
+        Ingest._readings_buffers = []
+        Ingest._readings_buffers.append(ReadingsRingBuffer(Ingest._readings_list_size))
+        Ingest._readings_buffers[0].append(mock_coro())
         log_warning = mocker.patch.object(ingest._LOGGER, "warning")
         Ingest._stop = True
         mocker.patch.object(Ingest, "_write_statistics", return_value=mock_coro())
@@ -293,11 +350,11 @@ class TestIngest:
         Ingest._max_concurrent_readings_inserts = 1
         Ingest._readings_list_size = 2
         Ingest._current_readings_list_index = 0
-        Ingest._readings_lists = []
-        Ingest._readings_lists.append([])
+        Ingest._readings_buffers = []
+        Ingest._readings_buffers.append(ReadingsRingBuffer(Ingest._readings_list_size))
         # Insert two tasks
-        Ingest._readings_lists[0].append(mock_coro())
-        Ingest._readings_lists[0].append(mock_coro())
+        Ingest._readings_buffers[0].append(mock_coro())
+        Ingest._readings_buffers[0].append(mock_coro())
         log_warning = mocker.patch.object(ingest._LOGGER, "warning")
         mocker.patch.object(Ingest, "_write_statistics", return_value=mock_coro())
         mocker.patch.object(Ingest, "_insert_readings", return_value=mock_coro())
@@ -328,16 +385,16 @@ class TestIngest:
         Ingest._max_concurrent_readings_inserts = 1
         Ingest._readings_list_size = 2
         Ingest._current_readings_list_index = 0
-        Ingest._readings_lists = []
-        Ingest._readings_lists.append([])
+        Ingest._readings_buffers = []
+        Ingest._readings_buffers.append(ReadingsRingBuffer(Ingest._readings_list_size))
         Ingest._readings_list_not_empty = []
         Ingest._readings_list_not_empty.append(asyncio.Event())
         Ingest._started = True
         mocker.patch.object(Ingest, "_write_statistics", return_value=mock_coro())
         mocker.patch.object(Ingest, "_insert_readings", return_value=mock_coro())
         mocker.patch.object(MicroserviceManagementClient, "__init__", return_value=None)
-        mocker.patch.object(MicroserviceManagementClient, "create_asset_tracker_event", return_value=None)
-        assert 0 == len(Ingest._readings_lists[0])
+        Ingest._asset_tracker_events = MagicMock(spec=AssetTrackerEvents)
+        assert 0 == len(Ingest._readings_buffers[0])
         assert 'PUMP1' not in list(Ingest._sensor_stats.keys())
 
         # WHEN
@@ -347,7 +404,10 @@ class TestIngest:
                                   readings=data['readings'])
 
         # THEN
-        assert 1 == len(Ingest._readings_lists[0])
+        assert 1 == len(Ingest._readings_buffers[0])
+        Ingest._asset_tracker_events.add.assert_called_once_with(
+            data['asset'], "Ingest", Ingest._parent_service._name,
+            Ingest._parent_service._plugin_info['config']['plugin']['default'])
 
     @pytest.mark.asyncio
     async def test_add_readings_if_stop(self, mocker):
@@ -367,15 +427,15 @@ class TestIngest:
         Ingest._max_concurrent_readings_inserts = 1
         Ingest._readings_list_size = 2
         Ingest._current_readings_list_index = 0
-        Ingest._readings_lists = []
-        Ingest._readings_lists.append([])
+        Ingest._readings_buffers = []
+        Ingest._readings_buffers.append(ReadingsRingBuffer(Ingest._readings_list_size))
         Ingest._readings_list_not_empty = []
         Ingest._readings_list_not_empty.append(asyncio.Event())
         Ingest._stop = True
         log_warning = mocker.patch.object(ingest._LOGGER, "warning")
         mocker.patch.object(Ingest, "_write_statistics", return_value=mock_coro())
         mocker.patch.object(Ingest, "_insert_readings", return_value=mock_coro())
-        assert 0 == len(Ingest._readings_lists[0])
+        assert 0 == len(Ingest._readings_buffers[0])
 
         # WHEN
         await Ingest.add_readings(asset=data['asset'],
@@ -384,7 +444,7 @@ class TestIngest:
                                   readings=data['readings'])
 
         # THEN
-        assert 0 == len(Ingest._readings_lists[0])
+        assert 0 == len(Ingest._readings_buffers[0])
         assert 1 == log_warning.call_count
         log_warning.assert_called_with('The South Service is stopping')
 
@@ -406,14 +466,14 @@ class TestIngest:
         Ingest._max_concurrent_readings_inserts = 1
         Ingest._readings_list_size = 2
         Ingest._current_readings_list_index = 0
-        Ingest._readings_lists = []
-        Ingest._readings_lists.append([])
+        Ingest._readings_buffers = []
+        Ingest._readings_buffers.append(ReadingsRingBuffer(Ingest._readings_list_size))
         Ingest._readings_list_not_empty = []
         Ingest._readings_list_not_empty.append(asyncio.Event())
         Ingest._started = False
         mocker.patch.object(Ingest, "_write_statistics", return_value=mock_coro())
         mocker.patch.object(Ingest, "_insert_readings", return_value=mock_coro())
-        assert 0 == len(Ingest._readings_lists[0])
+        assert 0 == len(Ingest._readings_buffers[0])
 
         # WHEN
         with pytest.raises(RuntimeError):
@@ -423,7 +483,7 @@ class TestIngest:
                                       readings=data['readings'])
 
         # THEN
-        assert 0 == len(Ingest._readings_lists[0])
+        assert 0 == len(Ingest._readings_buffers[0])
 
     @pytest.mark.asyncio
     async def test_add_readings_incorrect_data_values(self, mocker):
@@ -443,14 +503,14 @@ class TestIngest:
         Ingest._max_concurrent_readings_inserts = 1
         Ingest._readings_list_size = 2
         Ingest._current_readings_list_index = 0
-        Ingest._readings_lists = []
-        Ingest._readings_lists.append([])
+        Ingest._readings_buffers = []
+        Ingest._readings_buffers.append(ReadingsRingBuffer(Ingest._readings_list_size))
         Ingest._readings_list_not_empty = []
         Ingest._readings_list_not_empty.append(asyncio.Event())
         Ingest._started = True
         mocker.patch.object(Ingest, "_write_statistics", return_value=mock_coro())
         mocker.patch.object(Ingest, "_insert_readings", return_value=mock_coro())
-        assert 0 == len(Ingest._readings_lists[0])
+        assert 0 == len(Ingest._readings_buffers[0])
 
         # WHEN
         # Check for asset None
@@ -488,7 +548,7 @@ class TestIngest:
                                       key=data['key'],
                                       readings=123)
         # THEN
-        assert 0 == len(Ingest._readings_lists[0])
+        assert 0 == len(Ingest._readings_buffers[0])
 
     @pytest.mark.asyncio
     async def test_add_readings_when_one_list_becomes_full(self, mocker):
@@ -509,9 +569,9 @@ class TestIngest:
         Ingest._readings_list_size = 1
         Ingest._readings_insert_batch_size = 1
         Ingest._current_readings_list_index = 0
-        Ingest._readings_lists = []
-        Ingest._readings_lists.append([])
-        Ingest._readings_lists.append([])
+        Ingest._readings_buffers = []
+        Ingest._readings_buffers.append(ReadingsRingBuffer(Ingest._readings_list_size))
+        Ingest._readings_buffers.append(ReadingsRingBuffer(Ingest._readings_list_size))
         Ingest._readings_list_not_empty = []
         Ingest._readings_list_not_empty.append(asyncio.Event())
         Ingest._readings_list_not_empty.append(asyncio.Event())
@@ -522,9 +582,9 @@ class TestIngest:
         mocker.patch.object(Ingest, "_write_statistics", return_value=mock_coro())
         mocker.patch.object(Ingest, "_insert_readings", return_value=mock_coro())
         mocker.patch.object(MicroserviceManagementClient, "__init__", return_value=None)
-        mocker.patch.object(MicroserviceManagementClient, "create_asset_tracker_event", return_value=None)
+        Ingest._asset_tracker_events = MagicMock(spec=AssetTrackerEvents)
 
-        assert 0 == len(Ingest._readings_lists[0])
+        assert 0 == len(Ingest._readings_buffers[0])
         assert 'PUMP1' not in list(Ingest._sensor_stats.keys())
 
         # WHEN
@@ -539,5 +599,168 @@ class TestIngest:
                                   readings=data['readings'])
 
         # THEN
-        assert 1 == len(Ingest._readings_lists[0])
-        assert 1 == len(Ingest._readings_lists[1])
+        assert 1 == len(Ingest._readings_buffers[0])
+        assert 1 == len(Ingest._readings_buffers[1])
+
+    def _setup_full_buffer(self, mocker, policy):
+        Ingest._max_concurrent_readings_inserts = 1
+        Ingest._readings_list_size = 1
+        Ingest._readings_insert_batch_size = 1
+        Ingest._current_readings_list_index = 0
+        Ingest._readings_buffers = [ReadingsRingBuffer(Ingest._readings_list_size)]
+        Ingest._readings_buffers[0].append(mock_coro())
+        Ingest._readings_count = 1
+        Ingest._readings_list_not_empty = [asyncio.Event()]
+        Ingest._readings_list_batch_size_reached = [asyncio.Event()]
+        Ingest._readings_lists_not_full = asyncio.Event()
+        Ingest._readings_buffer_full_policy = policy
+        Ingest._readings_buffer_full_wait_seconds = 0.2
+        Ingest._started = True
+        mocker.patch.object(ingest._LOGGER, "warning")
+        Ingest._asset_tracker_events = MagicMock(spec=AssetTrackerEvents)
+
+    @pytest.mark.asyncio
+    async def test_add_readings_when_all_lists_full_discard(self, mocker):
+        # GIVEN
+        self._setup_full_buffer(mocker, 'discard')
+
+        # WHEN
+        await Ingest.add_readings(asset='pump1', timestamp='2017-01-02T01:02:03.23232Z-05:00',
+                                  key=uuid.uuid4(), readings={"velocity": "500"})
+
+        # THEN
+        assert 1 == Ingest._discarded_readings_stats
+        assert 1 == len(Ingest._readings_buffers[0])
+
+    @pytest.mark.asyncio
+    async def test_add_readings_when_all_lists_full_wait(self, mocker):
+        # GIVEN
+        self._setup_full_buffer(mocker, 'wait')
+
+        async def insert_batch():
+            await asyncio.sleep(0.05)
+            Ingest._readings_count -= Ingest._readings_buffers[0].discard(1)
+            Ingest._readings_lists_not_full.set()
+
+        # WHEN
+        insert_task = asyncio.ensure_future(insert_batch())
+        await Ingest.add_readings(asset='pump1', timestamp='2017-01-02T01:02:03.23232Z-05:00',
+                                  key=uuid.uuid4(), readings={"velocity": "500"})
+        await insert_task
+
+        # THEN
+        assert 0 == Ingest._discarded_readings_stats
+        assert 1 == len(Ingest._readings_buffers[0])
+        assert 'pump1' == Ingest._readings_buffers[0].peek(1)[0].asset_code
+
+    @pytest.mark.asyncio
+    async def test_add_readings_when_all_lists_full_wait_timeout(self, mocker):
+        # GIVEN
+        self._setup_full_buffer(mocker, 'wait')
+
+        # WHEN
+        await Ingest.add_readings(asset='pump1', timestamp='2017-01-02T01:02:03.23232Z-05:00',
+                                  key=uuid.uuid4(), readings={"velocity": "500"})
+
+        # THEN
+        assert 1 == Ingest._discarded_readings_stats
+        assert 1 == len(Ingest._readings_buffers[0])
+
+    @pytest.mark.asyncio
+    async def test_buffer_occupancy(self, mocker):
+        # GIVEN
+        Ingest._max_concurrent_readings_inserts = 2
+        Ingest._readings_list_size = 10
+        Ingest._readings_count = 4
+        Ingest._readings_high_water = 12
+        Ingest._readings_low_water = 1
+
+        # WHEN
+        occupancy = Ingest.buffer_occupancy(reset=True)
+
+        # THEN
+        assert {'readings': 4, 'capacity': 20, 'high_water': 12, 'low_water': 1} == occupancy
+        assert {'readings': 4, 'capacity': 20, 'high_water': 4, 'low_water': 4} == Ingest.buffer_occupancy()
+
+    def _setup_buffers(self, mocker, buffers, size):
+        Ingest._max_concurrent_readings_inserts = buffers
+        Ingest._readings_list_size = size
+        Ingest._readings_insert_batch_size = size
+        Ingest._current_readings_list_index = 0
+        Ingest._readings_buffers = [ReadingsRingBuffer(size) for _ in range(buffers)]
+        Ingest._readings_list_not_empty = [asyncio.Event() for _ in range(buffers)]
+        Ingest._readings_list_batch_size_reached = [asyncio.Event() for _ in range(buffers)]
+        Ingest._readings_lists_not_full = asyncio.Event()
+        Ingest._started = True
+        Ingest._parent_service = MagicMock(_name='south1',
+                                           _plugin_info={'config': {'plugin': {'default': 'poll'}}})
+        Ingest._asset_tracker_events = MagicMock(spec=AssetTrackerEvents)
+        mocker.patch.object(ingest._LOGGER, "warning")
+
+    @pytest.mark.asyncio
+    async def test_add_readings_batch(self, mocker):
+        # GIVEN
+        self._setup_buffers(mocker, 2, 3)
+        readings = [{"asset": "pump{}".format(i % 2), "timestamp": "2017-01-02T01:02:03.23232Z-05:00",
+                     "key": str(uuid.uuid4()), "readings": {"velocity": i}} for i in range(5)]
+
+        # WHEN
+        added = await Ingest.add_readings_batch(readings)
+
+        # THEN
+        assert 5 == added
+        assert 5 == Ingest._readings_count
+        assert 3 == len(Ingest._readings_buffers[0])
+        assert 2 == len(Ingest._readings_buffers[1])
+        assert [0, 1, 2, 3, 4] == [r.reading['velocity'] for r in
+                                   Ingest._readings_buffers[0].peek(3) + Ingest._readings_buffers[1].peek(3)]
+        assert {'PUMP0': 3, 'PUMP1': 2} == Ingest._sensor_stats
+        # The asset tracker is checked once per asset
+        assert 2 == Ingest._asset_tracker_events.add.call_count
+        Ingest._asset_tracker_events.add.assert_any_call('pump0', 'Ingest', 'south1', 'poll')
+        Ingest._asset_tracker_events.add.assert_any_call('pump1', 'Ingest', 'south1', 'poll')
+
+    @pytest.mark.asyncio
+    async def test_add_readings_batch_invalid_readings(self, mocker):
+        # GIVEN
+        self._setup_buffers(mocker, 1, 10)
+        readings = [{"asset": "pump1", "timestamp": "2017-01-02T01:02:03.23232Z-05:00", "readings": {"v": 1}},
+                    {"asset": None, "timestamp": "2017-01-02T01:02:03.23232Z-05:00"},
+                    {"asset": "pump1", "timestamp": "2017-01-02T01:02:03.23232Z-05:00", "readings": 123},
+                    {"asset": "pump1"},
+                    {"asset": "pump1", "timestamp": "2017-01-02T01:02:03.23232Z-05:00"}]
+
+        # WHEN
+        added = await Ingest.add_readings_batch(readings)
+
+        # THEN
+        assert 2 == added
+        assert 3 == Ingest._discarded_readings_stats
+        assert 2 == len(Ingest._readings_buffers[0])
+        assert {'PUMP1': 2} == Ingest._sensor_stats
+
+    @pytest.mark.asyncio
+    async def test_add_readings_batch_when_all_lists_full(self, mocker):
+        # GIVEN
+        self._setup_buffers(mocker, 1, 2)
+        readings = [{"asset": "pump1", "timestamp": "2017-01-02T01:02:03.23232Z-05:00"} for _ in range(5)]
+
+        # WHEN
+        added = await Ingest.add_readings_batch(readings)
+
+        # THEN
+        assert 2 == added
+        assert 3 == Ingest._discarded_readings_stats
+        assert {'PUMP1': 2} == Ingest._sensor_stats
+
+    @pytest.mark.asyncio
+    async def test_add_readings_batch_not_a_list(self, mocker):
+        # GIVEN
+        self._setup_buffers(mocker, 1, 2)
+
+        # WHEN
+        with pytest.raises(TypeError) as excinfo:
+            await Ingest.add_readings_batch({"asset": "pump1"})
+
+        # THEN
+        assert 'readings must be a list' == str(excinfo.value)
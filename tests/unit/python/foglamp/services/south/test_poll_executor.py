@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from foglamp.services.south.poll_executor import PollExecutor, PollLatencyHistogram
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+class SlowPlugin(object):
+    """A plugin whose poll blocks, as a poll reading a serial device"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.threads = []
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def plugin_poll(self, handle):
+        with self._lock:
+            self.threads.append(threading.current_thread())
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.seconds)
+        with self._lock:
+            self.running -= 1
+        return {'asset': 'pump', 'handle': handle}
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("south", "poll")
+class TestPollLatencyHistogram:
+
+    def test_record(self):
+        histogram = PollLatencyHistogram()
+        for milliseconds in (0.5, 1, 3, 200, 200, 9000):
+            histogram.record(milliseconds)
+        result = histogram.to_dict()
+        assert 6 == result['count']
+        assert 9000 == result['max']
+        assert round(9404.5 / 6, 3) == result['mean']
+        assert {'<=1': 2, '<=5': 1, '<=10': 0, '<=50': 0, '<=100': 0, '<=500': 2, '<=1000': 0, '<=5000': 0,
+                '>5000': 1} == result['buckets']
+
+    def test_empty(self):
+        assert {'count': 0, 'mean': 0, 'max': 0} == {key: value for key, value in
+                                                     PollLatencyHistogram().to_dict().items() if key != 'buckets'}
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("south", "poll")
+class TestPollExecutor:
+
+    def test_bad_mode(self):
+        with pytest.raises(ValueError):
+            PollExecutor('process')
+
+    def test_default_mode(self):
+        assert 'inline' == PollExecutor().mode
+
+    @pytest.mark.asyncio
+    async def test_inline(self):
+        plugin = MagicMock()
+        plugin.plugin_poll.return_value = [{'asset': 'pump'}]
+        executor = PollExecutor('inline', max_concurrent_polls=4)
+        # Inline polls never overlap
+        assert 1 == executor.max_concurrent_polls
+        assert [{'asset': 'pump'}] == await executor.poll(plugin, 'handle')
+        plugin.plugin_poll.assert_called_once_with('handle')
+        assert 1 == executor.latency.count
+        await executor.stop()
+
+    @pytest.mark.asyncio
+    async def test_thread_does_not_block_the_loop(self):
+        plugin = SlowPlugin(0.3)
+        executor = PollExecutor('thread')
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.ensure_future(tick())
+        try:
+            assert {'asset': 'pump', 'handle': 'handle'} == await executor.poll(plugin, 'handle')
+        finally:
+            ticker.cancel()
+        await executor.stop()
+        # The loop kept running during the poll
+        assert ticks > 10
+        assert threading.current_thread() is not plugin.threads[0]
+        assert 300 <= executor.latency.max
+
+    @pytest.mark.asyncio
+    async def test_thread_concurrency(self):
+        plugin = SlowPlugin(0.2)
+        executor = PollExecutor('thread', max_concurrent_polls=2)
+        polls = [asyncio.ensure_future(executor.poll(plugin, None)) for _ in range(4)]
+        await asyncio.sleep(0.1)
+        assert 4 == executor.running
+        assert 2 == plugin.running
+        await asyncio.gather(*polls)
+        await executor.stop()
+        assert 2 == plugin.max_running
+        assert 4 == executor.latency.count
+
+    @pytest.mark.asyncio
+    async def test_single_thread(self):
+        plugin = SlowPlugin(0)
+        executor = PollExecutor('thread')
+        for _ in range(3):
+            await executor.poll(plugin, None)
+        await executor.stop()
+        # Every poll is made from the same thread
+        assert 1 == len(set(plugin.threads))
+
+    @pytest.mark.asyncio
+    async def test_stop_waits_for_polls(self):
+        plugin = SlowPlugin(0.2)
+        executor = PollExecutor('thread')
+        poll = asyncio.ensure_future(executor.poll(plugin, None))
+        await asyncio.sleep(0.05)
+        await executor.stop()
+        assert 0 == plugin.running
+        await poll
+
+    @pytest.mark.asyncio
+    async def test_stop_waits_for_cancelled_polls(self):
+        plugin = SlowPlugin(0.2)
+        executor = PollExecutor('thread')
+        poll = asyncio.ensure_future(executor.poll(plugin, None))
+        await asyncio.sleep(0.05)
+        poll.cancel()
+        # The thread keeps running plugin_poll
+        await executor.stop()
+        assert 0 == plugin.running
+
+    @pytest.mark.asyncio
+    async def test_stop_refuses_new_polls(self):
+        plugin = MagicMock()
+        executor = PollExecutor('inline')
+        await executor.stop()
+        assert await executor.poll(plugin, 'handle') is None
+        assert 0 == plugin.plugin_poll.call_count
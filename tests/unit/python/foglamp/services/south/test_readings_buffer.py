@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+""" Test services/south/readings_buffer.py
+
+"""
+import pytest
+from foglamp.services.south.readings_buffer import Reading, ReadingsRingBuffer
+
+__copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("services", "south", "readings_buffer")
+class TestReading:
+    def test_to_dict(self):
+        reading = Reading("pump1", "5b3be500-ff95-41ae-b5a4-cc99d08bef40", {"velocity": 500}, "2018-01-01 00:00:00")
+        assert {"asset_code": "pump1", "read_key": "5b3be500-ff95-41ae-b5a4-cc99d08bef40",
+                "reading": {"velocity": 500}, "user_ts": "2018-01-01 00:00:00"} == reading.to_dict()
+
+    def test_slots(self):
+        reading = Reading("pump1", None, {}, "2018-01-01 00:00:00")
+        with pytest.raises(AttributeError):
+            reading.foo = 1
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("services", "south", "readings_buffer")
+class TestReadingsRingBuffer:
+    def test_init(self):
+        buffer = ReadingsRingBuffer(4)
+        assert 0 == len(buffer)
+        assert 4 == buffer.capacity
+        assert 4 == buffer.free()
+        assert buffer.is_full() is False
+
+    def test_init_bad_capacity(self):
+        with pytest.raises(ValueError) as excinfo:
+            ReadingsRingBuffer(0)
+        assert "capacity must be greater than 0" == str(excinfo.value)
+
+    def test_append_until_full(self):
+        buffer = ReadingsRingBuffer(2)
+        buffer.append(1)
+        buffer.append(2)
+        assert buffer.is_full() is True
+        assert 0 == buffer.free()
+        with pytest.raises(OverflowError):
+            buffer.append(3)
+        assert [1, 2] == buffer.peek(5)
+
+    def test_peek_does_not_remove(self):
+        buffer = ReadingsRingBuffer(4)
+        for i in range(3):
+            buffer.append(i)
+        assert [0, 1] == buffer.peek(2)
+        assert 3 == len(buffer)
+
+    def test_discard(self):
+        buffer = ReadingsRingBuffer(4)
+        for i in range(3):
+            buffer.append(i)
+        assert 2 == buffer.discard(2)
+        assert [2] == buffer.peek(4)
+        assert 1 == buffer.discard(5)
+        assert 0 == len(buffer)
+
+    def test_wrap_around(self):
+        buffer = ReadingsRingBuffer(4)
+        for i in range(4):
+            buffer.append(i)
+        buffer.discard(3)
+        # tail wraps to the start of the preallocated slots
+        for i in range(4, 7):
+            buffer.append(i)
+        assert buffer.is_full() is True
+        assert [3, 4, 5, 6] == buffer.peek(4)
+        assert 3 == buffer.discard(3)
+        assert [6] == buffer.peek(4)
+        buffer.append(7)
+        assert [6, 7] == buffer.peek(4)
+
+    def test_discard_releases_references(self):
+        buffer = ReadingsRingBuffer(3)
+        for i in range(3):
+            buffer.append(object())
+        buffer.discard(2)
+        buffer.append(object())
+        buffer.discard(2)
+        assert 0 == len(buffer)
+        assert [None, None, None] == buffer._items
+
+    def test_clear(self):
+        buffer = ReadingsRingBuffer(3)
+        buffer.append(1)
+        buffer.append(2)
+        buffer.clear()
+        assert 0 == len(buffer)
+        assert [] == buffer.peek(3)
@@ -6,7 +6,9 @@
 
 import asyncio
 import copy
+import json
 import sys
+import time
 from unittest.mock import MagicMock, Mock, call, patch
 import pytest
 
@@ -15,6 +17,7 @@ from foglamp.services.south.server import Server
 from foglamp.common.storage_client.storage_client import StorageClientAsync
 from foglamp.services.common.microservice import FoglampMicroservice
 from foglamp.services.south.ingest import Ingest
+from foglamp.services.south.poll_executor import PollExecutor
 
 __author__ = "Amarendra K Sinha"
 __copyright__ = "Copyright (c) 2017 OSIsoft, LLC"
@@ -93,6 +96,10 @@ async def false_coro():
     return True
 
 
+async def notification_json(notification):
+    return notification
+
+
 @pytest.allure.feature("unit")
 @pytest.allure.story("south")
 class TestServicesSouthServer:
@@ -102,6 +109,11 @@ class TestServicesSouthServer:
             config['plugin']['value'] = config['plugin']['default']
             return config
 
+        def get_category(category_name):
+            if category_name == 'testAdvanced':
+                return {'poll_mode': {'value': 'thread'}, 'max_concurrent_polls': {'value': '1'}}
+            return cat_get()
+
         mocker.patch.object(FoglampMicroservice, "__init__", return_value=None)
 
         south_server = Server()
@@ -109,7 +121,7 @@ class TestServicesSouthServer:
 
         attrs = {
                     'create_configuration_category.return_value': None,
-                    'get_configuration_category.return_value': cat_get(),
+                    'get_configuration_category.side_effect': get_category,
                     'register_interest.return_value': {'id': 1234, 'message': 'all ok'}
         }
         south_server._core_microservice_management_client = Mock()
@@ -382,6 +394,50 @@ class TestServicesSouthServer:
         log_info.assert_has_calls(calls, any_order=True)
         assert 0 == log_exception.call_count
 
+    @pytest.mark.asyncio
+    async def test__stop_poll_plugin(self, loop, mocker):
+        # GIVEN
+        cat_get, south_server, ingest_start, log_exception, log_error, log_info, log_warning = self.south_fixture(mocker)
+        mocker.patch.object(Ingest, 'stop', return_value=mock_coro())
+        get_category = south_server._core_microservice_management_client.get_configuration_category.side_effect
+        south_server._core_microservice_management_client.get_configuration_category.side_effect = \
+            lambda category_name: {'poll_mode': {'value': 'thread'}, 'max_concurrent_polls': {'value': '2'}} \
+            if category_name == 'testAdvanced' else get_category(category_name)
+        events = []
+
+        def plugin_poll(handle):
+            events.append('poll')
+            time.sleep(.3)
+            events.append('polled')
+            return []
+
+        mock_plugin = MagicMock()
+        attrs = copy.deepcopy(plugin_attrs)
+        attrs['plugin_info.return_value']['mode'] = 'poll'
+        attrs['plugin_init.return_value'].update({'pollInterval': {
+            'description': 'The interval between poll calls expressed in milliseconds.',
+            'type': 'integer',
+            'default': '100',
+            'value': '100'
+            },
+        })
+        attrs['plugin_poll.side_effect'] = plugin_poll
+        attrs['plugin_shutdown.side_effect'] = lambda handle: events.append('shutdown')
+        mock_plugin.configure_mock(**attrs)
+        sys.modules['foglamp.plugins.south.test.test'] = mock_plugin
+
+        # WHEN
+        await south_server._start(loop)
+        # Stopped before the second poll is due, while the first one is running
+        await asyncio.sleep(.05)
+        South._CLEAR_PENDING_TASKS_TIMEOUT = 1
+        await south_server._stop(loop)
+
+        # THEN
+        # The plugin is shut down once the poll running has returned and no poll starts after it
+        assert ['poll', 'polled', 'shutdown'] == events
+        assert 0 == log_exception.call_count
+
     @pytest.mark.asyncio
     async def test__stop_plugin_stop_error(self, loop, mocker):
         # GIVEN
@@ -438,6 +494,51 @@ class TestServicesSouthServer:
 
         # THEN
 
+    @pytest.mark.parametrize("data, readings", [
+        ([{'asset': 'a', 'timestamp': 't1'}, {'asset': 'b', 'timestamp': 't2'}, {'asset': 'a', 'timestamp': 't3'}],
+         [{'asset': 'a', 'timestamp': 't1'}, {'asset': 'b', 'timestamp': 't2'}, {'asset': 'a', 'timestamp': 't3'}]),
+        ({'asset': 'a', 'timestamp': 't1'}, [{'asset': 'a', 'timestamp': 't1'}]),
+        ([], None)
+    ])
+    @pytest.mark.asyncio
+    async def test__poll(self, loop, mocker, data, readings):
+        # GIVEN
+        cat_get, south_server, ingest_start, log_exception, log_error, log_info, log_warning = self.south_fixture(mocker)
+        south_server._plugin = MagicMock()
+        south_server._plugin.plugin_poll.return_value = data
+        south_server._plugin_handle = {}
+        south_server._poll_executor = PollExecutor('inline')
+        add_readings_batch = mocker.patch.object(Ingest, 'add_readings_batch', return_value=mock_coro())
+        add_readings = mocker.patch.object(Ingest, 'add_readings')
+
+        # WHEN
+        await south_server._poll()
+
+        # THEN
+        # All the readings of the poll are added at once, in order
+        if readings is None:
+            assert 0 == add_readings_batch.call_count
+        else:
+            add_readings_batch.assert_called_once_with(readings)
+        assert 0 == add_readings.call_count
+
+    @pytest.mark.asyncio
+    async def test_ping_poll_latency(self, loop, mocker):
+        # GIVEN
+        cat_get, south_server, ingest_start, log_exception, log_error, log_info, log_warning = self.south_fixture(mocker)
+        south_server._start_time = 0
+        south_server._poll_executor = PollExecutor('inline')
+        south_server._poll_executor.latency.record(20)
+
+        # WHEN
+        response = await south_server.ping(request=None)
+
+        # THEN
+        result = json.loads(response.body.decode())
+        assert result['uptime'] > 0
+        assert 1 == result['pollLatency']['count']
+        assert 1 == result['pollLatency']['buckets']['<=50']
+
     @pytest.mark.asyncio
     async def test_change(self, loop, mocker):
         # GIVEN
@@ -448,12 +549,16 @@ class TestServicesSouthServer:
         mock_plugin.configure_mock(**attrs)
         sys.modules['foglamp.plugins.south.test.test'] = mock_plugin
 
+        request = MagicMock()
+        request.json.return_value = notification_json({'category': 'test', 'items': {'a': 1}, 'version': 7})
+
         # WHEN
         await south_server._start(loop)
         await asyncio.sleep(.5)
-        await south_server.change(request=None)
+        await south_server.change(request=request)
 
         # THEN
+        south_server._core_microservice_management_client.category_changed.assert_called_once_with('test', {'a': 1}, 7)
         assert 4 == log_info.call_count
         calls = [call('Started South Plugin: test'),
                  call('Configuration has changed for South plugin test'),
@@ -473,11 +578,14 @@ class TestServicesSouthServer:
         mock_plugin.configure_mock(**attrs)
         sys.modules['foglamp.plugins.south.test.test'] = mock_plugin
 
+        request = MagicMock()
+        request.json.return_value = notification_json({'category': 'test', 'items': None})
+
         # WHEN
         with pytest.raises(TypeError):
             await south_server._start(loop)
             await asyncio.sleep(.5)
-            await south_server.change(request=None)
+            await south_server.change(request=request)
 
         # THEN
         assert 2 == log_info.call_count
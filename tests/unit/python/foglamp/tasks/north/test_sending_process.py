@@ -16,6 +16,7 @@ import pytest
 
 import foglamp.tasks.north.sending_process as sp_module
 from foglamp.common.audit_logger import AuditLogger
+from foglamp.common.asset_tracker_events import AssetTrackerEvents
 from foglamp.common.storage_client.storage_client import StorageClientAsync, ReadingsStorageClientAsync
 from foglamp.tasks.north.sending_process import SendingProcess
 from foglamp.common.process import FoglampProcess, SilentArgParse, ArgumentParserError
@@ -956,6 +957,9 @@ class TestSendingProcess:
         # Start time track
         start_time = time.time()
 
+        sp._tracked_assets = MagicMock(spec=AssetTrackerEvents)
+        sp._tracked_assets.close.return_value = mock_async_call()
+
         with patch.object(sp, '_last_object_id_read', return_value=0):
             await sp.send_data()
 
@@ -1797,11 +1801,12 @@ class TestSendingProcess:
         SendingProcess._logger = MagicMock(spec=logging)
         sp._audit = MagicMock(spec=AuditLogger)
         sp._stream_id = 1
-        sp._tracked_assets = []
+        sp._tracked_assets = MagicMock(spec=AssetTrackerEvents)
 
         # Configures properly the SendingProcess, enabling JQFilter
         sp._config = {
             'memory_buffer_size': p_buffer_size,
+            'max_concurrent_sends': 1,
             'plugin': 'pi_server'
         }
 
@@ -1827,17 +1832,16 @@ class TestSendingProcess:
 
             with patch.object(sp._plugin, 'plugin_send',
                               side_effect=[asyncio.ensure_future(mock_send_rows(x)) for x in range(0, len(p_send_result))]):
-                with patch.object(sp._core_microservice_management_client, 'create_asset_tracker_event'):
-                    task_id = asyncio.ensure_future(sp._task_send_data())
+                task_id = asyncio.ensure_future(sp._task_send_data())
 
-                    # Lets the _task_fetch_data to run for a while
-                    await asyncio.sleep(3)
-    
-                    # Tear down
-                    sp._task_send_data_run = False
-                    sp._task_fetch_data_sem.release()
+                # Lets the _task_fetch_data to run for a while
+                await asyncio.sleep(3)
 
-                    await task_id
+                # Tear down
+                sp._task_send_data_run = False
+                sp._task_fetch_data_sem.release()
+
+                await task_id
 
         expected_new_last_object_id = p_send_result[len(p_send_result) - 1]["new_last_object_id"]
 
@@ -1979,11 +1983,12 @@ class TestSendingProcess:
         SendingProcess._logger = MagicMock(spec=logging)
         sp._audit = MagicMock(spec=AuditLogger)
         sp._stream_id = 1
-        sp._tracked_assets = []
+        sp._tracked_assets = MagicMock(spec=AssetTrackerEvents)
 
         # Configures properly the SendingProcess, enabling JQFilter
         sp._config = {
             'memory_buffer_size': p_buffer_size,
+            'max_concurrent_sends': 1,
             'plugin': 'pi_server'
         }
 
@@ -2014,33 +2019,32 @@ class TestSendingProcess:
                     sp._plugin,
                     'plugin_send',
                     side_effect=[asyncio.ensure_future(mock_send_rows(x)) for x in range(0, len(p_send_result))]):
-                with patch.object(sp._core_microservice_management_client, 'create_asset_tracker_event'):
-                    task_id = asyncio.ensure_future(sp._task_send_data())
+                task_id = asyncio.ensure_future(sp._task_send_data())
 
-                    # Lets the _task_fetch_data to run for a while
-                    await asyncio.sleep(3)
+                # Lets the _task_fetch_data to run for a while
+                await asyncio.sleep(3)
 
-                    # THEN - Step 1
-                    expected_new_last_object_id = p_rows_step1[len(p_rows_step1) - 1][0]["id"]
+                # THEN - Step 1
+                expected_new_last_object_id = p_rows_step1[len(p_rows_step1) - 1][0]["id"]
 
-                    assert sp._memory_buffer == expected_buffer
-                    patched_update_position_reached.assert_called_with(
-                                                                       expected_new_last_object_id,
-                                                                       expected_num_sent_step1)
+                assert sp._memory_buffer == expected_buffer
+                patched_update_position_reached.assert_called_with(
+                                                                   expected_new_last_object_id,
+                                                                   expected_num_sent_step1)
 
-                    # Fills the buffer - step 1
-                    for x in range(len(p_rows_step2)):
-                        sp._memory_buffer[x] = p_rows_step2[x]
+                # Fills the buffer - step 1
+                for x in range(len(p_rows_step2)):
+                    sp._memory_buffer[x] = p_rows_step2[x]
 
-                    # let handle step 2
-                    sp._task_fetch_data_sem.release()
-                    await asyncio.sleep(3)
+                # let handle step 2
+                sp._task_fetch_data_sem.release()
+                await asyncio.sleep(3)
 
-                    # Tear down
-                    sp._task_send_data_run = False
-                    sp._task_fetch_data_sem.release()
+                # Tear down
+                sp._task_send_data_run = False
+                sp._task_fetch_data_sem.release()
 
-                    await task_id
+                await task_id
 
         # THEN - Step 2
         expected_new_last_object_id = p_rows_step2[len(p_rows_step2) - 1][0]["id"]
@@ -2152,9 +2156,10 @@ class TestSendingProcess:
             return p_send_result[x]["data_sent"], p_send_result[x]["new_last_object_id"], p_send_result[x]["num_sent"]
 
         # Configures properly the SendingProcess, enabling JQFilter
-        fixture_sp._tracked_assets = []
+        fixture_sp._tracked_assets = MagicMock(spec=AssetTrackerEvents)
         fixture_sp._config = {
             'memory_buffer_size': p_buffer_size,
+            'max_concurrent_sends': 1,
             'plugin': 'pi_server'
         }
 
@@ -2176,18 +2181,17 @@ class TestSendingProcess:
                             'plugin_send',
                             side_effect=[
                                 asyncio.ensure_future(mock_send_rows(x)) for x in range(0, len(p_send_result))]):
-                        with patch.object(fixture_sp._core_microservice_management_client, 'create_asset_tracker_event'):
-                            with pytest.raises(RuntimeError):
-                                task_id = asyncio.ensure_future(fixture_sp._task_send_data())
+                        with pytest.raises(RuntimeError):
+                            task_id = asyncio.ensure_future(fixture_sp._task_send_data())
 
-                                # Lets the _task_fetch_data to run for a while
-                                await asyncio.sleep(3)
+                            # Lets the _task_fetch_data to run for a while
+                            await asyncio.sleep(3)
 
-                                # Tear down
-                                fixture_sp._task_send_data_run = False
-                                fixture_sp._task_fetch_data_sem.release()
+                            # Tear down
+                            fixture_sp._task_send_data_run = False
+                            fixture_sp._task_fetch_data_sem.release()
 
-                                await task_id
+                            await task_id
 
         # THEN - Checks log and audit are called in case of en error and the in memory buffer is as expected
         assert patched_logger.called
@@ -2196,6 +2200,53 @@ class TestSendingProcess:
 
         assert fixture_sp._memory_buffer == expected_buffer
 
+    @pytest.mark.asyncio
+    async def test_task_send_data_concurrent(self, event_loop, fixture_sp):
+        """ Unit tests - _task_send_data - blocks sent concurrently, the first one is the last to complete,
+            the position reached is the one of the last block """
+
+        blocks = [
+            [{"id": 1, "asset_code": "test_asset_code", "read_key": "ef6e1368-4182-11e8-842f-0ed5f89f718b",
+              "reading": {"humidity": 11, "temperature": 38}, "user_ts": "16/04/2018 16:32:55"}],
+            [{"id": 2, "asset_code": "test_asset_code", "read_key": "ef6e1368-4182-11e8-842f-0ed5f89f718b",
+              "reading": {"humidity": 12, "temperature": 39}, "user_ts": "16/04/2018 16:32:55"}],
+            [{"id": 3, "asset_code": "test_asset_code", "read_key": "ef6e1368-4182-11e8-842f-0ed5f89f718b",
+              "reading": {"humidity": 13, "temperature": 40}, "user_ts": "16/04/2018 16:32:55"}],
+        ]
+        completed = []
+
+        async def mock_send_rows(handle, block, stream_id):
+            """ the first block is the slowest one """
+            object_id = block[0]["id"]
+            await asyncio.sleep(0.3 if object_id == 1 else 0.1)
+            completed.append(object_id)
+            return True, object_id, 1
+
+        fixture_sp._tracked_assets = MagicMock(spec=AssetTrackerEvents)
+        fixture_sp._config = {
+            'memory_buffer_size': 3,
+            'max_concurrent_sends': 3,
+            'plugin': 'pi_server'
+        }
+        fixture_sp._memory_buffer = list(blocks)
+
+        with patch.object(fixture_sp, '_update_position_reached', return_value=mock_async_call()) \
+                as patched_update_position_reached:
+            with patch.object(fixture_sp._plugin, 'plugin_send', side_effect=mock_send_rows):
+                task_id = asyncio.ensure_future(fixture_sp._task_send_data())
+
+                await asyncio.sleep(1)
+
+                # Tear down
+                fixture_sp._task_send_data_run = False
+                fixture_sp._task_fetch_data_sem.release()
+
+                await task_id
+
+        assert [2, 3, 1] == completed
+        assert [None, None, None] == fixture_sp._memory_buffer
+        patched_update_position_reached.assert_called_once_with(3, 3)
+
     @pytest.mark.asyncio
     async def test_update_position_reached(self, event_loop):
         """ Unit tests - _update_position_reached """
@@ -2266,6 +2317,7 @@ class TestSendingProcess:
                     "source": {"value": 'readings'},
                     "blockSize": {"value": "10"},
                     "memory_buffer_size": {"value": "10"},
+                    "max_concurrent_sends": {"value": "2"},
                     "sleepInterval": {"value": "10"},
                     "plugin": {"value": "omf"},
                     "stream_id": {"value": "1"}
@@ -2277,6 +2329,7 @@ class TestSendingProcess:
                     "source": 'readings',
                     "blockSize": 10,
                     "memory_buffer_size": 10,
+                    "max_concurrent_sends": 2,
                     "sleepInterval": 10,
                     "plugin": "omf",
                     "stream_id": 1
@@ -2305,6 +2358,7 @@ class TestSendingProcess:
         assert sp._config['source'] == expected_config['source']
         assert sp._config['blockSize'] == expected_config['blockSize']
         assert sp._config['memory_buffer_size'] == expected_config['memory_buffer_size']
+        assert sp._config['max_concurrent_sends'] == expected_config['max_concurrent_sends']
         assert sp._config['sleepInterval'] == expected_config['sleepInterval']
         assert sp._config['plugin'] == expected_config['plugin']
         assert sp._config['stream_id'] == expected_config['stream_id']
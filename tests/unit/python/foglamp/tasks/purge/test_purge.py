@@ -273,6 +273,10 @@ class TestPurge:
         def mock_purge():
             return 1, 2
 
+        @asyncio.coroutine
+        def mock_update_asset_catalog():
+            return None
+
         mockStorageClientAsync = MagicMock(spec=StorageClientAsync)
         mockAuditLogger = AuditLogger(mockStorageClientAsync)
 
@@ -282,10 +286,13 @@ class TestPurge:
                 p._logger.exception = MagicMock()
                 with patch.object(p, 'set_configuration', return_value=mock_config()) as mock_set_config:
                     with patch.object(p, 'purge_data', return_value=mock_purge()) as mock_purge_data:
-                        with patch.object(p, 'write_statistics') as mock_write_stats:
-                            await p.run()
-                            # Test the positive case when no error in try block
-                        mock_write_stats.assert_called_once_with(1, 2)
+                        with patch.object(p, 'update_asset_catalog',
+                                          return_value=mock_update_asset_catalog()) as mock_update_catalog:
+                            with patch.object(p, 'write_statistics') as mock_write_stats:
+                                await p.run()
+                                # Test the positive case when no error in try block
+                            mock_write_stats.assert_called_once_with(1, 2)
+                        mock_update_catalog.assert_called_once_with()
                     mock_purge_data.assert_called_once_with("Some config")
                 mock_set_config.assert_called_once_with()
 
@@ -7,10 +7,10 @@
 """Test tasks/statistics/statistics_history.py"""
 
 import asyncio
-from unittest.mock import patch, MagicMock
+import json
+from unittest.mock import patch, MagicMock, ANY
 import pytest
 from datetime import datetime
-import ast
 from foglamp.common import logger
 from foglamp.common.storage_client.storage_client import StorageClientAsync
 from foglamp.tasks.statistics.statistics_history import StatisticsHistory
@@ -49,32 +49,35 @@ class TestStatisticsHistory:
             log.assert_called_once_with("StatisticsHistory")
         mock_process.assert_called_once_with()
 
-    async def test_insert_into_stats_history(self):
+    async def test_bulk_insert_into_stats_history(self):
         with patch.object(FoglampProcess, '__init__'):
             with patch.object(logger, "setup"):
                 sh = StatisticsHistory()
                 sh._storage_async = MagicMock(spec=StorageClientAsync)
                 with patch.object(sh._storage_async, "insert_into_tbl", return_value=mock_coro(None)) as patch_storage:
                     ts = utils.local_timestamp()
-                    await sh._insert_into_stats_history(key='Bla', value=1, history_ts=ts)
+                    await sh._bulk_insert_into_stats_history([('Bla', 1), ('Foo', 0)], history_ts=ts)
+                patch_storage.assert_called_once_with("statistics_history", ANY)
                 args, kwargs = patch_storage.call_args
-                assert "statistics_history" == args[0]
-                payload = ast.literal_eval(args[1])
-                assert "Bla" == payload["key"]
-                assert 1 == payload["value"]
+                payload = json.loads(args[1])
+                assert [{"key": "Bla", "value": 1, "history_ts": ts},
+                        {"key": "Foo", "value": 0, "history_ts": ts}] == payload["inserts"]
 
-    async def test_update_previous_value(self):
+    async def test_bulk_update_previous_value(self):
         with patch.object(FoglampProcess, '__init__'):
             with patch.object(logger, "setup"):
                 sh = StatisticsHistory()
                 sh._storage_async = MagicMock(spec=StorageClientAsync)
                 with patch.object(sh._storage_async, "update_tbl", return_value=mock_coro(None)) as patch_storage:
-                    await sh._update_previous_value(key='Bla', value=1)
+                    await sh._bulk_update_previous_value([('Bla', 1), ('Foo', 5)])
+                patch_storage.assert_called_once_with("statistics", ANY)
                 args, kwargs = patch_storage.call_args
-                assert "statistics" == args[0]
-                payload = ast.literal_eval(args[1])
-                assert "Bla" == payload["where"]["value"]
-                assert 1 == payload["values"]["previous_value"]
+                payload = json.loads(args[1])
+                assert 2 == len(payload["updates"])
+                assert "Bla" == payload["updates"][0]["where"]["value"]
+                assert 1 == payload["updates"][0]["values"]["previous_value"]
+                assert "Foo" == payload["updates"][1]["where"]["value"]
+                assert 5 == payload["updates"][1]["values"]["previous_value"]
 
     async def test_run(self):
         with patch.object(FoglampProcess, '__init__'):
@@ -86,15 +89,33 @@ class TestStatisticsHistory:
                                     'value': 0, 'key': 'PURGED', 'previous_value': 0,
                                     'ts': '2018-08-31 17:03:17.597055+05:30'},
                                    {'description': 'Readings received by FogLAMP',
-                                    'value': 0, 'key': 'READINGS', 'previous_value': 0,
+                                    'value': 10, 'key': 'READINGS', 'previous_value': 4,
                                     'ts': '2018-08-31 17:03:17.597055+05:30'
                                     }]
                           }
                 with patch.object(sh._storage_async, "query_tbl", return_value=mock_coro(retval)) as mock_keys:
-                    with patch.object(sh, "_insert_into_stats_history", return_value=mock_coro(None)) as mock_insert_history:
-                        with patch.object(sh, "_update_previous_value", return_value=mock_coro(None)) as mock_update:
+                    with patch.object(sh, "_bulk_insert_into_stats_history", return_value=mock_coro(None)) as mock_insert_history:
+                        with patch.object(sh, "_bulk_update_previous_value", return_value=mock_coro(None)) as mock_update:
                             await sh.run()
-                        assert 2 == mock_update.call_count
+                        mock_update.assert_called_once_with([('READINGS', 10)])
                     args, kwargs = mock_insert_history.call_args
-                    assert "READINGS" == kwargs["key"]
+                    assert [('PURGED', 0), ('READINGS', 6)] == args[0]
+                    assert 1 == mock_insert_history.call_count
                 mock_keys.assert_called_once_with('statistics')
+
+    async def test_run_no_changes(self):
+        with patch.object(FoglampProcess, '__init__'):
+            with patch.object(logger, "setup"):
+                sh = StatisticsHistory()
+                sh._storage_async = MagicMock(spec=StorageClientAsync)
+                retval = {'count': 1,
+                          'rows': [{'description': 'Readings received by FogLAMP',
+                                    'value': 4, 'key': 'READINGS', 'previous_value': 4,
+                                    'ts': '2018-08-31 17:03:17.597055+05:30'}]
+                          }
+                with patch.object(sh._storage_async, "query_tbl", return_value=mock_coro(retval)):
+                    with patch.object(sh, "_bulk_insert_into_stats_history", return_value=mock_coro(None)) as mock_insert_history:
+                        with patch.object(sh, "_bulk_update_previous_value") as mock_update:
+                            await sh.run()
+                        assert 0 == mock_update.call_count
+                    mock_insert_history.assert_called_once_with([('READINGS', 0)], history_ts=ANY)